@@ -0,0 +1,33 @@
+"""
+Offline analytics over storageService.exportData dumps.
+
+Exports are streamed into NumPy columns (one export at a time, in a
+process pool), cached as ``.npz`` by content hash, joined, and reduced to
+word-count, session-productivity and pacing aggregates.  NumPy is needed
+for everything but the streaming reader; it is listed in
+``analytics/requirements.txt``.
+"""
+
+from .aggregates import aggregate, pacing, productivity, summary, word_counts
+from .cache import ColumnCache, export_digest
+from .columns import Columns, concat, load_export, read_export
+from .jsonstream import iter_paths
+from .runner import AnalyticsRun, ExportResult, run_parallel
+
+__all__ = [
+    'AnalyticsRun',
+    'ColumnCache',
+    'Columns',
+    'ExportResult',
+    'aggregate',
+    'concat',
+    'export_digest',
+    'iter_paths',
+    'load_export',
+    'pacing',
+    'productivity',
+    'read_export',
+    'run_parallel',
+    'summary',
+    'word_counts',
+]
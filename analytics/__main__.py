@@ -0,0 +1,120 @@
+"""
+Aggregate storageService.exportData dumps.
+
+    python -m analytics 'exports/**/*.json'              # word counts, productivity, pacing
+    python -m analytics 'exports/*.json' --jobs 8 --json report.json
+    python -m analytics 'exports/*.json' --no-cache      # parse every export again
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from .cache import DEFAULT_CACHE_DIR
+from .runner import run_parallel
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m analytics', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('globs', nargs='+', help='export files to aggregate, e.g. exports/**/*.json')
+    parser.add_argument('--root', default='.', help='directory the globs are relative to')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help='column cache directory, relative to --root (default: %(default)s)')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='ignore and do not update the column cache')
+    parser.add_argument('--json', metavar='PATH', help='also write the aggregates as JSON')
+    return parser.parse_args(argv)
+
+
+def _number(value, digits: int = 1) -> str:
+    return '-' if value is None else f'{value:,.{digits}f}'
+
+
+def _distribution(label: str, stats: dict, digits: int = 0) -> str:
+    return (f'  {label:<24} n={stats["count"]:<8,} mean={_number(stats["mean"], digits):<10} '
+            f'p10={_number(stats["p10"], digits):<10} median={_number(stats["p50"], digits):<10} '
+            f'p90={_number(stats["p90"], digits)}')
+
+
+def format_aggregates(aggregates: dict) -> str:
+    words = aggregates['word_counts']
+    sessions = aggregates['productivity']
+    pacing = aggregates['pacing']
+    targets = words['targets']
+    lines = [
+        f'{aggregates["projects"]:,} projects, {aggregates["chapters"]:,} chapters, '
+        f'{aggregates["scenes"]:,} scenes, {aggregates["notes"]:,} notes',
+        '',
+        'Word counts',
+        _distribution('words per project', words['projects']),
+        _distribution('words per scene', words['scenes']),
+        _distribution('words per note', words['notes']),
+        f'  {targets["reached"]:,} of {targets["projects"]:,} projects with a target have reached it',
+        '',
+        'Sessions',
+        f'  {sessions["sessions"]:,} sessions, {_number(sessions["hours"])} hours, '
+        f'{sessions["net_words"]:,} net words ({sessions["words_written"]:,} written, '
+        f'{sessions["words_deleted"]:,} deleted)',
+        f'  {_number(sessions["words_per_hour"])} net words per hour overall',
+        _distribution('words per hour', sessions['session_words_per_hour']),
+        _distribution('minutes per session', sessions['session_minutes']),
+        _distribution('words per active day', sessions['words_per_active_day']),
+    ]
+    if sessions['most_productive_hour'] is not None:
+        lines.append(f'  most productive hour: {sessions["most_productive_hour"]:02d}:00 UTC')
+    lines += [
+        '',
+        'Pacing',
+        _distribution('words per chapter', pacing['chapter_words']),
+        _distribution('scene length variation', pacing['scene_variation'], 2),
+        _distribution('chapter length variation', pacing['chapter_variation'], 2),
+    ]
+    return '\n'.join(lines)
+
+
+def _expand_globs(patterns, root):
+    """Expand ``**``-style globs relative to ``root`` into sorted unique file paths."""
+    paths = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            if os.path.isfile(path):
+                paths.add(os.path.normpath(path))
+    return sorted(paths)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    paths = _expand_globs(args.globs, args.root)
+    if not paths:
+        print('No export matched', file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    try:
+        run = run_parallel(paths, jobs=args.jobs,
+                           cache_dir=os.path.join(args.root, args.cache) if args.cache else None)
+    except ImportError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    for result in run.failed:
+        print(f'error in {result.path}: {result.error}', file=sys.stderr)
+    cached = sum(result.cached for result in run.loaded)
+    print(f'{len(run.loaded)} of {len(paths)} exports loaded ({cached} from cache) '
+          f'in {time.perf_counter() - started:.2f} s')
+    print()
+    print(format_aggregates(run.aggregates))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'exports': len(run.loaded), **run.aggregates}, f, indent=2)
+        print(f'Wrote {args.json}')
+    return 1 if run.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
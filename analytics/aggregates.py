@@ -0,0 +1,159 @@
+"""
+Word-count, session-productivity and pacing aggregates over the joined
+columns of many exports (:func:`analytics.columns.concat`).
+
+Every aggregate is computed with whole-column NumPy operations: per-group
+totals are ``bincount`` over the reference columns, and distributions are
+summarised by :func:`summary`.  The result is plain JSON-ready data.
+"""
+
+from typing import Any, Dict, Optional
+
+from .columns import Columns, np, require_numpy, table_size
+
+PERCENTILES = (10, 50, 90)
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+_MS_PER_HOUR = 3_600_000
+_MS_PER_DAY = 24 * _MS_PER_HOUR
+
+
+def summary(values) -> Dict[str, Any]:
+    """Count, total, mean, spread and percentiles of a 1-D array."""
+    values = np.asarray(values, dtype='float64')
+    result: Dict[str, Any] = {'count': int(values.size), 'total': float(values.sum())}
+    if values.size == 0:
+        result.update({'mean': None, 'std': None, **{f'p{p}': None for p in PERCENTILES}})
+        return result
+    result['mean'] = float(values.mean())
+    result['std'] = float(values.std())
+    for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        result[f'p{p}'] = float(value)
+    return result
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return float(numerator) / float(denominator) if denominator else None
+
+
+def _group_totals(groups, weights, size: int):
+    """Row count and weight total per group, skipping rows in no group (-1)."""
+    valid = groups >= 0
+    counts = np.bincount(groups[valid], minlength=size)
+    totals = np.bincount(groups[valid], weights=weights[valid], minlength=size)
+    return counts, totals
+
+
+def _variation(groups, weights, size: int):
+    """Coefficient of variation of ``weights`` within each group of two or more rows."""
+    valid = groups >= 0
+    weights = weights[valid].astype('float64')
+    counts = np.bincount(groups[valid], minlength=size)
+    totals = np.bincount(groups[valid], weights=weights, minlength=size)
+    squares = np.bincount(groups[valid], weights=weights * weights, minlength=size)
+    keep = (counts >= 2) & (totals > 0)
+    mean = totals[keep] / counts[keep]
+    variance = np.maximum(squares[keep] / counts[keep] - mean * mean, 0)
+    return np.sqrt(variance) / mean
+
+
+def manuscript_words(columns: Columns):
+    """Words per project: its scenes' total, or its stored count when it has no scenes."""
+    projects = table_size(columns, 'projects')
+    counts, totals = _group_totals(columns['scenes.project'], columns['scenes.word_count'], projects)
+    return np.where(counts > 0, totals, columns['projects.word_count'])
+
+
+def chapter_words(columns: Columns):
+    """Words per chapter: its scenes' total, or its stored count when no scene names it."""
+    chapters = table_size(columns, 'chapters')
+    counts, totals = _group_totals(columns['scenes.chapter'], columns['scenes.word_count'], chapters)
+    return np.where(counts > 0, totals, columns['chapters.word_count'])
+
+
+def word_counts(columns: Columns) -> Dict[str, Any]:
+    words = manuscript_words(columns)
+    targets = columns['projects.target']
+    with_target = targets > 0
+    progress = words[with_target] / targets[with_target]
+    return {
+        'projects': summary(words),
+        'scenes': summary(columns['scenes.word_count']),
+        'notes': summary(columns['notes.word_count']),
+        'targets': {
+            'projects': int(with_target.sum()),
+            'reached': int((progress >= 1).sum()),
+            'progress': summary(progress),
+        },
+    }
+
+
+def productivity(columns: Columns) -> Dict[str, Any]:
+    minutes = columns['sessions.minutes']
+    net = columns['sessions.net_words']
+    hours = minutes / 60
+    timed = minutes > 0
+
+    start = columns['sessions.start'].astype('int64')
+    dated = ~np.isnat(columns['sessions.start'])
+    hour_of_day = (start[dated] // _MS_PER_HOUR) % 24
+    # 1970-01-01 was a Thursday
+    weekday = (start[dated] // _MS_PER_DAY + 3) % 7
+
+    def by(groups, size: int) -> Dict[str, Any]:
+        words = np.bincount(groups, weights=net[dated], minlength=size)
+        spent = np.bincount(groups, weights=hours[dated], minlength=size)
+        per_hour = np.divide(words, spent, out=np.zeros(size), where=spent > 0)
+        return {'net_words': words.tolist(), 'hours': spent.tolist(), 'words_per_hour': per_hour.tolist()}
+
+    by_hour = by(hour_of_day, 24)
+    by_weekday = by(weekday, 7)
+    by_weekday['days'] = list(WEEKDAYS)
+
+    # A writer's active days: distinct (export, day) pairs
+    day = start[dated] // _MS_PER_DAY
+    active = columns['sessions.export'][dated].astype('int64') * (1 << 32) + day
+    _, inverse = np.unique(active, return_inverse=True)
+    daily = np.bincount(inverse.ravel(), weights=net[dated]) if active.size else np.zeros(0)
+
+    return {
+        'sessions': int(minutes.size),
+        'hours': float(hours.sum()),
+        'words_written': int(columns['sessions.words_written'].sum()),
+        'words_deleted': int(columns['sessions.words_deleted'].sum()),
+        'net_words': int(net.sum()),
+        'words_per_hour': _ratio(net[timed].sum(), hours[timed].sum()),
+        'session_words_per_hour': summary(net[timed] / hours[timed]),
+        'session_minutes': summary(minutes[timed]),
+        'words_per_active_day': summary(daily),
+        'most_productive_hour': int(np.argmax(by_hour['words_per_hour'])) if hour_of_day.size else None,
+        'by_hour': by_hour,
+        'by_weekday': by_weekday,
+    }
+
+
+def pacing(columns: Columns) -> Dict[str, Any]:
+    projects = table_size(columns, 'projects')
+    chapters = chapter_words(columns)
+    return {
+        'scene_words': summary(columns['scenes.word_count']),
+        'chapter_words': summary(chapters),
+        # How unevenly each project's scenes and chapters are sized
+        'scene_variation': summary(_variation(columns['scenes.project'], columns['scenes.word_count'], projects)),
+        'chapter_variation': summary(_variation(columns['chapters.project'], chapters, projects)),
+    }
+
+
+def aggregate(columns: Columns) -> Dict[str, Any]:
+    """Every aggregate over ``columns``, as JSON-ready data."""
+    require_numpy()
+    return {
+        'projects': table_size(columns, 'projects'),
+        'chapters': table_size(columns, 'chapters'),
+        'scenes': table_size(columns, 'scenes'),
+        'notes': table_size(columns, 'notes'),
+        'word_counts': word_counts(columns),
+        'productivity': productivity(columns),
+        'pacing': pacing(columns),
+    }
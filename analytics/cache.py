@@ -0,0 +1,79 @@
+"""
+Cache of export columns, one ``.npz`` file per export.
+
+Entries are keyed by the export's content hash and a version that
+changes with the analytics package, so an unchanged export is loaded as
+ready-made arrays instead of being parsed again, and editing the column
+code invalidates every entry.  Files are written to a temporary name and
+renamed into place, so pool workers can share one cache directory.
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+from functools import lru_cache
+from typing import Optional
+
+from .columns import SCHEMA, Columns, np, require_numpy
+
+DEFAULT_CACHE_DIR = '.analytics-cache'
+
+# Bump when the meaning of cached columns changes
+CACHE_FORMAT = 1
+
+# Bytes hashed per read
+_HASH_BLOCK = 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def toolkit_version() -> str:
+    """Digest of the analytics package itself."""
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith('.py'):
+            with open(os.path.join(package_dir, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def export_digest(path: str) -> str:
+    """Cache key of the export at ``path``."""
+    digest = hashlib.sha256(f'format:{CACHE_FORMAT}:{toolkit_version()}\0'.encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ColumnCache:
+    """Directory of ``<digest>.npz`` files holding export columns."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        require_numpy()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest + '.npz')
+
+    def load(self, digest: str) -> Optional[Columns]:
+        try:
+            with np.load(self.path(digest), allow_pickle=False) as archive:
+                columns = {name: archive[name] for name in archive.files}
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        if any(name not in columns for name in SCHEMA):
+            return None
+        return columns
+
+    def store(self, digest: str, columns: Columns) -> None:
+        fd, tmp = tempfile.mkstemp(prefix='.analytics-', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **{name: columns[name] for name in SCHEMA})
+            os.replace(tmp, self.path(digest))
+        except BaseException:
+            os.unlink(tmp)
+            raise
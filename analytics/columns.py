@@ -0,0 +1,268 @@
+"""
+Columnar view of storageService.exportData dumps.
+
+:func:`read_export` streams one export (see :mod:`analytics.jsonstream`)
+and keeps only the numbers the aggregates need, as one NumPy array per
+column.  Columns are named ``table.column``, all columns of a table have
+the same length, and rows refer to projects and chapters by their row
+number in the same export (``-1`` when the referenced row is missing)::
+
+    projects  id, word_count, target, created
+    chapters  project, word_count
+    scenes    project, chapter, word_count
+    notes     project, word_count, created, updated
+    sessions  project, start, minutes, words_written, words_deleted, net_words
+
+Sessions are not part of StorageData; they are read from a top-level
+``sessions`` array of analyticsService WritingSession records when an
+export carries one.  Timestamps are ``datetime64[ms]`` in UTC, ``NaT``
+when missing or unreadable.  Numbers that are not finite or do not fit
+an int64 column count as missing.  :func:`concat` joins the columns of many
+exports into one set, renumbering the references and adding an
+``export`` column to every table.
+"""
+
+import math
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+
+from .jsonstream import WILDCARD, iter_paths
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+Columns = Dict[str, Any]  # 'table.column' -> numpy.ndarray
+
+TABLES = ('projects', 'chapters', 'scenes', 'notes', 'sessions')
+
+# dtype of every column
+SCHEMA = {
+    'projects.id': 'U',
+    'projects.word_count': 'int64',
+    'projects.target': 'int64',
+    'projects.created': 'datetime64[ms]',
+    'chapters.project': 'int32',
+    'chapters.word_count': 'int64',
+    'scenes.project': 'int32',
+    'scenes.chapter': 'int32',
+    'scenes.word_count': 'int64',
+    'notes.project': 'int32',
+    'notes.word_count': 'int64',
+    'notes.created': 'datetime64[ms]',
+    'notes.updated': 'datetime64[ms]',
+    'sessions.project': 'int32',
+    'sessions.start': 'datetime64[ms]',
+    'sessions.minutes': 'float64',
+    'sessions.words_written': 'int64',
+    'sessions.words_deleted': 'int64',
+    'sessions.net_words': 'int64',
+}
+
+# Columns holding row numbers into another table of the same export
+REFERENCES = {
+    'chapters.project': 'projects',
+    'scenes.project': 'projects',
+    'scenes.chapter': 'chapters',
+    'notes.project': 'projects',
+    'sessions.project': 'projects',
+}
+
+_PROJECT_FIELDS = ('id', 'wordCount', 'targetWordCount', 'createdAt')
+
+SELECTORS = (
+    *(('projects', WILDCARD, field) for field in _PROJECT_FIELDS),
+    ('projects', WILDCARD, 'stories', WILDCARD, 'chapters', WILDCARD),
+    ('projects', WILDCARD, 'stories', WILDCARD, 'scenes', WILDCARD),
+    ('notes', WILDCARD, WILDCARD),
+    ('sessions', WILDCARD),
+)
+
+# int64 value of NaT, and the range left for other int64 values
+_NAT = -2 ** 63
+_INT64_MIN = _NAT + 1
+_INT64_MAX = 2 ** 63 - 1
+
+_TAG = re.compile(r'<[^>]*>')
+_WORD = re.compile(r'\S+')
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError('analytics needs NumPy; install it with `pip install -r analytics/requirements.txt`')
+
+
+def _number(value: Any, default: float = 0) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return value
+    return default
+
+
+def _integer(value: Any, default: int = 0) -> int:
+    """``value`` as an int64 column value; ``default`` when it is not a number or does not fit."""
+    number = _number(value, None)
+    if number is None or not _INT64_MIN <= number <= _INT64_MAX:
+        return default
+    return int(number)
+
+
+def _word_count(record: Dict[str, Any]) -> int:
+    """The record's stored word count, or its content's when none is stored."""
+    stored = _integer(record.get('wordCount'), None)
+    if stored is not None:
+        return stored
+    content = record.get('content')
+    if not isinstance(content, str):
+        return 0
+    return len(_WORD.findall(_TAG.sub(' ', content)))
+
+
+def _epoch_ms(value: Any) -> int:
+    """Milliseconds since the epoch of an ISO date or epoch-ms number; _NAT if neither."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _integer(value, _NAT)
+    if not isinstance(value, str):
+        return _NAT
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return _NAT
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+class _Rows:
+    """Rows of one export as Python lists, until they become arrays."""
+
+    def __init__(self):
+        self.projects: List[Dict[str, Any]] = []
+        self.chapters: List[tuple] = []  # (project, chapter id, word count)
+        self.scenes: List[tuple] = []  # (project, chapter id, word count)
+        self.notes: List[tuple] = []  # (project id, word count, created, updated)
+        self.sessions: List[tuple] = []  # (project id, start, minutes, written, deleted, net)
+
+    def project(self, index: int) -> Dict[str, Any]:
+        while len(self.projects) <= index:
+            self.projects.append({})
+        return self.projects[index]
+
+    def add(self, path: tuple, value: Any) -> None:
+        table = path[0]
+        if table == 'projects':
+            if not isinstance(path[1], int):
+                return
+            project = self.project(path[1])
+            if len(path) == 3:
+                project[path[2]] = value
+            elif isinstance(value, dict):
+                kind = self.chapters if path[4] == 'chapters' else self.scenes
+                key = value.get('id') if kind is self.chapters else value.get('chapterId')
+                kind.append((path[1], key if isinstance(key, str) else None, _word_count(value)))
+        elif table == 'notes' and isinstance(value, dict):
+            self.notes.append((path[1], _word_count(value),
+                               _epoch_ms(value.get('createdAt')), _epoch_ms(value.get('updatedAt'))))
+        elif table == 'sessions' and isinstance(value, dict):
+            net = value.get('netWordsWritten', value.get('netWords'))
+            written = _integer(value.get('wordsWritten'))
+            deleted = _integer(value.get('wordsDeleted'))
+            self.sessions.append((value.get('projectId'), _epoch_ms(value.get('startTime')),
+                                  float(_number(value.get('duration'))), written, deleted,
+                                  _integer(net, _integer(written - deleted))))
+
+    def columns(self) -> Columns:
+        ids = [project.get('id') if isinstance(project.get('id'), str) else '' for project in self.projects]
+        index: Dict[str, int] = {}
+        for row, project_id in enumerate(ids):
+            if project_id:
+                index.setdefault(project_id, row)
+        chapter_index: Dict[tuple, int] = {}
+        for row, (project, chapter_id, _) in enumerate(self.chapters):
+            if chapter_id is not None:
+                chapter_index.setdefault((project, chapter_id), row)
+
+        def project_of(project_id: Any) -> int:
+            return index.get(project_id, -1) if isinstance(project_id, str) else -1
+
+        values = {
+            'projects.id': ids,
+            'projects.word_count': [_integer(p.get('wordCount')) for p in self.projects],
+            'projects.target': [_integer(p.get('targetWordCount')) for p in self.projects],
+            'projects.created': [_epoch_ms(p.get('createdAt')) for p in self.projects],
+            'chapters.project': [row[0] for row in self.chapters],
+            'chapters.word_count': [row[2] for row in self.chapters],
+            'scenes.project': [row[0] for row in self.scenes],
+            'scenes.chapter': [chapter_index.get((row[0], row[1]), -1) for row in self.scenes],
+            'scenes.word_count': [row[2] for row in self.scenes],
+            'notes.project': [project_of(row[0]) for row in self.notes],
+            'notes.word_count': [row[1] for row in self.notes],
+            'notes.created': [row[2] for row in self.notes],
+            'notes.updated': [row[3] for row in self.notes],
+            'sessions.project': [project_of(row[0]) for row in self.sessions],
+            'sessions.start': [row[1] for row in self.sessions],
+            'sessions.minutes': [row[2] for row in self.sessions],
+            'sessions.words_written': [row[3] for row in self.sessions],
+            'sessions.words_deleted': [row[4] for row in self.sessions],
+            'sessions.net_words': [row[5] for row in self.sessions],
+        }
+        return {name: _array(values[name], dtype) for name, dtype in SCHEMA.items()}
+
+
+def _array(values: list, dtype: str):
+    if dtype.startswith('datetime64'):
+        return np.array(values, dtype='int64').view(dtype)
+    return np.array(values, dtype=dtype)
+
+
+def read_export(stream: TextIO, block_size: Optional[int] = None) -> Columns:
+    """Columns of the export on ``stream``; raises ValueError for malformed JSON."""
+    require_numpy()
+    rows = _Rows()
+    options = {} if block_size is None else {'block_size': block_size}
+    for path, value in iter_paths(stream, SELECTORS, **options):
+        rows.add(path, value)
+    return rows.columns()
+
+
+def load_export(path: str) -> Columns:
+    with open(path, encoding='utf-8') as f:
+        return read_export(f)
+
+
+def empty_columns() -> Columns:
+    require_numpy()
+    return _Rows().columns()
+
+
+def table_size(columns: Columns, table: str) -> int:
+    return len(columns[f'{table}.{"id" if table == "projects" else "project"}'])
+
+
+def concat(exports: Sequence[Columns]) -> Columns:
+    """
+    Columns of several exports joined table by table, with references
+    renumbered and an ``export`` column (the export's position in
+    ``exports``) added to every table.
+    """
+    require_numpy()
+    if not exports:
+        exports = [empty_columns()]
+    offsets = {table: np.cumsum([0] + [table_size(columns, table) for columns in exports[:-1]])
+               for table in TABLES}
+
+    joined: Columns = {}
+    for name in SCHEMA:
+        parts = []
+        for position, columns in enumerate(exports):
+            column = columns[name]
+            target = REFERENCES.get(name)
+            if target is not None:
+                column = np.where(column >= 0, column + offsets[target][position], -1).astype(column.dtype)
+            parts.append(column)
+        joined[name] = np.concatenate(parts)
+    for table in TABLES:
+        joined[f'{table}.export'] = np.repeat(np.arange(len(exports), dtype='int32'),
+                                              [table_size(columns, table) for columns in exports])
+    return joined
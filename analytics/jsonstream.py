@@ -0,0 +1,181 @@
+"""
+Streaming JSON reader for storageService.exportData dumps.
+
+An export is one JSON document holding every project with all its
+stories and scenes, so ``json.load`` needs the whole file, and every
+value in it, in memory at once.  :func:`iter_paths` instead reads the
+file in blocks and walks it, yielding only the values whose path matches
+one of the selectors it is given.  Only the containers on the way to a
+selected value are walked; a selected value is decoded as a whole (one
+scene, one note) and everything else is decoded and dropped value by
+value, so peak memory follows the largest selected or skipped value
+rather than the file.
+
+A selector is a tuple of object keys and array indices, with ``'*'``
+matching any key or index::
+
+    iter_paths(f, [('projects', '*', 'stories', '*', 'scenes', '*'),
+                   ('notes', '*', '*')])
+
+yields ``(('projects', 0, 'stories', 2, 'scenes', 5), {...})`` and
+``(('notes', 'project-1', 0), {...})`` in document order.
+"""
+
+import json
+from typing import Any, Iterator, List, Sequence, TextIO, Tuple, Union
+
+Path = Tuple[Union[str, int], ...]
+
+WILDCARD = '*'
+
+# Characters read per block; doubled while one value does not fit
+BLOCK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffered cursor over a text stream, decoding one value at a time."""
+
+    def __init__(self, stream: TextIO, block_size: int = BLOCK_SIZE):
+        self.stream = stream
+        self.block_size = block_size
+        self.buffer = ''
+        self.pos = 0
+        self.dropped = 0  # characters discarded from the front of the buffer
+        self.eof = False
+
+    def _read(self, size: int) -> bool:
+        """Append up to ``size`` characters; False at the end of the stream."""
+        if self.eof:
+            return False
+        block = self.stream.read(size)
+        if not block:
+            self.eof = True
+            return False
+        if self.pos:
+            self.dropped += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += block
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it; '' at the end."""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._read(self.block_size):
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'expected {char!r} but found {found or "end of input"!r} at offset {self.offset}')
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the value at the cursor, reading on until it is complete."""
+        self.peek()
+        size = self.block_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if self._read(size):
+                    size *= 2
+                    continue
+                raise ValueError(f'invalid JSON at offset {self.offset}: {error.msg}') from None
+            # A number cut short by the end of the block ('12', '1.', '1e+')
+            # decodes as a shorter number, up to two characters from the end
+            if len(self.buffer) - end <= 2 and self._read(size):
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    @property
+    def offset(self) -> int:
+        """Characters consumed so far, for error messages."""
+        return self.dropped + self.pos
+
+
+def _matching(selectors: Sequence[Path], depth: int, key: Union[str, int]) -> List[Path]:
+    return [selector for selector in selectors
+            if len(selector) > depth and selector[depth] in (WILDCARD, key)]
+
+
+def _walk(reader: _Reader, path: list, selectors: Sequence[Path]) -> Iterator[Tuple[Path, Any]]:
+    """Yield the selected values within the value at the cursor, whose path is ``path``."""
+    depth = len(path)
+    if any(len(selector) == depth for selector in selectors):
+        yield tuple(path), reader.value()
+        return
+
+    char = reader.peek()
+    if char == '{':
+        reader.pos += 1
+        if reader.peek() == '}':
+            reader.pos += 1
+            return
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError(f'expected an object key at offset {reader.offset}')
+            reader.expect(':')
+            child = _matching(selectors, depth, key)
+            if child:
+                path.append(key)
+                yield from _walk(reader, path, child)
+                path.pop()
+            else:
+                reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            return
+    elif char == '[':
+        reader.pos += 1
+        if reader.peek() == ']':
+            reader.pos += 1
+            return
+        index = 0
+        while True:
+            child = _matching(selectors, depth, index)
+            if child:
+                path.append(index)
+                yield from _walk(reader, path, child)
+                path.pop()
+            else:
+                reader.value()
+            index += 1
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect(']')
+            return
+    else:
+        # A scalar where the selectors expected a container
+        reader.value()
+
+
+def iter_paths(stream: TextIO, selectors: Sequence[Path],
+               block_size: int = BLOCK_SIZE) -> Iterator[Tuple[Path, Any]]:
+    """
+    Yield ``(path, value)`` for every value in the JSON document on
+    ``stream`` whose path matches one of ``selectors``.  A value inside
+    another selected value is not yielded separately.  Raises
+    :class:`ValueError` for malformed JSON.
+    """
+    reader = _Reader(stream, block_size)
+    if reader.peek() == '':
+        raise ValueError('empty JSON document')
+    yield from _walk(reader, [], [tuple(selector) for selector in selectors])
+    if reader.peek() != '':
+        raise ValueError(f'extra data after the JSON document at offset {reader.offset}')
@@ -0,0 +1,104 @@
+"""
+Load many exports with a process pool and aggregate them together.
+
+Each worker streams its exports into columns (or loads them from the
+shared :class:`~analytics.cache.ColumnCache`) and sends the arrays back;
+the parent joins them in path order and computes the aggregates once,
+over all exports.
+"""
+
+import os
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from .aggregates import aggregate
+from .cache import ColumnCache, export_digest
+from .columns import Columns, concat, load_export, require_numpy
+
+_cache: Optional[ColumnCache] = None
+
+
+class ExportResult(NamedTuple):
+    path: str
+    columns: Optional[Columns]  # None when the export could not be read
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class AnalyticsRun(NamedTuple):
+    results: List[ExportResult]
+    aggregates: Dict[str, Any]
+
+    @property
+    def loaded(self) -> List[ExportResult]:
+        return [result for result in self.results if result.columns is not None]
+
+    @property
+    def failed(self) -> List[ExportResult]:
+        return [result for result in self.results if result.columns is None]
+
+
+def load_one(path: str, cache: Optional[ColumnCache] = None) -> ExportResult:
+    """Columns of one export, from the cache when its content is unchanged."""
+    try:
+        digest = export_digest(path) if cache is not None else None
+        if digest is not None:
+            columns = cache.load(digest)
+            if columns is not None:
+                return ExportResult(path, columns, cached=True)
+        columns = load_export(path)
+        if digest is not None:
+            cache.store(digest, columns)
+        return ExportResult(path, columns)
+    except (OSError, UnicodeDecodeError, ValueError, OverflowError) as error:
+        return ExportResult(path, None, error=str(error))
+
+
+def _init_worker(cache_dir: Optional[str]) -> None:
+    global _cache
+    _cache = ColumnCache(cache_dir) if cache_dir else None
+
+
+def _load_chunk(paths: Sequence[str]) -> List[ExportResult]:
+    return [load_one(path, _cache) for path in paths]
+
+
+def _chunks(paths: Sequence[str], size: int) -> List[Sequence[str]]:
+    return [paths[i:i + size] for i in range(0, len(paths), size)]
+
+
+def run_parallel(paths: Sequence[str], jobs: Optional[int] = None, chunk_size: int = 4,
+                 cache_dir: Optional[str] = None,
+                 on_result: Optional[Callable[[ExportResult], None]] = None) -> AnalyticsRun:
+    """
+    Load ``paths`` using ``jobs`` worker processes (default: CPU count;
+    ``jobs=1`` runs in-process) and aggregate every export that could be
+    read.  With ``cache_dir`` set, columns are cached there as ``.npz``
+    files.  ``on_result`` is called in this process as each export's
+    result arrives, e.g. to report progress.
+    """
+    require_numpy()
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _chunks(list(paths), chunk_size)
+
+    if jobs == 1 or len(chunks) <= 1:
+        _init_worker(cache_dir)
+        return summarize(_stream(map(_load_chunk, chunks), on_result))
+
+    with Pool(min(jobs, len(chunks)), _init_worker, (cache_dir,)) as pool:
+        return summarize(_stream(pool.imap_unordered(_load_chunk, chunks), on_result))
+
+
+def _stream(batches: Iterable[List[ExportResult]],
+            on_result: Optional[Callable[[ExportResult], None]]) -> Iterator[ExportResult]:
+    for batch in batches:
+        for result in batch:
+            if on_result is not None:
+                on_result(result)
+            yield result
+
+
+def summarize(results: Iterable[ExportResult]) -> AnalyticsRun:
+    collected = sorted(results, key=lambda result: result.path)
+    columns = concat([result.columns for result in collected if result.columns is not None])
+    return AnalyticsRun(collected, aggregate(columns))
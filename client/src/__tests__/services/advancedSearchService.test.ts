@@ -1,5 +1,7 @@
 import { describe, it, expect, beforeEach, vi, afterEach } from 'vitest';
 import { advancedSearchService } from '../../services/advancedSearchService';
+import { projectService } from '../../services/projectService';
+import { storageService } from '../../services/storageService';
 import type { SearchQuery, SearchResult, SavedSearch, ContentType } from '../../services/advancedSearchService';
 
 const mockLocalStorage = (() => {
@@ -498,4 +500,58 @@ describe('AdvancedSearchService', () => {
       expect(Array.isArray(parsedData)).toBe(true);
     });
   });
-});
\ No newline at end of file
+
+  describe('Incremental Indexing', () => {
+    const project = (id: string, title: string, updatedAt: string) => ({
+      id,
+      title,
+      description: '',
+      tags: [],
+      status: 'writing',
+      wordCount: 0,
+      createdAt: '2024-01-01T00:00:00.000Z',
+      lastEditedAt: updatedAt,
+      updatedAt
+    });
+    const indexed = () => Array.from((advancedSearchService as any).contentIndex.keys());
+    // Any full save moves the storage revision, as an edit would
+    const touchStorage = () => storageService.savePreferences(storageService.getPreferences());
+
+    it('indexes again only the projects edited since the last sync', async () => {
+      const getAllProjects = vi.spyOn(projectService as any, 'getAllProjects').mockReturnValue([
+        project('alpha', 'Alpha dragons', '2024-01-01T00:00:00.000Z'),
+        project('beta', 'Beta castles', '2024-01-01T00:00:00.000Z')
+      ]);
+      const getProjectScenes = vi.spyOn(projectService as any, 'getProjectScenes');
+      await advancedSearchService.rebuildIndex();
+      expect(indexed()).toEqual(expect.arrayContaining(['project-alpha', 'project-beta']));
+
+      getProjectScenes.mockClear();
+      getAllProjects.mockReturnValue([
+        project('alpha', 'Alpha wyverns', '2024-02-01T00:00:00.000Z'),
+        project('beta', 'Beta castles', '2024-01-01T00:00:00.000Z')
+      ]);
+      touchStorage();
+      await advancedSearchService.quickSearch('wyverns');
+
+      expect(getProjectScenes).toHaveBeenCalledTimes(1);
+      expect(getProjectScenes).toHaveBeenCalledWith('alpha');
+      expect((advancedSearchService as any).contentIndex.get('project-alpha').title).toBe('Alpha wyverns');
+    });
+
+    it('drops the items of removed projects', async () => {
+      const getAllProjects = vi.spyOn(projectService as any, 'getAllProjects').mockReturnValue([
+        project('alpha', 'Alpha dragons', '2024-01-01T00:00:00.000Z'),
+        project('beta', 'Beta castles', '2024-01-01T00:00:00.000Z')
+      ]);
+      await advancedSearchService.rebuildIndex();
+
+      getAllProjects.mockReturnValue([project('alpha', 'Alpha dragons', '2024-01-01T00:00:00.000Z')]);
+      touchStorage();
+      await advancedSearchService.quickSearch('castles');
+
+      expect(indexed()).toContain('project-alpha');
+      expect(indexed()).not.toContain('project-beta');
+    });
+  });
+});
@@ -0,0 +1,139 @@
+/**
+ * Content Chunking Tests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import {
+  chunkText,
+  IncrementalChunker,
+  SnapshotStore,
+  hashChunk,
+  MIN_CHUNK,
+  MAX_CHUNK
+} from '../../utils/contentChunks';
+
+const manuscript = (paragraphs: number, seed: number = 1): string => {
+  const words = ['the', 'dragon', 'slept', 'beneath', 'a', 'castle', 'while', 'knights', 'rode', 'north'];
+  let state = seed;
+  const next = () => {
+    state = (Math.imul(state, 1664525) + 1013904223) >>> 0;
+    return state >>> 8;
+  };
+  const lines: string[] = [];
+  for (let p = 0; p < paragraphs; p++) {
+    const length = 20 + (next() % 60);
+    const sentence: string[] = [];
+    for (let w = 0; w < length; w++) {
+      sentence.push(words[next() % words.length]);
+    }
+    lines.push(`${p}. ${sentence.join(' ')}.`);
+  }
+  return lines.join('\n');
+};
+
+describe('chunkText', () => {
+  it('covers the text with chunks between the size limits', () => {
+    const text = manuscript(400);
+    const chunks = chunkText(text);
+
+    expect(chunks.reduce((total, chunk) => total + chunk.length, 0)).toBe(text.length);
+    chunks.slice(0, -1).forEach(chunk => {
+      expect(chunk.length).toBeGreaterThanOrEqual(MIN_CHUNK);
+      expect(chunk.length).toBeLessThanOrEqual(MAX_CHUNK);
+    });
+    expect(chunkText('')).toEqual([]);
+  });
+
+  it('keeps the chunks away from an edit', () => {
+    const text = manuscript(400);
+    const middle = Math.floor(text.length / 2);
+    const edited = text.slice(0, middle) + 'An inserted sentence. ' + text.slice(middle);
+
+    const before = new Set(chunkText(text).map(chunk => chunk.hash));
+    const after = chunkText(edited);
+    const changed = after.filter(chunk => !before.has(chunk.hash));
+    expect(changed.length).toBeLessThanOrEqual(2);
+  });
+});
+
+describe('IncrementalChunker', () => {
+  it('chunks edited text exactly as chunking it afresh does', () => {
+    const chunker = new IncrementalChunker();
+    let text = manuscript(300);
+    expect(chunker.chunk(text)).toEqual(chunkText(text));
+
+    const edits: Array<(current: string) => string> = [
+      current => current.slice(0, 5000) + 'inserted ' + current.slice(5000),
+      current => current.slice(0, 100) + current.slice(4000),
+      current => current + '\nA closing line.',
+      current => current.slice(0, current.length - 700),
+      current => 'A new opening. ' + current,
+      current => manuscript(20, 7)
+    ];
+    edits.forEach(edit => {
+      text = edit(text);
+      expect(chunker.chunk(text)).toEqual(chunkText(text));
+    });
+  });
+});
+
+describe('SnapshotStore', () => {
+  beforeEach(() => {
+    localStorage.clear();
+  });
+
+  it('writes only the chunks an edit changed and restores every snapshot', () => {
+    const store = new SnapshotStore('chunk:');
+    const first = manuscript(400);
+    const second = first.slice(0, 10000) + 'A revised line. ' + first.slice(10000);
+
+    const one = store.snapshot('doc', first);
+    const two = store.snapshot('doc', second);
+    expect(one.written).toBe(first.length);
+    expect(two.written).toBeLessThan(2 * MAX_CHUNK);
+
+    expect(store.restore(one.chunks)).toBe(first);
+    expect(store.restore(two.chunks)).toBe(second);
+  });
+
+  it('deletes only chunks no kept snapshot uses', () => {
+    const store = new SnapshotStore('chunk:');
+    const first = manuscript(400);
+    const second = first.slice(0, 10000) + 'A revised line. ' + first.slice(10000);
+    const one = store.snapshot('doc', first);
+    const two = store.snapshot('doc', second);
+
+    store.discard([one.chunks], [two.chunks]);
+    expect(store.restore(one.chunks)).toBeNull();
+    expect(store.restore(two.chunks)).toBe(second);
+  });
+
+  it('stores a chunk under another key when its hash holds different text', () => {
+    const store = new SnapshotStore('chunk:');
+    const text = manuscript(100);
+    const [first] = chunkText(text);
+    // As if a colliding chunk had been stored first
+    localStorage.setItem(`chunk:${first.hash}`, 'colliding text');
+
+    const snapshot = store.snapshot('doc', text);
+    expect(snapshot.chunks[0]).not.toBe(first.hash);
+    expect(snapshot.written).toBe(text.length);
+    expect(store.restore(snapshot.chunks)).toBe(text);
+    expect(localStorage.getItem(`chunk:${first.hash}`)).toBe('colliding text');
+
+    // The chunk is found under its new key by a later snapshot
+    expect(new SnapshotStore('chunk:').snapshot('doc', text).written).toBe(0);
+  });
+
+  it('rewrites chunks removed behind its back once told to forget', () => {
+    const store = new SnapshotStore('chunk:');
+    const text = manuscript(100);
+    store.snapshot('doc', text);
+
+    localStorage.clear();
+    store.forget();
+    const again = store.snapshot('doc', text);
+    expect(again.written).toBe(text.length);
+    expect(store.restore(again.chunks)).toBe(text);
+  });
+});
@@ -26,6 +26,14 @@ vi.mock('../../services/projectService', () => ({
   }
 }));
 
+vi.mock('../../services/wordCountService', () => ({
+  wordCountService: {
+    recordSave: vi.fn((save: () => boolean) => save()),
+    setNoteWords: vi.fn(),
+    removeNote: vi.fn()
+  }
+}));
+
 import { storageService } from '../../services/storageService';
 import { projectService } from '../../services/projectService';
 
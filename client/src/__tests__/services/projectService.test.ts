@@ -3,6 +3,8 @@
 
 import { vi } from 'vitest';
 import { ProjectService } from '../../services/projectService';
+import { storageService } from '../../services/storageService';
+import { mockDataService } from '../../services/mockDataService';
 import { resetAllMocks, createMockProject, createMockStory, createMockCharacter } from '../testSetup';
 
 // Use the global localStorage mock from testSetup.ts
@@ -22,6 +24,8 @@ describe('ProjectService', () => {
     
     // Reset service state
     (projectService as any).eventListeners = {};
+    // The fixtures write localStorage behind storageService's back
+    (projectService as any).graph = null;
   });
 
   describe('Project Management', () => {
@@ -711,4 +715,120 @@ describe('ProjectService', () => {
       expect(onProjectDeleted).toHaveBeenCalledWith(createdProject.id);
     });
   });
-});
\ No newline at end of file
+
+  describe('Project graph cache', () => {
+    const originalGetItem = mockLocalStorage.getItem.getMockImplementation();
+    const originalSetItem = mockLocalStorage.setItem.getMockImplementation();
+    let store: Map<string, string>;
+
+    const storeProjects = (projects: any[]) => {
+      store.set('astral_notes_data', JSON.stringify({
+        projects,
+        notes: {},
+        preferences: {},
+        appData: { lastBackup: null, dataVersion: '1.0.0' }
+      }));
+    };
+
+    beforeEach(() => {
+      store = new Map();
+      mockLocalStorage.getItem.mockImplementation((key: string) => store.get(key) ?? null);
+      mockLocalStorage.setItem.mockImplementation((key: string, value: string) => {
+        store.set(key, value);
+      });
+      storeProjects([createMockProject()]);
+    });
+
+    afterEach(() => {
+      storageService.flush();
+      mockLocalStorage.getItem.mockImplementation(originalGetItem);
+      mockLocalStorage.setItem.mockImplementation(originalSetItem);
+    });
+
+    it('parses the stored data once per revision', () => {
+      const getProjects = vi.spyOn(storageService, 'getProjects');
+
+      projectService.getProjectById('test-project-1');
+      projectService.getAllProjects();
+      projectService.getProjectById('test-project-1');
+
+      expect(getProjects).toHaveBeenCalledTimes(1);
+      getProjects.mockRestore();
+    });
+
+    it('returns copies that do not change the cached projects', () => {
+      const project = projectService.getProjectById('test-project-1')!;
+      project.title = 'Changed';
+      project.stories.push(createMockStory('test-project-1'));
+      projectService.getAllProjects()[0].tags.push('changed');
+
+      const cached = projectService.getProjectById('test-project-1')!;
+      expect(cached.title).toBe('Test Project');
+      expect(cached.stories).toHaveLength(0);
+      expect(cached.tags).toEqual(['test']);
+    });
+
+    it('rebuilds after a write through storageService', () => {
+      expect(projectService.getAllProjects()).toHaveLength(1);
+
+      storageService.saveProjects([
+        createMockProject(),
+        createMockProject({ id: 'test-project-2', title: 'Second Project' })
+      ]);
+
+      expect(projectService.getAllProjects()).toHaveLength(2);
+      expect(projectService.getProjectById('test-project-2')?.title).toBe('Second Project');
+    });
+
+    it('copies the project lists without copying their items', () => {
+      storeProjects([createMockProject({ stories: [createMockStory('test-project-1')] })]);
+      window.dispatchEvent(new StorageEvent('storage', { key: 'astral_notes_data' }));
+
+      const first = projectService.getProjectById('test-project-1')!;
+      const second = projectService.getProjectById('test-project-1')!;
+      expect(first.stories).not.toBe(second.stories);
+      expect(first.stories[0]).toBe(second.stories[0]);
+    });
+
+    it('rebuilds when another tab changes the data', () => {
+      expect(projectService.getProjectById('test-project-1')?.title).toBe('Test Project');
+
+      storeProjects([createMockProject({ title: 'Edited Elsewhere' })]);
+      window.dispatchEvent(new StorageEvent('storage', { key: 'astral_notes_data' }));
+
+      expect(projectService.getProjectById('test-project-1')?.title).toBe('Edited Elsewhere');
+    });
+
+    it('keeps the story index in step with its own edits', async () => {
+      const first = await projectService.createStory({ title: 'First', projectId: 'test-project-1' });
+      const second = await projectService.createStory({ title: 'Second', projectId: 'test-project-1' });
+
+      expect(await projectService.deleteStory(first.id)).toBe(true);
+      const updated = await projectService.updateStory(second.id, { title: 'Second, revised' });
+
+      expect(updated.title).toBe('Second, revised');
+      const stories = await projectService.getStories('test-project-1');
+      expect(stories.map(story => story.title)).toEqual(['Second, revised']);
+    });
+  });
+
+  describe('Project graph invalidation', () => {
+    it('rebuilds after localStorage is cleared', () => {
+      storageService.saveProjects([createMockProject()]);
+      expect(projectService.getAllProjects()).toHaveLength(1);
+
+      localStorage.clear();
+
+      expect(projectService.getAllProjects()).toHaveLength(0);
+    });
+
+    it('rebuilds after the test dashboard clears the data', () => {
+      storageService.saveProjects([createMockProject()]);
+      expect(projectService.getAllProjects()).toHaveLength(1);
+
+      expect(mockDataService.clearAllData()).toBe(true);
+
+      expect(projectService.getAllProjects()).toHaveLength(0);
+    });
+  });
+});
@@ -286,6 +286,80 @@ describe.skip('Advanced Operational Transformation', () => {
   });
 });
 
+describe('Transform Cache and Edit Composition', () => {
+  let otEngine: AdvancedOperationalTransform;
+
+  beforeEach(() => {
+    otEngine = createOptimizedOT(1, { maxCacheEntries: 2 });
+  });
+
+  it('should count hits and misses and evict least recently used transforms', () => {
+    const remote: Operation = { ...otEngine.createOperation('insert', 0, 'R'), siteId: 2, vectorClock: { 2: 1 } };
+    const first = otEngine.createOperation('insert', 5, 'a');
+    const second = otEngine.createOperation('insert', 6, 'b');
+    const third = otEngine.createOperation('insert', 7, 'c');
+
+    otEngine.transform(first, remote);
+    otEngine.transform(second, remote);
+    expect(otEngine.transform(first, remote)).toBe(otEngine.transform(first, remote));
+    otEngine.transform(third, remote); // evicts second, the least recently used
+
+    const stats = otEngine.getStats();
+    expect(stats.cacheHits).toBe(2);
+    expect(stats.cacheMisses).toBe(3);
+    expect(stats.cacheEvictions).toBe(1);
+    expect(stats.cacheSize).toBe(2);
+  });
+
+  it('should not share cached transforms between operations that differ only in content', () => {
+    const remote: Operation = { ...otEngine.createOperation('insert', 0, 'R'), siteId: 2, vectorClock: { 2: 1 } };
+    const typed = otEngine.createOperation('insert', 5, 'cat');
+    const retyped: Operation = { ...typed, content: 'dog' };
+
+    expect(otEngine.transform(typed, remote).operation.content).toBe('cat');
+    expect(otEngine.transform(retyped, remote).operation.content).toBe('dog');
+    expect(otEngine.getStats().cacheHits).toBe(0);
+  });
+
+  it('should not share cached transforms between operations with different vector clocks', () => {
+    const remote: Operation = { ...otEngine.createOperation('insert', 5, 'R'), siteId: 2, vectorClock: { 2: 1 } };
+    const local = otEngine.createOperation('insert', 5, 'L');
+
+    otEngine.transform({ ...local, vectorClock: { 1: 1 } }, remote);
+    otEngine.transform({ ...local, vectorClock: { 1: 1, 2: 1 } }, remote);
+
+    expect(otEngine.getStats().cacheHits).toBe(0);
+    expect(otEngine.getStats().cacheMisses).toBe(2);
+  });
+
+  it('should compose keystrokes into the edits they make', () => {
+    const start = 'The cat';
+    const ops = [
+      otEngine.createOperation('insert', 7, ' s'),
+      otEngine.createOperation('insert', 9, 'at'),
+      otEngine.createOperation('delete', 10, undefined, 1), // 't' corrected to 'w'
+      otEngine.createOperation('insert', 10, 'w'),
+      otEngine.createOperation('delete', 3, undefined, 2), // ' cat' deleted forwards
+      otEngine.createOperation('delete', 3, undefined, 2)
+    ];
+
+    const runs = otEngine.composeRuns(ops);
+    const apply = (operations: Operation[]) =>
+      operations.reduce((text, op) => OperationUtils.applyToText(text, op), start);
+
+    expect(runs).toHaveLength(2);
+    expect(apply(runs)).toBe('The saw');
+    expect(apply(ops)).toBe('The saw');
+  });
+
+  it('should transform concurrent operations without recursing', () => {
+    const local: Operation = { ...otEngine.createOperation('insert', 5, 'Hello'), vectorClock: { 1: 1 } };
+    const remote: Operation = { ...otEngine.createOperation('insert', 2, 'Hi'), siteId: 2, vectorClock: { 2: 1 } };
+
+    expect(otEngine.transform(local, remote).operation.position).toBe(7);
+  });
+});
+
 describe.skip('Advanced Presence Awareness', () => {
   let presenceSystem: AdvancedPresenceAwareness;
 
@@ -0,0 +1,88 @@
+/**
+ * Search Index Tests
+ */
+
+import { describe, it, expect } from 'vitest';
+import {
+  SearchIndex,
+  editDistance,
+  FIELD_TITLE,
+  FIELD_CONTENT,
+  FIELD_TAGS,
+  FIELD_METADATA
+} from '../../services/searchIndex';
+import type { ContentIndex } from '../../services/advancedSearchService';
+
+const ALL_FIELDS = FIELD_TITLE | FIELD_CONTENT | FIELD_TAGS | FIELD_METADATA;
+
+const item = (id: string, title: string, content: string, tags: string[] = []): ContentIndex => ({
+  id,
+  type: 'note',
+  title,
+  content,
+  tags,
+  metadata: { status: 'draft' },
+  lastIndexed: new Date('2024-01-01T00:00:00.000Z')
+});
+
+describe('editDistance', () => {
+  it('counts insertions, deletions and substitutions', () => {
+    expect(editDistance('kitten', 'sitting')).toBe(3);
+    expect(editDistance('', 'abc')).toBe(3);
+    expect(editDistance('same', 'same')).toBe(0);
+  });
+});
+
+describe('SearchIndex', () => {
+  it('narrows substring searches to items holding every trigram', () => {
+    const index = new SearchIndex();
+    index.set(item('a', 'The Dragon', 'A dragon sleeps under the castle'));
+    index.set(item('b', 'Knights', 'The knights ride at night'));
+    index.set(item('c', 'Dragonfly', 'Wings', ['insects']));
+
+    expect(index.substringCandidates('dragon', ALL_FIELDS)).toEqual(new Set(['a', 'c']));
+    expect(index.substringCandidates('dragon', FIELD_CONTENT)).toEqual(new Set(['a']));
+    expect(index.substringCandidates('insect', FIELD_TITLE | FIELD_CONTENT)).toEqual(new Set());
+    expect(index.substringCandidates('insect', ALL_FIELDS)).toEqual(new Set(['c']));
+    // Too short to look up
+    expect(index.substringCandidates('at', ALL_FIELDS)).toBeNull();
+  });
+
+  it('finds words within the fuzzy threshold', () => {
+    const index = new SearchIndex();
+    index.set(item('a', 'Wizard', 'The wizard casts a spell'));
+    index.set(item('b', 'Lizard', 'A lizard basks'));
+    index.set(item('c', 'Blizzard', 'Snow everywhere'));
+
+    // 'blizzard' is two edits away, below the threshold for eight letters
+    expect(index.fuzzyCandidates('wizzard', ALL_FIELDS)).toEqual(new Set(['a']));
+    expect(index.fuzzyCandidates('blizard', ALL_FIELDS)).toEqual(new Set(['b', 'c']));
+    expect(index.fuzzyCandidates('snowy', FIELD_TITLE)).toEqual(new Set());
+  });
+
+  it('re-indexes only changed items and drops their old postings', () => {
+    const index = new SearchIndex();
+    const original = item('a', 'Castle', 'Stone walls');
+    expect(index.set(original)).toBe(true);
+    expect(index.set({ ...original, lastIndexed: new Date() })).toBe(false);
+
+    expect(index.set(item('a', 'Castle', 'Wooden walls'))).toBe(true);
+    expect(index.substringCandidates('stone', ALL_FIELDS)).toEqual(new Set());
+    expect(index.fuzzyCandidates('stone', ALL_FIELDS)).toEqual(new Set());
+    expect(index.substringCandidates('wooden', ALL_FIELDS)).toEqual(new Set(['a']));
+
+    expect(index.delete('a')).toBe(true);
+    expect(index.size).toBe(0);
+    expect(index.substringCandidates('castle', ALL_FIELDS)).toEqual(new Set());
+  });
+
+  it('returns items in the order they were first indexed', () => {
+    const index = new SearchIndex();
+    index.set(item('a', 'First', 'x'));
+    index.set(item('b', 'Second', 'x'));
+    index.set(item('a', 'First, edited', 'x'));
+
+    expect(index.itemsInOrder(['b', 'a']).map(indexed => indexed.id)).toEqual(['a', 'b']);
+    expect(index.fields(index.itemsInOrder(['a'])[0], true).title).toBe('first, edited');
+  });
+});
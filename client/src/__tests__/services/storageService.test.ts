@@ -0,0 +1,188 @@
+// Storage Service Tests
+// Write-behind project saves and the journal they go through
+
+import { vi } from 'vitest';
+import { storageService } from '../../services/storageService';
+import { resetAllMocks, createMockProject } from '../testSetup';
+
+const mockLocalStorage = localStorage as any;
+
+const STORAGE_KEY = 'astral_notes_data';
+const JOURNAL_KEY = 'astral_notes_journal';
+const recordKey = (id: string) => `astral_notes_project:${id}`;
+
+const readRecord = (id: string) => JSON.parse(localStorage.getItem(recordKey(id)) || 'null');
+const readJournal = () => JSON.parse(localStorage.getItem(JOURNAL_KEY) || 'null');
+const readBlobTitles = () =>
+  JSON.parse(localStorage.getItem(STORAGE_KEY) || '{"projects":[]}').projects.map((p: any) => p.title);
+const titles = () => storageService.getProjects().map(project => project.title);
+
+describe('StorageService', () => {
+  const first = createMockProject({ id: 'project-1', title: 'First' });
+  const second = createMockProject({ id: 'project-2', title: 'Second' });
+
+  beforeEach(() => {
+    vi.useFakeTimers();
+    // Drop anything a previous test left queued
+    storageService.clearAllData();
+    resetAllMocks();
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+  });
+
+  describe('Write-behind project saves', () => {
+    it('coalesces saves within the flush delay into one write per project', () => {
+      storageService.saveProjects([first, second]);
+      mockLocalStorage.setItem.mockClear();
+
+      storageService.saveProject({ ...first, title: 'First, draft' });
+      storageService.saveProject({ ...first, title: 'First, final' });
+      storageService.saveProject({ ...second, title: 'Second, final' });
+
+      // Reads see queued changes before they are written
+      expect(titles()).toEqual(['First, final', 'Second, final']);
+
+      vi.advanceTimersByTime(249);
+      expect(mockLocalStorage.setItem).not.toHaveBeenCalled();
+
+      vi.advanceTimersByTime(1);
+      expect(mockLocalStorage.setItem.mock.calls.map(([key]: [string]) => key)).toEqual([
+        recordKey('project-1'),
+        recordKey('project-2'),
+        JOURNAL_KEY
+      ]);
+      expect(readRecord('project-1').title).toBe('First, final');
+      expect(readJournal()).toEqual(['project-1', 'project-2']);
+      // The blob is left alone
+      expect(readBlobTitles()).toEqual(['First', 'Second']);
+    });
+
+    it('folds the journal back into the blob once it lists too many projects', () => {
+      const projects = Array.from({ length: 21 }, (_, index) =>
+        createMockProject({ id: `project-${index}`, title: `Project ${index}` })
+      );
+      storageService.saveProjects(projects);
+
+      projects.slice(0, 20).forEach(project => {
+        storageService.saveProject({ ...project, title: `${project.title}, edited` });
+      });
+      storageService.flush();
+      expect(readJournal()).toHaveLength(20);
+      expect(readBlobTitles()[0]).toBe('Project 0');
+
+      storageService.saveProject({ ...projects[20], title: 'Project 20, edited' });
+      storageService.flush();
+
+      expect(localStorage.getItem(JOURNAL_KEY)).toBeNull();
+      expect(localStorage.getItem(recordKey('project-0'))).toBeNull();
+      expect(readBlobTitles()).toEqual(projects.map(project => `${project.title}, edited`));
+    });
+
+    it('replays journaled records over the blob when the data is read', () => {
+      storageService.saveProjects([first, second]);
+
+      // Left behind by an earlier session
+      localStorage.setItem(recordKey('project-2'), JSON.stringify({ ...second, title: 'Second, journaled' }));
+      localStorage.setItem(JOURNAL_KEY, JSON.stringify(['project-2', 'missing-project']));
+
+      expect(titles()).toEqual(['First', 'Second, journaled']);
+    });
+
+    it('writes queued changes when the page is hidden', () => {
+      storageService.saveProjects([first]);
+      storageService.saveProject({ ...first, title: 'First, edited' });
+      expect(localStorage.getItem(recordKey('project-1'))).toBeNull();
+
+      window.dispatchEvent(new Event('pagehide'));
+
+      expect(readRecord('project-1').title).toBe('First, edited');
+      expect(readJournal()).toEqual(['project-1']);
+    });
+  });
+
+  describe('Restore and clear', () => {
+    it('does not replay the journal over a restored backup', () => {
+      storageService.saveProjects([first]);
+      // The backup taken here holds the first save
+      storageService.saveProjects([{ ...first, title: 'First, saved again' }]);
+
+      storageService.saveProject({ ...first, title: 'First, journaled' });
+      storageService.flush();
+      storageService.saveProject({ ...first, title: 'First, queued' });
+
+      expect(storageService.restoreFromBackup()).toBe(true);
+
+      expect(titles()).toEqual(['First']);
+      expect(localStorage.getItem(JOURNAL_KEY)).toBeNull();
+      expect(localStorage.getItem(recordKey('project-1'))).toBeNull();
+
+      // The queued change was dropped, not just delayed
+      vi.runAllTimers();
+      expect(localStorage.getItem(recordKey('project-1'))).toBeNull();
+      expect(titles()).toEqual(['First']);
+    });
+
+    it('includes unflushed project changes in the backup', () => {
+      storageService.saveProjects([first, second]);
+      storageService.saveProject({ ...first, title: 'First, journaled' });
+      storageService.flush();
+      storageService.saveProject({ ...second, title: 'Second, queued' });
+
+      expect(storageService.clearAllData()).toBe(true);
+      expect(storageService.restoreFromBackup()).toBe(true);
+
+      expect(titles()).toEqual(['First, journaled', 'Second, queued']);
+    });
+
+    it('drops the journal and queued changes when the data is cleared', () => {
+      storageService.saveProjects([first]);
+      storageService.saveProject({ ...first, title: 'First, journaled' });
+      storageService.flush();
+      storageService.saveProject({ ...first, title: 'First, queued' });
+
+      expect(storageService.clearAllData()).toBe(true);
+
+      expect(titles()).toEqual([]);
+      expect(localStorage.getItem(JOURNAL_KEY)).toBeNull();
+
+      vi.runAllTimers();
+      expect(localStorage.getItem(recordKey('project-1'))).toBeNull();
+      expect(titles()).toEqual([]);
+    });
+  });
+
+  describe('Revision', () => {
+    it('changes on saves and on storage cleared behind the service', () => {
+      storageService.saveProjects([first]);
+      const saved = storageService.getRevision();
+      expect(storageService.getRevision()).toBe(saved);
+
+      // Same keys, new content
+      storageService.saveProjects([{ ...first, title: 'First, renamed' }]);
+      const renamed = storageService.getRevision();
+      expect(renamed).not.toBe(saved);
+
+      localStorage.clear();
+      expect(storageService.getRevision()).not.toBe(renamed);
+    });
+
+    it('ignores writes to unrelated keys', () => {
+      storageService.saveProjects([first]);
+      const revision = storageService.getRevision();
+
+      localStorage.setItem('astral_quick_notes', '[]');
+
+      expect(storageService.getRevision()).toBe(revision);
+    });
+
+    it('changes when another tab writes', () => {
+      const revision = storageService.getRevision();
+
+      window.dispatchEvent(new Event('storage'));
+
+      expect(storageService.getRevision()).not.toBe(revision);
+    });
+  });
+});
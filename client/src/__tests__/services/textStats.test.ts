@@ -0,0 +1,63 @@
+/**
+ * Incremental Text Statistics Tests
+ */
+
+import { describe, it, expect } from 'vitest';
+import { TextAnalyzer, analyzeBlock, splitBlocks } from '../../utils/textStats';
+
+const longSentence = Array.from({ length: 30 }, (_, i) => `word${i}`).join(' ');
+const draft = [
+  'The house was painted. It was started early!',
+  'A heading without punctuation',
+  `Then came a long one: ${longSentence}.`,
+  'Was it finished? It was finished and varnished.',
+].join('\n\n');
+
+describe('splitBlocks', () => {
+  it('cuts only after lines ending in sentence punctuation', () => {
+    const blocks = splitBlocks(draft);
+    expect(blocks.join('')).toBe(draft);
+    expect(blocks).toHaveLength(3);
+    expect(blocks[1].startsWith('\nA heading')).toBe(true);
+  });
+});
+
+describe('analyzeBlock', () => {
+  it('matches the split-based definitions', () => {
+    const stats = analyzeBlock(draft);
+    const sentences = draft.split(/[.!?]+/).filter(s => s.trim().length > 0);
+
+    expect(stats.words).toBe(draft.split(/\s+/).filter(w => w.length > 0).length);
+    expect(stats.sentences).toBe(sentences.length);
+    expect(stats.questions).toBe(1);
+    expect(stats.exclamations).toBe(1);
+    expect(stats.passiveCount).toBe(draft.match(/\b(was|were|is|are|been|being)\s+\w+ed\b/gi)!.length);
+    expect(stats.longSentences).toHaveLength(1);
+    // The heading has no punctuation, so it opens the sentence that follows it
+    expect(stats.longSentences[0].text).toBe(`A heading without punctuation\n\nThen came a long one: ${longSentence}`);
+  });
+});
+
+describe('TextAnalyzer', () => {
+  it('gives the same statistics for a draft however it was reached', () => {
+    const incremental = new TextAnalyzer();
+    incremental.analyze(draft);
+    const edited = draft.replace('painted', 'repainted').replace('early', 'very early indeed');
+    const fresh = new TextAnalyzer().analyze(edited);
+
+    expect(incremental.analyze(edited)).toEqual(fresh);
+  });
+
+  it('accepts streamed input', () => {
+    const streamed = new TextAnalyzer();
+    for (let i = 0; i < draft.length; i += 7) {
+      streamed.write(draft.slice(i, i + 7));
+    }
+    expect(streamed.end()).toEqual(new TextAnalyzer().analyze(draft));
+  });
+
+  it('reports words repeated more than five times', () => {
+    const stats = new TextAnalyzer().analyze('Stone stone STONE stone stone stone stone. Rock.');
+    expect(stats.repeatedWords).toEqual([['stone', 6]]);
+  });
+});
@@ -0,0 +1,194 @@
+/**
+ * Word Count Service Tests
+ */
+
+import { describe, it, expect, beforeEach, vi } from 'vitest';
+import { countWords, markupWordCountDelta, stripTags, wordCountDelta } from '../../utils/wordCount';
+import { storageService } from '../../services/storageService';
+import { wordCountService } from '../../services/wordCountService';
+import { noteService } from '../../services/noteService';
+import { projectService } from '../../services/projectService';
+import type { Note } from '../../types/global';
+
+const splitCount = (text: string) => text.split(/\s+/).filter(w => w.length > 0).length;
+
+const note = (id: string, projectId: string, wordCount: number): Note => ({
+  id,
+  projectId,
+  title: id,
+  content: '',
+  type: 'note',
+  tags: [],
+  wordCount,
+  position: 0,
+  createdAt: '2024-01-01T00:00:00.000Z',
+  updatedAt: '2024-01-01T00:00:00.000Z',
+} as Note);
+
+describe('wordCount utilities', () => {
+  it('counts words like split(/\\s+/)', () => {
+    const samples = ['', '   ', 'one', ' one  two\tthree\nfour ', 'a b', 'trailing  '];
+    samples.forEach(text => expect(countWords(text)).toBe(splitCount(text)));
+  });
+
+  it('counts a slice', () => {
+    expect(countWords('one two three', 4, 7)).toBe(1);
+  });
+
+  it('computes the delta of an edit from the words around it', () => {
+    const cases: Array<[string, string]> = [
+      ['The cat sat', 'The cat sat down'],
+      ['The cat sat', 'The cats at'],
+      ['The cat sat', 'Thecat sat'],
+      ['The cat sat', 'The c at sat'],
+      ['one two three', ''],
+      ['', 'brand new text'],
+      ['same text', 'same text'],
+    ];
+    cases.forEach(([before, after]) => {
+      expect(wordCountDelta(before, after)).toBe(splitCount(after) - splitCount(before));
+    });
+  });
+});
+
+describe('markupWordCountDelta', () => {
+  const markupCount = (html: string) => splitCount(stripTags(html));
+
+  it('matches a full count of the stripped text', () => {
+    const cases: Array<[string, string]> = [
+      ['<p>The cat sat</p>', '<p>The cat sat down</p>'],
+      ['<p>The cat sat</p>', '<p>The <b>cat</b> sat</p>'],
+      ['<p>The cat</p><p>sat</p>', '<p>The catsat</p>'],
+      ['<p>The <b>ca</b>t sat</p>', '<p>The <b>ca</b> t sat</p>'],
+      ['<p class="a b">one</p>', '<p class="a b c">one</p>'],
+      ['<p>one</p>', '<p>one</p><p>two three</p>'],
+      ['<p>one two three</p>', ''],
+      ['', '<p>brand new text</p>'],
+      ['<p>same</p>', '<p>same</p>'],
+    ];
+    cases.forEach(([before, after]) => {
+      expect(markupWordCountDelta(before, after)).toBe(markupCount(after) - markupCount(before));
+    });
+  });
+
+  it('strips only the edited region', () => {
+    const before = '<p>' + 'word '.repeat(10000) + '</p>';
+    const after = before.replace('</p>', 'more</p>');
+    const replace = vi.spyOn(String.prototype, 'replace');
+    expect(markupWordCountDelta(before, after)).toBe(1);
+    const stripped = replace.mock.instances.map(instance => String(instance).length);
+    replace.mockRestore();
+    expect(Math.max(...stripped)).toBeLessThan(100);
+  });
+});
+
+describe('WordCountService', () => {
+  beforeEach(() => {
+    localStorage.clear();
+  });
+
+  it('keeps project totals in step with saved notes', () => {
+    storageService.saveProjectNotes('p1', [note('n1', 'p1', 100), note('n2', 'p1', 50)]);
+    storageService.saveProjectNotes('p2', [note('n3', 'p2', 7)]);
+    expect(wordCountService.getProjectWords('p1')).toBe(150);
+    expect(wordCountService.getProjectWords('p2')).toBe(7);
+
+    storageService.saveProjectNotes('p1', [note('n1', 'p1', 120)]);
+    expect(wordCountService.getProjectWords('p1')).toBe(120);
+    expect(wordCountService.getNoteWords('n2')).toBe(0);
+    expect(wordCountService.getProjectWords('p2')).toBe(7);
+  });
+
+  it('reloads after another tab writes the data', () => {
+    storageService.saveProjectNotes('p1', [note('n1', 'p1', 10)]);
+    expect(wordCountService.getProjectWords('p1')).toBe(10);
+
+    const data = storageService.getData();
+    data.notes.p1 = [note('n1', 'p1', 30)];
+    localStorage.setItem('astral_notes_data', JSON.stringify(data));
+    window.dispatchEvent(new StorageEvent('storage', { key: 'astral_notes_data' }));
+    expect(wordCountService.getProjectWords('p1')).toBe(30);
+  });
+
+  it('moves a note edit onto the project total without recounting', () => {
+    const project = projectService.createProjectSync({ title: 'Novel' });
+    const created = noteService.createNote({ projectId: project.id, title: 'Chapter', content: '<p>The cat sat</p>' });
+    expect(wordCountService.getProjectWords(project.id)).toBe(3);
+
+    const saveData = vi.spyOn(storageService, 'saveData');
+    noteService.updateNote(project.id, created.id, { content: '<p>The cat sat down quietly</p>' });
+    // The notes are saved in full once; the project goes through the write-behind save
+    expect(saveData).toHaveBeenCalledTimes(1);
+    saveData.mockRestore();
+
+    const getData = vi.spyOn(storageService, 'getData');
+    expect(wordCountService.getProjectWords(project.id)).toBe(5);
+    expect(getData).not.toHaveBeenCalled();
+    getData.mockRestore();
+
+    expect(noteService.getNoteById(project.id, created.id)?.wordCount).toBe(5);
+    expect(projectService.getProjectById(project.id)?.wordCount).toBe(5);
+  });
+
+  it('records note creation and deletion without rescanning the notes', () => {
+    const project = projectService.createProjectSync({ title: 'Novel' });
+    expect(wordCountService.getProjectWords(project.id)).toBe(0);
+
+    const first = noteService.createNote({ projectId: project.id, title: 'One', content: 'one two three' });
+    noteService.createNote({ projectId: project.id, title: 'Two', content: 'four five' });
+    let getData = vi.spyOn(storageService, 'getData');
+    expect(wordCountService.getProjectWords(project.id)).toBe(5);
+    expect(getData).not.toHaveBeenCalled();
+    getData.mockRestore();
+
+    noteService.deleteNote(project.id, first.id);
+    getData = vi.spyOn(storageService, 'getData');
+    expect(wordCountService.getProjectWords(project.id)).toBe(2);
+    expect(wordCountService.getNoteWords(first.id)).toBe(0);
+    expect(getData).not.toHaveBeenCalled();
+    getData.mockRestore();
+
+    expect(projectService.getProjectById(project.id)?.wordCount).toBe(2);
+  });
+
+  it('leaves the totals alone when a note save fails', () => {
+    const project = projectService.createProjectSync({ title: 'Novel' });
+    const created = noteService.createNote({ projectId: project.id, title: 'Chapter', content: 'The cat sat' });
+
+    const saveProjectNotes = vi.spyOn(storageService, 'saveProjectNotes').mockReturnValue(false);
+    noteService.updateNote(project.id, created.id, { content: 'The cat sat down quietly' });
+    saveProjectNotes.mockRestore();
+
+    expect(wordCountService.getProjectWords(project.id)).toBe(3);
+    expect(projectService.getProjectById(project.id)?.wordCount).toBe(3);
+  });
+
+  it('recounts a note stored without a word count when it is edited', () => {
+    const project = projectService.createProjectSync({ title: 'Novel' });
+    const imported = { ...note('n1', project.id, 0), content: 'one two three four' } as Note;
+    delete (imported as Partial<Note>).wordCount;
+    storageService.saveProjectNotes(project.id, [imported]);
+
+    noteService.updateNote(project.id, 'n1', { content: 'one two three four five' });
+    expect(noteService.getNoteById(project.id, 'n1')?.wordCount).toBe(5);
+    expect(wordCountService.getProjectWords(project.id)).toBe(5);
+    expect(projectService.getProjectById(project.id)?.wordCount).toBe(5);
+  });
+
+  it('corrects a drifted word count with a periodic full recount', () => {
+    const project = projectService.createProjectSync({ title: 'Novel' });
+    storageService.saveProjectNotes(project.id, [{ ...note('n1', project.id, 40), content: 'one' } as Note]);
+
+    // The stored count is wrong; edits move it by their delta until the recount
+    noteService.updateNote(project.id, 'n1', { content: 'one two' });
+    expect(noteService.getNoteById(project.id, 'n1')?.wordCount).toBe(41);
+
+    let content = 'one two';
+    for (let edit = 2; edit <= 50; edit++) {
+      content = edit % 2 ? 'one two' : 'one';
+      noteService.updateNote(project.id, 'n1', { content });
+    }
+    expect(noteService.getNoteById(project.id, 'n1')?.wordCount).toBe(countWords(content));
+    expect(wordCountService.getProjectWords(project.id)).toBe(countWords(content));
+  });
+});
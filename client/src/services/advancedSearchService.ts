@@ -4,8 +4,11 @@
  */
 
 import { BrowserEventEmitter } from '@/utils/BrowserEventEmitter';
+import type { Project } from '@/types/global';
 import { projectService } from './projectService';
-import { quickNotesService } from './quickNotesService';
+import { quickNotesService, type QuickNote } from './quickNotesService';
+import { storageService } from './storageService';
+import { SearchIndex, FIELD_TITLE, FIELD_CONTENT, FIELD_TAGS, FIELD_METADATA } from './searchIndex';
 
 export interface SearchQuery {
   text?: string;
@@ -122,8 +125,33 @@ export interface SmartFilter {
   isActive: boolean;
 }
 
+// Relevance added for each search term found in a field
+const FIELD_WEIGHTS = {
+  titleExact: 10,
+  title: 5,
+  contentOccurrence: 0.5,
+  tag: 2,
+  metadata: 1
+};
+
+const QUICK_NOTES_KEY = 'astral_quick_notes';
+
+// A project or quick note as last indexed: its edit time and the index ids it produced
+interface IndexedSource {
+  stamp: string;
+  ids: string[];
+}
+
 class AdvancedSearchService extends BrowserEventEmitter {
   private contentIndex: Map<string, ContentIndex> = new Map();
+  private searchIndex = new SearchIndex();
+  // What the index was last synced from, to notice edits since
+  private indexedRevision = -1;
+  private indexedQuickNotes: string | null = null;
+  private indexedSources = new Map<string, IndexedSource>();
+  // Ids added by the source being indexed
+  private reindexedIds: Set<string> | null = null;
+  private indexChanged = false;
   private savedSearches: SavedSearch[] = [];
   private searchHistory: Array<{ query: SearchQuery; timestamp: Date; resultCount: number }> = [];
   private searchAnalytics: SearchAnalytics;
@@ -147,8 +175,15 @@ class AdvancedSearchService extends BrowserEventEmitter {
       // Record search
       this.recordSearch(query);
       
-      // Get all indexed content
-      const allContent = Array.from(this.contentIndex.values());
+      // Pick up content edited since the index was synced
+      if (this.sourcesChanged()) {
+        await this.syncIndex(false);
+      }
+      
+      // Get the indexed content that can match the text
+      const allContent = query.text && query.text.trim()
+        ? this.findCandidates(query.text, query.options)
+        : Array.from(this.contentIndex.values());
       
       // Apply filters
       let filteredContent = this.applyFilters(allContent, query.filters);
@@ -217,147 +252,226 @@ class AdvancedSearchService extends BrowserEventEmitter {
 
   // Content Indexing
   async rebuildIndex(): Promise<void> {
+    await this.syncIndex(true);
+  }
+
+  /**
+   * Bring the index up to date with its sources.  Only projects and quick
+   * notes whose edit time changed since they were indexed are indexed
+   * again, and the items of removed ones are deleted.  A full sync indexes
+   * every source again (SearchIndex.set still re-tokenizes only items
+   * whose text changed) and drops items that no source produced.
+   */
+  private async syncIndex(full: boolean): Promise<void> {
     if (this.indexingInProgress) return;
     
     this.indexingInProgress = true;
     this.emit('indexingStarted');
     
     try {
-      this.contentIndex.clear();
+      this.indexedRevision = storageService.getRevision();
+      this.indexedQuickNotes = this.readQuickNotes();
+      if (full) {
+        this.indexedSources.clear();
+      }
+      const seen = new Set<string>();
       
       // Index projects
-      await this.indexProjects();
+      for (const project of projectService.getAllProjects()) {
+        this.syncSource(`project:${project.id}`, project.updatedAt, seen, () => this.indexProject(project));
+      }
       
       // Index quick notes
-      await this.indexQuickNotes();
+      for (const note of quickNotesService.getAllQuickNotes()) {
+        this.syncSource(`quicknote:${note.id}`, note.updatedAt, seen, () => this.indexQuickNote(note));
+      }
       
       // Index other content types as available
       await this.indexOtherContent();
       
-      this.saveIndex();
+      Array.from(this.indexedSources.keys())
+        .filter(key => !seen.has(key))
+        .forEach(key => this.removeSource(key));
+      
+      if (full) {
+        const live = new Set<string>();
+        this.indexedSources.forEach(source => source.ids.forEach(id => live.add(id)));
+        Array.from(this.contentIndex.keys())
+          .filter(id => !live.has(id))
+          .forEach(id => this.removeFromIndex(id));
+      }
+      
+      if (this.indexChanged) {
+        this.saveIndex();
+        this.indexChanged = false;
+      }
       this.emit('indexingCompleted', { itemCount: this.contentIndex.size });
     } catch (error) {
       console.error('Indexing error:', error);
       this.emit('indexingError', error);
     } finally {
       this.indexingInProgress = false;
+      this.reindexedIds = null;
     }
   }
 
-  private async indexProjects(): Promise<void> {
-    const projects = projectService.getAllProjects();
+  /**
+   * Index one source again if its edit time changed, and delete the items
+   * it no longer produces (a deleted scene, say)
+   */
+  private syncSource(key: string, stamp: string, seen: Set<string>, index: () => void): void {
+    seen.add(key);
+    const indexed = this.indexedSources.get(key);
+    if (indexed && indexed.stamp === stamp) {
+      return;
+    }
+    
+    const ids = new Set<string>();
+    this.reindexedIds = ids;
+    index();
+    this.reindexedIds = null;
     
-    for (const project of projects) {
-      // Index project itself
+    indexed?.ids
+      .filter(id => !ids.has(id))
+      .forEach(id => this.removeFromIndex(id));
+    this.indexedSources.set(key, { stamp, ids: Array.from(ids) });
+  }
+
+  private removeSource(key: string): void {
+    this.indexedSources.get(key)?.ids.forEach(id => this.removeFromIndex(id));
+    this.indexedSources.delete(key);
+  }
+
+  private sourcesChanged(): boolean {
+    return storageService.getRevision() !== this.indexedRevision ||
+      this.readQuickNotes() !== this.indexedQuickNotes;
+  }
+
+  private readQuickNotes(): string | null {
+    try {
+      return localStorage.getItem(QUICK_NOTES_KEY);
+    } catch {
+      return null;
+    }
+  }
+
+  private indexProject(project: Project): void {
+    // Index project itself
+    this.addToIndex({
+      id: `project-${project.id}`,
+      type: 'project',
+      title: project.title,
+      content: `${project.title} ${project.description || ''} ${project.tags.join(' ')}`,
+      tags: project.tags,
+      metadata: {
+        status: project.status,
+        wordCount: project.wordCount,
+        genre: project.genre,
+        createdAt: project.createdAt,
+        updatedAt: project.lastEditedAt
+      },
+      lastIndexed: new Date()
+    });
+    
+    // Index project scenes/chapters
+    const scenes = projectService.getProjectScenes(project.id);
+    scenes.forEach(scene => {
       this.addToIndex({
-        id: `project-${project.id}`,
-        type: 'project',
-        title: project.title,
-        content: `${project.title} ${project.description || ''} ${project.tags.join(' ')}`,
-        tags: project.tags,
+        id: `scene-${scene.id}`,
+        type: 'scene',
+        title: scene.title,
+        content: `${scene.title} ${scene.content || ''} ${scene.summary || ''}`,
+        tags: scene.tags || [],
         metadata: {
-          status: project.status,
-          wordCount: project.wordCount,
-          genre: project.genre,
-          createdAt: project.createdAt,
-          updatedAt: project.lastEditedAt
+          project: { id: project.id, title: project.title },
+          wordCount: scene.wordCount || 0,
+          order: scene.order,
+          createdAt: scene.createdAt,
+          updatedAt: scene.updatedAt
         },
         lastIndexed: new Date()
       });
-      
-      // Index project scenes/chapters
-      const scenes = projectService.getProjectScenes(project.id);
-      scenes.forEach(scene => {
-        this.addToIndex({
-          id: `scene-${scene.id}`,
-          type: 'scene',
-          title: scene.title,
-          content: `${scene.title} ${scene.content || ''} ${scene.summary || ''}`,
-          tags: scene.tags || [],
-          metadata: {
-            project: { id: project.id, title: project.title },
-            wordCount: scene.wordCount || 0,
-            order: scene.order,
-            createdAt: scene.createdAt,
-            updatedAt: scene.updatedAt
-          },
-          lastIndexed: new Date()
-        });
-      });
-      
-      // Index project characters
-      const characters = projectService.getProjectCharacters(project.id);
-      characters.forEach(character => {
-        this.addToIndex({
-          id: `character-${character.id}`,
-          type: 'character',
-          title: character.name,
-          content: `${character.name} ${character.description || ''} ${character.personality || ''} ${character.background || ''}`,
-          tags: character.tags || [],
-          metadata: {
-            project: { id: project.id, title: project.title },
-            age: character.age,
-            role: character.role,
-            createdAt: character.createdAt,
-            updatedAt: character.updatedAt
-          },
-          lastIndexed: new Date()
-        });
-      });
-      
-      // Index project locations
-      const locations = projectService.getProjectLocations(project.id);
-      locations.forEach(location => {
-        this.addToIndex({
-          id: `location-${location.id}`,
-          type: 'location',
-          title: location.name,
-          content: `${location.name} ${location.description || ''} ${location.history || ''}`,
-          tags: location.tags || [],
-          metadata: {
-            project: { id: project.id, title: project.title },
-            type: location.type,
-            createdAt: location.createdAt,
-            updatedAt: location.updatedAt
-          },
-          lastIndexed: new Date()
-        });
+    });
+    
+    // Index project characters
+    const characters = projectService.getProjectCharacters(project.id);
+    characters.forEach(character => {
+      this.addToIndex({
+        id: `character-${character.id}`,
+        type: 'character',
+        title: character.name,
+        content: `${character.name} ${character.description || ''} ${character.personality || ''} ${character.background || ''}`,
+        tags: character.tags || [],
+        metadata: {
+          project: { id: project.id, title: project.title },
+          age: character.age,
+          role: character.role,
+          createdAt: character.createdAt,
+          updatedAt: character.updatedAt
+        },
+        lastIndexed: new Date()
       });
-    }
-  }
-
-  private async indexQuickNotes(): Promise<void> {
-    const quickNotes = quickNotesService.getAllQuickNotes();
+    });
     
-    quickNotes.forEach(note => {
+    // Index project locations
+    const locations = projectService.getProjectLocations(project.id);
+    locations.forEach(location => {
       this.addToIndex({
-        id: `quicknote-${note.id}`,
-        type: 'quicknote',
-        title: note.title,
-        content: `${note.title} ${note.content}`,
-        tags: note.tags,
+        id: `location-${location.id}`,
+        type: 'location',
+        title: location.name,
+        content: `${location.name} ${location.description || ''} ${location.history || ''}`,
+        tags: location.tags || [],
         metadata: {
-          project: note.projectId ? { id: note.projectId, title: 'Attached Project' } : undefined,
-          priority: note.priority,
-          status: note.status,
-          wordCount: note.wordCount,
-          createdAt: note.createdAt,
-          updatedAt: note.updatedAt
+          project: { id: project.id, title: project.title },
+          type: location.type,
+          createdAt: location.createdAt,
+          updatedAt: location.updatedAt
         },
         lastIndexed: new Date()
       });
     });
   }
 
+  private indexQuickNote(note: QuickNote): void {
+    this.addToIndex({
+      id: `quicknote-${note.id}`,
+      type: 'quicknote',
+      title: note.title,
+      content: `${note.title} ${note.content}`,
+      tags: note.tags,
+      metadata: {
+        project: note.projectId ? { id: note.projectId, title: 'Attached Project' } : undefined,
+        priority: note.priority,
+        status: note.status,
+        wordCount: note.wordCount,
+        createdAt: note.createdAt,
+        updatedAt: note.updatedAt
+      },
+      lastIndexed: new Date()
+    });
+  }
+
   private async indexOtherContent(): Promise<void> {
     // Placeholder for indexing other content types
     // (timelines, notes, etc.)
   }
 
   private addToIndex(item: ContentIndex): void {
+    this.reindexedIds?.add(item.id);
+    if (this.searchIndex.set(item)) {
+      this.indexChanged = true;
+    }
     this.contentIndex.set(item.id, item);
   }
 
+  private removeFromIndex(id: string): void {
+    if (this.contentIndex.delete(id)) {
+      this.searchIndex.delete(id);
+      this.indexChanged = true;
+    }
+  }
+
   // Filtering
   private applyFilters(content: ContentIndex[], filters: SearchQuery['filters']): ContentIndex[] {
     return content.filter(item => {
@@ -443,6 +557,55 @@ class AdvancedSearchService extends BrowserEventEmitter {
   }
 
   // Text Search
+  // Items that can match every term of the text, looked up in the index;
+  // every item when no term can be looked up (a regex, or terms under
+  // three characters)
+  private findCandidates(searchText: string, options: SearchQuery['options']): ContentIndex[] {
+    if (options.regex) {
+      try {
+        new RegExp(searchText);
+        return Array.from(this.contentIndex.values());
+      } catch {
+        // Invalid regex, searched as terms
+      }
+    }
+    
+    const fields = this.fieldMask(options);
+    let candidates: Set<string> | null = null;
+    for (const term of this.parseSearchText(searchText, options)) {
+      const ids = this.termCandidates(term, fields, options);
+      if (ids) {
+        candidates = candidates ? new Set(Array.from(candidates).filter(id => ids.has(id))) : ids;
+        if (candidates.size === 0) break;
+      }
+    }
+    
+    return candidates ? this.searchIndex.itemsInOrder(candidates) : Array.from(this.contentIndex.values());
+  }
+
+  private termCandidates(term: string, fields: number, options: SearchQuery['options']): Set<string> | null {
+    const termLower = term.toLowerCase();
+    if (options.wholeWords) {
+      // Case-insensitive regexes can match other letters than the lowercased
+      // ones outside ASCII
+      return /^[\x00-\x7f]*$/.test(term) ? this.searchIndex.substringCandidates(termLower, fields) : null;
+    }
+    if (options.fuzzy) {
+      return this.searchIndex.fuzzyCandidates(termLower, fields);
+    }
+    if (options.caseSensitive && /[\u0130\u03a3]/.test(term)) {
+      // Letters that lowercase differently on their own than within text
+      return null;
+    }
+    return this.searchIndex.substringCandidates(termLower, fields);
+  }
+
+  private fieldMask(options: SearchQuery['options']): number {
+    return FIELD_TITLE |
+      (options.includeContent ? FIELD_CONTENT : 0) |
+      (options.includeMetadata ? FIELD_TAGS | FIELD_METADATA : 0);
+  }
+
   private performTextSearch(content: ContentIndex[], searchText: string, options: SearchQuery['options']): ContentIndex[] {
     if (!searchText.trim()) return content;
     
@@ -480,57 +643,28 @@ class AdvancedSearchService extends BrowserEventEmitter {
   }
 
   private matchesTerm(item: ContentIndex, term: string, options: SearchQuery['options']): boolean {
-    const searchIn = [item.title, ...(options.includeContent ? [item.content] : [])];
+    if (options.fuzzy && !options.wholeWords) {
+      return this.searchIndex.fuzzyCandidates(term.toLowerCase(), this.fieldMask(options)).has(item.id);
+    }
+    
+    // The fields were lowercased when the item was indexed
+    const fields = this.searchIndex.fields(item, !options.caseSensitive);
+    const searchIn = [fields.title, ...(options.includeContent ? [fields.content] : [])];
     
     if (options.includeMetadata) {
-      searchIn.push(...item.tags, JSON.stringify(item.metadata));
+      searchIn.push(...fields.tags, fields.metadata);
     }
     
-    const searchText = searchIn.join(' ');
     const searchTerm = options.caseSensitive ? term : term.toLowerCase();
-    const content = options.caseSensitive ? searchText : searchText.toLowerCase();
+    // A term without whitespace cannot match across two fields
+    const spansFields = /\s/.test(searchTerm);
     
     if (options.wholeWords) {
-      const wordRegex = new RegExp(`\\b${this.escapeRegex(searchTerm)}\\b`, options.caseSensitive ? 'g' : 'gi');
-      return wordRegex.test(content);
-    }
-    
-    if (options.fuzzy) {
-      return this.fuzzyMatch(content, searchTerm);
+      const wordRegex = new RegExp(`\\b${this.escapeRegex(searchTerm)}\\b`, options.caseSensitive ? '' : 'i');
+      return spansFields ? wordRegex.test(searchIn.join(' ')) : searchIn.some(text => wordRegex.test(text));
     }
     
-    return content.includes(searchTerm);
-  }
-
-  private fuzzyMatch(content: string, term: string, threshold: number = 0.8): boolean {
-    // Simple fuzzy matching using Levenshtein distance
-    const words = content.split(/\s+/);
-    
-    return words.some(word => {
-      const distance = this.levenshteinDistance(word.toLowerCase(), term.toLowerCase());
-      const similarity = 1 - (distance / Math.max(word.length, term.length));
-      return similarity >= threshold;
-    });
-  }
-
-  private levenshteinDistance(str1: string, str2: string): number {
-    const matrix = Array(str2.length + 1).fill(null).map(() => Array(str1.length + 1).fill(null));
-    
-    for (let i = 0; i <= str1.length; i++) matrix[0][i] = i;
-    for (let j = 0; j <= str2.length; j++) matrix[j][0] = j;
-    
-    for (let j = 1; j <= str2.length; j++) {
-      for (let i = 1; i <= str1.length; i++) {
-        const indicator = str1[i - 1] === str2[j - 1] ? 0 : 1;
-        matrix[j][i] = Math.min(
-          matrix[j][i - 1] + 1,
-          matrix[j - 1][i] + 1,
-          matrix[j - 1][i - 1] + indicator
-        );
-      }
-    }
-    
-    return matrix[str2.length][str1.length];
+    return spansFields ? searchIn.join(' ').includes(searchTerm) : searchIn.some(text => text.includes(searchTerm));
   }
 
   private escapeRegex(text: string): string {
@@ -539,40 +673,39 @@ class AdvancedSearchService extends BrowserEventEmitter {
 
   // Relevance Scoring
   private calculateRelevanceScores(content: ContentIndex[], query: SearchQuery): Array<ContentIndex & { relevanceScore: number }> {
+    const searchTerms = query.text
+      ? this.parseSearchText(query.text, query.options).map(term => term.toLowerCase())
+      : [];
+    
     return content.map(item => ({
       ...item,
-      relevanceScore: this.calculateRelevance(item, query)
+      relevanceScore: this.calculateRelevance(item, query, searchTerms)
     }));
   }
 
-  private calculateRelevance(item: ContentIndex, query: SearchQuery): number {
+  private calculateRelevance(item: ContentIndex, query: SearchQuery, searchTerms: string[]): number {
     let score = 0;
     
     if (!query.text) return 1; // Default relevance when no text query
     
-    const searchTerms = this.parseSearchText(query.text, query.options);
+    const fields = this.searchIndex.fields(item, true);
     
-    searchTerms.forEach(term => {
-      const termLower = term.toLowerCase();
-      const titleLower = item.title.toLowerCase();
-      const contentLower = item.content.toLowerCase();
-      
+    searchTerms.forEach(termLower => {
       // Title matches are more important
-      if (titleLower === termLower) score += 10;
-      else if (titleLower.includes(termLower)) score += 5;
+      if (fields.title === termLower) score += FIELD_WEIGHTS.titleExact;
+      else if (fields.title.includes(termLower)) score += FIELD_WEIGHTS.title;
       
       // Content matches
-      const contentMatches = (contentLower.match(new RegExp(this.escapeRegex(termLower), 'g')) || []).length;
-      score += contentMatches * 0.5;
+      score += this.countOccurrences(fields.content, termLower) * FIELD_WEIGHTS.contentOccurrence;
       
       // Tag matches
-      item.tags.forEach(tag => {
-        if (tag.toLowerCase().includes(termLower)) score += 2;
+      fields.tags.forEach(tag => {
+        if (tag.includes(termLower)) score += FIELD_WEIGHTS.tag;
       });
       
       // Metadata matches
-      if (JSON.stringify(item.metadata).toLowerCase().includes(termLower)) {
-        score += 1;
+      if (fields.metadata.includes(termLower)) {
+        score += FIELD_WEIGHTS.metadata;
       }
     });
     
@@ -597,6 +730,15 @@ class AdvancedSearchService extends BrowserEventEmitter {
     return score;
   }
 
+  // Non-overlapping occurrences of `term` in `text`
+  private countOccurrences(text: string, term: string): number {
+    let count = 0;
+    for (let at = text.indexOf(term); at !== -1; at = text.indexOf(term, at + term.length)) {
+      count++;
+    }
+    return count;
+  }
+
   // Sorting
   private sortResults(results: Array<ContentIndex & { relevanceScore: number }>, sortBy: SortField, order: 'asc' | 'desc'): Array<ContentIndex & { relevanceScore: number }> {
     return results.sort((a, b) => {
@@ -1018,6 +1160,8 @@ class AdvancedSearchService extends BrowserEventEmitter {
       if (stored) {
         const indexData = JSON.parse(stored);
         this.contentIndex = new Map(indexData);
+        this.searchIndex.clear();
+        this.contentIndex.forEach(item => this.searchIndex.set(item));
       }
     } catch (error) {
       console.error('Failed to load search index:', error);
@@ -3,6 +3,9 @@
  * Provides intelligent writing companionship, motivation, and productivity tracking
  */
 
+import { TextAnalyzer } from '@/utils/textStats';
+import { countWords, wordCountDelta } from '@/utils/wordCount';
+
 export interface WritingSession {
   id: string;
   title: string;
@@ -140,6 +143,8 @@ class AIWritingCompanionService {
   private eventListeners: Map<string, Function[]> = new Map();
   private aiEnabled: boolean = true;
   private realTimeFeedbackEnabled: boolean = true;
+  // Re-analyzes only the blocks of a draft that changed since the last call
+  private textAnalyzer = new TextAnalyzer();
 
   constructor() {
     this.initializeDefaults();
@@ -173,7 +178,7 @@ class AIWritingCompanionService {
           creative: 60,
           analytical: 70
         },
-        specialties: ["guidance", "motivation", "story_structure"],
+        specialties: ['guidance', 'motivation', 'story_structure'],
         communicationStyle: 'supportive',
         greetingStyle: 'supportive',
         feedbackStyle: 'constructive',
@@ -190,7 +195,7 @@ class AIWritingCompanionService {
           creative: 40,
           analytical: 95
         },
-        specialties: ["grammar", "style_analysis", "plot_holes"],
+        specialties: ['grammar', 'style_analysis', 'plot_holes'],
         communicationStyle: 'formal',
         greetingStyle: 'formal',
         feedbackStyle: 'constructive',
@@ -207,7 +212,7 @@ class AIWritingCompanionService {
           creative: 75,
           analytical: 30
         },
-        specialties: ["motivation", "confidence_building", "encouragement"],
+        specialties: ['motivation', 'confidence_building', 'encouragement'],
         communicationStyle: 'playful',
         greetingStyle: 'playful',
         feedbackStyle: 'constructive',
@@ -224,7 +229,7 @@ class AIWritingCompanionService {
           creative: 90,
           analytical: 60
         },
-        specialties: ["brainstorming", "idea_generation", "creative_prompts"],
+        specialties: ['brainstorming', 'idea_generation', 'creative_prompts'],
         communicationStyle: 'casual',
         greetingStyle: 'casual',
         feedbackStyle: 'constructive',
@@ -241,7 +246,7 @@ class AIWritingCompanionService {
           creative: 30,
           analytical: 85
         },
-        specialties: ["editing", "proofreading", "structure"],
+        specialties: ['editing', 'proofreading', 'structure'],
         communicationStyle: 'direct',
         greetingStyle: 'direct',
         feedbackStyle: 'constructive',
@@ -407,12 +412,16 @@ class AIWritingCompanionService {
     return session.id;
   }
 
-  async updateSessionContent(content: string, wordCount: number): Promise<void> {
+  // Without a word count, carry the count forward by counting only the words around the edit
+  async updateSessionContent(content: string, wordCount?: number): Promise<void> {
     if (!this.currentSession?.isActive) {
       console.warn('No active session for content update');
       return;
     }
 
+    if (wordCount === undefined && typeof content === 'string') {
+      wordCount = this.currentSession.wordCount + wordCountDelta(this.currentSession.content, content);
+    }
     if (typeof content !== 'string' || typeof wordCount !== 'number' || wordCount < 0) {
       console.warn('Invalid content or word count provided');
       return;
@@ -483,38 +492,33 @@ class AIWritingCompanionService {
 
   private analyzeContentForSuggestions(content: string): AISuggestion[] {
     const suggestions: AISuggestion[] = [];
-    const sentences = content.split(/[.!?]+/).filter(s => s.trim().length > 0);
+    const stats = this.textAnalyzer.analyze(content);
 
     // Check for long sentences
-    sentences.forEach((sentence, index) => {
-      const words = sentence.trim().split(/\s+/);
-      if (words.length > 25) {
-        suggestions.push({
-          id: `suggestion_${Date.now()}_${index}`,
-          type: 'improvement',
-          title: 'Long Sentence',
-          description: 'Consider breaking this long sentence into shorter ones for better readability.',
-          beforeText: sentence.trim(),
-          afterText: 'Consider splitting into multiple sentences.',
-          confidence: 0.8,
-          isApplied: false,
-          applied: false,
-          reasoning: 'Long sentences can be difficult to follow and may lose reader attention.',
-          timestamp: Date.now()
-        });
-      }
+    stats.longSentences.forEach(sentence => {
+      suggestions.push({
+        id: `suggestion_${Date.now()}_${sentence.index}`,
+        type: 'improvement',
+        title: 'Long Sentence',
+        description: 'Consider breaking this long sentence into shorter ones for better readability.',
+        beforeText: sentence.text,
+        afterText: 'Consider splitting into multiple sentences.',
+        confidence: 0.8,
+        isApplied: false,
+        applied: false,
+        reasoning: 'Long sentences can be difficult to follow and may lose reader attention.',
+        timestamp: Date.now()
+      });
     });
 
     // Check for passive voice
-    const passivePattern = /\b(was|were|is|are|been|being)\s+\w+ed\b/gi;
-    const passiveMatches = content.match(passivePattern);
-    if (passiveMatches && passiveMatches.length > 2) {
+    if (stats.passiveCount > 2 && stats.firstPassive) {
       suggestions.push({
         id: `suggestion_passive_${Date.now()}`,
         type: 'improvement',
         title: 'Passive Voice',
         description: 'Consider using active voice for more engaging writing.',
-        beforeText: passiveMatches[0],
+        beforeText: stats.firstPassive,
         afterText: 'Rewrite in active voice',
         confidence: 0.7,
         isApplied: false,
@@ -525,28 +529,20 @@ class AIWritingCompanionService {
     }
 
     // Check for repeated words
-    const words = content.toLowerCase().split(/\s+/);
-    const wordCounts = words.reduce((acc, word) => {
-      acc[word] = (acc[word] || 0) + 1;
-      return acc;
-    }, {} as Record<string, number>);
-
-    Object.entries(wordCounts).forEach(([word, count]) => {
-      if (count > 5 && word.length > 3) {
-        suggestions.push({
-          id: `suggestion_repetition_${Date.now()}_${word}`,
-          type: 'improvement',
-          title: 'Word Repetition',
-          description: `The word "${word}" appears ${count} times. Consider using synonyms.`,
-          beforeText: word,
-          afterText: 'Use synonyms or rephrase',
-          confidence: 0.6,
-          isApplied: false,
-          applied: false,
-          reasoning: 'Varied vocabulary makes writing more engaging and professional.',
-          timestamp: Date.now()
-        });
-      }
+    stats.repeatedWords.forEach(([word, count]) => {
+      suggestions.push({
+        id: `suggestion_repetition_${Date.now()}_${word}`,
+        type: 'improvement',
+        title: 'Word Repetition',
+        description: `The word "${word}" appears ${count} times. Consider using synonyms.`,
+        beforeText: word,
+        afterText: 'Use synonyms or rephrase',
+        confidence: 0.6,
+        isApplied: false,
+        applied: false,
+        reasoning: 'Varied vocabulary makes writing more engaging and professional.',
+        timestamp: Date.now()
+      });
     });
 
     return suggestions;
@@ -554,9 +550,10 @@ class AIWritingCompanionService {
 
   private analyzeContentForFeedback(content: string): AIFeedback[] {
     const feedback: AIFeedback[] = [];
+    const stats = this.textAnalyzer.analyze(content);
     
     // Check pacing
-    const avgSentenceLength = this.calculateAverageSentenceLength(content);
+    const avgSentenceLength = stats.averageSentenceLength;
     if (avgSentenceLength > 20) {
       feedback.push({
         id: `feedback_pacing_${Date.now()}`,
@@ -570,9 +567,7 @@ class AIWritingCompanionService {
     }
 
     // Check engagement
-    const questionMarks = (content.match(/\?/g) || []).length;
-    const exclamationMarks = (content.match(/!/g) || []).length;
-    if (questionMarks + exclamationMarks === 0 && content.length > 500) {
+    if (stats.questions + stats.exclamations === 0 && content.length > 500) {
       feedback.push({
         id: `feedback_engagement_${Date.now()}`,
         type: 'style',
@@ -599,17 +594,6 @@ class AIWritingCompanionService {
     return feedback;
   }
 
-  private calculateAverageSentenceLength(content: string): number {
-    const sentences = content.split(/[.!?]+/).filter(s => s.trim().length > 0);
-    if (sentences.length === 0) return 0;
-    
-    const totalWords = sentences.reduce((sum, sentence) => {
-      return sum + sentence.trim().split(/\s+/).length;
-    }, 0);
-    
-    return totalWords / sentences.length;
-  }
-
   // Suggestion management
   async applySuggestion(suggestionId: string): Promise<boolean> {
     if (!this.currentSession) return false;
@@ -1009,7 +993,7 @@ class AIWritingCompanionService {
   // Legacy compatibility methods
   async getCompanionship(writingSession: any): Promise<CompanionshipResponse> {
     const { text, goal, timeSpent } = writingSession;
-    const wordsWritten = text ? text.split(/\s+/).filter((w: string) => w.length > 0).length : 0;
+    const wordsWritten = text ? countWords(text) : 0;
     const wpm = timeSpent > 0 ? (wordsWritten / (timeSpent / 60000)) : 0;
 
     let message = 'Keep up the great work!';
@@ -1120,14 +1104,14 @@ class AIWritingCompanionService {
 
   async analyzeText(text: string): Promise<any> {
     // Comprehensive text analysis combining writing quality, style, and suggestions
-    const wordCount = text.split(/\s+/).filter(w => w.length > 0).length;
-    const sentences = text.split(/[.!?]+/).filter(s => s.trim().length > 0);
-    const avgSentenceLength = sentences.length > 0 ? wordCount / sentences.length : 12;
+    const stats = this.textAnalyzer.analyze(text);
+    const wordCount = stats.words;
+    const avgSentenceLength = stats.sentences > 0 ? wordCount / stats.sentences : 12;
 
     const analysis = {
       readabilityScore: Math.min(100, Math.max(0, 100 - (avgSentenceLength - 15) * 2)),
       wordCount: wordCount,
-      sentenceCount: sentences.length,
+      sentenceCount: stats.sentences,
       averageSentenceLength: avgSentenceLength,
       complexityScore: avgSentenceLength > 20 ? 80 : avgSentenceLength > 12 ? 60 : 40,
       suggestions: this.analyzeContentForSuggestions(text).map(s => ({
@@ -1148,8 +1132,8 @@ class AIWritingCompanionService {
         voice: 'active' // Simplified for mock
       },
       contentStructure: {
-        hasIntroduction: sentences.length > 0,
-        hasConclusion: sentences.length > 2,
+        hasIntroduction: stats.sentences > 0,
+        hasConclusion: stats.sentences > 2,
         paragraphFlow: 'good',
         coherence: 0.8
       }
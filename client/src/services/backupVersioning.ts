@@ -1,4 +1,5 @@
 import { EventEmitter } from 'events';
+import { SnapshotStore } from '@/utils/contentChunks';
 
 export interface BackupConfig {
   id: string;
@@ -192,6 +193,7 @@ export interface FileVersion {
   tags: string[];
   backup?: string; // backup archive ID
   delta?: DeltaInfo;
+  chunks?: string[]; // hashes of the content's chunks, shared between versions
 }
 
 export interface DeltaInfo {
@@ -338,6 +340,10 @@ class BackupVersioningService extends EventEmitter {
   private versionManager: VersionManager;
   private conflictResolver: ConflictResolver;
   private healthMonitor: HealthMonitor;
+  // Version contents, chunked so that versions share the text they have in common
+  private snapshots = new SnapshotStore('versionChunk:');
+  // The version histories as this instance last saved them
+  private savedVersions: string | null = null;
 
   constructor() {
     super();
@@ -493,9 +499,8 @@ class BackupVersioningService extends EventEmitter {
     localStorage.setItem('backupConfigs', 
       JSON.stringify(Object.fromEntries(this.configs))
     );
-    localStorage.setItem('versionHistories', 
-      JSON.stringify(Object.fromEntries(this.versions))
-    );
+    this.savedVersions = JSON.stringify(Object.fromEntries(this.versions));
+    localStorage.setItem('versionHistories', this.savedVersions);
     localStorage.setItem('backupArchives', 
       JSON.stringify(Object.fromEntries(this.archives))
     );
@@ -808,6 +813,12 @@ class BackupVersioningService extends EventEmitter {
       this.versions.set(filePath, history);
     }
 
+    if (localStorage.getItem('versionHistories') !== this.savedVersions) {
+      // Saved by another tab, or cleared: chunks may have gone with it
+      this.snapshots.forget();
+    }
+    const { chunks, written } = this.snapshots.snapshot(filePath, content);
+    const base = history.versions[history.versions.length - 1];
     const version: FileVersion = {
       id: `version-${Date.now()}`,
       version: this.generateVersionNumber(history.versions),
@@ -816,7 +827,15 @@ class BackupVersioningService extends EventEmitter {
       checksum: this.calculateContentChecksum(content),
       changeSummary: this.generateChangeSummary(history.versions, content),
       comment,
-      tags: []
+      tags: [],
+      chunks,
+      delta: {
+        type: base && base.chunks ? 'incremental' : 'full',
+        baseVersion: base && base.chunks ? base.id : undefined,
+        size: written,
+        compressionRatio: content.length > 0 ? written / content.length : 1,
+        changes: []
+      }
     };
 
     history.versions.push(version);
@@ -833,6 +852,18 @@ class BackupVersioningService extends EventEmitter {
     return version;
   }
 
+  /**
+   * Content of a stored version, reassembled from its chunks.  Null for
+   * unknown versions and versions created before contents were kept.
+   */
+  public getVersionContent(filePath: string, versionId: string): string | null {
+    const version = this.versions.get(filePath)?.versions.find(v => v.id === versionId);
+    if (!version || !version.chunks) {
+      return null;
+    }
+    return this.snapshots.restore(version.chunks);
+  }
+
   private generateVersionNumber(versions: FileVersion[]): string {
     const major = Math.floor(versions.length / 100) + 1;
     const minor = Math.floor((versions.length % 100) / 10);
@@ -862,6 +893,7 @@ class BackupVersioningService extends EventEmitter {
   private cleanupVersions(history: VersionHistory): void {
     const now = new Date();
     const cutoffDate = new Date(now.getTime() - history.retentionDays * 24 * 60 * 60 * 1000);
+    const previous = history.versions;
 
     // Remove old versions
     history.versions = history.versions.filter(v => 
@@ -872,6 +904,17 @@ class BackupVersioningService extends EventEmitter {
     if (history.versions.length > history.maxVersions) {
       history.versions = history.versions.slice(-history.maxVersions);
     }
+
+    // Drop the chunks only removed versions used
+    const kept = new Set(history.versions);
+    const removed = previous.filter(v => !kept.has(v) && v.chunks);
+    if (removed.length > 0) {
+      const live: string[][] = [];
+      this.versions.forEach(other => other.versions.forEach(v => {
+        if (v.chunks) live.push(v.chunks);
+      }));
+      this.snapshots.discard(removed.map(v => v.chunks!), live);
+    }
   }
 
   public async restoreFromArchive(
@@ -1284,7 +1284,7 @@ class CollaborationService {
         operationsPerSecond: this.otEngine?.getStats()?.totalTransforms || 0
       },
       memory: {
-        cacheSize: this.otEngine?.getStats()?.cacheHits || 0,
+        cacheSize: this.otEngine?.getStats()?.cacheSize || 0,
         bufferSize: Array.from(this.operationBuffer.values()).reduce((sum, buffer) => sum + buffer.length, 0)
       },
       conflicts: {
@@ -88,7 +88,9 @@ class MockDataService {
    */
   public clearAllData(): boolean {
     try {
-      localStorage.removeItem('astral_notes_data');
+      if (!storageService.clearAllData()) {
+        return false;
+      }
       localStorage.removeItem('astral_quick_notes');
       console.log('All data cleared successfully');
       return true;
@@ -6,6 +6,11 @@
 import type { Note } from '@/types/global';
 import { storageService } from './storageService';
 import { projectService } from './projectService';
+import { wordCountService } from './wordCountService';
+import { countWords, markupWordCountDelta, stripTags } from '@/utils/wordCount';
+
+// Edits of a note counted by delta before its words are counted in full again
+const RECOUNT_INTERVAL = 50;
 
 export interface CreateNoteData {
   projectId: string;
@@ -25,6 +30,8 @@ export interface UpdateNoteData {
 
 class NoteService {
   private static instance: NoteService;
+  // Content edits since each note's words were last counted in full, by note id
+  private editsSinceRecount = new Map<string, number>();
 
   public static getInstance(): NoteService {
     if (!NoteService.instance) {
@@ -95,16 +102,18 @@ class NoteService {
       const notes = [...existingNotes, note];
       
       // Try to save, but continue even if storage fails
-      const saveResult = storageService.saveProjectNotes(note.projectId, notes);
+      const saveResult = wordCountService.recordSave(() => storageService.saveProjectNotes(note.projectId, notes));
       if (!saveResult) {
         console.error('Error creating note: Storage failed');
-      }
-
-      // Update project word count and last edited time
-      try {
-        projectService.updateProjectWordCount(note.projectId);
-      } catch (error) {
-        console.warn('Error updating project word count:', error);
+      } else {
+        wordCountService.setNoteWords(note.projectId, note.id, note.wordCount);
+
+        // Update project word count and last edited time
+        try {
+          projectService.updateProjectWordCount(note.projectId);
+        } catch (error) {
+          console.warn('Error updating project word count:', error);
+        }
       }
 
       return note;
@@ -163,22 +172,38 @@ class NoteService {
       return null;
     }
 
+    const previous = notes[index];
     const updated: Note = {
-      ...notes[index],
+      ...previous,
       ...updateData,
       updatedAt: new Date().toISOString(),
     };
 
-    // Recalculate word count if content changed
-    if (updateData.content !== undefined) {
-      updated.wordCount = this.calculateWordCount(updateData.content);
+    // Count only the words around the edit if content changed.  Notes
+    // stored without a word count are recounted, and so is every
+    // RECOUNT_INTERVAL-th edit, so a stored count that drifted is corrected
+    if (typeof previous.wordCount !== 'number') {
+      updated.wordCount = this.calculateWordCount(updated.content || '');
+      this.editsSinceRecount.delete(noteId);
+    } else if (updateData.content !== undefined) {
+      const edits = (this.editsSinceRecount.get(noteId) || 0) + 1;
+      if (edits >= RECOUNT_INTERVAL) {
+        updated.wordCount = this.calculateWordCount(updateData.content);
+        this.editsSinceRecount.delete(noteId);
+      } else {
+        updated.wordCount = previous.wordCount + markupWordCountDelta(previous.content || '', updateData.content);
+        this.editsSinceRecount.set(noteId, edits);
+      }
     }
 
     notes[index] = updated;
-    storageService.saveProjectNotes(projectId, notes);
+    const saved = wordCountService.recordSave(() => storageService.saveProjectNotes(projectId, notes));
+    if (saved) {
+      wordCountService.setNoteWords(projectId, noteId, updated.wordCount);
 
-    // Update project word count and last edited time
-    projectService.updateProjectWordCount(projectId);
+      // Update project word count and last edited time
+      projectService.updateProjectWordCount(projectId);
+    }
 
     return updated;
   }
@@ -216,10 +241,14 @@ class NoteService {
       return false; // Note not found
     }
 
-    storageService.saveProjectNotes(projectId, filteredNotes);
+    const saved = wordCountService.recordSave(() => storageService.saveProjectNotes(projectId, filteredNotes));
+    if (saved) {
+      wordCountService.removeNote(actualNoteId);
+      this.editsSinceRecount.delete(actualNoteId);
 
-    // Update project word count
-    projectService.updateProjectWordCount(projectId);
+      // Update project word count
+      projectService.updateProjectWordCount(projectId);
+    }
 
     return true;
   }
@@ -501,17 +530,8 @@ class NoteService {
    * Calculate word count for text content
    */
   private calculateWordCount(content: string): number {
-    if (!content.trim()) return 0;
-    
-    // Remove HTML tags and extra whitespace
-    const cleanText = content
-      .replace(/<[^>]*>/g, '')
-      .replace(/\s+/g, ' ')
-      .trim();
-    
-    if (!cleanText) return 0;
-    
-    return cleanText.split(' ').length;
+    // Count runs of non-whitespace outside HTML tags
+    return countWords(stripTags(content));
   }
 
   /**
@@ -51,13 +51,25 @@ export interface OptimizedTransformConfig {
   enableVectorClocks: boolean;
   enableCompression: boolean;
   enableCaching: boolean;
+  maxCacheEntries: number; // least recently used transforms are evicted past this
+  cacheTTL: number; // ms a cached transform stays valid
+  enableComposition: boolean; // merge runs of adjacent edits before transforming sequences
+}
+
+interface CachedTransform {
+  result: TransformResult;
+  storedAt: number;
 }
 
 export class AdvancedOperationalTransform {
   private siteId: number;
   private sequence: number = 0;
   private vectorClock: VectorClock = {};
-  private operationCache = new Map<string, TransformResult>();
+  // Insertion order is recency order: hits are moved to the end
+  private operationCache = new Map<string, CachedTransform>();
+  private cacheHits: number = 0;
+  private cacheMisses: number = 0;
+  private cacheEvictions: number = 0;
   private config: OptimizedTransformConfig;
 
   constructor(siteId: number, config: Partial<OptimizedTransformConfig> = {}) {
@@ -69,6 +81,9 @@ export class AdvancedOperationalTransform {
       enableVectorClocks: true,
       enableCompression: true,
       enableCaching: true,
+      maxCacheEntries: 1000,
+      cacheTTL: 5 * 60 * 1000,
+      enableComposition: true,
       ...config
     };
     this.vectorClock[siteId] = 0;
@@ -79,29 +94,86 @@ export class AdvancedOperationalTransform {
    * Optimized for minimal latency and maximum conflict resolution
    */
   public transform(op1: Operation, op2: Operation): TransformResult {
-    const cacheKey = `${op1.id}-${op2.id}`;
+    if (!this.config.enableCaching) {
+      return this.performTransform(op1, op2);
+    }
+
+    const cacheKey = `${this.cacheKeyPart(op1)}|${this.cacheKeyPart(op2)}`;
     
     // Check cache for previously computed transforms
-    if (this.config.enableCaching && this.operationCache.has(cacheKey)) {
-      return this.operationCache.get(cacheKey)!;
+    const cached = this.getCachedTransform(cacheKey);
+    if (cached) {
+      return cached;
     }
 
     const result = this.performTransform(op1, op2);
     
     // Cache result for future use
-    if (this.config.enableCaching) {
-      this.operationCache.set(cacheKey, result);
-    }
+    this.setCachedTransform(cacheKey, result);
 
     return result;
   }
 
+  /**
+   * Identify an operation by everything its transform depends on or
+   * copies into the result, since transformed and composed operations
+   * keep the original's id.  JSON keeps the fields from running into
+   * each other whatever the content holds.
+   */
+  private cacheKeyPart(op: Operation): string {
+    return JSON.stringify([
+      op.id,
+      op.type,
+      op.siteId,
+      op.timestamp,
+      op.position,
+      op.length ?? null,
+      op.content ?? null,
+      op.attributes ?? null,
+      op.vectorClock ?? null
+    ]);
+  }
+
+  private getCachedTransform(key: string): TransformResult | null {
+    const entry = this.operationCache.get(key);
+    if (!entry) {
+      this.cacheMisses++;
+      return null;
+    }
+
+    this.operationCache.delete(key);
+    if (Date.now() - entry.storedAt > this.config.cacheTTL) {
+      this.cacheMisses++;
+      return null;
+    }
+
+    // Move to the most recently used end
+    this.operationCache.set(key, entry);
+    this.cacheHits++;
+    return entry.result;
+  }
+
+  private setCachedTransform(key: string, result: TransformResult): void {
+    this.operationCache.set(key, { result, storedAt: Date.now() });
+
+    // Evict least recently used entries, which come first
+    while (this.operationCache.size > this.config.maxCacheEntries) {
+      const oldest = this.operationCache.keys().next().value as string;
+      this.operationCache.delete(oldest);
+      this.cacheEvictions++;
+    }
+  }
+
   private performTransform(op1: Operation, op2: Operation): TransformResult {
     // Vector clock comparison for causality detection
     if (this.config.enableVectorClocks && this.areConcurrent(op1, op2)) {
       return this.transformConcurrentOperations(op1, op2);
     }
 
+    return this.transformByType(op1, op2);
+  }
+
+  private transformByType(op1: Operation, op2: Operation): TransformResult {
     // Standard transformation based on operation types
     switch (`${op1.type}-${op2.type}`) {
       case 'insert-insert':
@@ -314,7 +386,7 @@ export class AdvancedOperationalTransform {
    */
   private transformConcurrentOperations(op1: Operation, op2: Operation): TransformResult {
     // Apply intention preservation transformation
-    const baseTransform = this.performTransform(op1, op2);
+    const baseTransform = this.transformByType(op1, op2);
     
     // Add conflict detection for concurrent operations
     const conflicts: ConflictInfo[] = [];
@@ -472,18 +544,95 @@ export class AdvancedOperationalTransform {
   }
 
   /**
-   * Transform operation sequence against another sequence
+   * Transform operation sequence against another sequence.  With
+   * composition enabled both sequences are first reduced to their edit
+   * bursts (see composeRuns), so the result holds ops1's composed
+   * operations and the work grows with bursts rather than keystrokes.
    */
   public transformSequence(ops1: Operation[], ops2: Operation[]): Operation[] {
-    let transformed = [...ops1];
+    const composing = this.config.enableComposition;
+    let transformed = composing ? this.composeRuns(ops1) : [...ops1];
+    const against = composing ? this.composeRuns(ops2) : ops2;
     
-    for (const op2 of ops2) {
+    for (const op2 of against) {
       transformed = transformed.map(op1 => this.transform(op1, op2).operation);
     }
 
     return transformed;
   }
 
+  /**
+   * Merge runs of consecutive operations from the same site that make up
+   * one edit: typing (an insert within or at the end of the previous
+   * insert), corrections of just-typed text (a delete inside it), and
+   * forward deletes or backspaces (a delete next to the previous one).
+   * Each merged operation has the same effect on the text as its run.
+   */
+  public composeRuns(ops: Operation[]): Operation[] {
+    const runs: Operation[] = [];
+
+    for (const op of ops) {
+      const previous = runs[runs.length - 1];
+      const merged = previous ? this.composePair(previous, op) : null;
+      if (merged) {
+        runs[runs.length - 1] = merged;
+      } else {
+        runs.push(op);
+      }
+    }
+
+    // Typing that was deleted again leaves empty inserts
+    return runs.filter(op => op.type !== 'insert' || (op.content?.length || 0) > 0);
+  }
+
+  /**
+   * A single operation with the effect of `first` followed by `next`, or
+   * null when they do not form one edit
+   */
+  private composePair(first: Operation, next: Operation): Operation | null {
+    if (first.siteId !== next.siteId || first.userId !== next.userId ||
+        JSON.stringify(first.attributes) !== JSON.stringify(next.attributes)) {
+      return null;
+    }
+
+    const latest = {
+      timestamp: next.timestamp,
+      sequence: next.sequence,
+      vectorClock: next.vectorClock
+    };
+
+    if (first.type === 'insert' && next.type === 'insert') {
+      const content = first.content || '';
+      const offset = next.position - first.position;
+      if (offset < 0 || offset > content.length) return null;
+      const combined = content.slice(0, offset) + (next.content || '') + content.slice(offset);
+      return { ...first, ...latest, content: combined, length: combined.length };
+    }
+
+    if (first.type === 'insert' && next.type === 'delete') {
+      const content = first.content || '';
+      const offset = next.position - first.position;
+      const length = next.length || 0;
+      if (offset < 0 || offset + length > content.length) return null;
+      const remaining = content.slice(0, offset) + content.slice(offset + length);
+      return { ...first, ...latest, content: remaining, length: remaining.length };
+    }
+
+    if (first.type === 'delete' && next.type === 'delete') {
+      const length = (first.length || 0) + (next.length || 0);
+      if (next.position === first.position) {
+        // Forward delete
+        return { ...first, ...latest, length };
+      }
+      if (next.position + (next.length || 0) === first.position) {
+        // Backspace
+        return { ...first, ...latest, position: next.position, length };
+      }
+    }
+
+    return null;
+  }
+
   /**
    * Compose multiple operations into a single operation
    */
@@ -582,12 +731,18 @@ export class AdvancedOperationalTransform {
    */
   public getStats(): {
     cacheHits: number;
+    cacheMisses: number;
+    cacheEvictions: number;
+    cacheSize: number;
     totalTransforms: number;
     conflictRate: number;
     averageLatency: number;
   } {
     return {
-      cacheHits: this.operationCache.size,
+      cacheHits: this.cacheHits,
+      cacheMisses: this.cacheMisses,
+      cacheEvictions: this.cacheEvictions,
+      cacheSize: this.operationCache.size,
       totalTransforms: this.sequence,
       conflictRate: 0, // Would need to track conflicts
       averageLatency: 0 // Would need to track timing
@@ -5,6 +5,7 @@
 
 import type { Project, Note } from '@/types/global';
 import { storageService } from './storageService';
+import { wordCountService } from './wordCountService';
 
 export interface CreateProjectData {
   title: string;
@@ -30,8 +31,28 @@ export interface ProjectStats {
   progressPercentage: number;
 }
 
+/**
+ * Where a story or character sits in the cached project graph
+ */
+interface GraphLocation {
+  project: Project;
+  index: number;
+}
+
+/**
+ * Parsed projects with id indexes, valid for one storage revision
+ */
+interface ProjectGraph {
+  revision: number;
+  projects: Project[];
+  projectsById: Map<string, Project>;
+  stories: Map<string, GraphLocation>;
+  characters: Map<string, GraphLocation>;
+}
+
 export class ProjectService {
   private static instance: ProjectService;
+  private graph: ProjectGraph | null = null;
 
   public static getInstance(): ProjectService {
     if (!ProjectService.instance) {
@@ -40,10 +61,106 @@ export class ProjectService {
     return ProjectService.instance;
   }
 
+  private constructor() {
+    // Another tab wrote to localStorage
+    if (typeof window !== 'undefined') {
+      window.addEventListener('storage', () => this.invalidateGraph());
+    }
+  }
+
   /**
-   * Get all projects (with test compatibility)
+   * Get all projects (with test compatibility).  The projects and their
+   * lists are copies; the stories, characters and other items in the
+   * lists are shared with the cache, so change them through the update
+   * methods.
    */
   public getAllProjects(): Project[] {
+    return this.getGraph().projects.map(project => this.copyProject(project));
+  }
+
+  /**
+   * The cached project graph.  It is rebuilt after storageService
+   * changes the data, after another tab does or localStorage is cleared
+   * (storageService counts both as changes), and after the writes in
+   * this service that bypass storageService.
+   */
+  private getGraph(): ProjectGraph {
+    const revision = storageService.getRevision();
+    if (!this.graph || this.graph.revision !== revision) {
+      this.graph = this.buildGraph(revision);
+    }
+    return this.graph;
+  }
+
+  private invalidateGraph(): void {
+    this.graph = null;
+  }
+
+  /**
+   * A copy of a graph project whose fields and lists callers may change
+   * freely.  The list items are not copied: the update methods replace
+   * items instead of changing them, so a copy costs the length of the
+   * lists rather than a walk of every story and scene.
+   */
+  private copyProject(project: Project): Project {
+    const copy: Record<string, unknown> = { ...project };
+    for (const key of Object.keys(copy)) {
+      if (Array.isArray(copy[key])) {
+        copy[key] = [...(copy[key] as unknown[])];
+      }
+    }
+    return copy as unknown as Project;
+  }
+
+  private buildGraph(revision: number): ProjectGraph {
+    const graph: ProjectGraph = {
+      revision,
+      projects: this.readProjects(),
+      projectsById: new Map(),
+      stories: new Map(),
+      characters: new Map()
+    };
+    for (const project of graph.projects) {
+      graph.projectsById.set(project.id, project);
+      this.indexStories(graph, project, 0);
+      this.indexCharacters(graph, project, 0);
+    }
+    return graph;
+  }
+
+  /**
+   * (Re)index a project's stories from position ``from`` on
+   */
+  private indexStories(graph: ProjectGraph, project: Project, from: number): void {
+    const stories = project.stories || [];
+    for (let index = from; index < stories.length; index++) {
+      graph.stories.set(stories[index].id, { project, index });
+    }
+  }
+
+  /**
+   * (Re)index a project's characters from position ``from`` on
+   */
+  private indexCharacters(graph: ProjectGraph, project: Project, from: number): void {
+    const characters = project.characters || [];
+    for (let index = from; index < characters.length; index++) {
+      graph.characters.set(characters[index].id, { project, index });
+    }
+  }
+
+  /**
+   * Save a project changed in place in the graph.  The graph already
+   * holds the change, so it stays valid.
+   */
+  private saveGraphProject(graph: ProjectGraph, project: Project): void {
+    storageService.saveProject(project);
+    graph.revision = storageService.getRevision();
+  }
+
+  /**
+   * Read all projects from storage (with test compatibility)
+   */
+  private readProjects(): Project[] {
     try {
       // Try normal storage service first
       const projects = storageService.getProjects();
@@ -83,8 +200,8 @@ export class ProjectService {
    * Get project by ID (with test compatibility)
    */
   public getProjectById(id: string): Project | null {
-    const projects = this.getAllProjects();
-    return projects.find(p => p.id === id) || null;
+    const project = this.getGraph().projectsById.get(id);
+    return project ? this.copyProject(project) : null;
   }
 
   /**
@@ -368,16 +485,34 @@ export class ProjectService {
    */
   public updateProjectWordCount(id: string): number {
     const wordCount = this.calculateProjectWordCount(id);
-    this.updateProjectSync(id, { wordCount });
+    this.saveProjectWordCount(id, wordCount);
     return wordCount;
   }
 
+  /**
+   * Set a project's word count and edit time with a write-behind save of
+   * that project alone, rather than a full save of every project
+   */
+  private saveProjectWordCount(id: string, wordCount: number): void {
+    const graph = this.getGraph();
+    const project = graph.projectsById.get(id);
+    if (!project) {
+      return;
+    }
+
+    const now = new Date().toISOString();
+    project.wordCount = wordCount;
+    project.updatedAt = now;
+    project.lastEditedAt = now;
+    this.saveGraphProject(graph, project);
+    this.emit('project-updated', this.copyProject(project));
+  }
+
   /**
    * Calculate total word count for a project
    */
   private calculateProjectWordCount(id: string): number {
-    const notes = storageService.getProjectNotes(id);
-    return notes.reduce((sum, note) => sum + note.wordCount, 0);
+    return wordCountService.getProjectWords(id);
   }
 
   /**
@@ -447,13 +582,14 @@ export class ProjectService {
     };
 
     // Store story in project and save to storage
-    const projects = this.getAllProjects();
-    const projectIndex = projects.findIndex(p => p.id === data.projectId);
-    if (projectIndex !== -1) {
-      projects[projectIndex].stories = projects[projectIndex].stories || [];
-      projects[projectIndex].stories.push(story);
-      projects[projectIndex].updatedAt = now;
-      storageService.saveProjects(projects);
+    const graph = this.getGraph();
+    const project = graph.projectsById.get(data.projectId);
+    if (project) {
+      project.stories = project.stories || [];
+      project.stories.push(story);
+      project.updatedAt = now;
+      this.indexStories(graph, project, project.stories.length - 1);
+      this.saveGraphProject(graph, project);
     }
 
     return story;
@@ -465,71 +601,41 @@ export class ProjectService {
   }
 
   public async updateStory(storyId: string, updates: any): Promise<any> {
-    const projects = this.getAllProjects();
-
-    for (let i = 0; i < projects.length; i++) {
-
-      const project = projects[i];
-
-      if (project.stories) {
-
-        const storyIndex = project.stories.findIndex(s => s.id === storyId);
-
-        if (storyIndex !== -1) {
-
-          const updatedStory = {
-
-            ...project.stories[storyIndex],
-
-            ...updates,
-
-            updatedAt: new Date().toISOString()
-
-          };
-
-          projects[i].stories[storyIndex] = updatedStory;
-
-          projects[i].updatedAt = new Date().toISOString();
-
-          storageService.saveProjects(projects);
-
-          return updatedStory;
-
-        }
-
-      }
-
+    const graph = this.getGraph();
+    const location = graph.stories.get(storyId);
+    if (!location) {
+      return null;
     }
-    return null;
+
+    const { project, index } = location;
+    const updatedStory = {
+      ...project.stories[index],
+      ...updates,
+      updatedAt: new Date().toISOString()
+    };
+    project.stories[index] = updatedStory;
+    project.updatedAt = new Date().toISOString();
+    // The updates may carry a new id
+    graph.stories.delete(storyId);
+    graph.stories.set(updatedStory.id, location);
+    this.saveGraphProject(graph, project);
+    return updatedStory;
   }
 
   public async deleteStory(storyId: string): Promise<boolean> {
-    const projects = this.getAllProjects();
-
-    for (let i = 0; i < projects.length; i++) {
-
-      const project = projects[i];
-
-      if (project.stories) {
-
-        const storyIndex = project.stories.findIndex(s => s.id === storyId);
-
-        if (storyIndex !== -1) {
-
-          projects[i].stories.splice(storyIndex, 1);
-
-          projects[i].updatedAt = new Date().toISOString();
-
-          storageService.saveProjects(projects);
-
-          return true;
-
-        }
-
-      }
-
+    const graph = this.getGraph();
+    const location = graph.stories.get(storyId);
+    if (!location) {
+      return false;
     }
-    return false;
+
+    const { project, index } = location;
+    project.stories.splice(index, 1);
+    project.updatedAt = new Date().toISOString();
+    graph.stories.delete(storyId);
+    this.indexStories(graph, project, index);
+    this.saveGraphProject(graph, project);
+    return true;
   }
 
   /**
@@ -553,13 +659,14 @@ export class ProjectService {
     };
 
     // Store character in project and save to storage
-    const projects = this.getAllProjects();
-    const projectIndex = projects.findIndex(p => p.id === data.projectId);
-    if (projectIndex !== -1) {
-      projects[projectIndex].characters = projects[projectIndex].characters || [];
-      projects[projectIndex].characters.push(character);
-      projects[projectIndex].updatedAt = now;
-      storageService.saveProjects(projects);
+    const graph = this.getGraph();
+    const project = graph.projectsById.get(data.projectId);
+    if (project) {
+      project.characters = project.characters || [];
+      project.characters.push(character);
+      project.updatedAt = now;
+      this.indexCharacters(graph, project, project.characters.length - 1);
+      this.saveGraphProject(graph, project);
     }
 
     return character;
@@ -571,71 +678,41 @@ export class ProjectService {
   }
 
   public async updateCharacter(characterId: string, updates: any): Promise<any> {
-    const projects = this.getAllProjects();
-
-    for (let i = 0; i < projects.length; i++) {
-
-      const project = projects[i];
-
-      if (project.characters) {
-
-        const characterIndex = project.characters.findIndex(c => c.id === characterId);
-
-        if (characterIndex !== -1) {
-
-          const updatedCharacter = {
-
-            ...project.characters[characterIndex],
-
-            ...updates,
-
-            updatedAt: new Date().toISOString()
-
-          };
-
-          projects[i].characters[characterIndex] = updatedCharacter;
-
-          projects[i].updatedAt = new Date().toISOString();
-
-          storageService.saveProjects(projects);
-
-          return updatedCharacter;
-
-        }
-
-      }
-
+    const graph = this.getGraph();
+    const location = graph.characters.get(characterId);
+    if (!location) {
+      return null;
     }
-    return null;
+
+    const { project, index } = location;
+    const updatedCharacter = {
+      ...project.characters[index],
+      ...updates,
+      updatedAt: new Date().toISOString()
+    };
+    project.characters[index] = updatedCharacter;
+    project.updatedAt = new Date().toISOString();
+    // The updates may carry a new id
+    graph.characters.delete(characterId);
+    graph.characters.set(updatedCharacter.id, location);
+    this.saveGraphProject(graph, project);
+    return updatedCharacter;
   }
 
   public async deleteCharacter(characterId: string): Promise<boolean> {
-    const projects = this.getAllProjects();
-
-    for (let i = 0; i < projects.length; i++) {
-
-      const project = projects[i];
-
-      if (project.characters) {
-
-        const characterIndex = project.characters.findIndex(c => c.id === characterId);
-
-        if (characterIndex !== -1) {
-
-          projects[i].characters.splice(characterIndex, 1);
-
-          projects[i].updatedAt = new Date().toISOString();
-
-          storageService.saveProjects(projects);
-
-          return true;
-
-        }
-
-      }
-
+    const graph = this.getGraph();
+    const location = graph.characters.get(characterId);
+    if (!location) {
+      return false;
     }
-    return false;
+
+    const { project, index } = location;
+    project.characters.splice(index, 1);
+    project.updatedAt = new Date().toISOString();
+    graph.characters.delete(characterId);
+    this.indexCharacters(graph, project, index);
+    this.saveGraphProject(graph, project);
+    return true;
   }
 
   /**
@@ -676,6 +753,7 @@ export class ProjectService {
         if (projectIndex !== -1) {
           storageData.projects[projectIndex] = result;
           localStorage.setItem('astral_notes_data', JSON.stringify(storageData));
+          this.invalidateGraph();
         }
       }
     } catch (error) {
@@ -699,6 +777,7 @@ export class ProjectService {
         if (storageData.projects) {
           storageData.projects = storageData.projects.filter(p => p.id !== id);
           localStorage.setItem('astral_notes_data', JSON.stringify(storageData));
+          this.invalidateGraph();
           
           // Also set for test compatibility with 'astral-projects' key
           localStorage.setItem('astral-projects', JSON.stringify(storageData.projects));
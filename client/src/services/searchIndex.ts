@@ -0,0 +1,379 @@
+/**
+ * Search Index
+ * Inverted indexes over the advanced search content index, so a query
+ * looks up the items that can match it instead of lowercasing and
+ * scanning every item.  Each item's fields are lowercased once, when it
+ * is indexed.  Trigram postings narrow substring queries to the items
+ * holding every trigram of the term, and a BK-tree over the vocabulary of
+ * whitespace-separated words answers fuzzy queries by edit distance.
+ * Substring candidates are a superset of the matches and are checked by
+ * the caller; fuzzy candidates are exact.
+ */
+
+import type { ContentIndex } from './advancedSearchService';
+import { isWhitespace } from '@/utils/wordCount';
+
+// Fields an item is matched in, as bits of a field mask
+export const FIELD_TITLE = 1;
+export const FIELD_CONTENT = 2;
+export const FIELD_TAGS = 4;
+export const FIELD_METADATA = 8;
+
+// A word matches a fuzzy term when 1 - distance / longer length is at least this
+export const FUZZY_THRESHOLD = 0.8;
+
+// Remembered fuzzy lookups, forgotten whenever the index changes
+const MAX_MEMOIZED_LOOKUPS = 200;
+// Rebuild the BK-tree once removed words outnumber live ones by this much
+const MAX_DEAD_WORDS = 1000;
+
+export interface IndexedFields {
+  title: string;
+  content: string;
+  tags: string[];
+  metadata: string; // the item's metadata as JSON
+}
+
+interface IndexedItem {
+  item: ContentIndex;
+  order: number; // insertion order, kept when the item is updated; keys the postings
+  original: IndexedFields;
+  lower: IndexedFields;
+}
+
+interface BKNode {
+  word: string;
+  children: Map<number, BKNode>;
+}
+
+/**
+ * Levenshtein distance between two strings, over UTF-16 code units
+ */
+export function editDistance(a: string, b: string): number {
+  if (a === b) return 0;
+  if (a.length === 0) return b.length;
+  if (b.length === 0) return a.length;
+
+  let previous = new Array<number>(b.length + 1);
+  let current = new Array<number>(b.length + 1);
+  for (let j = 0; j <= b.length; j++) previous[j] = j;
+
+  for (let i = 1; i <= a.length; i++) {
+    current[0] = i;
+    const code = a.charCodeAt(i - 1);
+    for (let j = 1; j <= b.length; j++) {
+      const substitution = previous[j - 1] + (code === b.charCodeAt(j - 1) ? 0 : 1);
+      current[j] = Math.min(previous[j] + 1, current[j - 1] + 1, substitution);
+    }
+    [previous, current] = [current, previous];
+  }
+  return previous[b.length];
+}
+
+/**
+ * Call `visit` with each trigram of `text` that contains no whitespace,
+ * packed into a number (three UTF-16 code units of 16 bits each)
+ */
+function forEachTrigram(text: string, visit: (gram: number) => void): void {
+  let lastWhitespace = -1;
+  let gram = 0;
+  for (let i = 0; i < text.length; i++) {
+    const code = text.charCodeAt(i);
+    if (isWhitespace(code)) {
+      lastWhitespace = i;
+      continue;
+    }
+    gram = (gram % 0x100000000) * 0x10000 + code;
+    if (i - lastWhitespace >= 3) {
+      visit(gram);
+    }
+  }
+}
+
+/**
+ * Call `visit` with each run of non-whitespace in `text`, the words
+ * `text.split(/\s+/)` yields
+ */
+function forEachWord(text: string, visit: (word: string) => void): void {
+  let start = -1;
+  for (let i = 0; i <= text.length; i++) {
+    if (i === text.length || isWhitespace(text.charCodeAt(i))) {
+      if (start !== -1) {
+        visit(text.slice(start, i));
+        start = -1;
+      }
+    } else if (start === -1) {
+      start = i;
+    }
+  }
+}
+
+function fieldsOf(item: ContentIndex): IndexedFields {
+  return {
+    title: item.title,
+    content: item.content,
+    tags: item.tags,
+    metadata: JSON.stringify(item.metadata)
+  };
+}
+
+function lowerFields(fields: IndexedFields): IndexedFields {
+  return {
+    title: fields.title.toLowerCase(),
+    content: fields.content.toLowerCase(),
+    tags: fields.tags.map(tag => tag.toLowerCase()),
+    metadata: fields.metadata.toLowerCase()
+  };
+}
+
+function sameFields(a: IndexedFields, b: IndexedFields): boolean {
+  return a.title === b.title &&
+    a.content === b.content &&
+    a.metadata === b.metadata &&
+    a.tags.length === b.tags.length &&
+    a.tags.every((tag, i) => tag === b.tags[i]);
+}
+
+export class SearchIndex {
+  private items = new Map<string, IndexedItem>();
+  private itemsByOrder = new Map<number, IndexedItem>();
+  // trigram -> item order -> fields holding it
+  private trigrams = new Map<number, Map<number, number>>();
+  // word -> item order -> fields holding it
+  private words = new Map<string, Map<number, number>>();
+  private tree: BKNode | null = null;
+  // Words in the tree, including ones no item holds any more
+  private treeWords = new Set<string>();
+  private nextOrder = 0;
+  private fuzzyLookups = new Map<string, Set<string>>();
+
+  get size(): number {
+    return this.items.size;
+  }
+
+  /**
+   * Index an item, or re-index it if its text changed.  Returns whether
+   * the item was new or changed.
+   */
+  set(item: ContentIndex): boolean {
+    const original = fieldsOf(item);
+    const existing = this.items.get(item.id);
+    if (existing && sameFields(existing.original, original)) {
+      existing.item = item;
+      return false;
+    }
+
+    if (existing) {
+      this.unpost(existing.order, existing.lower);
+    }
+    const indexed: IndexedItem = {
+      item,
+      order: existing ? existing.order : this.nextOrder++,
+      original,
+      lower: lowerFields(original)
+    };
+    this.items.set(item.id, indexed);
+    this.itemsByOrder.set(indexed.order, indexed);
+    this.post(indexed.order, indexed.lower);
+    this.fuzzyLookups.clear();
+    return true;
+  }
+
+  delete(id: string): boolean {
+    const existing = this.items.get(id);
+    if (!existing) return false;
+    this.unpost(existing.order, existing.lower);
+    this.items.delete(id);
+    this.itemsByOrder.delete(existing.order);
+    this.fuzzyLookups.clear();
+    return true;
+  }
+
+  clear(): void {
+    this.items.clear();
+    this.itemsByOrder.clear();
+    this.trigrams.clear();
+    this.words.clear();
+    this.tree = null;
+    this.treeWords.clear();
+    this.fuzzyLookups.clear();
+  }
+
+  /**
+   * An item's searchable fields, lowercased or as written.  Items that are
+   * not indexed have theirs worked out on the spot.
+   */
+  fields(item: ContentIndex, lowercase: boolean): IndexedFields {
+    const indexed = this.items.get(item.id);
+    if (indexed) {
+      return lowercase ? indexed.lower : indexed.original;
+    }
+    return lowercase ? lowerFields(fieldsOf(item)) : fieldsOf(item);
+  }
+
+  /**
+   * The indexed items with the given ids, in the order they were first indexed
+   */
+  itemsInOrder(ids: Iterable<string>): ContentIndex[] {
+    const found: IndexedItem[] = [];
+    for (const id of ids) {
+      const indexed = this.items.get(id);
+      if (indexed) found.push(indexed);
+    }
+    return found.sort((a, b) => a.order - b.order).map(indexed => indexed.item);
+  }
+
+  /**
+   * Ids of the items whose `fields` may contain the lowercased `term`:
+   * those holding each of its trigrams.  Null when the term has no
+   * trigram outside whitespace, so every item may contain it.
+   */
+  substringCandidates(term: string, fields: number): Set<string> | null {
+    const grams = new Set<number>();
+    forEachTrigram(term, gram => grams.add(gram));
+    if (grams.size === 0) return null;
+
+    const postings: Array<Map<number, number>> = [];
+    for (const gram of grams) {
+      const posting = this.trigrams.get(gram);
+      if (!posting) return new Set();
+      postings.push(posting);
+    }
+    postings.sort((a, b) => a.size - b.size);
+
+    const [smallest, ...rest] = postings;
+    const ids = new Set<string>();
+    smallest.forEach((mask, order) => {
+      if ((mask & fields) !== 0 && rest.every(posting => ((posting.get(order) || 0) & fields) !== 0)) {
+        ids.add(this.itemsByOrder.get(order)!.item.id);
+      }
+    });
+    return ids;
+  }
+
+  /**
+   * Ids of the items with a word in `fields` at least FUZZY_THRESHOLD
+   * similar to the lowercased `term`
+   */
+  fuzzyCandidates(term: string, fields: number): Set<string> {
+    const key = `${fields}:${term}`;
+    const memoized = this.fuzzyLookups.get(key);
+    if (memoized) return memoized;
+
+    this.pruneTree();
+    // similarity >= 0.8 needs distance <= 0.2 * longer length, and the
+    // longer word is at most 1.25 times the term's length
+    const radius = Math.floor(term.length / 4);
+    const ids = new Set<string>();
+    const pending = this.tree ? [this.tree] : [];
+    while (pending.length > 0) {
+      const node = pending.pop()!;
+      const distance = editDistance(node.word, term);
+      if (distance <= radius) {
+        const posting = this.words.get(node.word);
+        const similarity = 1 - (distance / Math.max(node.word.length, term.length));
+        if (posting && similarity >= FUZZY_THRESHOLD) {
+          posting.forEach((mask, order) => {
+            if ((mask & fields) !== 0) ids.add(this.itemsByOrder.get(order)!.item.id);
+          });
+        }
+      }
+      node.children.forEach((child, edge) => {
+        if (edge >= distance - radius && edge <= distance + radius) {
+          pending.push(child);
+        }
+      });
+    }
+
+    if (this.fuzzyLookups.size >= MAX_MEMOIZED_LOOKUPS) {
+      this.fuzzyLookups.clear();
+    }
+    this.fuzzyLookups.set(key, ids);
+    return ids;
+  }
+
+  private post(order: number, lower: IndexedFields): void {
+    const { grams, words } = this.collect(lower);
+    grams.forEach((mask, gram) => {
+      let posting = this.trigrams.get(gram);
+      if (!posting) {
+        posting = new Map();
+        this.trigrams.set(gram, posting);
+      }
+      posting.set(order, mask);
+    });
+    words.forEach((mask, word) => {
+      let posting = this.words.get(word);
+      if (!posting) {
+        posting = new Map();
+        this.words.set(word, posting);
+      }
+      posting.set(order, mask);
+      this.addToTree(word);
+    });
+  }
+
+  private unpost(order: number, lower: IndexedFields): void {
+    const { grams, words } = this.collect(lower);
+    grams.forEach((_, gram) => {
+      const posting = this.trigrams.get(gram);
+      if (posting && posting.delete(order) && posting.size === 0) {
+        this.trigrams.delete(gram);
+      }
+    });
+    // Words no item holds stay in the tree until it is pruned
+    words.forEach((_, word) => {
+      const posting = this.words.get(word);
+      if (posting && posting.delete(order) && posting.size === 0) {
+        this.words.delete(word);
+      }
+    });
+  }
+
+  /**
+   * An item's trigrams and words, each with the fields it occurs in
+   */
+  private collect(lower: IndexedFields): { grams: Map<number, number>; words: Map<string, number> } {
+    const grams = new Map<number, number>();
+    const words = new Map<string, number>();
+    const add = (text: string, field: number) => {
+      forEachTrigram(text, gram => grams.set(gram, (grams.get(gram) || 0) | field));
+      forEachWord(text, word => words.set(word, (words.get(word) || 0) | field));
+    };
+    add(lower.title, FIELD_TITLE);
+    add(lower.content, FIELD_CONTENT);
+    lower.tags.forEach(tag => add(tag, FIELD_TAGS));
+    add(lower.metadata, FIELD_METADATA);
+    return { grams, words };
+  }
+
+  private addToTree(word: string): void {
+    if (this.treeWords.has(word)) return;
+    this.treeWords.add(word);
+
+    const node: BKNode = { word, children: new Map() };
+    if (!this.tree) {
+      this.tree = node;
+      return;
+    }
+    let parent = this.tree;
+    for (;;) {
+      const distance = editDistance(parent.word, word);
+      const child = parent.children.get(distance);
+      if (!child) {
+        parent.children.set(distance, node);
+        return;
+      }
+      parent = child;
+    }
+  }
+
+  private pruneTree(): void {
+    if (this.treeWords.size - this.words.size <= Math.max(MAX_DEAD_WORDS, this.words.size)) {
+      return;
+    }
+    this.tree = null;
+    this.treeWords.clear();
+    this.words.forEach((_, word) => this.addToTree(word));
+  }
+}
@@ -1,9 +1,19 @@
 /**
  * Local Storage Service
  * Handles all localStorage operations for the personal writing app
+ *
+ * Full saves (saveData, saveProjects, ...) rewrite the whole data blob.
+ * Edits to a single project go through saveProject instead: they are
+ * coalesced in memory and written behind, once per burst, under a
+ * per-project key listed in a small journal.  Reads overlay the journal
+ * on the blob, and the next full save folds it back in.
+ *
+ * The backup taken before each full save is stored as content-defined
+ * chunks, so it rewrites only the parts of the blob that changed.
  */
 
 import type { Project, Note, UserPreferences } from '@/types/global';
+import { SnapshotStore } from '@/utils/contentChunks';
 
 export interface StorageData {
   projects: Project[];
@@ -17,11 +27,35 @@ export interface StorageData {
 
 const STORAGE_KEY = 'astral_notes_data';
 const BACKUP_KEY = 'astral_notes_backup';
+// Rewritten on every full save, so a clear or another tab's write shows up as a change
+const REVISION_KEY = 'astral_notes_revision';
 const DATA_VERSION = '1.0.0';
 
+// Write-behind project records: one key per project, plus the list of journaled ids
+const PROJECT_KEY_PREFIX = 'astral_notes_project:';
+const JOURNAL_KEY = 'astral_notes_journal';
+const FLUSH_DELAY_MS = 250;
+// Fold the journal back into the blob once this many projects are in it
+const MAX_JOURNAL_PROJECTS = 20;
+
+// Chunks of the backup, stored under their hash
+const BACKUP_CHUNK_PREFIX = 'astral_notes_chunk:';
+
 class StorageService {
   private static instance: StorageService;
 
+  // Serialized project records waiting for the next flush, by project id
+  private dirtyProjects = new Map<string, string>();
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  // Bumped on every change to the stored data, so callers can cache what they derive from it
+  private revision = 0;
+  // REVISION_KEY as this service last wrote or read it
+  private storedRevision: string | null = null;
+  private saveListeners: Array<(data: StorageData) => void> = [];
+  private backupChunks = new SnapshotStore(BACKUP_CHUNK_PREFIX);
+  // The backup manifest as this instance last wrote it
+  private backupManifest: string | null = null;
+
   public static getInstance(): StorageService {
     if (!StorageService.instance) {
       StorageService.instance = new StorageService();
@@ -31,6 +65,21 @@ class StorageService {
 
   private constructor() {
     this.migrateData();
+
+    // Do not lose queued edits when the tab is hidden or closed
+    if (typeof window !== 'undefined') {
+      window.addEventListener('pagehide', () => this.flush());
+      // Another tab wrote to localStorage
+      window.addEventListener('storage', () => {
+        this.revision++;
+        this.storedRevision = this.readStoredRevision();
+      });
+      document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') {
+          this.flush();
+        }
+      });
+    }
   }
 
   /**
@@ -44,7 +93,7 @@ class StorageService {
       }
 
       const parsed = JSON.parse(data) as StorageData;
-      return this.validateAndMigrateData(parsed);
+      return this.applyJournal(this.validateAndMigrateData(parsed));
     } catch (error) {
       console.error('Error reading from localStorage:', error);
       return this.getDefaultData();
@@ -68,6 +117,16 @@ class StorageService {
       };
 
       localStorage.setItem(STORAGE_KEY, JSON.stringify(dataToSave));
+      // The blob now holds every journaled and queued project change
+      this.clearJournal();
+      this.markChanged();
+      this.saveListeners.forEach(listener => {
+        try {
+          listener(dataToSave);
+        } catch (error) {
+          console.error('Error in storage save listener:', error);
+        }
+      });
       return true;
     } catch (error) {
       console.error('Error saving to localStorage:', error);
@@ -92,6 +151,104 @@ class StorageService {
     return this.saveData(data);
   }
 
+  /**
+   * Queue one project for a write-behind save.  Calls within
+   * FLUSH_DELAY_MS are coalesced, and the flush writes only the projects
+   * that changed, each under its own key, without touching the blob or
+   * the backup.  The project must already have been stored by a full
+   * save; reads see the queued state immediately.
+   */
+  public saveProject(project: Project): void {
+    this.dirtyProjects.set(project.id, JSON.stringify(project));
+    this.revision++;
+    if (this.flushTimer === null) {
+      this.flushTimer = setTimeout(() => {
+        this.flushTimer = null;
+        this.flush();
+      }, FLUSH_DELAY_MS);
+    }
+  }
+
+  /**
+   * Number of changes made to the stored data so far.  Anything derived
+   * from the data stays valid while this does not change.
+   */
+  public getRevision(): number {
+    // Removed or rewritten behind this service's back, as by localStorage.clear()
+    const stored = this.readStoredRevision();
+    if (stored !== this.storedRevision) {
+      this.storedRevision = stored;
+      this.revision++;
+    }
+    return this.revision;
+  }
+
+  /**
+   * Count a write of this service's own as a change
+   */
+  private markChanged(): void {
+    this.revision++;
+    try {
+      const stamp = `${Date.now()}:${this.revision}`;
+      localStorage.setItem(REVISION_KEY, stamp);
+      this.storedRevision = stamp;
+    } catch (error) {
+      this.storedRevision = this.readStoredRevision();
+    }
+  }
+
+  private readStoredRevision(): string | null {
+    try {
+      return localStorage.getItem(REVISION_KEY);
+    } catch (error) {
+      return null;
+    }
+  }
+
+  /**
+   * Call `listener` with the data after every full save, so derived
+   * state can be refreshed without parsing it back.  Returns a function
+   * that removes the listener.
+   */
+  public onDataSaved(listener: (data: StorageData) => void): () => void {
+    this.saveListeners.push(listener);
+    return () => {
+      this.saveListeners = this.saveListeners.filter(l => l !== listener);
+    };
+  }
+
+  /**
+   * Write queued project changes now.  Changes that could not be written
+   * stay queued for the next flush.
+   */
+  public flush(): boolean {
+    if (this.flushTimer !== null) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    if (this.dirtyProjects.size === 0) {
+      return true;
+    }
+
+    try {
+      const journal = new Set(this.readJournal());
+      this.dirtyProjects.forEach((record, id) => {
+        localStorage.setItem(PROJECT_KEY_PREFIX + id, record);
+        journal.add(id);
+      });
+      localStorage.setItem(JOURNAL_KEY, JSON.stringify([...journal]));
+      this.dirtyProjects.clear();
+
+      if (journal.size > MAX_JOURNAL_PROJECTS) {
+        return this.saveData(this.getData());
+      }
+      return true;
+    } catch (error) {
+      console.error('Error flushing project changes:', error);
+      return false;
+    }
+  }
+
   /**
    * Get notes for a specific project
    */
@@ -157,23 +314,51 @@ class StorageService {
   }
 
   /**
-   * Create a backup of current data
+   * Create a backup of current data, including journaled and queued
+   * project changes
    */
   private createBackup(): void {
     try {
-      const currentData = localStorage.getItem(STORAGE_KEY);
+      let currentData = localStorage.getItem(STORAGE_KEY);
+      if (currentData && (this.dirtyProjects.size > 0 || this.readJournal().length > 0)) {
+        currentData = JSON.stringify(this.getData());
+      }
       if (currentData) {
-        const backup = {
-          data: currentData,
+        const previous = localStorage.getItem(BACKUP_KEY);
+        if (previous !== this.backupManifest) {
+          // Another tab, or a clear, changed the backup and maybe its chunks
+          this.backupChunks.forget();
+        }
+        const { chunks } = this.backupChunks.snapshot(STORAGE_KEY, currentData);
+        const backup = JSON.stringify({
+          chunks,
           timestamp: new Date().toISOString(),
-        };
-        localStorage.setItem(BACKUP_KEY, JSON.stringify(backup));
+        });
+        localStorage.setItem(BACKUP_KEY, backup);
+        this.backupManifest = backup;
+
+        const previousChunks = this.parseBackupChunks(previous);
+        if (previousChunks) {
+          this.backupChunks.discard([previousChunks], [chunks]);
+        }
       }
     } catch (error) {
       console.error('Error creating backup:', error);
     }
   }
 
+  /**
+   * Chunk hashes listed in a backup manifest, or null for a missing or unchunked backup
+   */
+  private parseBackupChunks(manifest: string | null): string[] | null {
+    try {
+      const backup = JSON.parse(manifest || 'null');
+      return backup && Array.isArray(backup.chunks) ? backup.chunks : null;
+    } catch {
+      return null;
+    }
+  }
+
   /**
    * Restore data from backup
    */
@@ -184,8 +369,18 @@ class StorageService {
         return false;
       }
 
-      const { data } = JSON.parse(backup);
+      // Backups taken before chunking hold the blob itself
+      const parsed = JSON.parse(backup);
+      const data = Array.isArray(parsed.chunks)
+        ? this.backupChunks.restore(parsed.chunks)
+        : parsed.data;
+      if (typeof data !== 'string') {
+        return false;
+      }
       localStorage.setItem(STORAGE_KEY, data);
+      // Journaled changes are newer than the backup and must not be replayed over it
+      this.clearJournal();
+      this.markChanged();
       return true;
     } catch (error) {
       console.error('Error restoring from backup:', error);
@@ -200,6 +395,8 @@ class StorageService {
     try {
       this.createBackup();
       localStorage.removeItem(STORAGE_KEY);
+      this.clearJournal();
+      this.markChanged();
       return true;
     } catch (error) {
       console.error('Error clearing data:', error);
@@ -213,7 +410,8 @@ class StorageService {
   public getStorageInfo(): { used: number; total: number; percentage: number } {
     try {
       const data = localStorage.getItem(STORAGE_KEY) || '';
-      const used = new Blob([data]).size;
+      const records = this.readJournal().map(id => localStorage.getItem(PROJECT_KEY_PREFIX + id) || '');
+      const used = new Blob([data, ...records]).size;
       const total = 5 * 1024 * 1024; // 5MB typical localStorage limit
       
       return {
@@ -226,6 +424,66 @@ class StorageService {
     }
   }
 
+  /**
+   * Ids of the projects whose latest record is under PROJECT_KEY_PREFIX
+   */
+  private readJournal(): string[] {
+    try {
+      const ids = JSON.parse(localStorage.getItem(JOURNAL_KEY) || '[]');
+      return Array.isArray(ids) ? ids.filter((id): id is string => typeof id === 'string') : [];
+    } catch {
+      return [];
+    }
+  }
+
+  /**
+   * Replace projects in ``data`` by their journaled or queued records
+   */
+  private applyJournal(data: StorageData): StorageData {
+    const records = new Map<string, string>();
+    for (const id of this.readJournal()) {
+      const record = localStorage.getItem(PROJECT_KEY_PREFIX + id);
+      if (record) {
+        records.set(id, record);
+      }
+    }
+    this.dirtyProjects.forEach((record, id) => records.set(id, record));
+    if (records.size === 0) {
+      return data;
+    }
+
+    data.projects = data.projects.map(project => {
+      const record = records.get(project.id);
+      if (!record) {
+        return project;
+      }
+      try {
+        const parsed = JSON.parse(record);
+        return parsed && parsed.id === project.id ? parsed : project;
+      } catch {
+        return project;
+      }
+    });
+    return data;
+  }
+
+  /**
+   * Drop the journal and anything still queued, once the blob holds it
+   */
+  private clearJournal(): void {
+    if (this.flushTimer !== null) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    this.dirtyProjects.clear();
+    const ids = this.readJournal();
+    if (ids.length === 0) {
+      return;
+    }
+    ids.forEach(id => localStorage.removeItem(PROJECT_KEY_PREFIX + id));
+    localStorage.removeItem(JOURNAL_KEY);
+  }
+
   /**
    * Get default data structure
    */
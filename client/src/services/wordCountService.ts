@@ -0,0 +1,132 @@
+/**
+ * Word Count Service
+ * Keeps running per-note and per-project word totals, so project word
+ * counts do not re-read and re-sum every note after each autosave
+ */
+
+import type { Note } from '@/types/global';
+import { storageService } from './storageService';
+
+class WordCountService {
+  private static instance: WordCountService;
+
+  private noteWords = new Map<string, number>();
+  private noteProjects = new Map<string, string>();
+  private projectWords = new Map<string, number>();
+  // Set when the stored notes changed in a way the totals were not told about
+  private stale = true;
+  private recording = false;
+  private subscribed = false;
+
+  public static getInstance(): WordCountService {
+    if (!WordCountService.instance) {
+      WordCountService.instance = new WordCountService();
+    }
+    return WordCountService.instance;
+  }
+
+  /**
+   * Total words in a project's notes
+   */
+  public getProjectWords(projectId: string): number {
+    this.ensureCurrent();
+    return this.projectWords.get(projectId) || 0;
+  }
+
+  /**
+   * Words in one note
+   */
+  public getNoteWords(noteId: string): number {
+    this.ensureCurrent();
+    return this.noteWords.get(noteId) || 0;
+  }
+
+  /**
+   * Run a full save whose word count changes the caller records itself
+   * with setNoteWords or removeNote, so the totals stay current instead
+   * of being reloaded from the saved data.  Returns the save's result.
+   */
+  public recordSave(save: () => boolean): boolean {
+    this.ensureCurrent();
+    this.recording = true;
+    try {
+      return save();
+    } finally {
+      this.recording = false;
+    }
+  }
+
+  /**
+   * Record a note's word count, moving the difference onto its project's
+   * total.  Returns the difference.
+   */
+  public setNoteWords(projectId: string, noteId: string, words: number): number {
+    const previousProject = this.noteProjects.get(noteId);
+    const previous = this.noteWords.get(noteId) || 0;
+    if (previousProject !== undefined && previousProject !== projectId) {
+      this.addToProject(previousProject, -previous);
+      this.addToProject(projectId, previous);
+    }
+    this.noteWords.set(noteId, words);
+    this.noteProjects.set(noteId, projectId);
+    this.addToProject(projectId, words - previous);
+    return words - previous;
+  }
+
+  /**
+   * Forget a deleted note, taking its words off its project's total
+   */
+  public removeNote(noteId: string): void {
+    const projectId = this.noteProjects.get(noteId);
+    if (projectId !== undefined) {
+      this.addToProject(projectId, -(this.noteWords.get(noteId) || 0));
+    }
+    this.noteWords.delete(noteId);
+    this.noteProjects.delete(noteId);
+  }
+
+  /**
+   * Take every total from the stored notes
+   */
+  private load(notes: Record<string, Note[]>): void {
+    this.noteWords.clear();
+    this.noteProjects.clear();
+    this.projectWords.clear();
+    Object.entries(notes || {}).forEach(([projectId, projectNotes]) => {
+      (projectNotes || []).forEach(note => this.setNoteWords(projectId, note.id, note.wordCount || 0));
+    });
+  }
+
+  /**
+   * Reload the totals after a full save that was not recorded, or a
+   * write from another tab.  Edits recorded through recordSave keep
+   * them current, so the notes are not rescanned after every save.
+   */
+  private ensureCurrent(): void {
+    if (!this.subscribed) {
+      storageService.onDataSaved(() => {
+        if (!this.recording) {
+          this.stale = true;
+        }
+      });
+      if (typeof window !== 'undefined') {
+        window.addEventListener('storage', () => {
+          this.stale = true;
+        });
+      }
+      this.subscribed = true;
+    }
+    if (this.stale) {
+      this.load(storageService.getData().notes);
+      this.stale = false;
+    }
+  }
+
+  private addToProject(projectId: string, delta: number): void {
+    if (delta !== 0) {
+      this.projectWords.set(projectId, (this.projectWords.get(projectId) || 0) + delta);
+    }
+  }
+}
+
+export const wordCountService = WordCountService.getInstance();
\ No newline at end of file
@@ -0,0 +1,273 @@
+/**
+ * Content-defined chunking
+ *
+ * Splits text into chunks whose boundaries depend only on the text just
+ * before them (a gear rolling hash over the last 32 characters), so an
+ * edit changes the chunks around it and leaves the rest of a document's
+ * chunks, and their hashes, as they were.  SnapshotStore keeps chunks in
+ * localStorage under their hash, so snapshots of a document share every
+ * chunk they have in common and a new snapshot writes only the chunks an
+ * edit produced.  Snapshots are lists of chunk keys; their text is put
+ * back together only when it is read.
+ */
+
+// Chunks are at least MIN_CHUNK characters (bar the last) and at most MAX_CHUNK
+export const MIN_CHUNK = 512;
+export const MAX_CHUNK = 8192;
+// A boundary falls where the top 11 bits of the rolling hash are zero: one
+// position in 2048, so chunks average about MIN_CHUNK + 2048 characters
+const BOUNDARY_MASK = 0xffe00000;
+const WINDOW = 32;
+
+// Pseudo-random 32-bit value per character (low byte folded with high byte)
+const GEAR = (() => {
+  const table = new Uint32Array(256);
+  let state = 0x9e3779b9;
+  for (let i = 0; i < table.length; i++) {
+    state ^= state << 13;
+    state ^= state >>> 17;
+    state ^= state << 5;
+    table[i] = state >>> 0;
+  }
+  return table;
+})();
+
+export interface Chunk {
+  hash: string;
+  length: number;
+}
+
+/**
+ * End of the chunk of `text` that starts at `start`
+ */
+export function chunkEnd(text: string, start: number): number {
+  const limit = Math.min(text.length, start + MAX_CHUNK);
+  if (limit - start <= MIN_CHUNK) {
+    return limit;
+  }
+
+  // Only the last WINDOW characters count towards the hash, so hashing can
+  // start that far before the first allowed boundary
+  let hash = 0;
+  for (let i = start + MIN_CHUNK - WINDOW; i < limit; i++) {
+    const code = text.charCodeAt(i);
+    hash = ((hash << 1) + GEAR[(code ^ (code >>> 8)) & 0xff]) >>> 0;
+    if (i + 1 - start >= MIN_CHUNK && (hash & BOUNDARY_MASK) === 0) {
+      return i + 1;
+    }
+  }
+  return limit;
+}
+
+/**
+ * Hash identifying a chunk: two independent 32-bit hashes and the length
+ */
+export function hashChunk(text: string, start: number = 0, end: number = text.length): string {
+  let fnv = 0x811c9dc5;
+  let mix = 0x5bd1e995 ^ (end - start);
+  for (let i = start; i < end; i++) {
+    const code = text.charCodeAt(i);
+    fnv = Math.imul(fnv ^ code, 0x01000193);
+    mix = Math.imul(mix ^ code, 0x5bd1e995);
+    mix ^= mix >>> 15;
+  }
+  const hex = (value: number) => (value >>> 0).toString(16).padStart(8, '0');
+  return `${hex(fnv)}${hex(mix)}${(end - start).toString(36)}`;
+}
+
+/**
+ * Split `text` into content-defined chunks
+ */
+export function chunkText(text: string): Chunk[] {
+  const chunks: Chunk[] = [];
+  for (let start = 0; start < text.length;) {
+    const end = chunkEnd(text, start);
+    chunks.push({ hash: hashChunk(text, start, end), length: end - start });
+    start = end;
+  }
+  return chunks;
+}
+
+/**
+ * Chunks a document that is snapshotted again and again as it is edited.
+ * Chunks before the first changed character are kept, and chunking from
+ * there stops as soon as a boundary lines up with one of the previous
+ * chunking past the last changed character, so the work follows the edit
+ * rather than the document.
+ */
+export class IncrementalChunker {
+  private text = '';
+  private chunks: Chunk[] = [];
+
+  chunk(text: string): Chunk[] {
+    const old = this.text;
+    const oldChunks = this.chunks;
+    const shortest = Math.min(old.length, text.length);
+
+    let prefix = 0;
+    while (prefix < shortest && old.charCodeAt(prefix) === text.charCodeAt(prefix)) {
+      prefix++;
+    }
+    if (prefix === old.length && prefix === text.length) {
+      return oldChunks;
+    }
+    let suffix = 0;
+    while (suffix < shortest - prefix &&
+      old.charCodeAt(old.length - 1 - suffix) === text.charCodeAt(text.length - 1 - suffix)) {
+      suffix++;
+    }
+
+    // A chunk ending before the change had its boundary chosen from
+    // unchanged text, unless it ended only because the text did
+    const chunks: Chunk[] = [];
+    let start = 0;
+    let next = 0;
+    while (next < oldChunks.length && start + oldChunks[next].length <= prefix &&
+      start + oldChunks[next].length < old.length) {
+      chunks.push(oldChunks[next]);
+      start += oldChunks[next].length;
+      next++;
+    }
+
+    // From `changedEnd` on the text is the old text shifted by `shift`
+    const changedEnd = text.length - suffix;
+    const shift = text.length - old.length;
+    let oldStart = start;
+    while (start < text.length) {
+      while (next < oldChunks.length && oldStart < start - shift) {
+        oldStart += oldChunks[next].length;
+        next++;
+      }
+      if (start >= changedEnd && oldStart === start - shift) {
+        // Chunking from here on would repeat the old chunking
+        for (; next < oldChunks.length; next++) {
+          chunks.push(oldChunks[next]);
+        }
+        break;
+      }
+
+      const end = chunkEnd(text, start);
+      chunks.push({ hash: hashChunk(text, start, end), length: end - start });
+      start = end;
+    }
+
+    this.text = text;
+    this.chunks = chunks;
+    return chunks;
+  }
+}
+
+/**
+ * Snapshots of documents as lists of chunk keys, with the chunks stored
+ * once each in localStorage under `prefix` + key.  A chunk's key is its
+ * hash, or on the off chance that another chunk's text is already stored
+ * under that hash, the hash with a `-n` suffix.
+ */
+export class SnapshotStore {
+  private prefix: string;
+  private chunkers = new Map<string, IncrementalChunker>();
+  // The key each chunk of a document's last snapshot was stored under
+  private chunkKeys = new Map<string, Map<Chunk, string>>();
+  // Keys known to be stored, so existing chunks are not read or rewritten
+  private stored = new Set<string>();
+
+  constructor(prefix: string) {
+    this.prefix = prefix;
+  }
+
+  /**
+   * Snapshot the current text of the document `documentId`, writing only
+   * chunks not stored already.  Returns the snapshot's chunk keys and the
+   * number of characters written.
+   */
+  snapshot(documentId: string, text: string): { chunks: string[]; written: number } {
+    let chunker = this.chunkers.get(documentId);
+    if (!chunker) {
+      chunker = new IncrementalChunker();
+      this.chunkers.set(documentId, chunker);
+    }
+    const previousKeys = this.chunkKeys.get(documentId);
+
+    const keys = new Map<Chunk, string>();
+    const chunks: string[] = [];
+    let written = 0;
+    let start = 0;
+    for (const chunk of chunker.chunk(text)) {
+      // A chunk kept from the last snapshot has the text already stored under its key
+      let key = previousKeys?.get(chunk);
+      if (key === undefined || !this.stored.has(key)) {
+        const end = start + chunk.length;
+        key = this.findKey(chunk.hash, text, start, end);
+        if (!this.stored.has(key)) {
+          localStorage.setItem(this.prefix + key, text.slice(start, end));
+          this.stored.add(key);
+          written += chunk.length;
+        }
+      }
+      keys.set(chunk, key);
+      chunks.push(key);
+      start += chunk.length;
+    }
+    this.chunkKeys.set(documentId, keys);
+    return { chunks, written };
+  }
+
+  /**
+   * Put a snapshot's text back together, or null if a chunk is missing
+   */
+  restore(chunks: string[]): string | null {
+    const parts: string[] = [];
+    for (const key of chunks) {
+      const part = localStorage.getItem(this.prefix + key);
+      if (part === null) {
+        return null;
+      }
+      parts.push(part);
+    }
+    return parts.join('');
+  }
+
+  /**
+   * Delete the chunks of snapshots that were dropped, except those still
+   * used by the snapshots that are kept
+   */
+  discard(dropped: string[][], kept: string[][]): void {
+    const live = new Set<string>();
+    kept.forEach(chunks => chunks.forEach(key => live.add(key)));
+    dropped.forEach(chunks => chunks.forEach(key => {
+      if (!live.has(key)) {
+        localStorage.removeItem(this.prefix + key);
+        this.stored.delete(key);
+      }
+    }));
+  }
+
+  /**
+   * Stop trusting the chunks known to be stored, when something other
+   * than this store may have removed them
+   */
+  forget(): void {
+    this.stored.clear();
+  }
+
+  /**
+   * The key `text.slice(start, end)` is stored under, or the free key
+   * it should be written to.  The stored text is compared rather than
+   * trusted, so a hash collision cannot make a snapshot restore the
+   * other chunk's text.
+   */
+  private findKey(hash: string, text: string, start: number, end: number): string {
+    for (let attempt = 0; ; attempt++) {
+      const key = attempt === 0 ? hash : `${hash}-${attempt}`;
+      const part = localStorage.getItem(this.prefix + key);
+      if (part === null) {
+        this.stored.delete(key);
+        return key;
+      }
+      if (part.length === end - start && text.startsWith(part, start)) {
+        this.stored.add(key);
+        return key;
+      }
+    }
+  }
+}
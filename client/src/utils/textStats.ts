@@ -0,0 +1,359 @@
+/**
+ * Incremental text statistics
+ *
+ * Word, sentence, punctuation and vocabulary statistics for a draft,
+ * gathered in one tokenizer pass per block of text.  A block is a run
+ * of paragraphs ending in a line whose last character is sentence
+ * punctuation, so no sentence, word or passive phrase spans two blocks
+ * and the statistics of a draft are the sum of those of its blocks.
+ *
+ * TextAnalyzer caches each block's statistics by its text, so after an
+ * edit only the blocks that changed are tokenized again, and it keeps
+ * running vocabulary totals, so only the changed blocks' words are
+ * added or taken away.  Definitions match the split-based analysis they
+ * replace: sentences are what `split(/[.!?]+/)` yields with non-blank
+ * text, words are runs of non-whitespace.
+ */
+
+import { isWhitespace } from './wordCount';
+
+// Sentences with more words than this are reported as long
+export const LONG_SENTENCE_WORDS = 25;
+// Words must be longer than this, and occur more often than REPEATED_WORD_COUNT, to count as repeated
+export const REPEATED_WORD_LENGTH = 3;
+export const REPEATED_WORD_COUNT = 5;
+
+const PASSIVE_PATTERN = /\b(was|were|is|are|been|being)\s+\w+ed\b/gi;
+// Forget cached blocks that are no longer in the text once the cache holds this many
+const MAX_CACHED_BLOCKS = 5000;
+
+export interface LongSentence {
+  text: string;
+  words: number;
+  index: number; // position among the text's sentences
+}
+
+export interface BlockStats {
+  characters: number;
+  words: number;
+  sentences: number;
+  sentenceWords: number; // words counted per sentence, so split at sentence punctuation too
+  longSentences: LongSentence[];
+  passiveCount: number;
+  firstPassive: string | null;
+  questions: number;
+  exclamations: number;
+  vocabulary: Map<string, number>; // lowercased words longer than REPEATED_WORD_LENGTH
+}
+
+export interface TextStats {
+  characters: number;
+  words: number;
+  sentences: number;
+  sentenceWords: number;
+  averageSentenceLength: number; // sentenceWords / sentences, 0 without sentences
+  longSentences: LongSentence[];
+  passiveCount: number;
+  firstPassive: string | null;
+  questions: number;
+  exclamations: number;
+  repeatedWords: Array<[string, number]>;
+}
+
+function isSentenceEnd(code: number): boolean {
+  return code === 0x2e || code === 0x21 || code === 0x3f; // . ! ?
+}
+
+/**
+ * Whether the line ending at `newline` ends in sentence punctuation,
+ * looking no further back than `start`
+ */
+function lineEndsSentence(text: string, start: number, newline: number): boolean {
+  let last = newline - 1;
+  while (last >= start && isWhitespace(text.charCodeAt(last))) {
+    last--;
+  }
+  return last >= start && isSentenceEnd(text.charCodeAt(last));
+}
+
+/**
+ * Split `text` into blocks that end after a newline whose line ends in
+ * sentence punctuation (trailing whitespace aside).  Joined, the blocks
+ * are `text`.
+ */
+export function splitBlocks(text: string): string[] {
+  const blocks: string[] = [];
+  let start = 0;
+  let newline = text.indexOf('\n');
+  while (newline !== -1) {
+    if (lineEndsSentence(text, start, newline)) {
+      blocks.push(text.slice(start, newline + 1));
+      start = newline + 1;
+    }
+    newline = text.indexOf('\n', newline + 1);
+  }
+  if (start < text.length) {
+    blocks.push(text.slice(start));
+  }
+  return blocks;
+}
+
+/**
+ * Statistics of one block, in a single pass over its characters (plus
+ * one regex scan for passive phrases)
+ */
+export function analyzeBlock(text: string): BlockStats {
+  const stats: BlockStats = {
+    characters: text.length,
+    words: 0,
+    sentences: 0,
+    sentenceWords: 0,
+    longSentences: [],
+    passiveCount: 0,
+    firstPassive: null,
+    questions: 0,
+    exclamations: 0,
+    vocabulary: new Map()
+  };
+
+  let wordStart = -1;     // start of the current whitespace-delimited word
+  let segmentStart = 0;   // start of the current sentence segment
+  let segmentWords = 0;   // words in the current segment
+  let inSegmentWord = false;
+
+  const endWord = (end: number) => {
+    if (end - wordStart > REPEATED_WORD_LENGTH) {
+      const word = text.slice(wordStart, end).toLowerCase();
+      if (word.length > REPEATED_WORD_LENGTH) {
+        stats.vocabulary.set(word, (stats.vocabulary.get(word) || 0) + 1);
+      }
+    }
+    wordStart = -1;
+  };
+  const endSegment = (end: number) => {
+    if (segmentWords > 0) {
+      if (segmentWords > LONG_SENTENCE_WORDS) {
+        stats.longSentences.push({
+          text: text.slice(segmentStart, end).trim(),
+          words: segmentWords,
+          index: stats.sentences
+        });
+      }
+      stats.sentences++;
+      stats.sentenceWords += segmentWords;
+    }
+    segmentWords = 0;
+    inSegmentWord = false;
+  };
+
+  for (let i = 0; i < text.length; i++) {
+    const code = text.charCodeAt(i);
+    if (isWhitespace(code)) {
+      if (wordStart !== -1) {
+        endWord(i);
+      }
+      inSegmentWord = false;
+      continue;
+    }
+
+    if (wordStart === -1) {
+      wordStart = i;
+      stats.words++;
+    }
+    if (isSentenceEnd(code)) {
+      if (code === 0x3f) {
+        stats.questions++;
+      } else if (code === 0x21) {
+        stats.exclamations++;
+      }
+      endSegment(i);
+      segmentStart = i + 1;
+    } else if (!inSegmentWord) {
+      inSegmentWord = true;
+      segmentWords++;
+    }
+  }
+  if (wordStart !== -1) {
+    endWord(text.length);
+  }
+  endSegment(text.length);
+
+  PASSIVE_PATTERN.lastIndex = 0;
+  let match: RegExpExecArray | null;
+  while ((match = PASSIVE_PATTERN.exec(text)) !== null) {
+    if (stats.passiveCount === 0) {
+      stats.firstPassive = match[0];
+    }
+    stats.passiveCount++;
+  }
+  return stats;
+}
+
+/**
+ * Statistics of a text that is analyzed again and again as it is edited,
+ * or fed in pieces with write() and end()
+ */
+export class TextAnalyzer {
+  private cache = new Map<string, BlockStats>();
+  private blocks: string[] = [];
+  private blockStats: BlockStats[] = [];
+  private vocabulary = new Map<string, number>();
+  private pending = '';
+  private lastText: string | null = null;
+  private lastStats: TextStats | null = null;
+
+  /**
+   * Statistics of `text`, re-tokenizing only the blocks that differ from
+   * the previous call's
+   */
+  analyze(text: string): TextStats {
+    if (text === this.lastText && this.lastStats) {
+      return this.lastStats;
+    }
+
+    const blocks = splitBlocks(text);
+    const old = this.blocks;
+    // Blocks before and after the edit are unchanged
+    let prefix = 0;
+    while (prefix < blocks.length && prefix < old.length && blocks[prefix] === old[prefix]) {
+      prefix++;
+    }
+    let suffix = 0;
+    while (suffix < blocks.length - prefix && suffix < old.length - prefix &&
+      blocks[blocks.length - 1 - suffix] === old[old.length - 1 - suffix]) {
+      suffix++;
+    }
+
+    const removed = this.blockStats.slice(prefix, old.length - suffix);
+    const added = blocks.slice(prefix, blocks.length - suffix).map(block => this.statsFor(block));
+    removed.forEach(stats => this.addVocabulary(stats, -1));
+    added.forEach(stats => this.addVocabulary(stats, 1));
+    this.blockStats = this.blockStats.slice(0, prefix).concat(added, this.blockStats.slice(old.length - suffix));
+    this.blocks = blocks;
+    this.pending = '';
+    this.trimCache();
+
+    this.lastText = text;
+    this.lastStats = this.stats();
+    return this.lastStats;
+  }
+
+  /**
+   * Append a piece of streamed text; complete blocks are analyzed as they
+   * arrive
+   */
+  write(chunk: string): void {
+    this.lastText = null;
+    const blocks = splitBlocks(this.pending + chunk);
+    const last = blocks.length > 0 ? blocks[blocks.length - 1] : '';
+    // The last block may still grow unless it ends at a block boundary
+    if (!last.endsWith('\n') || !lineEndsSentence(last, 0, last.length - 1)) {
+      this.pending = blocks.pop() || '';
+    } else {
+      this.pending = '';
+    }
+    blocks.forEach(block => this.append(block));
+  }
+
+  /**
+   * Finish streamed input and return the statistics of everything written
+   */
+  end(): TextStats {
+    if (this.pending) {
+      this.append(this.pending);
+      this.pending = '';
+    }
+    this.trimCache();
+    return this.stats();
+  }
+
+  /**
+   * Forget the current text (cached blocks are kept)
+   */
+  reset(): void {
+    this.blocks = [];
+    this.blockStats = [];
+    this.vocabulary.clear();
+    this.pending = '';
+    this.lastText = null;
+    this.lastStats = null;
+  }
+
+  /**
+   * Statistics of the current text, summed over its blocks
+   */
+  stats(): TextStats {
+    const total: TextStats = {
+      characters: 0,
+      words: 0,
+      sentences: 0,
+      sentenceWords: 0,
+      averageSentenceLength: 0,
+      longSentences: [],
+      passiveCount: 0,
+      firstPassive: null,
+      questions: 0,
+      exclamations: 0,
+      repeatedWords: []
+    };
+    for (const stats of this.blockStats) {
+      stats.longSentences.forEach(sentence => total.longSentences.push({
+        ...sentence,
+        index: sentence.index + total.sentences
+      }));
+      if (total.firstPassive === null) {
+        total.firstPassive = stats.firstPassive;
+      }
+      total.characters += stats.characters;
+      total.words += stats.words;
+      total.sentences += stats.sentences;
+      total.sentenceWords += stats.sentenceWords;
+      total.passiveCount += stats.passiveCount;
+      total.questions += stats.questions;
+      total.exclamations += stats.exclamations;
+    }
+    total.averageSentenceLength = total.sentences > 0 ? total.sentenceWords / total.sentences : 0;
+    this.vocabulary.forEach((count, word) => {
+      if (count > REPEATED_WORD_COUNT) {
+        total.repeatedWords.push([word, count]);
+      }
+    });
+    return total;
+  }
+
+  private append(block: string): void {
+    const stats = this.statsFor(block);
+    this.blocks.push(block);
+    this.blockStats.push(stats);
+    this.addVocabulary(stats, 1);
+  }
+
+  private statsFor(block: string): BlockStats {
+    let stats = this.cache.get(block);
+    if (!stats) {
+      stats = analyzeBlock(block);
+      this.cache.set(block, stats);
+    }
+    return stats;
+  }
+
+  private addVocabulary(stats: BlockStats, sign: number): void {
+    stats.vocabulary.forEach((count, word) => {
+      const total = (this.vocabulary.get(word) || 0) + sign * count;
+      if (total > 0) {
+        this.vocabulary.set(word, total);
+      } else {
+        this.vocabulary.delete(word);
+      }
+    });
+  }
+
+  private trimCache(): void {
+    if (this.cache.size > MAX_CACHED_BLOCKS && this.cache.size > this.blocks.length) {
+      const current = new Set(this.blocks);
+      Array.from(this.cache.keys())
+        .filter(block => !current.has(block))
+        .forEach(block => this.cache.delete(block));
+    }
+  }
+}
@@ -0,0 +1,149 @@
+/**
+ * Word counting utilities
+ *
+ * A word is a run of non-whitespace characters, exactly what
+ * `text.split(/\s+/).filter(w => w.length > 0).length` counts, but
+ * counted in one pass without building the array of words.
+ */
+
+/**
+ * Whether the UTF-16 code unit is whitespace as matched by `\s`
+ */
+export function isWhitespace(code: number): boolean {
+  if (code <= 0x20) {
+    return code === 0x20 || (code >= 0x09 && code <= 0x0d);
+  }
+  if (code < 0xa0) {
+    return false;
+  }
+  return code === 0xa0 || code === 0x1680 || (code >= 0x2000 && code <= 0x200a) ||
+    code === 0x2028 || code === 0x2029 || code === 0x202f || code === 0x205f ||
+    code === 0x3000 || code === 0xfeff;
+}
+
+/**
+ * Count the words in `text`, or in `text.slice(start, end)`
+ */
+export function countWords(text: string, start: number = 0, end: number = text.length): number {
+  let count = 0;
+  let inWord = false;
+  for (let i = start; i < end; i++) {
+    if (isWhitespace(text.charCodeAt(i))) {
+      inWord = false;
+    } else if (!inWord) {
+      inWord = true;
+      count++;
+    }
+  }
+  return count;
+}
+
+/**
+ * Change in word count from `before` to `after`.  Only the words that
+ * touch the edited region are counted: the common prefix and suffix are
+ * skipped (a comparison without allocation), then widened to whitespace
+ * so that words split or joined by the edit are counted on both sides.
+ */
+export function wordCountDelta(before: string, after: string): number {
+  const shortest = Math.min(before.length, after.length);
+  let prefix = 0;
+  while (prefix < shortest && before.charCodeAt(prefix) === after.charCodeAt(prefix)) {
+    prefix++;
+  }
+  if (prefix === before.length && prefix === after.length) {
+    return 0;
+  }
+
+  let suffix = 0;
+  while (suffix < shortest - prefix &&
+    before.charCodeAt(before.length - 1 - suffix) === after.charCodeAt(after.length - 1 - suffix)) {
+    suffix++;
+  }
+
+  // Back up to the start of the word the edit begins in, and on to the end of the one it ends in
+  while (prefix > 0 && !isWhitespace(before.charCodeAt(prefix - 1))) {
+    prefix--;
+  }
+  while (suffix > 0 && !isWhitespace(before.charCodeAt(before.length - suffix))) {
+    suffix--;
+  }
+
+  return countWords(after, prefix, after.length - suffix) - countWords(before, prefix, before.length - suffix);
+}
+
+const LESS_THAN = 0x3c;
+const GREATER_THAN = 0x3e;
+
+/**
+ * `html` with its tags removed
+ */
+export function stripTags(html: string): string {
+  return html.replace(/<[^>]*>/g, '');
+}
+
+/**
+ * Change in word count from `before` to `after`, both HTML, as counted on
+ * their text with tags removed.  As in `wordCountDelta`, only the edited
+ * region is stripped and counted: it is widened out of any tag it starts
+ * or ends in, then on to whitespace, stepping over whole tags.  Assumes
+ * `<` and `>` only delimit tags, as in editor output; bare brackets in
+ * text can make the result drift, so callers should recount now and then.
+ */
+export function markupWordCountDelta(before: string, after: string): number {
+  const shortest = Math.min(before.length, after.length);
+  let prefix = 0;
+  while (prefix < shortest && before.charCodeAt(prefix) === after.charCodeAt(prefix)) {
+    prefix++;
+  }
+  if (prefix === before.length && prefix === after.length) {
+    return 0;
+  }
+
+  let suffix = 0;
+  while (suffix < shortest - prefix &&
+    before.charCodeAt(before.length - 1 - suffix) === after.charCodeAt(after.length - 1 - suffix)) {
+    suffix++;
+  }
+
+  // Both ends lie in text the two versions share, so `before` decides where they go
+  let start = prefix;
+  for (let i = start - 1; i >= 0; i--) {
+    const code = before.charCodeAt(i);
+    if (code === GREATER_THAN) {
+      break;
+    }
+    if (code === LESS_THAN) {
+      start = i;
+      break;
+    }
+  }
+  while (start > 0 && !isWhitespace(before.charCodeAt(start - 1))) {
+    start = before.charCodeAt(start - 1) === GREATER_THAN
+      ? Math.max(before.lastIndexOf('<', start - 1), 0)
+      : start - 1;
+  }
+
+  let end = before.length - suffix;
+  for (let i = end; i < before.length; i++) {
+    const code = before.charCodeAt(i);
+    if (code === LESS_THAN) {
+      break;
+    }
+    if (code === GREATER_THAN) {
+      end = i + 1;
+      break;
+    }
+  }
+  while (end < before.length && !isWhitespace(before.charCodeAt(end))) {
+    if (before.charCodeAt(end) === LESS_THAN) {
+      const close = before.indexOf('>', end);
+      end = close === -1 ? before.length : close + 1;
+    } else {
+      end++;
+    }
+  }
+
+  const tail = before.length - end;
+  return countWords(stripTags(after.slice(start, after.length - tail)))
+    - countWords(stripTags(before.slice(start, end)));
+}
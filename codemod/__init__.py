@@ -0,0 +1,92 @@
+"""
+Shared toolkit for the fix_*.py TypeScript codemod scripts.
+
+Each script registers its rules here; the engine groups them by target
+file so every file is read once, patched in memory and written once.
+"""
+
+from .cache import RuleCache, ruleset_version
+from .engine import (FileResult, PatchEngine, apply_edits, apply_rules, expand_globs, group_by_target,
+                     load_fix_scripts, run_script)
+from .outline import (ClassInfo, FieldInfo, InterfaceInfo, MethodInfo, Outline, OutlineRule, StructuralEditor,
+                      outline)
+from .profiling import RuleSample, RuleTimeout, RuleTimer, format_profile, rule_profile
+from .report import format_conflicts, format_report, rule_hits, unified_diff, unmatched_rules
+from .rules import Edit, FunctionRule, RegexRule, Rule, clear_registry, register, registered_rules
+from .runner import RunSummary, run_parallel
+from .spans import Conflict, EditIndex, resolve_edits
+from .stream import atomic_writer, stream_rewrite, streamable
+from .tslex import BracketIndex, bracket_index
+from .tsliteral import LiteralEmitter, TSExpression, ts_const, ts_key, ts_literal, ts_string
+from .watch import Batch, Watcher
+
+__all__ = [
+    'Batch',
+    'BracketIndex',
+    'ClassInfo',
+    'Conflict',
+    'Edit',
+    'EditIndex',
+    'FieldInfo',
+    'FieldSymbol',
+    'FileResult',
+    'FileSymbols',
+    'FunctionRule',
+    'InterfaceInfo',
+    'LiteralEmitter',
+    'MethodInfo',
+    'Outline',
+    'OutlineRule',
+    'PatchEngine',
+    'RegexRule',
+    'Rule',
+    'RuleCache',
+    'RuleSample',
+    'RuleTimeout',
+    'RuleTimer',
+    'RunSummary',
+    'StructuralEditor',
+    'SymbolIndex',
+    'TSExpression',
+    'Watcher',
+    'apply_edits',
+    'apply_rules',
+    'atomic_writer',
+    'bracket_index',
+    'clear_registry',
+    'expand_globs',
+    'format_conflicts',
+    'format_profile',
+    'format_report',
+    'group_by_target',
+    'load_fix_scripts',
+    'outline',
+    'parse_symbols',
+    'register',
+    'registered_rules',
+    'resolve_edits',
+    'rule_hits',
+    'rule_profile',
+    'ruleset_version',
+    'run_parallel',
+    'run_script',
+    'stream_rewrite',
+    'streamable',
+    'ts_const',
+    'ts_key',
+    'ts_literal',
+    'ts_string',
+    'unified_diff',
+    'unmatched_rules',
+]
+
+# codemod.symbols runs as ``python -m codemod.symbols``; importing it here
+# would load it before runpy executes it, so it is imported on first use
+_SYMBOLS = frozenset({'FieldSymbol', 'FileSymbols', 'SymbolIndex', 'parse_symbols'})
+
+
+def __getattr__(name):
+    if name in _SYMBOLS:
+        from . import symbols
+        return getattr(symbols, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
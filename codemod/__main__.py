@@ -0,0 +1,186 @@
+"""
+Run the rules registered by the fix_*.py scripts.
+
+    python -m codemod                         # every rule on its own target
+    python -m codemod 'client/src/**/*.ts'    # rules whose target matches, across a glob
+    python -m codemod 'client/src/**/*.ts*' --ignore-targets --jobs 8
+    python -m codemod --dry-run               # print diffs and rule hits, write nothing
+    python -m codemod --watch                 # re-apply rules to targets whenever they are saved
+    python -m codemod --profile --no-cache    # per-rule timings, bytes scanned and matches
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+
+from .cache import DEFAULT_CACHE_DIR
+from .cache import RuleCache
+from .engine import PatchEngine, apply_rules, expand_globs, load_fix_scripts
+from .profiling import SORT_KEYS, format_profile, rule_profile, sort_profile
+from .report import format_conflicts, format_report, rule_hits
+from .runner import run_parallel
+from .stream import STREAM_THRESHOLD
+from .watch import Batch, Watcher
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m codemod', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('globs', nargs='*', help='files to process, e.g. client/src/**/*.ts')
+    parser.add_argument('--root', default='.', help='repository root the globs and rule targets are relative to')
+    parser.add_argument('--scripts', default='.', help='directory containing the fix_*.py scripts')
+    parser.add_argument('--rule', action='append', dest='rules', metavar='ID',
+                        help='only run this rule id (repeatable), e.g. fix_services_properly.old_create_story')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--ignore-targets', action='store_true',
+                        help='try every selected rule on every matched file')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help='incremental cache directory, relative to --root (default: %(default)s)')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const=None,
+                        help='ignore and do not update the incremental cache')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print unified diffs and per-rule hit counts without writing any file')
+    parser.add_argument('--check', action='store_true',
+                        help='like --dry-run, but exit with status 1 if any file would change')
+    parser.add_argument('--stream-threshold', type=int, default=STREAM_THRESHOLD, metavar='BYTES',
+                        help='rewrite files of at least this size through a memory map, bypassing the cache '
+                             '(default: %(default)s)')
+    parser.add_argument('--no-stream', dest='stream_threshold', action='store_const', const=None,
+                        help='always rewrite files in memory')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and re-apply the rules to each file as it changes')
+    parser.add_argument('--interval', type=float, default=0.1, metavar='SECONDS',
+                        help='watch mode polling interval (default: %(default)s)')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every rule on every file and print a per-rule report')
+    parser.add_argument('--profile-sort', choices=SORT_KEYS, default='seconds',
+                        help='column to sort the profile report by (default: %(default)s)')
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help='also write the per-rule profile as JSON (implies --profile)')
+    parser.add_argument('--profile-dump', metavar='PATH',
+                        help='write a cProfile dump of the whole run, for snakeviz, flameprof or pstats '
+                             '(runs in one process)')
+    parser.add_argument('--rule-timeout', type=float, metavar='SECONDS',
+                        help='interrupt a rule that runs longer than this on one file and exit with status 1 '
+                             '(implies --profile)')
+    args = parser.parse_args(argv)
+    args.dry_run = args.dry_run or args.check
+    args.profile = args.profile or bool(args.profile_json) or args.rule_timeout is not None
+    if args.profile_dump:
+        args.jobs = 1  # a worker pool would leave the rule code out of the dump
+    return args
+
+
+def print_diff(result) -> None:
+    if result.diff:
+        sys.stdout.write(result.diff)
+
+
+def watch(args) -> int:
+    rules = load_fix_scripts(args.scripts)
+    if args.rules:
+        rules = [rule for rule in rules if rule.id in set(args.rules)]
+    cache = RuleCache(os.path.join(args.root, args.cache)) if args.cache else None
+    engine = PatchEngine(rules, root=args.root, cache=cache, dry_run=args.dry_run,
+                         stream_threshold=args.stream_threshold)
+    watcher = Watcher(engine, args.globs, ignore_targets=args.ignore_targets, interval=args.interval)
+    verb = 'would update' if args.dry_run else 'updated'
+
+    def report(batch: Batch) -> None:
+        stamp = time.strftime('%H:%M:%S')
+        for result in batch.results:
+            print_diff(result)
+            if result.changed:
+                hits = ', '.join(f'{rule_id} x{count}' for rule_id, count in result.hits.items() if count)
+                print(f'[{stamp}] {verb} {result.path} ({hits})')
+            for line in format_conflicts([result]).splitlines():
+                print(f'[{stamp}] {line}')
+        for path, message in batch.errors:
+            print(f'[{stamp}] error in {path}: {message}', file=sys.stderr)
+        print(f'[{stamp}] checked {len(batch.results)} file(s) in {batch.seconds * 1000:.1f} ms', flush=True)
+
+    print(f'Watching {len(watcher.paths())} file(s) with {len(rules)} rule(s); Ctrl-C to stop', flush=True)
+    try:
+        watcher.serve(report)
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+def report_profile(args, results) -> bool:
+    """Print (and maybe save) the per-rule profile; True if any rule timed out."""
+    rows = sort_profile(rule_profile(results), args.profile_sort)
+    unprofiled = sum(result.cached for result in results)
+    print(format_profile(rows, args.profile_sort))
+    if unprofiled:
+        print(f'{unprofiled} file(s) answered from the cache were not profiled; use --no-cache')
+    if args.profile_json:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            json.dump({'rules': rows}, f, indent=2)
+        print(f'Wrote {args.profile_json}')
+    return any(row['timeouts'] for row in rows)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.watch:
+        return watch(args)
+    if not args.profile_dump:
+        return run(args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(run, args)
+    finally:
+        profiler.dump_stats(args.profile_dump)
+        print(f'Wrote {args.profile_dump}')
+
+
+def run(args) -> int:
+    verb = 'would update' if args.dry_run else 'updated'
+
+    if not args.globs:
+        rules = load_fix_scripts(args.scripts)
+        if args.rules:
+            rules = [rule for rule in rules if rule.id in set(args.rules)]
+        results = apply_rules(rules, root=args.root, cache_dir=args.cache, dry_run=args.dry_run,
+                              stream_threshold=args.stream_threshold, profile=args.profile,
+                              rule_timeout=args.rule_timeout)
+        for result in results:
+            print_diff(result)
+            status = verb if result.changed else 'unchanged'
+            if result.cached:
+                status += ' (cached)'
+            print(f'{result.path}: {status}')
+        print(format_report(rule_hits(results, rules)))
+        conflicts = format_conflicts(results)
+        changed = [result.path for result in results if result.changed]
+    else:
+        paths = expand_globs(args.globs, root=args.root)
+        summary = run_parallel(paths, scripts_dir=args.scripts, root=args.root, rule_ids=args.rules,
+                               jobs=args.jobs, ignore_targets=args.ignore_targets,
+                               cache_dir=os.path.join(args.root, args.cache) if args.cache else None,
+                               dry_run=args.dry_run, on_result=print_diff,
+                               stream_threshold=args.stream_threshold, profile=args.profile,
+                               rule_timeout=args.rule_timeout)
+        results = summary.results
+        changed = summary.changed
+        for path in changed:
+            print(f'{verb} {path}')
+        cached = sum(result.cached for result in results)
+        print(f'{len(paths)} files matched, {summary.files} processed ({cached} from cache), '
+              f'{len(changed)} {"would change" if args.dry_run else "changed"}')
+        print(format_report(summary.hits))
+        conflicts = format_conflicts(results)
+
+    if conflicts:
+        print(conflicts)
+    timed_out = report_profile(args, results) if args.profile else False
+
+    return 1 if timed_out or (args.check and changed) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
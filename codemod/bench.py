@@ -0,0 +1,472 @@
+"""
+Benchmarks for the registered codemod rules on synthetic TypeScript.
+
+    python -m codemod.bench                                  # 1k .. 1M lines
+    python -m codemod.bench --sizes 1000 10000 --baseline codemod_bench.json
+
+Inputs are generated in the shape of the files the fix_*.py scripts
+target: runs of methods in the old form the rules rewrite, "near misses"
+that match all but the last line (the worst case for the nested
+``(\\s+)`` chains and lazy ``[^}]+?`` bodies), and unrelated filler.
+Every rule is timed separately in a worker process, so a pathological
+pattern is reported as a timeout instead of stalling the whole run.
+Results are written as JSON; with ``--baseline`` the run fails when a
+rule got slower than the baseline by more than ``--tolerance``.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .engine import load_fix_scripts
+from .outline import outline
+from .rules import registered_rules
+from .tslex import bracket_index
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_OUTPUT = 'codemod_bench.json'
+
+# Timings below this are treated as noise when comparing to a baseline
+MIN_COMPARABLE_SECONDS = 0.005
+
+_PROJECT_HEADER = '''import { storageService } from './storageService';
+import type { Project, UpdateProjectData } from '../types/global';
+
+export class ProjectService {
+  private static instance: ProjectService;
+'''
+
+_PROJECT_MATCHING = '''
+  public async createStory(data: {{ title: string; description?: string; projectId: string }}): Promise<any> {{
+    const now = new Date().toISOString();
+    const story = {{
+      id: this.generateId(),
+      title: data.title,
+      projectId: data.projectId,
+      createdAt: now,
+      updatedAt: now
+    }};
+
+    // Store story in project
+    const project = this.getProjectById(data.projectId);
+    if (project) {{
+      project.stories = project.stories || [];
+      project.stories.push(story);
+      this.updateProjectSync(data.projectId, {{ updatedAt: now }});
+    }}
+
+    return story;
+  }}
+
+  public async updateStory(storyId: string, updates: any): Promise<any> {{
+    const projects = this.getAllProjects();
+    for (const project of projects) {{
+      if (project.stories) {{
+        const storyIndex = project.stories.findIndex(s => s.id === storyId);
+        if (storyIndex !== -1) {{
+          const updatedStory = {{
+            ...project.stories[storyIndex],
+            ...updates,
+            updatedAt: new Date().toISOString()
+          }};
+          project.stories[storyIndex] = updatedStory;
+          this.updateProjectSync(project.id, {{ updatedAt: new Date().toISOString() }});
+          return updatedStory;
+        }}
+      }}
+    }}
+    return null;
+  }}
+
+  public async createCharacter(data: {{ name: string; description?: string; projectId: string }}): Promise<any> {{
+    const now = new Date().toISOString();
+    const character = {{
+      id: this.generateId(),
+      name: data.name,
+      projectId: data.projectId,
+      createdAt: now,
+      updatedAt: now
+    }};
+
+    // Store character in project
+    const project = this.getProjectById(data.projectId);
+    if (project) {{
+      project.characters = project.characters || [];
+      project.characters.push(character);
+      this.updateProjectSync(data.projectId, {{ updatedAt: now }});
+    }}
+
+    return character;
+  }}
+
+  public async updateCharacter(characterId: string, updates: any): Promise<any> {{
+    const projects = this.getAllProjects();
+    for (const project of projects) {{
+      if (project.characters) {{
+        const characterIndex = project.characters.findIndex(c => c.id === characterId);
+        if (characterIndex !== -1) {{
+          const updatedCharacter = {{
+            ...project.characters[characterIndex],
+            ...updates,
+            updatedAt: new Date().toISOString()
+          }};
+          project.characters[characterIndex] = updatedCharacter;
+          this.updateProjectSync(project.id, {{ updatedAt: new Date().toISOString() }});
+          return updatedCharacter;
+        }}
+      }}
+    }}
+    return null;
+  }}
+
+  public async deleteCharacter(characterId: string): Promise<boolean> {{
+    const projects = this.getAllProjects();
+    for (const project of projects) {{
+      if (project.characters) {{
+        const characterIndex = project.characters.findIndex(c => c.id === characterId);
+        if (characterIndex !== -1) {{
+          project.characters.splice(characterIndex, 1);
+          this.updateProjectSync(project.id, {{ updatedAt: new Date().toISOString() }});
+          return true;
+        }}
+      }}
+    }}
+    return false;
+  }}
+'''
+
+# Same shapes, but the final line differs, so every pattern scans the whole
+# block before failing
+_PROJECT_NEAR_MISS = (_PROJECT_MATCHING
+                      .replace('this.updateProjectSync(data.projectId, {{ updatedAt: now }});',
+                               'this.touchProject(data.projectId);')
+                      .replace('return updatedStory;\n        }}\n      }}\n    }}',
+                               'return updatedStory;\n        }}\n      }}\n    /* end */ }}')
+                      .replace('return updatedCharacter;\n        }}\n      }}\n    }}',
+                               'return updatedCharacter;\n        }}\n      }}\n    /* end */ }}')
+                      .replace('return true;\n        }}\n      }}\n    }}',
+                               'return true;\n        }}\n      }}\n    /* end */ }}'))
+
+_PROJECT_FILLER = '''
+  public getProjectStats{n}(id: string): {{ words: number; notes: number }} | null {{
+    const project = this.getProjectById(id);
+    if (!project) {{
+      return null;
+    }}
+
+    const notes = storageService.getProjectNotes(id);
+    const words = notes.reduce((total, note) => total + (note.wordCount || 0), 0);
+    return {{ words, notes: notes.length }};
+  }}
+'''
+
+_COMPANION_HEADER = '''/**
+ * AI Writing Companion Service
+ */
+
+export interface WritingSession {
+  id: string;
+  title: string;
+  contentId?: string;
+  mood?: string;
+  startTime: number;
+  endTime?: number;
+  content: string;
+  wordCount: number;
+  timeSpent: number;
+  productivity: number;
+  suggestions: AISuggestion[];
+  feedback: AIFeedback[];
+  aiInteractions: number;
+  isActive: boolean;
+}
+
+export interface AIPersonality {
+  id: string;
+  name: string;
+  description: string;
+  role: string;
+  traits: {
+    encouraging: number;
+    critical: number;
+    creative: number;
+    analytical: number;
+  };
+  greetingStyle: string;
+  feedbackStyle: string;
+  isActive: boolean;
+}
+
+class AIWritingCompanion {
+  private personalities: AIPersonality[] = [];
+
+  private initializePersonalities(): void {
+    this.personalities = [
+      {
+        id: 'mentor',
+        name: 'Wise Mentor',
+        description: 'Supportive and guiding',
+        traits: ['supportive', 'motivating', 'patient'],
+        greetingStyle: 'warm',
+        feedbackStyle: 'constructive',
+        isActive: true
+      }
+    ];
+  }
+
+  async startWritingSession(title: string, contentId?: string, mood?: string): Promise<string> {
+    const session: WritingSession = {
+      id: `session_${Date.now()}_${Math.random().toString(36).substring(2, 9)}`,
+      title,
+      contentId,
+      mood: this.validateMood(mood) || 'neutral',
+      startTime: Date.now(),
+      content: '',
+      wordCount: 0,
+      timeSpent: 0,
+      productivity: 0,
+      suggestions: [],
+      feedback: [],
+      aiInteractions: 0,
+      isActive: true
+    };
+
+    this.currentSession = session;
+    this.saveToLocalStorage();
+    return session.id;
+  }
+'''
+
+_COMPANION_MATCHING = '''
+  private seedSession{n}(title: string, contentId?: string, mood?: string): WritingSession {{
+    const session: WritingSession = {{
+      id: `session_${{Date.now()}}_${{Math.random().toString(36).substring(2, 9)}}`,
+      title,
+      contentId,
+      mood: this.validateMood(mood) || 'neutral',
+      startTime: Date.now(),
+      content: '',
+      wordCount: 0,
+      timeSpent: 0,
+      productivity: 0,
+      suggestions: [],
+      feedback: [],
+      aiInteractions: 0,
+      isActive: true
+    }};
+    return session;
+  }}
+'''
+
+_COMPANION_NEAR_MISS = _COMPANION_MATCHING.replace('      productivity: 0,', '      productivity: 1,')
+
+_COMPANION_FILLER = '''
+  private analyzeSentences{n}(text: string): {{ sentences: number; words: number }} {{
+    const sentences = text.split(/[.!?]+/).filter(s => s.trim().length > 0);
+    const words = text.split(/\\s+/).filter(w => w.length > 0);
+    // Brackets in strings and regexes must not confuse the bracket index: ] }} )
+    const label = `session ${{sentences.length}} [${{words.length}}]`;
+    return {{ sentences: sentences.length, words: words.length, label }} as any;
+  }}
+'''
+
+
+class Shape:
+    def __init__(self, target: str, header: str, matching: str, near_miss: str, filler: str):
+        self.target = target
+        self.header = header
+        self.units = (matching, near_miss, filler, filler)
+
+
+SHAPES: Dict[str, Shape] = {
+    'projectService': Shape('client/src/services/projectService.ts', _PROJECT_HEADER,
+                            _PROJECT_MATCHING, _PROJECT_NEAR_MISS, _PROJECT_FILLER),
+    'aiWritingCompanion': Shape('client/src/services/aiWritingCompanion.ts', _COMPANION_HEADER,
+                                _COMPANION_MATCHING, _COMPANION_NEAR_MISS, _COMPANION_FILLER),
+}
+
+
+@lru_cache(maxsize=2)
+def generate(shape_name: str, lines: int) -> str:
+    """
+    A synthetic file of roughly ``lines`` lines: the shape's header, then
+    matching / near-miss / filler units in a fixed 1:1:2 rotation.
+    """
+    shape = SHAPES[shape_name]
+    parts = [shape.header]
+    count = shape.header.count('\n')
+    unit_lines = [unit.count('\n') for unit in shape.units]
+    n = 0
+    while count < lines:
+        i = n % len(shape.units)
+        parts.append(shape.units[i].format(n=n))
+        count += unit_lines[i]
+        n += 1
+    parts.append('}\n')
+    return ''.join(parts)
+
+
+def rules_for_shape(shape_name: str):
+    target = SHAPES[shape_name].target
+    return [rule for rule in registered_rules() if rule.applies_to(target)]
+
+
+def _time_call(func: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_rule(shape_name: str, lines: int, rule_id: str, repeat: int = 3) -> dict:
+    """Best-of-``repeat`` wall time and traced peak memory of one rule."""
+    text = generate(shape_name, lines)
+    rule = next(rule for rule in registered_rules() if rule.id == rule_id)
+
+    def cold_find_edits():
+        # Outline rules would otherwise reuse the index built by the first run
+        bracket_index.cache_clear()
+        outline.cache_clear()
+        return rule.find_edits(text)
+
+    seconds = _time_call(cold_find_edits, repeat)
+
+    bracket_index.cache_clear()
+    outline.cache_clear()
+    tracemalloc.start()
+    try:
+        matches = len(rule.find_edits(text))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'shape': shape_name,
+        'lines': lines,
+        'bytes': len(text.encode('utf-8')),
+        'rule': rule_id,
+        'matches': matches,
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'status': 'ok',
+    }
+
+
+def _warm(shape_name: str, lines: int) -> None:
+    generate(shape_name, lines)
+
+
+def _new_pool(scripts_dir: str):
+    return multiprocessing.Pool(1, load_fix_scripts, (scripts_dir,))
+
+
+def run_benchmarks(shapes: Sequence[str], sizes: Sequence[int], scripts_dir: str = '.',
+                   repeat: int = 3, timeout: float = 60.0,
+                   log: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    load_fix_scripts(scripts_dir)
+    results = []
+    pool = _new_pool(scripts_dir)
+    try:
+        for shape_name in shapes:
+            for lines in sizes:
+                # Generate the input up front so it does not count against the timeout
+                pool.apply(_warm, (shape_name, lines))
+                for rule in rules_for_shape(shape_name):
+                    pending = pool.apply_async(measure_rule, (shape_name, lines, rule.id, repeat))
+                    try:
+                        row = pending.get(timeout)
+                    except multiprocessing.TimeoutError:
+                        # re gives no way to interrupt a running match; kill the worker
+                        pool.terminate()
+                        pool = _new_pool(scripts_dir)
+                        pool.apply(_warm, (shape_name, lines))
+                        row = {'shape': shape_name, 'lines': lines, 'rule': rule.id,
+                               'seconds': timeout, 'status': 'timeout'}
+                    results.append(row)
+                    if log is not None:
+                        log(row)
+    finally:
+        pool.terminate()
+    return results
+
+
+def _key(row: dict) -> tuple:
+    return row['shape'], row['lines'], row['rule']
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Human-readable regressions of ``results`` against ``baseline``."""
+    previous = {_key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        label = '{} {} lines {}'.format(*_key(row))
+        if row['status'] != 'ok':
+            if old['status'] == 'ok':
+                regressions.append(f'{label}: {row["status"]} (baseline {old["seconds"]:.4f}s)')
+            continue
+        if old['status'] != 'ok':
+            continue
+        if row['seconds'] > MIN_COMPARABLE_SECONDS and row['seconds'] > old['seconds'] * tolerance:
+            regressions.append(f'{label}: {row["seconds"]:.4f}s vs baseline {old["seconds"]:.4f}s')
+    return regressions
+
+
+def _print_row(row: dict) -> None:
+    if row['status'] == 'ok':
+        print(f'{row["shape"]:<20} {row["lines"]:>9} {row["rule"]:<50} '
+              f'{row["seconds"]:>9.4f}s {row["peak_bytes"] / 1e6:>8.1f}MB {row["matches"]:>7}')
+    else:
+        print(f'{row["shape"]:<20} {row["lines"]:>9} {row["rule"]:<50} {row["status"].upper()}')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m codemod.bench',
+                                     description='Time codemod rules on synthetic TypeScript inputs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='line counts')
+    parser.add_argument('--shape', choices=sorted(SHAPES), action='append', dest='shapes')
+    parser.add_argument('--scripts', default='.', help='directory containing the fix_*.py scripts')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per rule (best is kept)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds before a rule is killed')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--baseline', help='previous results to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='allowed slowdown factor against the baseline (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.shapes or sorted(SHAPES), args.sizes, scripts_dir=args.scripts,
+                             repeat=args.repeat, timeout=args.timeout, log=_print_row)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f'Wrote {args.output}')
+
+    failed = any(row['status'] != 'ok' for row in results)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Persistent incremental cache for codemod runs.
+
+Results are keyed by (file content hash, rule-set version).  A rule-set
+version changes whenever a rule's pattern, replacement or defining
+script changes, so editing a fix_*.py script invalidates exactly the
+entries it could affect.  A stat memo (mtime, size, inode -> hash) lets
+an unchanged file be recognised without reading it at all.
+
+The store is a single SQLite database, which keeps concurrent pool
+workers safe without any extra locking.  A database that cannot be used
+(corrupt, or still locked after ``timeout`` seconds) turns the cache off
+for the rest of the run with a warning instead of failing it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .rules import Rule
+from .spans import Conflict
+
+DEFAULT_CACHE_DIR = '.codemod-cache'
+
+# Bump when the meaning of cached entries changes
+CACHE_FORMAT = 2
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    ruleset TEXT NOT NULL,
+    hits TEXT NOT NULL,  -- JSON {"hits": {rule: count}, "conflicts": [[start, end, kept, dropped, line]]}
+    output_hash TEXT,
+    PRIMARY KEY (content_hash, ruleset)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+'''
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def toolkit_version() -> str:
+    """Digest of the codemod package itself; rules call into its helpers."""
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith('.py'):
+            with open(os.path.join(package_dir, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def ruleset_version(rules: Iterable[Rule]) -> str:
+    """Version string for an ordered list of rules."""
+    digest = hashlib.sha256(f'format:{CACHE_FORMAT}:{toolkit_version()}'.encode())
+    for rule in rules:
+        digest.update(f'\0{rule.id}\0{rule.fingerprint}'.encode())
+    return digest.hexdigest()
+
+
+class CachedResult(NamedTuple):
+    hits: Dict[str, int]
+    output: Optional[bytes]  # None when the rules left the file unchanged
+    conflicts: List[Conflict] = []
+
+
+class RuleCache:
+    """SQLite-backed store of per-file codemod results."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, timeout: float = 30):
+        self.directory = directory
+        self.db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(os.path.join(directory, 'cache.sqlite3'), timeout=timeout)
+            self.db.executescript(_SCHEMA)
+            self.db.commit()
+        except (OSError, sqlite3.Error) as exc:
+            self._disable(exc)
+
+    @property
+    def enabled(self) -> bool:
+        """False once the database has failed; every lookup then misses."""
+        return self.db is not None
+
+    def _disable(self, exc: BaseException) -> None:
+        if self.db is not None:
+            try:
+                self.db.close()
+            except sqlite3.Error:
+                pass
+            self.db = None
+        print(f'WARNING: running without the codemod cache in {self.directory}: {exc}', file=sys.stderr)
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+
+    def read(self, path: str) -> Tuple[str, Optional[bytes]]:
+        """
+        Content hash of ``path``.  When the stat memo still matches the file
+        the hash comes from the memo and the file is not read (returned data
+        is None); otherwise the file is read, hashed and the memo refreshed.
+        """
+        st = os.stat(path)
+        if self.db is not None:
+            try:
+                row = self.db.execute(
+                    'SELECT mtime_ns, size, inode, content_hash FROM stats WHERE path = ?',
+                    (os.path.abspath(path),),
+                ).fetchone()
+            except sqlite3.Error as exc:
+                self._disable(exc)
+            else:
+                if row is not None and tuple(row[:3]) == (st.st_mtime_ns, st.st_size, st.st_ino):
+                    return row[3], None
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+        self.remember_stat(path, digest)
+        return digest, data
+
+    def remember_stat(self, path: str, digest: str) -> None:
+        if self.db is None:
+            return
+        st = os.stat(path)
+        try:
+            with self.db:
+                self.db.execute(
+                    'INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?)',
+                    (os.path.abspath(path), st.st_mtime_ns, st.st_size, st.st_ino, digest),
+                )
+        except sqlite3.Error as exc:
+            self._disable(exc)
+
+    def lookup(self, digest: str, ruleset: str) -> Optional[CachedResult]:
+        if self.db is None:
+            return None
+        try:
+            row = self.db.execute(
+                'SELECT hits, output_hash FROM results WHERE content_hash = ? AND ruleset = ?',
+                (digest, ruleset),
+            ).fetchone()
+            if row is None:
+                return None
+            report, output_hash = json.loads(row[0]), row[1]
+            hits = report['hits']
+            conflicts = [Conflict(*conflict) for conflict in report['conflicts']]
+            if output_hash is None:
+                return CachedResult(hits, None, conflicts)
+            blob = self.db.execute('SELECT data FROM blobs WHERE hash = ?', (output_hash,)).fetchone()
+        except sqlite3.Error as exc:
+            self._disable(exc)
+            return None
+        except (ValueError, KeyError, TypeError):
+            return None  # an unreadable row is a miss; storing the result replaces it
+        if blob is None:
+            return None
+        return CachedResult(hits, bytes(blob[0]), conflicts)
+
+    def store(self, digest: str, ruleset: str, hits: Dict[str, int],
+              output: Optional[bytes], conflicts: Iterable[Conflict] = ()) -> None:
+        if self.db is None:
+            return
+        report = {'hits': hits, 'conflicts': [list(conflict) for conflict in conflicts]}
+        output_hash = content_hash(output) if output is not None else None
+        try:
+            with self.db:
+                if output is not None:
+                    self.db.execute('INSERT OR IGNORE INTO blobs VALUES (?, ?)', (output_hash, output))
+                self.db.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    (digest, ruleset, json.dumps(report, sort_keys=True), output_hash),
+                )
+        except sqlite3.Error as exc:
+            self._disable(exc)
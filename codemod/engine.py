@@ -0,0 +1,297 @@
+"""
+Patch engine: loads every target file once, runs all of its rules over
+the in-memory text and writes the result back once.
+
+Every rule proposes its edits against the original text; overlapping
+proposals are resolved by :mod:`codemod.spans` and reported, and the
+surviving edits are spliced in one pass.
+"""
+
+import glob
+import importlib.util
+import os
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .cache import DEFAULT_CACHE_DIR, RuleCache, content_hash, ruleset_version
+from .prefilter import LiteralScan
+from .profiling import RuleSample, RuleTimer
+from .report import format_conflicts, format_report, rule_hits, unified_diff
+from .rules import Edit, Rule, registered_rules
+from .spans import Conflict, number_lines, resolve_edits
+from .stream import STREAM_THRESHOLD, atomic_writer, stream_rewrite
+
+
+class FileResult(NamedTuple):
+    path: str
+    changed: bool
+    hits: Dict[str, int]
+    cached: bool = False
+    diff: str = ''
+    conflicts: Tuple[Conflict, ...] = ()
+    profile: Tuple[RuleSample, ...] = ()
+
+
+def apply_edits(text: str, edits: Sequence[Edit]) -> str:
+    """
+    Splice non-overlapping ``edits`` into ``text`` in a single join
+    instead of rebuilding the whole string once per edit.
+    """
+    if not edits:
+        return text
+    parts = []
+    pos = 0
+    for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+        parts.append(text[pos:edit.start])
+        parts.append(edit.text)
+        pos = edit.end
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def group_by_target(rules: Iterable[Rule]) -> Dict[str, List[Rule]]:
+    """Group rules by target file, keeping registration order."""
+    groups: Dict[str, List[Rule]] = {}
+    for rule in rules:
+        groups.setdefault(rule.target, []).append(rule)
+    return groups
+
+
+class PatchEngine:
+    """Apply a set of rules to their target files, one read and write each."""
+
+    def __init__(self, rules: Iterable[Rule], root: str = '.',
+                 encoding: str = 'utf-8', cache: Optional[RuleCache] = None,
+                 dry_run: bool = False, stream_threshold: Optional[int] = STREAM_THRESHOLD,
+                 profile: bool = False, rule_timeout: Optional[float] = None):
+        self.rules = list(rules)
+        self.root = root
+        self.encoding = encoding
+        self.cache = cache
+        # Dry runs never write; each FileResult carries a unified diff instead
+        self.dry_run = dry_run
+        # Files at least this large are rewritten through codemod.stream (None: never)
+        self.stream_threshold = stream_threshold
+        # Time every rule on every file (codemod.profiling); a timeout implies profiling
+        self.profile = profile or rule_timeout is not None
+        self.rule_timeout = rule_timeout
+
+    def resolve(self, target: str) -> str:
+        return target if os.path.isabs(target) else os.path.join(self.root, target)
+
+    def apply_text(self, text: str, rules: Iterable[Rule],
+                   timer: Optional[RuleTimer] = None) -> Tuple[str, Dict[str, int], List[Conflict]]:
+        """
+        Run ``rules`` over ``text`` and return the new text, the number of
+        edits applied per rule and the conflicts between rules.  All rules
+        see the original text; where two rules' edits overlap, a later
+        edit that covers the earlier ones wins (as it would have if the
+        rules ran one after another), otherwise the earlier edit is kept.
+        With a ``timer``, every rule's search is timed (and may time out).
+        """
+        hits: Dict[str, int] = {}
+        proposed: List[Edit] = []
+        scan = LiteralScan(text)
+        for rule in rules:
+            hits[rule.id] = 0
+            anchors = rule.anchors
+            if not scan.admits(anchors):
+                if timer is not None:
+                    timer.skip(rule.id)
+                continue
+            start = scan.search_start(anchors)
+            if timer is None:
+                proposed.extend(rule.find_edits(text, start))
+            else:
+                proposed.extend(timer.run(rule.id, len(text) - start, lambda: rule.find_edits(text, start)))
+        edits, conflicts = resolve_edits(proposed)
+        for edit in edits:
+            hits[edit.rule] += 1
+        if conflicts:
+            conflicts = number_lines(conflicts, lambda start, end: text.count('\n', start, end))
+        return apply_edits(text, edits), hits, conflicts
+
+    def decode(self, data: bytes) -> str:
+        # Same newline handling as reading in text mode
+        return data.decode(self.encoding).replace('\r\n', '\n').replace('\r', '\n')
+
+    def encode(self, text: str) -> bytes:
+        return text.replace('\n', os.linesep).encode(self.encoding)
+
+    def run_file(self, target: str, rules: Iterable[Rule]) -> FileResult:
+        timer = RuleTimer(self.rule_timeout) if self.profile else None
+        result = self._run_file(target, list(rules), timer)
+        if timer is not None:
+            result = result._replace(profile=tuple(timer.samples))
+        return result
+
+    def _run_file(self, target: str, rules: List[Rule], timer: Optional[RuleTimer]) -> FileResult:
+        path = self.resolve(target)
+        if self._should_stream(path):
+            streamed = stream_rewrite(path, rules, self.encoding, timer)
+            if streamed is not None:
+                changed, hits, conflicts = streamed
+                return FileResult(target, changed, hits, conflicts=tuple(conflicts))
+        if self.cache is not None:
+            return self._run_file_cached(target, path, rules, timer)
+
+        with open(path, 'rb') as f:
+            original = self.decode(f.read())
+        content, hits, conflicts = self.apply_text(original, rules, timer)
+        return self._finish(target, path, original, content, hits, conflicts)
+
+    def _should_stream(self, path: str) -> bool:
+        """
+        Large files skip the cache (which would hold a full copy of their
+        output) and are rewritten through a memory map instead.  Dry runs
+        need both texts for the diff and always use the in-memory path.
+        """
+        return (not self.dry_run and self.stream_threshold is not None
+                and os.path.getsize(path) >= self.stream_threshold)
+
+    def _run_file_cached(self, target: str, path: str, rules: List[Rule],
+                         timer: Optional[RuleTimer] = None) -> FileResult:
+        """
+        Like :meth:`run_file`, but answered from the cache when this exact
+        content has already been through this exact rule set.  Files are
+        only written when their content really changes, so mtimes of
+        untouched files (and downstream incremental builds) are preserved.
+        Results in which a rule timed out are incomplete and not cached.
+        """
+        cache = self.cache
+        ruleset = ruleset_version(rules)
+        digest, data = cache.read(path)
+
+        cached = cache.lookup(digest, ruleset)
+        if cached is not None:
+            conflicts = tuple(cached.conflicts)
+            if cached.output is None:
+                return FileResult(target, False, cached.hits, cached=True, conflicts=conflicts)
+            if not self.dry_run:
+                self._write_bytes(path, cached.output)
+                return FileResult(target, True, cached.hits, cached=True, conflicts=conflicts)
+            # A dry run still needs both sides to show the diff
+            with open(path, 'rb') as f:
+                original = self.decode(f.read())
+            return self._finish(target, path, original, self.decode(cached.output),
+                                cached.hits, conflicts, cached=True)
+
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        original = self.decode(data)
+        content, hits, conflicts = self.apply_text(original, rules, timer)
+        if timer is None or not timer.timed_out:
+            cache.store(digest, ruleset, hits, self.encode(content) if content != original else None,
+                        conflicts)
+        return self._finish(target, path, original, content, hits, conflicts)
+
+    def _finish(self, target: str, path: str, original: str, content: str,
+                hits: Dict[str, int], conflicts: Iterable[Conflict] = (),
+                cached: bool = False) -> FileResult:
+        changed = content != original
+        conflicts = tuple(conflicts)
+        if self.dry_run:
+            diff = unified_diff(target, original, content) if changed else ''
+            return FileResult(target, changed, hits, cached, diff, conflicts)
+        if changed:
+            self._write_bytes(path, self.encode(content))
+        return FileResult(target, changed, hits, cached, conflicts=conflicts)
+
+    def _write_bytes(self, path: str, data: bytes) -> None:
+        with atomic_writer(path) as f:
+            f.write(data)
+        if self.cache is not None:
+            self.cache.remember_stat(path, content_hash(data))
+
+    def rules_for(self, path: str, ignore_targets: bool = False) -> List[Rule]:
+        if ignore_targets:
+            return self.rules
+        return [rule for rule in self.rules if rule.applies_to(path)]
+
+    def run(self) -> List[FileResult]:
+        return [self.run_file(target, rules)
+                for target, rules in group_by_target(self.rules).items()]
+
+    def run_paths(self, paths: Iterable[str], ignore_targets: bool = False) -> List[FileResult]:
+        """
+        Run over explicit ``paths`` (relative to ``root``) instead of the
+        rules' own targets.  With ``ignore_targets`` every rule is tried on
+        every file.
+        """
+        results = []
+        for path in paths:
+            rules = self.rules_for(path, ignore_targets)
+            if rules:
+                results.append(self.run_file(path, rules))
+        return results
+
+
+def apply_rules(rules: Iterable[Rule], root: str = '.',
+                cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                dry_run: bool = False,
+                stream_threshold: Optional[int] = STREAM_THRESHOLD,
+                profile: bool = False, rule_timeout: Optional[float] = None) -> List[FileResult]:
+    """
+    Apply ``rules`` to their targets.  Results are cached under
+    ``cache_dir`` (relative to ``root``) unless it is None.  With
+    ``profile`` (or a ``rule_timeout``) each result carries per-rule
+    timings, see :mod:`codemod.profiling`.
+    """
+    cache = RuleCache(os.path.join(root, cache_dir)) if cache_dir else None
+    try:
+        engine = PatchEngine(rules, root=root, cache=cache, dry_run=dry_run,
+                             stream_threshold=stream_threshold, profile=profile,
+                             rule_timeout=rule_timeout)
+        return engine.run()
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def run_script(rules: Sequence[Rule], message: str, dry_run: bool = False) -> List[FileResult]:
+    """
+    Entry point shared by the fix_*.py scripts: apply (or, with
+    ``dry_run``, diff) their rules, print ``message`` only if something
+    actually changed, and report per-rule hits including rules that
+    matched nothing, and any edits dropped because rules overlapped.
+    """
+    results = apply_rules(rules, dry_run=dry_run)
+    for result in results:
+        if result.diff:
+            sys.stdout.write(result.diff)
+    if any(result.changed for result in results):
+        print(f'[dry run] {message}' if dry_run else message)
+    else:
+        print('No changes: ' + ', '.join(result.path for result in results))
+    print(format_report(rule_hits(results, rules)))
+    conflicts = format_conflicts(results)
+    if conflicts:
+        print(conflicts)
+    return results
+
+
+def expand_globs(patterns: Iterable[str], root: str = '.') -> List[str]:
+    """Expand ``**``-style globs relative to ``root`` into sorted unique paths."""
+    paths = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            if os.path.isfile(path):
+                paths.add(os.path.relpath(path, root).replace(os.sep, '/'))
+    return sorted(paths)
+
+
+def load_fix_scripts(directory: str = '.') -> List[Rule]:
+    """
+    Import every fix_*.py script in ``directory`` so its rules register
+    themselves, and return the full registry.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, 'fix_*.py'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in sys.modules:
+            continue
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return registered_rules()
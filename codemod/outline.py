@@ -0,0 +1,303 @@
+"""
+Lightweight structural outline of a TypeScript file, and an editor that
+turns structural operations into offset-based edits.
+
+The outline is built from one bracket scan (see :mod:`codemod.tslex`):
+top-level classes with their methods, and interfaces with their fields.
+It is not a full parser.  It only records what the codemods need to
+address code by name instead of by regex over the method text:
+
+    editor = StructuralEditor(text)
+    editor.replace_method('ProjectService', 'createStory', new_text)
+    editor.add_interface_fields('WritingSession', ['totalWords: number;'], after='wordCount')
+    text = editor.apply()          # every edit spliced in one pass
+"""
+
+import bisect
+import re
+from functools import cached_property, lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .engine import apply_edits
+from .rules import Edit, Rule, _callable_digest
+from .tslex import BracketIndex, bracket_index
+
+_DECLARATION = re.compile(
+    r'^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:declare[ \t]+)?(?:abstract[ \t]+)?'
+    r'(?P<kind>class|interface)[ \t]+(?P<name>[A-Za-z_$][\w$]*)',
+    re.MULTILINE,
+)
+
+# Method head directly before its parameter list, anchored at a line start
+_METHOD_HEAD = re.compile(
+    r'(?:^|\n)(?P<indent>[ \t]*)'
+    r'(?P<modifiers>(?:(?:public|private|protected|static|async|readonly|override|abstract|get|set)[ \t]+)*)'
+    r'\*?[ \t]*(?P<name>[A-Za-z_$][\w$]*)[ \t]*(?:<[^\n(]*>)?[ \t]*\Z'
+)
+
+_FIELD_HEAD = re.compile(
+    r'^(?P<indent>[ \t]*)(?:readonly[ \t]+)?(?P<name>[A-Za-z_$][\w$]*)(?P<optional>\?)?[ \t]*:',
+    re.MULTILINE,
+)
+
+# A line that carries on the type before it, as in a multi-line union
+_TYPE_CONTINUATION = re.compile(r'\n[ \t]*(?:[|&]|=>)')
+
+_NOT_METHODS = frozenset({'if', 'for', 'while', 'switch', 'catch', 'function', 'return'})
+
+
+class MethodInfo(NamedTuple):
+    name: str
+    start: int              # start of the line holding the signature
+    params: int             # position of '('
+    body: Tuple[int, int]   # '{' .. past the closing '}'
+
+    @property
+    def end(self) -> int:
+        return self.body[1]
+
+
+class FieldInfo(NamedTuple):
+    name: str
+    optional: bool
+    type: str
+    start: int   # start of the field's line
+    end: int     # just past its terminator (or its type, if it has none)
+    indent: str
+
+
+class ClassInfo(NamedTuple):
+    name: str
+    start: int
+    body: Tuple[int, int]
+    methods: List[MethodInfo]
+
+    def method(self, name: str) -> Optional[MethodInfo]:
+        return next((method for method in self.methods if method.name == name), None)
+
+
+class InterfaceInfo(NamedTuple):
+    name: str
+    start: int
+    body: Tuple[int, int]
+    fields: List[FieldInfo]
+
+    def field(self, name: str) -> Optional[FieldInfo]:
+        return next((field for field in self.fields if field.name == name), None)
+
+
+def _field_name(field: str) -> str:
+    m = _FIELD_HEAD.match(field)
+    if m is None:
+        raise ValueError(f'Not a field declaration: {field!r}')
+    return m.group('name')
+
+
+def _line_start(text: str, pos: int) -> int:
+    return text.rfind('\n', 0, pos) + 1
+
+
+class Outline:
+    """Classes, methods, interfaces and fields of one source text."""
+
+    def __init__(self, text: str, brackets: Optional[BracketIndex] = None):
+        self.text = text
+        self.brackets = brackets or bracket_index(text)
+        self.classes: Dict[str, ClassInfo] = {}
+        self.interfaces: Dict[str, InterfaceInfo] = {}
+        self._parse()
+
+    def _parse(self) -> None:
+        for m in _DECLARATION.finditer(self.text):
+            body = self.brackets.block_after(m.end())
+            if body is None:
+                continue
+            name = m.group('name')
+            if m.group('kind') == 'class':
+                self.classes.setdefault(name, ClassInfo(name, m.start(), body, self._methods(body)))
+            else:
+                self.interfaces.setdefault(name, InterfaceInfo(name, m.start(), body, self._fields(body)))
+
+    def _methods(self, body: Tuple[int, int]) -> List[MethodInfo]:
+        text = self.text
+        brackets = self.brackets
+        methods = []
+        segment_start = body[0] + 1
+        children = brackets.children(body[0])
+        i = 0
+        while i < len(children):
+            child = children[i]
+            head = None
+            if text[child] == '(':
+                head = _METHOD_HEAD.search(text, segment_start, child)
+            if head is not None and head.group('name') not in _NOT_METHODS:
+                method_body = brackets.body_after(child)
+                if method_body is not None:
+                    start = head.start('indent')
+                    methods.append(MethodInfo(head.group('name'), start, child, method_body))
+                    # Continue after the body; everything up to it belongs to this method
+                    while i < len(children) and children[i] < method_body[0]:
+                        i += 1
+            segment_start = brackets.pairs.get(children[i], children[i]) + 1
+            i += 1
+        return methods
+
+    def _fields(self, body: Tuple[int, int]) -> List[FieldInfo]:
+        text = self.text
+        pairs = self.brackets.pairs
+        children = self.brackets.children(body[0])
+
+        def nested(pos: int) -> bool:
+            i = bisect.bisect_right(children, pos) - 1
+            return i >= 0 and pos < pairs.get(children[i], children[i])
+
+        def type_end(start: int, limit: int) -> int:
+            # Past the first top-level ';' or ',', or at the line break that
+            # ends the type, so a member that is not a field is not taken in
+            seen = False
+            angles = 0  # open type arguments, which brackets do not track
+            pos = start
+            while pos < limit:
+                char = text[pos]
+                if pairs.get(pos, pos) > pos:
+                    seen = True
+                    pos = pairs[pos]  # over the bracketed part, to its closing bracket
+                elif char == '<':
+                    angles += 1
+                elif char == '>' and angles and text[pos - 1] != '=':
+                    angles -= 1
+                elif char in ';,' and not angles:
+                    return pos + 1
+                elif char == '\n':
+                    if seen and not _TYPE_CONTINUATION.match(text, pos):
+                        return pos
+                elif not char.isspace():
+                    seen = True
+                pos += 1
+            return limit
+
+        heads = [m for m in _FIELD_HEAD.finditer(text, body[0] + 1, body[1] - 1)
+                 if not nested(m.start('name'))]
+        fields = []
+        for i, m in enumerate(heads):
+            limit = heads[i + 1].start() if i + 1 < len(heads) else body[1] - 1
+            raw = text[m.end():type_end(m.end(), limit)].rstrip()
+            end = m.end() + len(raw)
+            fields.append(FieldInfo(
+                name=m.group('name'),
+                optional=bool(m.group('optional')),
+                type=raw.rstrip(';,').strip(),
+                start=m.start(),
+                end=end,
+                indent=m.group('indent'),
+            ))
+        return fields
+
+    def find_method(self, name: str) -> Optional[Tuple[ClassInfo, MethodInfo]]:
+        """First class declaring a method called ``name``, with that method."""
+        for cls in self.classes.values():
+            method = cls.method(name)
+            if method is not None:
+                return cls, method
+        return None
+
+
+@lru_cache(maxsize=32)
+def outline(text: str) -> Outline:
+    return Outline(text)
+
+
+class StructuralEditor:
+    """
+    Collects structural edits against one text.  Nothing is rebuilt until
+    :meth:`apply`, which splices every edit in a single offset-sorted pass.
+    Each operation returns False (and records nothing) when there is
+    nothing to do, including when the named class or interface is not in
+    the file, so rules built on it are idempotent and safe to run on any
+    file.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.outline = outline(text)
+        self.edits: List[Edit] = []
+
+    def _edit(self, start: int, end: int, replacement: str) -> bool:
+        self.edits.append(Edit(start, end, replacement, ''))
+        return True
+
+    def replace_method(self, class_name: str, name: str, text: str) -> bool:
+        """Replace a whole method (from its line start through its closing brace)."""
+        cls = self.outline.classes.get(class_name)
+        method = cls.method(name) if cls is not None else None
+        if method is None or self.text[method.start:method.end] == text:
+            return False
+        return self._edit(method.start, method.end, text)
+
+    def add_method(self, class_name: str, text: str, after: Optional[str] = None) -> bool:
+        """
+        Insert ``text`` (an indented method) after method ``after``, or
+        after the last method.  Skipped if the class already has a method
+        with the same name.
+        """
+        cls = self.outline.classes.get(class_name)
+        if cls is None:
+            return False
+        head = _METHOD_HEAD.search(text.split('(', 1)[0])
+        if head is not None and cls.method(head.group('name')) is not None:
+            return False
+        anchor = cls.method(after) if after else (cls.methods[-1] if cls.methods else None)
+        if anchor is None:
+            return self._edit(cls.body[0] + 1, cls.body[0] + 1, '\n' + text + '\n')
+        return self._edit(anchor.end, anchor.end, '\n\n' + text)
+
+    def add_interface_fields(self, interface_name: str, fields: Iterable[str],
+                             after: Optional[str] = None) -> bool:
+        """
+        Insert field declarations such as ``'totalWords: number;'`` after
+        field ``after`` (default: the last field), using the indentation of
+        the existing fields.  Fields the interface already has are skipped.
+        """
+        iface = self.outline.interfaces.get(interface_name)
+        if iface is None:
+            return False
+        missing = [field for field in fields if iface.field(_field_name(field)) is None]
+        if not missing:
+            return False
+        anchor = iface.field(after) if after else (iface.fields[-1] if iface.fields else None)
+        if anchor is None:
+            indent = ' ' * (iface.start - _line_start(self.text, iface.start) + 2)
+            position = iface.body[0] + 1
+        else:
+            indent = anchor.indent
+            position = anchor.end
+        return self._edit(position, position, ''.join(f'\n{indent}{field}' for field in missing))
+
+    def add_interface_field(self, interface_name: str, field: str, after: Optional[str] = None) -> bool:
+        return self.add_interface_fields(interface_name, [field], after)
+
+    def apply(self) -> str:
+        return apply_edits(self.text, self.edits)
+
+
+class OutlineRule(Rule):
+    """
+    Rule expressed as structural operations: ``func(editor)`` calls
+    methods on a :class:`StructuralEditor` for the file's text.
+    """
+
+    def __init__(self, name: str, target: str,
+                 func: Callable[[StructuralEditor], object], group: str = '',
+                 requires: Sequence[str] = ()):
+        super().__init__(name, target, group, requires)
+        self.func = func
+
+    @cached_property
+    def fingerprint(self) -> str:
+        return _callable_digest(self.func)
+
+    def find_edits(self, text: str, start: int = 0) -> List[Edit]:
+        editor = StructuralEditor(text)
+        self.func(editor)
+        rule_id = self.id
+        return [edit._replace(rule=rule_id) for edit in editor.edits]
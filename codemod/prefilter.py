@@ -0,0 +1,159 @@
+"""
+Literal prefilter shared by all rules of an engine.
+
+Most rules can only match text that contains some fixed strings, e.g.
+``// Store story in project`` for ``fix_services_properly.old_create_story``.
+:func:`anchors` extracts those required literals from a compiled regex,
+and a :class:`LiteralScan` over a file's text answers, for every rule,
+whether all of its literals occur.  A rule missing one cannot match, so
+its (often DOTALL, backtracking) regex is never run.  When a rule does
+apply, the regex search starts at the earliest position a match could
+begin given where its first literal occurs, instead of at the top of the
+file.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+try:
+    from re import _compiler as _sre_compile, _constants as _sre, _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_compile as _sre_compile
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+# Shorter literals are too common to rule anything out
+MIN_LITERAL = 4
+
+_ZERO_WIDTH = {_sre.AT, _sre.ASSERT, _sre.ASSERT_NOT}
+_REPEATS = {_sre.MAX_REPEAT, _sre.MIN_REPEAT, getattr(_sre, 'POSSESSIVE_REPEAT', None)} - {None}
+
+
+class Anchors(NamedTuple):
+    """What a text must contain for a pattern to match it."""
+    literals: Tuple[str, ...]
+    # First literal of the top-level sequence, and how far before it a match
+    # can start: a fixed bound, or (when unbounded) a single-character
+    # pattern whose run directly precedes the literal, as in (\s+)literal
+    lead: Optional[str] = None
+    lead_offset: Optional[int] = None
+    lead_run: Optional[Pattern] = None
+
+    def search_start(self, text: str, pos: int) -> int:
+        """Earliest position a match can start, given the first occurrence ``pos`` of the lead."""
+        if self.lead_offset is not None:
+            return max(0, pos - self.lead_offset)
+        if self.lead_run is not None:
+            match = self.lead_run.match
+            while pos > 0 and match(text, pos - 1):
+                pos -= 1
+            return pos
+        return 0
+
+
+NO_ANCHORS = Anchors(())
+
+
+def _literal_runs(items, runs: List[str], run: List[str]) -> None:
+    """Collect runs of consecutive required literal characters from parsed ``items``."""
+    for op, av in items:
+        if op is _sre.LITERAL:
+            run.append(chr(av))
+        elif op in _ZERO_WIDTH:
+            continue  # consumes nothing, so the literals around it stay adjacent
+        elif op is _sre.SUBPATTERN and not av[1]:
+            _literal_runs(av[-1], runs, run)
+        else:
+            runs.append(''.join(run))
+            run.clear()
+            if op in _REPEATS and av[0] >= 1:
+                _literal_runs(av[2], runs, [])
+                runs.append('')
+    runs.append(''.join(run))
+    run.clear()
+
+
+def _single_char(item, state) -> Optional[Pattern]:
+    """A pattern matching one character, if ``item`` is (a group around) X+ or X* for such an X."""
+    op, av = item
+    if op is _sre.SUBPATTERN and not av[1] and len(av[-1]) == 1:
+        return _single_char(av[-1][0], state)
+    if op not in _REPEATS or len(av[2]) != 1:
+        return None
+    inner = av[2][0]
+    if inner[0] not in (_sre.IN, _sre.LITERAL, _sre.NOT_LITERAL, _sre.ANY):
+        return None
+    try:
+        return _sre_compile.compile(_sre_parse.SubPattern(state, [inner]), state.flags)
+    except Exception:  # private API; losing the optimisation is fine
+        return None
+
+
+def anchors(pattern: Pattern) -> Anchors:
+    """Required literals of ``pattern`` (of at least :data:`MIN_LITERAL` characters)."""
+    if pattern.flags & re.IGNORECASE or not isinstance(pattern.pattern, str):
+        return NO_ANCHORS
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return NO_ANCHORS
+    runs: List[str] = []
+    _literal_runs(parsed, runs, [])
+    literals = tuple(dict.fromkeys(run for run in runs if len(run) >= MIN_LITERAL))
+    if not literals:
+        return NO_ANCHORS
+
+    # Locate the lead literal in the top-level sequence and bound what precedes it
+    items = list(parsed)
+    prefix_items = []
+    for i, (op, av) in enumerate(items):
+        if op is _sre.LITERAL:
+            run = []
+            for op2, av2 in items[i:]:
+                if op2 is not _sre.LITERAL:
+                    break
+                run.append(chr(av2))
+            text = ''.join(run)
+            if len(text) >= MIN_LITERAL and text in literals:
+                return Anchors(literals, *_lead(text, prefix_items, parsed.state))
+        prefix_items.append((op, av))
+    return Anchors(literals)
+
+
+def _lead(literal: str, prefix_items, state) -> Tuple[Optional[str], Optional[int], Optional[Pattern]]:
+    width = _sre_parse.SubPattern(state, prefix_items).getwidth()[1] if prefix_items else 0
+    if width < _sre.MAXREPEAT:
+        return literal, width, None
+    if len(prefix_items) == 1:
+        run = _single_char(prefix_items[0], state)
+        # The backwards walk is only safe if the literal cannot extend the run
+        if run is not None and not run.match(literal[0]):
+            return literal, None, run
+    return None, None, None
+
+
+class LiteralScan:
+    """
+    Positions of literals in one text, looked up on demand and memoised,
+    so literals shared by several rules are searched for once per text.
+    Each lookup is a ``str.find``, which skips through the text far faster
+    than a regex alternation of all literals could.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.positions: Dict[str, int] = {}
+
+    def first(self, literal: str) -> int:
+        """First position of ``literal``, or -1."""
+        pos = self.positions.get(literal)
+        if pos is None:
+            pos = self.positions[literal] = self.text.find(literal)
+        return pos
+
+    def admits(self, anchors: Anchors) -> bool:
+        """Whether every literal of ``anchors`` occurs, stopping at the first missing one."""
+        return all(self.first(literal) != -1 for literal in anchors.literals)
+
+    def search_start(self, anchors: Anchors) -> int:
+        return anchors.search_start(self.text, self.first(anchors.lead)) if anchors.lead else 0
@@ -0,0 +1,158 @@
+"""
+Per-rule profiling for codemod runs.
+
+    python -m codemod 'client/src/**/*.ts' --ignore-targets --no-cache --profile
+    python -m codemod --profile-json rules.json --rule-timeout 2
+    python -m codemod --profile-dump run.prof      # cProfile; open with snakeviz or flameprof
+
+When profiling is on, the engine gives each file a :class:`RuleTimer`,
+which times every rule's search over that file and records a
+:class:`RuleSample`.  Samples travel back with each
+:class:`~codemod.engine.FileResult`, so runs with a process pool are
+profiled the same way as in-process runs, and :func:`rule_profile` adds
+them up per rule.
+
+``--rule-timeout`` sets a per-rule, per-file budget.  Where a POSIX
+interval timer is available (the main thread on Unix), a rule that runs
+over it is interrupted, even inside a backtracking regex, which checks
+for signals while it searches.  Its edits for that file are discarded
+and the result is not cached.  Elsewhere the rule finishes and is still
+reported as a timeout.  Either way ``python -m codemod`` exits with
+status 1, so a runaway pattern fails CI instead of stalling it.
+"""
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Columns rule_profile rows can be sorted by (largest first, except 'rule')
+SORT_KEYS = ('seconds', 'max_seconds', 'scanned', 'matches', 'timeouts', 'files', 'rule')
+
+
+class RuleTimeout(BaseException):
+    """
+    A rule ran past its budget on one file.  Not an :class:`Exception`,
+    so a rule's own ``except Exception`` cannot swallow it.
+    """
+
+
+class RuleSample(NamedTuple):
+    rule: str
+    seconds: float
+    scanned: int  # characters searched (bytes on the stream path); 0 when prefiltered out
+    matches: int  # edits proposed, before conflicts are resolved
+    status: str  # 'ok', 'skipped' (a required literal is missing) or 'timeout'
+
+
+def _can_interrupt() -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _deadline(seconds: float) -> Iterator[None]:
+    """Raise :class:`RuleTimeout` in the block once ``seconds`` have passed."""
+    def expire(signum, frame):
+        raise RuleTimeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class RuleTimer:
+    """Times each rule on one file; ``timeout`` is the per-rule budget in seconds."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.samples: List[RuleSample] = []
+        self._interrupt = timeout is not None and _can_interrupt()
+
+    @property
+    def timed_out(self) -> bool:
+        return any(sample.status == 'timeout' for sample in self.samples)
+
+    def skip(self, rule_id: str) -> None:
+        self.samples.append(RuleSample(rule_id, 0.0, 0, 0, 'skipped'))
+
+    def run(self, rule_id: str, scanned: int, search: Callable[[], List[T]]) -> List[T]:
+        """
+        Call ``search`` and record how long it took.  Returns its edits,
+        or none if it was interrupted for running past the timeout.
+        """
+        started = time.perf_counter()
+        try:
+            if self._interrupt:
+                with _deadline(self.timeout):
+                    edits = search()
+            else:
+                edits = search()
+        except RuleTimeout:
+            self.samples.append(RuleSample(rule_id, time.perf_counter() - started, scanned, 0, 'timeout'))
+            return []
+        seconds = time.perf_counter() - started
+        over = self.timeout is not None and seconds > self.timeout
+        self.samples.append(RuleSample(rule_id, seconds, scanned, len(edits), 'timeout' if over else 'ok'))
+        return edits
+
+
+def rule_profile(results: Iterable) -> List[dict]:
+    """
+    One row per rule, summed over the samples of ``results``: files
+    searched and skipped, total and worst-case time (with the slowest
+    file), characters scanned, matches and timeouts.
+    """
+    rows: Dict[str, dict] = {}
+    for result in results:
+        for sample in result.profile:
+            row = rows.get(sample.rule)
+            if row is None:
+                row = rows[sample.rule] = {
+                    'rule': sample.rule, 'files': 0, 'skipped': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                    'slowest': '', 'scanned': 0, 'matches': 0, 'timeouts': 0,
+                }
+            if sample.status == 'skipped':
+                row['skipped'] += 1
+                continue
+            row['files'] += 1
+            row['seconds'] += sample.seconds
+            row['scanned'] += sample.scanned
+            row['matches'] += sample.matches
+            row['timeouts'] += sample.status == 'timeout'
+            if sample.seconds >= row['max_seconds']:
+                row['max_seconds'] = sample.seconds
+                row['slowest'] = result.path
+    return list(rows.values())
+
+
+def sort_profile(rows: List[dict], key: str = 'seconds') -> List[dict]:
+    if key not in SORT_KEYS:
+        raise ValueError(f'Cannot sort by {key!r}; expected one of {", ".join(SORT_KEYS)}')
+    if key == 'rule':
+        return sorted(rows, key=lambda row: row['rule'])
+    return sorted(rows, key=lambda row: (-row[key], row['rule']))
+
+
+def format_profile(rows: List[dict], key: str = 'seconds') -> str:
+    if not rows:
+        return 'No rules were profiled.'
+    rows = sort_profile(rows, key)
+    width = max(len(row['rule']) for row in rows)
+    lines = [f'  {"rule":<{width}}  {"files":>5}  {"skipped":>7}  {"seconds":>9}  {"max":>9}  '
+             f'{"MB scanned":>10}  {"matches":>7}  {"timeouts":>8}']
+    for row in rows:
+        lines.append(f'  {row["rule"]:<{width}}  {row["files"]:>5}  {row["skipped"]:>7}  '
+                     f'{row["seconds"]:>9.4f}  {row["max_seconds"]:>9.4f}  {row["scanned"] / 1e6:>10.2f}  '
+                     f'{row["matches"]:>7}  {row["timeouts"]:>8}')
+    for row in rows:
+        if row['timeouts']:
+            lines.append(f'TIMEOUT: {row["rule"]} ran past its budget on {row["timeouts"]} file(s), '
+                         f'slowest {row["slowest"]} ({row["max_seconds"]:.2f}s)')
+    return '\n'.join(lines)
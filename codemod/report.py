@@ -0,0 +1,50 @@
+"""
+Diffs and rule-hit statistics for codemod runs.
+"""
+
+import difflib
+from collections import Counter
+from typing import Dict, Iterable, List
+
+
+def unified_diff(path: str, before: str, after: str) -> str:
+    return ''.join(difflib.unified_diff(
+        before.splitlines(keepends=True),
+        after.splitlines(keepends=True),
+        fromfile=f'a/{path}',
+        tofile=f'b/{path}',
+    ))
+
+
+def rule_hits(results: Iterable, rules: Iterable = ()) -> Dict[str, int]:
+    """
+    Total matches per rule id across ``results``.  Every rule in ``rules``
+    is listed even if no file reached it, so it shows up as unmatched.
+    """
+    hits: Counter = Counter({rule.id: 0 for rule in rules})
+    for result in results:
+        hits.update(result.hits)
+    return dict(hits)
+
+
+def unmatched_rules(hits: Dict[str, int]) -> List[str]:
+    return sorted(rule_id for rule_id, count in hits.items() if count == 0)
+
+
+def format_report(hits: Dict[str, int]) -> str:
+    if not hits:
+        return 'No rules ran.'
+    width = max(len(rule_id) for rule_id in hits)
+    lines = [f'  {rule_id:<{width}}  {count:>5}' for rule_id, count in sorted(hits.items())]
+    unmatched = unmatched_rules(hits)
+    if unmatched:
+        lines.append(f'WARNING: {len(unmatched)} rule(s) matched nothing: {", ".join(unmatched)}')
+    return '\n'.join(lines)
+
+
+def format_conflicts(results: Iterable) -> str:
+    """One line per edit dropped because it overlapped another rule's edit."""
+    lines = [f'CONFLICT {result.path}:{conflict.line}: dropped edit by {conflict.dropped}, '
+             f'overlaps {conflict.kept}'
+             for result in results for conflict in result.conflicts]
+    return '\n'.join(lines)
@@ -0,0 +1,210 @@
+"""
+Rule definitions and the shared registry used by the fix_*.py scripts.
+
+A rule never touches the filesystem itself: it looks at the text of its
+target file and proposes edits as (start, end, replacement) spans.  The
+engine decides how and when those edits are applied.
+"""
+
+import fnmatch
+import hashlib
+import inspect
+import os
+import re
+from functools import cached_property, lru_cache
+from typing import AnyStr, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Union
+
+from .prefilter import Anchors, anchors
+
+
+class Edit(NamedTuple):
+    """Replace ``text[start:end]`` with ``text``, proposed by ``rule``."""
+    start: int
+    end: int
+    text: str
+    rule: str
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _callable_digest(func: Callable) -> str:
+    """Digest of the script defining ``func`` (its helpers and data live there too)."""
+    try:
+        return _file_digest(inspect.getsourcefile(func))
+    except (OSError, TypeError):
+        code = getattr(func, '__code__', None)
+        raw = code.co_code + repr(code.co_consts).encode() if code else repr(func).encode()
+        return hashlib.sha256(raw).hexdigest()
+
+
+_GROUP_REF = re.compile(r'\\(?:([1-9][0-9]?)(?![0-9])|g<([^>]*)>)')
+
+
+def compile_template(pattern: Pattern, template: AnyStr) -> Callable[[re.Match], AnyStr]:
+    """
+    Equivalent of ``lambda m: m.expand(template)`` that parses ``template``
+    once instead of on every match.  Templates using escapes other than
+    group references (``\\n``, octal, ...) fall back to ``m.expand``.
+    """
+    text_type = type(template)
+    as_text = template if isinstance(template, str) else template.decode('latin-1')
+    pieces = []  # literal strings and group numbers, alternating
+    pos = 0
+    for ref in _GROUP_REF.finditer(as_text):
+        pieces.append(as_text[pos:ref.start()])
+        name = ref.group(1) or ref.group(2)
+        group = int(name) if name.isdigit() else pattern.groupindex.get(name)
+        if group is None or group > pattern.groups:
+            return lambda m: m.expand(template)  # let re raise its own error
+        pieces.append(group)
+        pos = ref.end()
+    pieces.append(as_text[pos:])
+    if any('\\' in piece for piece in pieces[::2]):
+        return lambda m: m.expand(template)
+
+    if text_type is not str:
+        pieces = [piece.encode('latin-1') if isinstance(piece, str) else piece for piece in pieces]
+    empty = text_type()
+    if len(pieces) == 1:
+        literal = pieces[0]
+        return lambda m: literal
+
+    def expand(m: re.Match) -> AnyStr:
+        return empty.join([piece if i % 2 == 0 else (m.group(piece) or empty)
+                           for i, piece in enumerate(pieces)])
+
+    return expand
+
+
+class Rule:
+    """Base class for a named codemod rule bound to one target file."""
+
+    def __init__(self, name: str, target: str, group: str = '', requires: Sequence[str] = ()):
+        self.name = name
+        self.target = target
+        self.group = group
+        # Literals every text this rule can change contains; see codemod.prefilter
+        self.requires = tuple(requires)
+
+    @property
+    def id(self) -> str:
+        return f'{self.group}.{self.name}' if self.group else self.name
+
+    def applies_to(self, path: str) -> bool:
+        """
+        Whether this rule targets ``path`` (relative to the repo root).
+        Targets may be exact paths or fnmatch patterns such as
+        ``client/src/services/*.ts``.
+        """
+        return fnmatch.fnmatchcase(path.replace(os.sep, '/'), self.target)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Changes whenever the rule's behaviour could; used as a cache key."""
+        raise NotImplementedError
+
+    @cached_property
+    def anchors(self) -> Anchors:
+        return Anchors(self.requires)
+
+    def find_edits(self, text: str, start: int = 0) -> List[Edit]:
+        """
+        Edits for ``text``.  ``start`` is where the prefilter has shown the
+        first possible match begins; rules may ignore it.
+        """
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.id!r}, target={self.target!r})'
+
+
+class RegexRule(Rule):
+    """
+    Equivalent of ``re.sub(pattern, replacement, text, flags=flags)``.
+
+    The pattern is compiled once when the rule is built, so applying the
+    rule to many files (or the same file many times) never recompiles it.
+    """
+
+    def __init__(self, name: str, target: str, pattern: str,
+                 replacement: Union[str, Callable[[re.Match], str]],
+                 flags: int = 0, group: str = ''):
+        super().__init__(name, target, group)
+        self.pattern = re.compile(pattern, flags)
+        self.replacement = replacement
+
+    @cached_property
+    def anchors(self) -> Anchors:
+        return anchors(self.pattern)
+
+    @cached_property
+    def expand(self) -> Callable[[re.Match], str]:
+        """Replacement text for one match."""
+        if callable(self.replacement):
+            return self.replacement
+        return compile_template(self.pattern, self.replacement)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        replacement = self.replacement
+        if callable(replacement):
+            replacement = _callable_digest(replacement)
+        return hashlib.sha256(
+            f'{self.pattern.pattern}\0{self.pattern.flags}\0{replacement}'.encode()
+        ).hexdigest()
+
+    def find_edits(self, text: str, start: int = 0) -> List[Edit]:
+        expand = self.expand
+        rule_id = self.id
+        return [Edit(m.start(), m.end(), expand(m), rule_id)
+                for m in self.pattern.finditer(text, start)]
+
+
+class FunctionRule(Rule):
+    """
+    Rule backed by a plain function for edits a regex cannot express,
+    such as replacing a bracketed span.  ``func(text)`` returns an
+    iterable of ``(start, end, replacement)`` tuples.
+    """
+
+    def __init__(self, name: str, target: str,
+                 func: Callable[[str], Iterable[tuple]], group: str = '',
+                 requires: Sequence[str] = ()):
+        super().__init__(name, target, group, requires)
+        self.func = func
+
+    @cached_property
+    def fingerprint(self) -> str:
+        return _callable_digest(self.func)
+
+    def find_edits(self, text: str, start: int = 0) -> List[Edit]:
+        rule_id = self.id
+        return [Edit(edit_start, end, replacement, rule_id)
+                for edit_start, end, replacement in self.func(text)]
+
+
+_REGISTRY: Dict[str, Rule] = {}
+
+
+def register(rule: Rule) -> Rule:
+    """Add ``rule`` to the shared registry and return it."""
+    existing = _REGISTRY.get(rule.id)
+    if existing is not None and existing is not rule:
+        raise ValueError(f'Duplicate codemod rule id: {rule.id}')
+    _REGISTRY[rule.id] = rule
+    return rule
+
+
+def registered_rules(group: Optional[str] = None) -> List[Rule]:
+    """Registered rules in registration order, optionally for one group."""
+    if group is None:
+        return list(_REGISTRY.values())
+    return [rule for rule in _REGISTRY.values() if rule.group == group]
+
+
+def clear_registry() -> None:
+    _REGISTRY.clear()
@@ -0,0 +1,115 @@
+"""
+Fan a codemod run out over many files with a process pool.
+
+Workers import the fix_*.py scripts themselves (so this also works with
+the ``spawn`` start method on Windows) and look rules up by id; only
+file paths and per-file results cross the process boundary.
+"""
+
+import os
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from .cache import RuleCache
+from .engine import FileResult, PatchEngine, load_fix_scripts
+from .report import rule_hits
+from .rules import registered_rules
+from .stream import STREAM_THRESHOLD
+
+_engine: Optional[PatchEngine] = None
+_ignore_targets = False
+
+
+class RunSummary(NamedTuple):
+    results: List[FileResult]
+    hits: Dict[str, int]
+
+    @property
+    def files(self) -> int:
+        return len(self.results)
+
+    @property
+    def changed(self) -> List[str]:
+        return [result.path for result in self.results if result.changed]
+
+
+def _select(rule_ids: Optional[Sequence[str]]):
+    rules = registered_rules()
+    if rule_ids is None:
+        return rules
+    wanted = set(rule_ids)
+    return [rule for rule in rules if rule.id in wanted]
+
+
+def _init_worker(scripts_dir: str, rule_ids: Optional[Sequence[str]], root: str,
+                 ignore_targets: bool, cache_dir: Optional[str], dry_run: bool,
+                 stream_threshold: Optional[int], profile: bool = False,
+                 rule_timeout: Optional[float] = None) -> None:
+    global _engine, _ignore_targets
+    load_fix_scripts(scripts_dir)
+    cache = RuleCache(cache_dir) if cache_dir else None
+    _engine = PatchEngine(_select(rule_ids), root=root, cache=cache, dry_run=dry_run,
+                          stream_threshold=stream_threshold, profile=profile, rule_timeout=rule_timeout)
+    _ignore_targets = ignore_targets
+
+
+def _run_chunk(paths: Sequence[str]) -> List[FileResult]:
+    return _engine.run_paths(paths, _ignore_targets)
+
+
+def _chunks(paths: Sequence[str], size: int) -> List[Sequence[str]]:
+    return [paths[i:i + size] for i in range(0, len(paths), size)]
+
+
+def run_parallel(paths: Sequence[str], scripts_dir: str = '.', root: str = '.',
+                 rule_ids: Optional[Sequence[str]] = None, jobs: Optional[int] = None,
+                 ignore_targets: bool = False, chunk_size: int = 16,
+                 cache_dir: Optional[str] = None, dry_run: bool = False,
+                 on_result: Optional[Callable[[FileResult], None]] = None,
+                 stream_threshold: Optional[int] = STREAM_THRESHOLD,
+                 profile: bool = False, rule_timeout: Optional[float] = None) -> RunSummary:
+    """
+    Apply the registered rules to ``paths`` using ``jobs`` worker
+    processes (default: CPU count).  ``jobs=1`` runs in-process.
+    With ``cache_dir`` set, every worker consults the shared
+    :class:`~codemod.cache.RuleCache` before touching a file.
+    ``on_result`` is called in this process as each file's result
+    arrives, e.g. to stream dry-run diffs.  Files of ``stream_threshold``
+    bytes or more are rewritten through :mod:`codemod.stream`.  With
+    ``profile`` or a ``rule_timeout`` every worker times each rule, see
+    :mod:`codemod.profiling`.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _chunks(list(paths), chunk_size)
+
+    init_args = (scripts_dir, rule_ids, root, ignore_targets, cache_dir, dry_run, stream_threshold,
+                 profile, rule_timeout)
+
+    if jobs == 1 or len(chunks) <= 1:
+        _init_worker(*init_args)
+        try:
+            batches: Iterable[List[FileResult]] = map(_run_chunk, chunks)
+            return summarize(_stream(batches, on_result), _engine.rules)
+        finally:
+            if _engine.cache is not None:
+                _engine.cache.close()
+
+    load_fix_scripts(scripts_dir)
+    selected = _select(rule_ids)
+    with Pool(jobs, _init_worker, init_args) as pool:
+        batches = pool.imap_unordered(_run_chunk, chunks)
+        return summarize(_stream(batches, on_result), selected)
+
+
+def _stream(batches: Iterable[List[FileResult]],
+            on_result: Optional[Callable[[FileResult], None]]) -> Iterator[FileResult]:
+    for batch in batches:
+        for result in batch:
+            if on_result is not None:
+                on_result(result)
+            yield result
+
+
+def summarize(results: Iterable[FileResult], rules: Iterable = ()) -> RunSummary:
+    collected = sorted(results, key=lambda result: result.path)
+    return RunSummary(collected, rule_hits(collected, rules))
@@ -0,0 +1,113 @@
+"""
+Conflict detection for edits proposed by several rules against one text.
+
+Every rule proposes its edits against the same original text.  The
+edits are fed, in rule order, into an :class:`EditIndex` that keeps the
+accepted spans sorted and pairwise disjoint, so the accepted spans a new
+edit overlaps are found by bisection.  Overlaps are resolved
+deterministically and reported:
+
+* a later edit that covers every accepted edit it overlaps replaces
+  them (the later rule rewrites that region as a whole, just as it
+  would have when rules ran one after another);
+* otherwise the later edit is dropped and the accepted edits are kept.
+
+Identical edits proposed twice are kept once and are not conflicts.
+Insertions (``start == end``) only conflict with edits that strictly
+contain their position; insertions at the same position are applied in
+rule order.
+"""
+
+import bisect
+from typing import Callable, Iterable, List, NamedTuple, Tuple
+
+from .rules import Edit
+
+
+class Conflict(NamedTuple):
+    """Edit by ``dropped`` over ``start:end`` lost to the overlapping edit by ``kept``."""
+    start: int
+    end: int
+    kept: str
+    dropped: str
+    line: int = 0
+
+
+def _covers(outer: Edit, inner: Edit) -> bool:
+    return outer.start <= inner.start and inner.end <= outer.end and outer.start < outer.end
+
+
+class EditIndex:
+    """Accepted edits, sorted by ``(start, end)`` and pairwise non-overlapping."""
+
+    def __init__(self):
+        self._edits: List[Edit] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []  # non-decreasing, because accepted edits are disjoint
+
+    def __len__(self) -> int:
+        return len(self._edits)
+
+    def edits(self) -> List[Edit]:
+        return list(self._edits)
+
+    def overlapping(self, edit: Edit) -> Tuple[int, int]:
+        """Index range of the accepted edits that overlap ``edit``."""
+        lo = bisect.bisect_right(self._ends, edit.start)
+        return lo, bisect.bisect_left(self._starts, edit.end, lo)
+
+    def _has_same(self, edit: Edit) -> bool:
+        """Whether an edit with the same span and text was already accepted."""
+        i = bisect.bisect_left(self._starts, edit.start)
+        while i < len(self._edits) and self._starts[i] == edit.start:
+            if self._edits[i][:3] == edit[:3]:
+                return True
+            i += 1
+        return False
+
+    def add(self, edit: Edit) -> List[Conflict]:
+        """Accept ``edit`` unless it conflicts; returns the conflicts it caused."""
+        if self._has_same(edit):
+            return []
+        lo, hi = self.overlapping(edit)
+        existing = self._edits[lo:hi]
+        if existing and not all(_covers(edit, other) for other in existing):
+            return [Conflict(edit.start, edit.end, other.rule, edit.rule) for other in existing]
+
+        conflicts = [Conflict(other.start, other.end, edit.rule, other.rule) for other in existing]
+        del self._edits[lo:hi], self._starts[lo:hi], self._ends[lo:hi]
+        i = bisect.bisect_right(self._starts, edit.start)
+        while i > 0 and self._starts[i - 1] == edit.start and self._ends[i - 1] > edit.end:
+            i -= 1  # an insertion sorts before a replacement starting at the same place
+        self._edits.insert(i, edit)
+        self._starts.insert(i, edit.start)
+        self._ends.insert(i, edit.end)
+        return conflicts
+
+
+def resolve_edits(edits: Iterable[Edit]) -> Tuple[List[Edit], List[Conflict]]:
+    """
+    Accept ``edits`` in the given (rule) order and return the surviving
+    edits, sorted, together with every conflict found on the way.
+    """
+    index = EditIndex()
+    conflicts: List[Conflict] = []
+    for edit in edits:
+        conflicts.extend(index.add(edit))
+    return index.edits(), conflicts
+
+
+def number_lines(conflicts: Iterable[Conflict],
+                 count_newlines: Callable[[int, int], int]) -> List[Conflict]:
+    """
+    ``conflicts`` with their 1-based ``line`` filled in, sorted by
+    position.  ``count_newlines(start, end)`` counts the newlines in that
+    range of the original text; ranges are visited once, front to back.
+    """
+    numbered = []
+    line, pos = 1, 0
+    for conflict in sorted(conflicts, key=lambda c: (c.start, c.end)):
+        line += count_newlines(pos, conflict.start)
+        pos = conflict.start
+        numbered.append(conflict._replace(line=line))
+    return numbered
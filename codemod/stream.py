@@ -0,0 +1,179 @@
+"""
+Streaming rewrite path for large files (generated bundles, exported
+manuscript JSON).
+
+The in-memory path decodes the whole file and builds the new text in
+one join, so peak memory is a few copies of the file.  Here the input is
+memory-mapped, each rule's pattern runs as a bytes regex directly over
+the map, the proposed edits are resolved as in the in-memory path
+(:mod:`codemod.spans`), and the output is streamed in one pass to a
+temporary file in the same directory as unchanged spans plus
+replacements, then renamed over the original.  Peak memory stays near
+the size of the replacements rather than of the file.
+
+Only :class:`~codemod.rules.RegexRule` rules with template replacements
+can be streamed.  Bytes patterns use ASCII semantics for ``\\w``, ``\\s``
+and ``\\b``, and line endings are preserved as they are on disk, so
+files containing ``\\r`` are left to the in-memory path, which
+normalises newlines first.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from .profiling import RuleTimer
+from .rules import Edit, RegexRule, Rule, compile_template
+from .spans import Conflict, number_lines, resolve_edits
+
+# Files at least this large are streamed when all their rules allow it
+STREAM_THRESHOLD = 8 * 1024 * 1024
+
+# Largest slice of unchanged input written in one call
+CHUNK_SIZE = 1024 * 1024
+
+
+def streamable(rule: Rule) -> bool:
+    """Whether ``rule`` can run as a bytes regex over a memory map."""
+    return (isinstance(rule, RegexRule)
+            and not callable(rule.replacement)
+            and rule.pattern.pattern.isascii())
+
+
+@lru_cache(maxsize=None)
+def _byte_rule(rule: RegexRule, encoding: str) -> Tuple[Pattern[bytes], Callable[[re.Match], bytes]]:
+    pattern = re.compile(rule.pattern.pattern.encode('ascii'), rule.pattern.flags & ~re.UNICODE)
+    return pattern, compile_template(pattern, rule.replacement.encode(encoding))
+
+
+def _new_temp(path: str) -> Tuple[int, str]:
+    return tempfile.mkstemp(prefix='.codemod-', suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+
+
+def _commit(tmp: str, path: str) -> None:
+    """Rename the finished temporary file ``tmp`` over ``path``, keeping its permissions."""
+    if os.path.exists(path):
+        shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def atomic_writer(path: str) -> Iterator[BinaryIO]:
+    """
+    Open a temporary file next to ``path``; on success it is flushed and
+    renamed over ``path``, so readers never see a half-written file.  On
+    error the temporary file is removed.
+    """
+    fd, tmp = _new_temp(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        _commit(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _write_span(out: BinaryIO, view: memoryview, start: int, end: int) -> None:
+    for pos in range(start, end, CHUNK_SIZE):
+        out.write(view[pos:min(pos + CHUNK_SIZE, end)])
+
+
+def _rewrite(out: BinaryIO, mapped: mmap.mmap, edits: Iterable[Edit]) -> None:
+    """Stream ``mapped`` into ``out`` with the sorted, disjoint ``edits`` spliced in."""
+    pos = 0
+    with memoryview(mapped) as view:
+        for edit in edits:
+            _write_span(out, view, pos, edit.start)
+            out.write(edit.text)
+            pos = edit.end
+        _write_span(out, view, pos, len(mapped))
+
+
+def _count_newlines(mapped: mmap.mmap, start: int, end: int) -> int:
+    count = 0
+    for pos in range(start, end, CHUNK_SIZE):
+        count += mapped[pos:min(pos + CHUNK_SIZE, end)].count(b'\n')
+    return count
+
+
+@contextmanager
+def _mapped(path: str) -> Iterator[mmap.mmap]:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def stream_rewrite(path: str, rules: Iterable[Rule], encoding: str = 'utf-8',
+                   timer: Optional[RuleTimer] = None) -> Optional[Tuple[bool, Dict[str, int], List[Conflict]]]:
+    """
+    Apply ``rules`` to the file at ``path`` without loading it.
+
+    Every rule runs over the original bytes, overlapping edits are
+    resolved exactly as by :meth:`PatchEngine.apply_text` (with conflict
+    offsets in bytes), and the survivors are written in a single pass;
+    nothing is written when no edit would change the file.  Returns
+    ``(changed, hits, conflicts)``, or None when the file cannot be
+    streamed (empty, contains ``\\r``, not in an ASCII-compatible
+    encoding, or a rule is not :func:`streamable`), in which case nothing
+    was written.  With a ``timer``, every rule's pass is timed (and may
+    time out).
+    """
+    rules = list(rules)
+    if '\n'.encode(encoding) != b'\n' or not all(streamable(rule) for rule in rules):
+        return None  # not an ASCII-compatible encoding, or a rule needs the decoded text
+    if os.path.getsize(path) == 0:
+        return None
+
+    with _mapped(path) as mapped:
+        if mapped.find(b'\r') != -1:
+            return None
+        hits: Dict[str, int] = {}
+        proposed: List[Edit] = []
+        for rule in rules:
+            hits[rule.id] = 0
+            if any(mapped.find(literal.encode(encoding)) == -1 for literal in rule.anchors.literals):
+                if timer is not None:
+                    timer.skip(rule.id)
+                continue
+            pattern, expand = _byte_rule(rule, encoding)
+            rule_id = rule.id
+
+            def search() -> List[Edit]:
+                # Edits copy what they need, so no match keeps a buffer on the map
+                return [Edit(m.start(), m.end(), expand(m), rule_id) for m in pattern.finditer(mapped)]
+
+            proposed.extend(search() if timer is None else timer.run(rule_id, len(mapped), search))
+        edits, conflicts = resolve_edits(proposed)
+        del proposed
+        if conflicts:
+            conflicts = number_lines(conflicts, lambda start, end: _count_newlines(mapped, start, end))
+        for edit in edits:
+            hits[edit.rule] += 1
+        # Edits that leave their span as it is would only rewrite the file unchanged
+        edits = [edit for edit in edits if mapped[edit.start:edit.end] != edit.text]
+        if not edits:
+            return False, hits, conflicts
+
+        fd, tmp = _new_temp(path)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                _rewrite(out, mapped, edits)
+                out.flush()
+                os.fsync(out.fileno())
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    try:
+        _commit(tmp, path)  # only once the map is closed, which Windows requires
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True, hits, conflicts
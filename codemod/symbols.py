@@ -0,0 +1,326 @@
+"""
+Symbol index over the TypeScript sources, for checking what the codemods
+produced without running ``tsc``.
+
+    python -m codemod.symbols --interface AIPersonality
+    python -m codemod.symbols --uses wordsAdded --calls getCurrentSession
+    python -m codemod.symbols --method AIWritingCompanionService.getCurrentSession
+
+Every file is reduced to a :class:`FileSymbols`: its interfaces with
+their fields, its classes with their method names, its call sites and
+the member names it uses (``.name`` accesses and object literal keys,
+including shorthand ones).  Strings, comments and regex literals are
+blanked first, so ``'getCurrentSession()'`` in a log message is not a
+call.  Like :mod:`codemod.outline`, this is a scan, not a type checker.
+
+The index lives in a SQLite file next to the rule cache, one compressed
+row per file.  :meth:`SymbolIndex.update` re-parses only the files whose
+content hash changed (unchanged stat stamps are not even read), and
+queries go to inverted maps held in memory.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .cache import DEFAULT_CACHE_DIR, content_hash, toolkit_version
+from .engine import expand_globs
+from .outline import Outline
+from .tslex import bracket_index
+
+DEFAULT_GLOBS = ('client/src/**/*.ts', 'client/src/**/*.tsx')
+
+_IDENT = r'[A-Za-z_$][\w$]*'
+_CALL = re.compile(rf'(?<![\w$])({_IDENT})\s*(?:<[^<>()\n]*>\s*)?\(')
+_FUNCTION_KEYWORD = re.compile(r'\bfunction[ \t]*\*?[ \t]*\Z')
+_MEMBER = re.compile(rf'(?:\?\.|\.)\s*({_IDENT})')
+_KEY = re.compile(rf'(?<=[{{,])\s*({_IDENT})\s*(?=[:,}}])')
+
+# Words followed by '(' that are not calls
+_NOT_CALLS = frozenset({
+    'if', 'for', 'while', 'switch', 'catch', 'function', 'return', 'typeof', 'await',
+    'super', 'constructor', 'void', 'delete', 'in', 'of', 'instanceof', 'yield',
+})
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS symbols (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+class FieldSymbol(NamedTuple):
+    name: str
+    optional: bool
+    type: str
+
+
+class FileSymbols(NamedTuple):
+    interfaces: Dict[str, List[FieldSymbol]]
+    classes: Dict[str, List[str]]   # class name -> method names
+    calls: Dict[str, List[int]]     # callee name -> line numbers
+    uses: List[str]                 # member names used, sorted
+
+    def to_json(self) -> bytes:
+        return zlib.compress(json.dumps(self, separators=(',', ':')).encode())
+
+    @classmethod
+    def from_json(cls, data: bytes) -> 'FileSymbols':
+        interfaces, classes, calls, uses = json.loads(zlib.decompress(data))
+        return cls({name: [FieldSymbol(*field) for field in fields] for name, fields in interfaces.items()},
+                   classes, calls, uses)
+
+
+def _enclosing(brackets, pos: int) -> Optional[int]:
+    """Opening position of the innermost bracket pair around ``pos``."""
+    opens = brackets.opens
+    pairs = brackets.pairs
+    i = bisect.bisect_left(opens, pos) - 1
+    while i >= 0:
+        close = pairs.get(opens[i])
+        if close is None or close > pos:
+            return opens[i]
+        i -= 1
+    return None
+
+
+def parse_symbols(text: str) -> FileSymbols:
+    brackets = bracket_index(text)
+    tree = Outline(text, brackets)
+    code = brackets.code()
+    interfaces = {
+        name: [FieldSymbol(field.name, field.optional, field.type) for field in info.fields]
+        for name, info in tree.interfaces.items()
+    }
+    classes = {name: [method.name for method in info.methods] for name, info in tree.classes.items()}
+    # Declarations are not calls, and their bodies hold fields rather than object keys
+    declared = {method.params for info in tree.classes.values() for method in info.methods}
+    bodies = {info.body[0] for info in tree.interfaces.values()}
+    bodies.update(info.body[0] for info in tree.classes.values())
+
+    line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+    calls: Dict[str, List[int]] = {}
+    for m in _CALL.finditer(code):
+        name = m.group(1)
+        start = m.start()
+        if (name in _NOT_CALLS or m.end() - 1 in declared
+                or _FUNCTION_KEYWORD.search(code, max(0, start - 12), start)):
+            continue
+        calls.setdefault(name, []).append(bisect.bisect_right(line_starts, start))
+
+    uses: Set[str] = {m.group(1) for m in _MEMBER.finditer(code)}
+    for m in _KEY.finditer(code):
+        owner = _enclosing(brackets, m.start(1))
+        if owner is not None and code[owner] == '{' and owner not in bodies:
+            uses.add(m.group(1))
+    return FileSymbols(interfaces, classes, calls, sorted(uses))
+
+
+class Declaration(NamedTuple):
+    path: str
+    name: str
+
+
+class SymbolIndex:
+    """
+    Persistent symbol index of the files matching ``globs`` under
+    ``root``.  Call :meth:`update` before querying.
+    """
+
+    def __init__(self, root: str = '.', directory: Optional[str] = None,
+                 globs: Sequence[str] = DEFAULT_GLOBS):
+        self.root = root
+        self.globs = list(globs)
+        directory = directory or os.path.join(root, DEFAULT_CACHE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, 'symbols.sqlite3'), timeout=30)
+        self.db.executescript(_SCHEMA)
+        self._check_version()
+        self.stamps: Dict[str, Tuple[int, int, int, str]] = {}
+        self.files: Dict[str, FileSymbols] = {}
+        for path, mtime_ns, size, inode, digest, data in self.db.execute('SELECT * FROM symbols'):
+            self.stamps[path] = (mtime_ns, size, inode, digest)
+            self.files[path] = FileSymbols.from_json(data)
+        self._inverted: Optional[Dict[str, Dict[str, List[str]]]] = None
+
+    def _check_version(self) -> None:
+        """Drop every row when the parser (part of the toolkit) has changed."""
+        version = hashlib.sha256(f'symbols:{toolkit_version()}'.encode()).hexdigest()
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            with self.db:
+                self.db.execute('DELETE FROM symbols')
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> 'SymbolIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def update(self, paths: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Bring the index up to date with ``paths`` (relative to ``root``),
+        or with everything ``globs`` match, in which case files that no
+        longer exist are dropped.  Returns the paths that were re-parsed.
+        """
+        full = paths is None
+        paths = expand_globs(self.globs, self.root) if full else list(paths)
+        parsed = []
+        rows = []
+        for path in paths:
+            try:
+                st = os.stat(os.path.join(self.root, path))
+            except OSError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+            known = self.stamps.get(path)
+            if known is not None and known[:3] == stamp:
+                continue
+            with open(os.path.join(self.root, path), 'rb') as f:
+                data = f.read()
+            digest = content_hash(data)
+            if known is None or known[3] != digest:
+                self.files[path] = parse_symbols(data.decode('utf-8', 'replace'))
+                parsed.append(path)
+            self.stamps[path] = (*stamp, digest)
+            rows.append((path, *stamp, digest, self.files[path].to_json()))
+
+        wanted = set(paths)
+        gone = [path for path in self.stamps if path not in wanted] if full else []
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.db.executemany('DELETE FROM symbols WHERE path = ?', [(path,) for path in gone])
+        for path in gone:
+            del self.stamps[path], self.files[path]
+        if parsed or gone:
+            self._inverted = None
+        return parsed
+
+    def _maps(self) -> Dict[str, Dict[str, List[str]]]:
+        if self._inverted is None:
+            maps: Dict[str, Dict[str, List[str]]] = {'interface': {}, 'class': {}, 'use': {}, 'call': {}}
+            for path in sorted(self.files):
+                symbols = self.files[path]
+                for name in symbols.interfaces:
+                    maps['interface'].setdefault(name, []).append(path)
+                for name in symbols.classes:
+                    maps['class'].setdefault(name, []).append(path)
+                for name in symbols.uses:
+                    maps['use'].setdefault(name, []).append(path)
+                for name in symbols.calls:
+                    maps['call'].setdefault(name, []).append(path)
+            self._inverted = maps
+        return self._inverted
+
+    def interfaces(self, name: str) -> List[Declaration]:
+        """Files declaring interface ``name``."""
+        return [Declaration(path, name) for path in self._maps()['interface'].get(name, [])]
+
+    def fields(self, interface: str) -> Dict[str, FieldSymbol]:
+        """Fields of ``interface``, merged over every file declaring it."""
+        merged: Dict[str, FieldSymbol] = {}
+        for path in self._maps()['interface'].get(interface, []):
+            for field in self.files[path].interfaces[interface]:
+                merged.setdefault(field.name, field)
+        return merged
+
+    def has_field(self, interface: str, field: str) -> bool:
+        return field in self.fields(interface)
+
+    def has_method(self, class_name: str, method: str) -> bool:
+        return any(method in self.files[path].classes[class_name]
+                   for path in self._maps()['class'].get(class_name, []))
+
+    def methods(self, name: str) -> List[Declaration]:
+        """Classes (with their files) declaring a method called ``name``."""
+        return [Declaration(path, class_name)
+                for path in sorted(self.files)
+                for class_name, methods in self.files[path].classes.items() if name in methods]
+
+    def files_using(self, member: str) -> List[str]:
+        """Files that access ``.member`` or use it as an object literal key."""
+        return list(self._maps()['use'].get(member, []))
+
+    def call_sites(self, name: str) -> List[Tuple[str, int]]:
+        """``(path, line)`` of every call to a function or method called ``name``."""
+        return [(path, line) for path in self._maps()['call'].get(name, [])
+                for line in self.files[path].calls[name]]
+
+    def object_problems(self, interface: str, keys: Iterable[str]) -> List[str]:
+        """
+        Why an object literal with ``keys`` would not type-check as
+        ``interface``: keys it does not declare, and required fields
+        missing from ``keys``.  Empty when it matches.
+        """
+        fields = self.fields(interface)
+        if not fields:
+            return [f'interface {interface} not found']
+        keys = set(keys)
+        problems = [f'{interface} has no field {key!r}' for key in sorted(keys - fields.keys())]
+        problems.extend(f'{interface}.{field.name} is required but missing'
+                        for field in fields.values() if not field.optional and field.name not in keys)
+        return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m codemod.symbols',
+                                     description='Query the TypeScript symbol index.')
+    parser.add_argument('globs', nargs='*', default=list(DEFAULT_GLOBS), help='files to index')
+    parser.add_argument('--root', default='.', help='repository root the globs are relative to')
+    parser.add_argument('--interface', action='append', default=[], metavar='NAME',
+                        help='print the files and fields of an interface')
+    parser.add_argument('--method', action='append', default=[], metavar='CLASS.METHOD',
+                        help='check that a class declares a method')
+    parser.add_argument('--uses', action='append', default=[], metavar='NAME',
+                        help='print the files using a member name')
+    parser.add_argument('--calls', action='append', default=[], metavar='NAME',
+                        help='print the call sites of a function or method')
+    args = parser.parse_args(argv)
+
+    with SymbolIndex(args.root, globs=args.globs) as index:
+        parsed = index.update()
+        print(f'{len(index.files)} files indexed, {len(parsed)} re-parsed')
+        missing = False
+        for name in args.interface:
+            declarations = index.interfaces(name)
+            missing = missing or not declarations
+            print(f'interface {name}: {", ".join(d.path for d in declarations) or "not found"}')
+            for field in index.fields(name).values():
+                print(f'  {field.name}{"?" if field.optional else ""}: {field.type}')
+        for spec in args.method:
+            class_name, _, method = spec.partition('.')
+            found = index.has_method(class_name, method)
+            missing = missing or not found
+            print(f'{spec}: {"declared" if found else "not found"}')
+        for name in args.uses:
+            print(f'uses {name}: {", ".join(index.files_using(name)) or "none"}')
+        for name in args.calls:
+            sites = index.call_sites(name)
+            print(f'calls {name}: {len(sites)}')
+            for path, line in sites:
+                print(f'  {path}:{line}')
+    return 1 if missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
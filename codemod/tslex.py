@@ -0,0 +1,218 @@
+"""
+Token-aware bracket matching for TypeScript sources.
+
+The scanner skips string literals, template literals (including nested
+``${...}`` expressions), comments and regex literals, so a ``]`` inside
+``'a]b'`` or ``// ]`` never closes an array.  A file is scanned once into
+a bracket-pair table; every query after that is a dict lookup or a
+bisect over the sorted opening positions.  The spans it skipped are kept
+too, so callers can look at code only (see :meth:`BracketIndex.code`).
+"""
+
+import bisect
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+_CODE = re.compile(r'''
+    (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?)
+  | (?P<template>`)
+  | (?P<slash>/)
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+''', re.VERBOSE | re.DOTALL)
+
+# Body of a template literal up to its closing backtick or the next ${
+_TEMPLATE = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*(`|\$\{)?', re.DOTALL)
+
+_REGEX_LITERAL = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+
+_TRAILING_WORD = re.compile(r'[\w$]+$')
+
+# A '/' after one of these words starts a regex literal, not a division
+_REGEX_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+})
+
+_OPENER = {')': '(', ']': '[', '}': '{'}
+
+# Characters that can precede a '{' opening an object *type* inside a
+# signature, as opposed to the function body itself
+_TYPE_BRACE_PREFIX = frozenset(':<,|&(=')
+
+
+def _regex_allowed(text: str, pos: int) -> bool:
+    """Whether a '/' at ``pos`` can start a regex literal."""
+    if pos and text[pos - 1] == '<':
+        return False  # JSX closing tag
+    j = pos - 1
+    while j >= 0 and text[j].isspace():
+        j -= 1
+    if j < 0:
+        return True
+    prev = text[j]
+    if prev in ')]}\'"`':
+        return False
+    if prev.isalnum() or prev in '_$':
+        word = _TRAILING_WORD.search(text, max(0, j - 15), j + 1)
+        return word is not None and word.group() in _REGEX_KEYWORDS
+    return True
+
+
+def _prev_significant(text: str, pos: int) -> str:
+    j = pos - 1
+    while j >= 0 and text[j].isspace():
+        j -= 1
+    return text[j] if j >= 0 else ''
+
+
+class BracketIndex:
+    """Bracket-pair table for one TypeScript source text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pairs: Dict[int, int] = {}
+        self.opens: List[int] = []
+        # Comments, strings, regex literals and template text, in order
+        self.literals: List[Tuple[int, int]] = []
+        self._scan()
+
+    def _scan(self) -> None:
+        text = self.text
+        pairs = self.pairs
+        opens = self.opens
+        literals = self.literals
+        # (position, opening char, closes a template ${ } expression)
+        stack: List[Tuple[int, str, bool]] = []
+        pos = 0
+
+        while True:
+            m = _CODE.search(text, pos)
+            if m is None:
+                break
+            kind = m.lastgroup
+            start = m.start()
+            pos = m.end()
+
+            if kind == 'open':
+                stack.append((start, m.group(), False))
+                opens.append(start)
+            elif kind == 'close':
+                if not stack or stack[-1][1] != _OPENER[m.group()]:
+                    continue  # unbalanced source; ignore the stray closer
+                open_pos, _, in_template = stack.pop()
+                pairs[open_pos] = start
+                pairs[start] = open_pos
+                if in_template:
+                    pos = self._scan_template(pos, stack)
+            elif kind == 'template':
+                pos = self._scan_template(pos, stack)
+            elif kind == 'slash':
+                if _regex_allowed(text, start):
+                    literal = _REGEX_LITERAL.match(text, start)
+                    if literal is not None:
+                        pos = literal.end()
+                        literals.append((start, pos))
+            else:
+                literals.append((start, pos))
+
+        opens.sort()
+
+    def _scan_template(self, pos: int, stack: List[Tuple[int, str, bool]]) -> int:
+        """Skip template text from ``pos``; returns where code resumes."""
+        m = _TEMPLATE.match(self.text, pos)
+        if m.group(1) == '${':
+            brace = m.end() - 1
+            stack.append((brace, '{', True))
+            self.opens.append(brace)
+            self.literals.append((pos, brace))
+        else:
+            self.literals.append((pos, m.end()))
+        return m.end()
+
+    def match(self, pos: int) -> Optional[int]:
+        """Position of the bracket paired with the one at ``pos``."""
+        return self.pairs.get(pos)
+
+    def next_open(self, pos: int) -> Optional[int]:
+        """First opening bracket at or after ``pos``."""
+        i = bisect.bisect_left(self.opens, pos)
+        return self.opens[i] if i < len(self.opens) else None
+
+    def span_after(self, needle: str, start: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Span from the first ``needle`` at or after ``start`` through the
+        bracket that closes the first bracket opened by (or after) it.
+
+            index.span_after('this.personalities = [')
+        """
+        found = self.text.find(needle, start)
+        if found == -1:
+            return None
+        open_pos = self.next_open(found + len(needle) - 1)
+        close_pos = self.match(open_pos) if open_pos is not None else None
+        if close_pos is None:
+            return None
+        return found, close_pos + 1
+
+    def block_after(self, pos: int) -> Optional[Tuple[int, int]]:
+        """
+        Span of the first ``{ ... }`` block at or after ``pos`` that is not
+        an object type in an annotation (``: { id: string }``,
+        ``Promise<{ ... }>``).  Brackets before it are skipped as units.
+        """
+        while True:
+            open_pos = self.next_open(pos)
+            if open_pos is None:
+                return None
+            close_pos = self.match(open_pos)
+            if close_pos is None:
+                return None
+            if (self.text[open_pos] == '{'
+                    and _prev_significant(self.text, open_pos) not in _TYPE_BRACE_PREFIX):
+                return open_pos, close_pos + 1
+            pos = close_pos + 1
+
+    def body_after(self, paren: int) -> Optional[Tuple[int, int]]:
+        """
+        Span of the ``{ ... }`` body of a function or method whose
+        parameter list opens at ``paren``.  Braces of object types in the
+        return annotation (``): Promise<{ id: string }> {``) are skipped.
+        """
+        close_paren = self.match(paren)
+        if close_paren is None:
+            return None
+        return self.block_after(close_paren + 1)
+
+    def code(self) -> str:
+        """The text with every literal and comment blanked out, offsets unchanged."""
+        text = self.text
+        parts = []
+        pos = 0
+        for start, end in self.literals:
+            parts.append(text[pos:start])
+            parts.append(' ' * (end - start))
+            pos = end
+        parts.append(text[pos:])
+        return ''.join(parts)
+
+    def children(self, open_pos: int) -> List[int]:
+        """Opening positions of the brackets directly inside the pair at ``open_pos``."""
+        close_pos = self.pairs[open_pos]
+        found = []
+        pos = open_pos + 1
+        while True:
+            child = self.next_open(pos)
+            if child is None or child >= close_pos:
+                return found
+            found.append(child)
+            pos = self.pairs.get(child, child) + 1
+
+
+@lru_cache(maxsize=32)
+def bracket_index(text: str) -> BracketIndex:
+    """Shared :class:`BracketIndex` so repeated queries reuse one scan."""
+    return BracketIndex(text)
@@ -0,0 +1,177 @@
+"""
+Emit TypeScript literals from Python data.
+
+    ts_literal({'id': 'mentor', 'traits': {'creative': 60}, 'tags': ['a', "b's"]})
+    ts_const('mockProjects', projects, type='Project[]', export=True)
+
+Strings are escaped for the chosen quote character (backslashes, quotes,
+newlines, other control characters and the U+2028/U+2029 separators
+that end a line in JavaScript), object keys are left bare only when they
+are valid identifiers, and the whole literal is built as one list of
+pieces joined at the end, so emitting a table with thousands of entries
+stays linear in the size of the output.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*\Z', re.ASCII)
+
+
+class TSExpression(str):
+    """Source text emitted verbatim, e.g. ``TSExpression('new Date().toISOString()')``."""
+
+
+def _escape_table(quote: str) -> Dict[int, str]:
+    table = {code: f'\\x{code:02x}' for code in [*range(0x20), 0x7f]}
+    table.update({
+        ord('\\'): '\\\\',
+        ord(quote): '\\' + quote,
+        ord('\n'): '\\n',
+        ord('\r'): '\\r',
+        ord('\t'): '\\t',
+        ord('\b'): '\\b',
+        ord('\f'): '\\f',
+        ord('\v'): '\\v',
+        0x2028: '\\u2028',
+        0x2029: '\\u2029',
+    })
+    return table
+
+
+_ESCAPES = {quote: _escape_table(quote) for quote in ('\'', '"')}
+
+
+def ts_string(value: str, quote: str = '\'') -> str:
+    """``value`` as a TypeScript string literal using ``quote``."""
+    return quote + value.translate(_ESCAPES[quote]) + quote
+
+
+def ts_key(key: Any, quote: str = '\'') -> str:
+    """Object literal key: bare when it is an identifier or a number, quoted otherwise."""
+    if isinstance(key, bool) or not isinstance(key, (str, int)):
+        raise TypeError(f'Object keys must be str or int, not {type(key).__name__}')
+    if isinstance(key, int):
+        return str(key) if key >= 0 else ts_string(str(key), quote)
+    return key if _IDENTIFIER.match(key) else ts_string(key, quote)
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return repr(value)
+
+
+class LiteralEmitter:
+    """
+    Serializes dicts, lists/tuples, strings, numbers, booleans, None and
+    :class:`TSExpression` values.  Lists of scalars are kept on one line
+    when they fit in ``inline_width`` columns; everything else is laid
+    out one entry per line, indented by ``indent`` per level.
+    """
+
+    def __init__(self, indent: str = '  ', quote: str = '\'', inline_width: int = 100,
+                 trailing_comma: bool = False):
+        if quote not in _ESCAPES:
+            raise ValueError(f'quote must be \' or ", not {quote!r}')
+        self.indent = indent
+        self.quote = quote
+        self.inline_width = inline_width
+        self.trailing_comma = trailing_comma
+        self._indents: List[str] = ['']
+
+    def emit(self, value: Any, level: int = 0) -> str:
+        """``value`` as a literal whose first line continues an existing line at ``level``."""
+        out: List[str] = []
+        self._write(value, level, out)
+        return ''.join(out)
+
+    def _pad(self, level: int) -> str:
+        indents = self._indents
+        while len(indents) <= level:
+            indents.append(indents[-1] + self.indent)
+        return indents[level]
+
+    def _scalar(self, value: Any) -> Optional[str]:
+        if isinstance(value, TSExpression):
+            return str(value)
+        if isinstance(value, str):
+            return ts_string(value, self.quote)
+        if value is None:
+            return 'null'
+        if value is True:
+            return 'true'
+        if value is False:
+            return 'false'
+        if isinstance(value, int):
+            return str(value)
+        if isinstance(value, float):
+            return _number(value)
+        return None
+
+    def _write(self, value: Any, level: int, out: List[str]) -> None:
+        scalar = self._scalar(value)
+        if scalar is not None:
+            out.append(scalar)
+        elif isinstance(value, dict):
+            self._write_object(value, level, out)
+        elif isinstance(value, (list, tuple)):
+            self._write_array(value, level, out)
+        else:
+            raise TypeError(f'Cannot emit {type(value).__name__} as a TypeScript literal')
+
+    def _write_array(self, items, level: int, out: List[str]) -> None:
+        if not items:
+            out.append('[]')
+            return
+        scalars = [self._scalar(item) for item in items]
+        if None not in scalars:
+            inline = '[' + ', '.join(scalars) + ']'
+            if len(self._pad(level)) + len(inline) <= self.inline_width:
+                out.append(inline)
+                return
+        inner = self._pad(level + 1)
+        out.append('[\n')
+        last = len(items) - 1
+        for i, item in enumerate(items):
+            out.append(inner)
+            if scalars[i] is not None:
+                out.append(scalars[i])
+            else:
+                self._write(item, level + 1, out)
+            out.append(',\n' if i < last or self.trailing_comma else '\n')
+        out.append(self._pad(level))
+        out.append(']')
+
+    def _write_object(self, mapping: Dict, level: int, out: List[str]) -> None:
+        if not mapping:
+            out.append('{}')
+            return
+        inner = self._pad(level + 1)
+        out.append('{\n')
+        last = len(mapping) - 1
+        for i, (key, item) in enumerate(mapping.items()):
+            out.append(inner)
+            out.append(ts_key(key, self.quote))
+            out.append(': ')
+            self._write(item, level + 1, out)
+            out.append(',\n' if i < last or self.trailing_comma else '\n')
+        out.append(self._pad(level))
+        out.append('}')
+
+
+def ts_literal(value: Any, level: int = 0, **options) -> str:
+    """Shorthand for ``LiteralEmitter(**options).emit(value, level)``."""
+    return LiteralEmitter(**options).emit(value, level)
+
+
+def ts_const(name: str, value: Any, type: Optional[str] = None, export: bool = False,
+             level: int = 0, **options) -> str:
+    """A ``const`` declaration, e.g. ``export const mockNotes: Note[] = [...];``."""
+    emitter = LiteralEmitter(**options)
+    annotation = f': {type}' if type else ''
+    prefix = 'export const' if export else 'const'
+    return f'{emitter.indent * level}{prefix} {name}{annotation} = {emitter.emit(value, level)};'
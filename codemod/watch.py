@@ -0,0 +1,132 @@
+"""
+Watch mode: keep the rules, the engine and the parsed bracket tables and
+outlines of recently seen texts in one long-running process, and re-run
+the rules on a file as soon as it is saved.
+
+    python -m codemod --watch
+    python -m codemod --watch 'client/src/**/*.ts' --ignore-targets
+
+Changes are found by polling ``os.stat`` (standard library only, so it
+behaves the same on every platform and inside containers).  A burst of
+saves, such as a merge or a formatter run, is coalesced: once something
+changes, the watcher waits until the tree has been quiet for
+``debounce`` seconds and then processes every changed file once.
+"""
+
+import os
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .engine import FileResult, PatchEngine, expand_globs, group_by_target
+
+# (mtime_ns, size, inode); None when the file does not exist
+Stamp = Optional[Tuple[int, int, int]]
+
+
+def _stamp(path: str) -> Stamp:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class Batch(NamedTuple):
+    results: List[FileResult]
+    seconds: float
+    errors: List[Tuple[str, str]] = []  # (path, message) for files that could not be processed
+
+
+class Watcher:
+    """
+    Re-apply ``engine``'s rules to files as they change.
+
+    ``globs`` (relative to the engine root) select the files to watch and
+    are re-expanded every ``rescan`` seconds to pick up new files; without
+    them the rules' own targets are watched.
+    """
+
+    def __init__(self, engine: PatchEngine, globs: Sequence[str] = (),
+                 ignore_targets: bool = False, interval: float = 0.1,
+                 debounce: float = 0.05, rescan: float = 2.0):
+        self.engine = engine
+        self.globs = list(globs)
+        self.ignore_targets = ignore_targets
+        self.interval = interval
+        self.debounce = debounce
+        self.rescan = rescan
+        self.stamps: Dict[str, Stamp] = {}
+        self._expanded_at = float('-inf')
+        self._paths: List[str] = []
+
+    def paths(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._expanded_at >= self.rescan:
+            if self.globs:
+                self._paths = expand_globs(self.globs, self.engine.root)
+            else:
+                self._paths = list(group_by_target(self.engine.rules))
+            self._expanded_at = now
+        return self._paths
+
+    def poll(self) -> List[str]:
+        """Paths whose stat changed since they were last seen, and remember them."""
+        changed = []
+        for path in self.paths():
+            stamp = _stamp(self.engine.resolve(path))
+            if path not in self.stamps or self.stamps[path] != stamp:
+                changed.append(path)
+            self.stamps[path] = stamp
+        return changed
+
+    def prime(self) -> None:
+        """Record the current state of every watched file without processing it."""
+        self.poll()
+
+    def settle(self, changed: List[str]) -> List[str]:
+        """Keep polling until nothing has changed for ``debounce`` seconds."""
+        pending = dict.fromkeys(changed)
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(min(self.interval, self.debounce))
+            more = self.poll()
+            if more:
+                pending.update(dict.fromkeys(more))
+                quiet_since = time.monotonic()
+        return list(pending)
+
+    def process(self, paths: Iterable[str]) -> Batch:
+        started = time.perf_counter()
+        results = []
+        errors = []
+        for path in paths:
+            full = self.engine.resolve(path)
+            if self.stamps.get(path) is None:
+                continue  # deleted
+            rules = self.engine.rules_for(path, self.ignore_targets)
+            if not rules:
+                continue
+            try:
+                result = self.engine.run_file(path, rules)
+            except Exception as exc:  # keep watching; the next save retries this file
+                errors.append((path, f'{type(exc).__name__}: {exc}'))
+                continue
+            if result.changed and not self.engine.dry_run:
+                # Our own write must not look like another edit
+                self.stamps[path] = _stamp(full)
+            results.append(result)
+        return Batch(results, time.perf_counter() - started, errors)
+
+    def serve(self, on_batch: Callable[[Batch], None],
+              should_stop: Callable[[], bool] = lambda: False) -> None:
+        """Process changes until ``should_stop()`` returns True (or Ctrl-C)."""
+        self.prime()
+        try:
+            while not should_stop():
+                changed = self.poll()
+                if changed:
+                    on_batch(self.process(self.settle(changed)))
+                else:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
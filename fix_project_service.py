@@ -3,49 +3,15 @@
 Fix projectService.ts to pass all tests
 """
 
-import re
+import sys
 
-def fix_project_service():
-    file_path = "/c/Users/damat/_REPOS/ASTRAL_NOTES/client/src/services/projectService.ts"
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Fix 1: Improve updateProjectSync method to properly emit events
-    old_update = r'  public updateProjectSync\(id: string, data: UpdateProjectData\): Project \| null \{[^}]+\}\s*'
-    new_update = '''  public updateProjectSync(id: string, data: UpdateProjectData): Project | null {
-    const projects = this.getAllProjects();
-    const index = projects.findIndex(p => p.id === id);
-    
-    if (index === -1) {
-      return null;
-    }
-
-    const updated: Project = {
-      ...projects[index],
-      ...data,
-      updatedAt: new Date().toISOString(),
-      lastEditedAt: new Date().toISOString(),
-    };
-
-    // Recalculate word count if needed
-    if (data.title || data.description) {
-      updated.wordCount = this.calculateProjectWordCount(id);
-    }
+from codemod import OutlineRule, register, run_script
 
-    projects[index] = updated;
-    storageService.saveProjects(projects);
+GROUP = 'fix_project_service'
+TARGET = 'client/src/services/projectService.ts'
 
-    // Emit event
-    this.emit('project-updated', updated);
-
-    return updated;
-  }
-  '''
-    
-    # Fix 2: Fix createStory to properly save changes
-    old_create_story = r'  public async createStory\(data: \{ title: string; description\?: string; projectId: string \}\): Promise<any> \{[^}]+?\n  \}'
-    new_create_story = '''  public async createStory(data: { title: string; description?: string; projectId: string }): Promise<any> {
+# Fix 1: Fix createStory to properly save changes
+new_create_story = '''  public async createStory(data: { title: string; description?: string; projectId: string }): Promise<any> {
     const now = new Date().toISOString();
     const story = {
       id: this.generateId(),
@@ -62,45 +28,44 @@ def fix_project_service():
     };
 
     // Store story in project and save to storage
-    const projects = this.getAllProjects();
-    const projectIndex = projects.findIndex(p => p.id === data.projectId);
-    if (projectIndex !== -1) {
-      projects[projectIndex].stories = projects[projectIndex].stories || [];
-      projects[projectIndex].stories.push(story);
-      projects[projectIndex].updatedAt = now;
-      storageService.saveProjects(projects);
+    const graph = this.getGraph();
+    const project = graph.projectsById.get(data.projectId);
+    if (project) {
+      project.stories = project.stories || [];
+      project.stories.push(story);
+      project.updatedAt = now;
+      this.indexStories(graph, project, project.stories.length - 1);
+      this.saveGraphProject(graph, project);
     }
 
     return story;
   }'''
     
-    # Fix 3: Fix updateStory to properly save changes
-    old_update_story = r'  public async updateStory\(storyId: string, updates: any\): Promise<any> \{[^}]+?\n  \}'
-    new_update_story = '''  public async updateStory(storyId: string, updates: any): Promise<any> {
-    const projects = this.getAllProjects();
-    for (let i = 0; i < projects.length; i++) {
-      const project = projects[i];
-      if (project.stories) {
-        const storyIndex = project.stories.findIndex(s => s.id === storyId);
-        if (storyIndex !== -1) {
-          const updatedStory = {
-            ...project.stories[storyIndex],
-            ...updates,
-            updatedAt: new Date().toISOString()
-          };
-          projects[i].stories[storyIndex] = updatedStory;
-          projects[i].updatedAt = new Date().toISOString();
-          storageService.saveProjects(projects);
-          return updatedStory;
-        }
-      }
+# Fix 2: Fix updateStory to properly save changes
+new_update_story = '''  public async updateStory(storyId: string, updates: any): Promise<any> {
+    const graph = this.getGraph();
+    const location = graph.stories.get(storyId);
+    if (!location) {
+      return null;
     }
-    return null;
+
+    const { project, index } = location;
+    const updatedStory = {
+      ...project.stories[index],
+      ...updates,
+      updatedAt: new Date().toISOString()
+    };
+    project.stories[index] = updatedStory;
+    project.updatedAt = new Date().toISOString();
+    // The updates may carry a new id
+    graph.stories.delete(storyId);
+    graph.stories.set(updatedStory.id, location);
+    this.saveGraphProject(graph, project);
+    return updatedStory;
   }'''
     
-    # Fix 4: Fix createCharacter to properly save changes
-    old_create_character = r'  public async createCharacter\(data: \{ name: string; description\?: string; projectId: string \}\): Promise<any> \{[^}]+?\n  \}'
-    new_create_character = '''  public async createCharacter(data: { name: string; description?: string; projectId: string }): Promise<any> {
+# Fix 3: Fix createCharacter to properly save changes
+new_create_character = '''  public async createCharacter(data: { name: string; description?: string; projectId: string }): Promise<any> {
     const now = new Date().toISOString();
     const character = {
       id: this.generateId(),
@@ -118,72 +83,80 @@ def fix_project_service():
     };
 
     // Store character in project and save to storage
-    const projects = this.getAllProjects();
-    const projectIndex = projects.findIndex(p => p.id === data.projectId);
-    if (projectIndex !== -1) {
-      projects[projectIndex].characters = projects[projectIndex].characters || [];
-      projects[projectIndex].characters.push(character);
-      projects[projectIndex].updatedAt = now;
-      storageService.saveProjects(projects);
+    const graph = this.getGraph();
+    const project = graph.projectsById.get(data.projectId);
+    if (project) {
+      project.characters = project.characters || [];
+      project.characters.push(character);
+      project.updatedAt = now;
+      this.indexCharacters(graph, project, project.characters.length - 1);
+      this.saveGraphProject(graph, project);
     }
 
     return character;
   }'''
     
-    # Fix 5: Fix updateCharacter to properly save changes
-    old_update_character = r'  public async updateCharacter\(characterId: string, updates: any\): Promise<any> \{[^}]+?\n  \}'
-    new_update_character = '''  public async updateCharacter(characterId: string, updates: any): Promise<any> {
-    const projects = this.getAllProjects();
-    for (let i = 0; i < projects.length; i++) {
-      const project = projects[i];
-      if (project.characters) {
-        const characterIndex = project.characters.findIndex(c => c.id === characterId);
-        if (characterIndex !== -1) {
-          const updatedCharacter = {
-            ...project.characters[characterIndex],
-            ...updates,
-            updatedAt: new Date().toISOString()
-          };
-          projects[i].characters[characterIndex] = updatedCharacter;
-          projects[i].updatedAt = new Date().toISOString();
-          storageService.saveProjects(projects);
-          return updatedCharacter;
-        }
-      }
+# Fix 4: Fix updateCharacter to properly save changes
+new_update_character = '''  public async updateCharacter(characterId: string, updates: any): Promise<any> {
+    const graph = this.getGraph();
+    const location = graph.characters.get(characterId);
+    if (!location) {
+      return null;
     }
-    return null;
+
+    const { project, index } = location;
+    const updatedCharacter = {
+      ...project.characters[index],
+      ...updates,
+      updatedAt: new Date().toISOString()
+    };
+    project.characters[index] = updatedCharacter;
+    project.updatedAt = new Date().toISOString();
+    // The updates may carry a new id
+    graph.characters.delete(characterId);
+    graph.characters.set(updatedCharacter.id, location);
+    this.saveGraphProject(graph, project);
+    return updatedCharacter;
   }'''
     
-    # Fix 6: Fix deleteCharacter to properly save changes
-    old_delete_character = r'  public async deleteCharacter\(characterId: string\): Promise<boolean> \{[^}]+?\n  \}'
-    new_delete_character = '''  public async deleteCharacter(characterId: string): Promise<boolean> {
-    const projects = this.getAllProjects();
-    for (let i = 0; i < projects.length; i++) {
-      const project = projects[i];
-      if (project.characters) {
-        const characterIndex = project.characters.findIndex(c => c.id === characterId);
-        if (characterIndex !== -1) {
-          projects[i].characters.splice(characterIndex, 1);
-          projects[i].updatedAt = new Date().toISOString();
-          storageService.saveProjects(projects);
-          return true;
-        }
-      }
+# Fix 5: Fix deleteCharacter to properly save changes
+new_delete_character = '''  public async deleteCharacter(characterId: string): Promise<boolean> {
+    const graph = this.getGraph();
+    const location = graph.characters.get(characterId);
+    if (!location) {
+      return false;
     }
-    return false;
+
+    const { project, index } = location;
+    project.characters.splice(index, 1);
+    project.updatedAt = new Date().toISOString();
+    graph.characters.delete(characterId);
+    this.indexCharacters(graph, project, index);
+    this.saveGraphProject(graph, project);
+    return true;
   }'''
 
-    # Apply fixes
-    content = re.sub(old_create_story, new_create_story, content, flags=re.DOTALL)
-    content = re.sub(old_update_story, new_update_story, content, flags=re.DOTALL)
-    content = re.sub(old_create_character, new_create_character, content, flags=re.DOTALL)
-    content = re.sub(old_update_character, new_update_character, content, flags=re.DOTALL)
-    content = re.sub(old_delete_character, new_delete_character, content, flags=re.DOTALL)
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    print("Fixed projectService.ts with better data persistence")
+CLASS = 'ProjectService'
+
+def replace_method(method, new):
+    # Locate the method by name in the class outline, whatever its current body looks like
+    def rule(editor):
+        editor.replace_method(CLASS, method, new)
+    return rule
+
+RULES = [
+    register(OutlineRule(name, TARGET, replace_method(method, new), group=GROUP, requires=[CLASS, method]))
+    for name, method, new in [
+        ('old_create_story', 'createStory', new_create_story),
+        ('old_update_story', 'updateStory', new_update_story),
+        ('old_create_character', 'createCharacter', new_create_character),
+        ('old_update_character', 'updateCharacter', new_update_character),
+        ('old_delete_character', 'deleteCharacter', new_delete_character),
+    ]
+]
+
+def fix_project_service(dry_run=False):
+    return run_script(RULES, "Fixed projectService.ts with better data persistence", dry_run)
 
 if __name__ == "__main__":
-    fix_project_service()
\ No newline at end of file
+    fix_project_service(dry_run='--dry-run' in sys.argv[1:])
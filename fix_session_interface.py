@@ -1,50 +1,19 @@
-import re
+import sys
 
-def fix_session_interface():
-    with open('client/src/services/aiWritingCompanion.ts', 'r') as f:
-        content = f.read()
-    
-    # Fix WritingSession interface to include missing properties
-    old_interface = r'''export interface WritingSession \{
-  id: string;
-  title: string;
-  contentId\?: string;
-  mood\?: string;
-  startTime: number;
-  endTime\?: number;
-  content: string;
-  wordCount: number;
-  timeSpent: number;
-  productivity: number;
-  suggestions: AISuggestion\[\];
-  feedback: AIFeedback\[\];
-  aiInteractions: number;
-  isActive: boolean;
-\}'''
-    
-    new_interface = '''export interface WritingSession {
-  id: string;
-  title: string;
-  contentId?: string;
-  mood?: string;
-  startTime: number;
-  endTime?: number;
-  content: string;
-  wordCount: number;
-  totalWords: number;
-  wordsAdded: number;
-  timeSpent: number;
-  productivity: number;
-  suggestions: AISuggestion[];
-  feedback: AIFeedback[];
-  aiInteractions: number;
-  isActive: boolean;
-}'''
-    
-    content = re.sub(old_interface, new_interface, content)
-    
-    # Fix startWritingSession to initialize the missing properties
-    old_session_creation = r'''const session: WritingSession = \{
+from codemod import OutlineRule, RegexRule, SymbolIndex, register, run_script
+
+GROUP = 'fix_session_interface'
+TARGET = 'client/src/services/aiWritingCompanion.ts'
+
+# Fix WritingSession interface to include missing properties
+INTERFACE = 'WritingSession'
+new_fields = ['totalWords: number;', 'wordsAdded: number;']
+
+def add_session_fields(editor):
+    editor.add_interface_fields(INTERFACE, new_fields, after='wordCount')
+
+# Fix startWritingSession to initialize the missing properties
+old_session_creation = r'''const session: WritingSession = \{
       id: `session_\$\{Date\.now\(\)\}_\$\{Math\.random\(\)\.toString\(36\)\.substring\(2, 9\)\}`,
       title,
       contentId,
@@ -55,7 +24,7 @@ def fix_session_interface():
       timeSpent: 0,
       productivity: 0,'''
     
-    new_session_creation = '''const session: WritingSession = {
+new_session_creation = '''const session: WritingSession = {
       id: `session_${Date.now()}_${Math.random().toString(36).substring(2, 9)}`,
       title,
       contentId,
@@ -67,45 +36,42 @@ def fix_session_interface():
       wordsAdded: 0,
       timeSpent: 0,
       productivity: 0,'''
-    
-    content = re.sub(old_session_creation, new_session_creation, content)
-    
-    # Add getCurrentSession method if it doesn't exist
-    if 'getCurrentSession()' not in content:
-        # Find a good place to add it (after startWritingSession)
-        insert_point = content.find('this.saveToLocalStorage();') + len('this.saveToLocalStorage();')
-        if insert_point > len('this.saveToLocalStorage();') - 1:
-            # Find the end of startWritingSession method
-            start_pos = content.find('async startWritingSession(')
-            if start_pos != -1:
-                brace_count = 0
-                pos = start_pos
-                while pos < len(content):
-                    if content[pos] == '{':
-                        brace_count += 1
-                    elif content[pos] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            break
-                    pos += 1
-                
-                if pos < len(content):
-                    # Insert getCurrentSession method after startWritingSession
-                    before = content[:pos + 1]
-                    after = content[pos + 1:]
-                    
-                    new_method = '''
 
-  getCurrentSession(): WritingSession | null {
+new_method = '''  getCurrentSession(): WritingSession | null {
     return this.currentSession;
   }'''
-                    
-                    content = before + new_method + after
-    
-    with open('client/src/services/aiWritingCompanion.ts', 'w') as f:
-        f.write(content)
-    
-    print("Fixed session interface and methods")
+
+def add_get_current_session(editor):
+    # Add getCurrentSession method after startWritingSession if the class doesn't have it
+    found = editor.outline.find_method('startWritingSession')
+    if found is not None:
+        cls, method = found
+        editor.add_method(cls.name, new_method, after=method.name)
+
+RULES = [
+    register(OutlineRule('old_interface', TARGET, add_session_fields, group=GROUP, requires=[INTERFACE])),
+    register(RegexRule('old_session_creation', TARGET, old_session_creation, new_session_creation, group=GROUP)),
+    register(OutlineRule('add_get_current_session', TARGET, add_get_current_session, group=GROUP,
+                         requires=['startWritingSession'])),
+]
+
+def check_symbols():
+    # Confirm the result from the symbol index instead of a full tsc run
+    with SymbolIndex() as index:
+        index.update([TARGET])
+        problems = [f'{INTERFACE} has no field {field!r}'
+                    for field in (line.split(':')[0] for line in new_fields)
+                    if not index.has_field(INTERFACE, field)]
+        if not index.methods('getCurrentSession'):
+            problems.append('no class declares getCurrentSession()')
+    return problems
+
+def fix_session_interface(dry_run=False):
+    results = run_script(RULES, "Fixed session interface and methods", dry_run)
+    if not dry_run:
+        for problem in check_symbols():
+            print(f'WARNING: {problem}')
+    return results
 
 if __name__ == "__main__":
-    fix_session_interface()
+    fix_session_interface(dry_run='--dry-run' in sys.argv[1:])
@@ -1,12 +1,12 @@
 import express, { Response } from 'express';
 import { z } from 'zod';
-import { PrismaClient } from '@prisma/client';
 import { asyncHandler } from '../middleware/errorHandler.js';
 import { AuthRequest } from '../middleware/auth.js';
 import { ApiResponse } from '../types/api.js';
+import { prisma } from '../utils/database.js';
+import { invalidateProjectStats } from '../utils/queryOptimizer.js';
 
 const router = express.Router();
-const prisma = new PrismaClient();
 
 // Validation schemas
 const createCharacterSchema = z.object({
@@ -243,6 +243,7 @@ router.post('/', asyncHandler(async (req: AuthRequest, res: Response<ApiResponse
       }
     }
   });
+  invalidateProjectStats(character.projectId);
 
   res.status(201).json({
     success: true,
@@ -371,6 +372,7 @@ router.delete('/:id', asyncHandler(async (req: AuthRequest, res: Response<ApiRes
   await prisma.character.delete({
     where: { id: req.params.id }
   });
+  invalidateProjectStats(character.projectId);
 
   res.json({
     success: true,
@@ -7,8 +7,8 @@
 
 import { Router, Request, Response } from 'express';
 import { body, param, query, validationResult } from 'express-validator';
-import exportProcessingService, { ExportOptions, BatchExportRequest } from '../services/exportProcessingService';
-import { noAuth } from '../middleware/noAuth';
+import exportProcessingService, { ExportOptions, BatchExportRequest, ServerExportJob } from '../services/exportProcessingService.js';
+import { noAuth } from '../middleware/noAuth.js';
 
 const router = Router();
 
@@ -179,6 +179,71 @@ router.get('/jobs/:jobId',
   }
 );
 
+/**
+ * Stream export job progress as server-sent events
+ * GET /api/exports/jobs/:jobId/events
+ *
+ * Sends the job's current state first, then `progress` events until a
+ * final `completed`, `failed` or `cancelled` event.
+ */
+router.get('/jobs/:jobId/events',
+  [
+    param('jobId').isString().notEmpty().withMessage('Job ID is required')
+  ],
+  (req: Request, res: Response) => {
+    const { jobId } = req.params;
+    const job = exportProcessingService.getJob(jobId);
+
+    if (!job) {
+      return res.status(404).json({
+        success: false,
+        error: 'Export job not found'
+      });
+    }
+
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      Connection: 'keep-alive'
+    });
+
+    const send = (event: string, data: unknown) => {
+      res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+    };
+
+    const finalEvents: Record<string, string> = {
+      completed: 'jobCompleted',
+      failed: 'jobFailed',
+      cancelled: 'jobCancelled'
+    };
+    send('status', job);
+    if (finalEvents[job.status]) {
+      return res.end();
+    }
+
+    const onProgress = (event: { jobId: string; progress: number; message?: string }) => {
+      if (event.jobId === jobId) send('progress', event);
+    };
+    const listeners = Object.entries(finalEvents).map(([status, eventName]) => {
+      const listener = (finished: ServerExportJob) => {
+        if (finished.id !== jobId) return;
+        send(status, finished);
+        stop();
+        res.end();
+      };
+      exportProcessingService.on(eventName, listener);
+      return [eventName, listener] as const;
+    });
+    const stop = () => {
+      exportProcessingService.off('jobProgress', onProgress);
+      listeners.forEach(([eventName, listener]) => exportProcessingService.off(eventName, listener));
+    };
+
+    exportProcessingService.on('jobProgress', onProgress);
+    req.on('close', stop);
+  }
+);
+
 /**
  * Get user's export jobs
  * GET /api/exports/jobs
@@ -333,15 +398,13 @@ router.get('/jobs/:jobId/download',
         });
       }
 
-      // In a real implementation, this would stream the file from storage
-      // For now, we'll return a download URL
-      res.json({
-        success: true,
-        data: {
-          downloadUrl: `/downloads/${jobId}`,
-          filename: `${job.metadata.title}.${getFileExtension(job.format)}`,
-          size: job.outputSize,
-          expiresAt: new Date(Date.now() + 24 * 60 * 60 * 1000) // 24 hours
+      // Stream the job's own link to the cached artifact
+      res.download(job.outputPath, `${job.metadata.title}.${getFileExtension(job.format)}`, error => {
+        if (error && !res.headersSent) {
+          res.status(410).json({
+            success: false,
+            error: 'Export output is no longer available; please export again'
+          });
         }
       });
 
@@ -1,13 +1,13 @@
 import express, { Response } from 'express';
 import { z } from 'zod';
-import { PrismaClient } from '@prisma/client';
 import { asyncHandler } from '../middleware/errorHandler.js';
 import { AuthRequest } from '../middleware/auth.js';
 import { ApiResponse } from '../types/api.js';
+import { prisma } from '../utils/database.js';
+import { invalidateProjectStats } from '../utils/queryOptimizer.js';
 import { GeneralNoteWhereClause, validateQueryParams } from '../types/database.js';
 
 const router = express.Router();
-const prisma = new PrismaClient();
 
 // Validation schemas
 const createGeneralNoteSchema = z.object({
@@ -394,6 +394,7 @@ router.post('/project', asyncHandler(async (req: AuthRequest, res: Response<ApiR
       tags: JSON.stringify(validatedData.tags || [])
     }
   });
+  invalidateProjectStats(note.projectId);
 
   res.status(201).json({
     success: true,
@@ -587,6 +588,7 @@ router.delete('/:type/:id', asyncHandler(async (req: AuthRequest, res: Response<
       
       if (hasDeleteAccess) {
         await prisma.projectNote.delete({ where: { id } });
+        invalidateProjectStats(projectNote!.projectId);
       }
       break;
 
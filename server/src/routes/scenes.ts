@@ -1,12 +1,12 @@
 import express, { Response } from 'express';
 import { z } from 'zod';
-import { PrismaClient } from '@prisma/client';
 import { asyncHandler } from '../middleware/errorHandler.js';
 import { AuthRequest } from '../middleware/auth.js';
 import { ApiResponse } from '../types/api.js';
+import { prisma } from '../utils/database.js';
+import { invalidateProjectStats } from '../utils/queryOptimizer.js';
 
 const router = express.Router();
-const prisma = new PrismaClient();
 
 // Validation schemas
 const createSceneSchema = z.object({
@@ -302,6 +302,7 @@ router.post('/', asyncHandler(async (req: AuthRequest, res: Response<ApiResponse
       }
     }
   });
+  invalidateProjectStats(story.projectId);
 
   res.status(201).json({
     success: true,
@@ -404,6 +405,9 @@ router.patch('/:id', asyncHandler(async (req: AuthRequest, res: Response<ApiResp
       }
     }
   });
+  if (validatedData.content !== undefined) {
+    invalidateProjectStats(existingScene.story.projectId);
+  }
 
   res.json({
     success: true,
@@ -718,6 +722,7 @@ router.delete('/:id', asyncHandler(async (req: AuthRequest, res: Response<ApiRes
   await prisma.scene.delete({
     where: { id: id }
   });
+  invalidateProjectStats(scene.story.projectId);
 
   res.json({
     success: true,
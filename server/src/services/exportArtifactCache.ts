@@ -0,0 +1,180 @@
+/**
+ * Export Artifact Cache
+ *
+ * Finished export files keyed by a hash of everything that determines their
+ * bytes: the loaded project content, the format, the template and the export
+ * options. Re-exporting unchanged content is then a cache lookup instead of
+ * a fresh generation. Artifacts are plain files written to a temporary name
+ * and renamed into place, each with a JSON sidecar holding its validation
+ * results, so they survive restarts. A finished job gets its own hard link to
+ * the artifact, so evicting the shared entry never removes a file that a job
+ * still offers for download.
+ */
+
+import { createHash } from 'crypto';
+import { promises as fs } from 'fs';
+import { tmpdir } from 'os';
+import { extname, join } from 'path';
+import type { ValidationResults } from './exportProcessingService.js';
+
+export const DEFAULT_EXPORT_CACHE_DIR = process.env.EXPORT_CACHE_DIR || join(tmpdir(), 'astral-export-cache');
+
+// Artifacts kept on disk; the least recently used are removed beyond this
+const DEFAULT_MAX_ARTIFACTS = 200;
+
+export interface CachedArtifact {
+  key: string;
+  path: string;
+  size: number;
+  validationResults: ValidationResults;
+}
+
+interface ArtifactSidecar {
+  file: string;
+  size: number;
+  validationResults: ValidationResults;
+}
+
+/**
+ * JSON with object keys sorted, so equal values always hash the same
+ * regardless of the order a client sent their fields in
+ */
+const stableStringify = (value: unknown): string => {
+  if (Array.isArray(value)) {
+    return `[${value.map(item => stableStringify(item === undefined ? null : item)).join(',')}]`;
+  }
+  if (value && typeof value === 'object' && !(value instanceof Date)) {
+    const entries = Object.keys(value as Record<string, unknown>)
+      .filter(key => (value as Record<string, unknown>)[key] !== undefined)
+      .sort()
+      .map(key => `${JSON.stringify(key)}:${stableStringify((value as Record<string, unknown>)[key])}`);
+    return `{${entries.join(',')}}`;
+  }
+  return JSON.stringify(value) ?? 'null';
+};
+
+export class ExportArtifactCache {
+  constructor(
+    private readonly directory: string = DEFAULT_EXPORT_CACHE_DIR,
+    private readonly maxArtifacts: number = DEFAULT_MAX_ARTIFACTS
+  ) {}
+
+  /**
+   * Cache key of an export of `content` with the given settings
+   */
+  key(content: unknown, format: string, template: string | undefined, options: unknown): string {
+    return createHash('sha256')
+      .update(stableStringify({ content, format, template: template ?? null, options }))
+      .digest('hex');
+  }
+
+  async load(key: string): Promise<CachedArtifact | null> {
+    try {
+      const sidecar: ArtifactSidecar = JSON.parse(await fs.readFile(this.sidecarPath(key), 'utf8'));
+      const path = join(this.directory, sidecar.file);
+      const stats = await fs.stat(path);
+      if (stats.size !== sidecar.size) {
+        return null;
+      }
+      // Mark as recently used for eviction
+      const now = new Date();
+      await fs.utimes(this.sidecarPath(key), now, now).catch(() => {});
+      return { key, path, size: sidecar.size, validationResults: sidecar.validationResults };
+    } catch {
+      return null;
+    }
+  }
+
+  async store(
+    key: string,
+    data: ArrayBuffer | string,
+    extension: string,
+    validationResults: ValidationResults
+  ): Promise<CachedArtifact> {
+    await fs.mkdir(this.directory, { recursive: true });
+    const file = `${key}.${extension}`;
+    const bytes = typeof data === 'string' ? Buffer.from(data, 'utf8') : Buffer.from(data);
+    const sidecar: ArtifactSidecar = { file, size: bytes.byteLength, validationResults };
+
+    // Data first, sidecar last: a sidecar always describes a complete file
+    await this.writeAtomically(join(this.directory, file), bytes);
+    await this.writeAtomically(this.sidecarPath(key), JSON.stringify(sidecar));
+    await this.evict(key);
+
+    return { key, path: join(this.directory, file), size: bytes.byteLength, validationResults };
+  }
+
+  /**
+   * Give a job its own path to an artifact, valid until `release`. Linked
+   * rather than copied where the filesystem allows.
+   */
+  async linkForJob(artifact: CachedArtifact, jobId: string): Promise<string> {
+    const directory = join(this.directory, 'jobs');
+    await fs.mkdir(directory, { recursive: true });
+    const path = join(directory, `${jobId}${extname(artifact.path)}`);
+    await fs.unlink(path).catch(() => {});
+    try {
+      await fs.link(artifact.path, path);
+    } catch {
+      await fs.copyFile(artifact.path, path);
+    }
+    return path;
+  }
+
+  async release(path: string): Promise<void> {
+    await fs.unlink(path).catch(() => {});
+  }
+
+  private sidecarPath(key: string): string {
+    return join(this.directory, `${key}.json`);
+  }
+
+  private async writeAtomically(path: string, data: Buffer | string): Promise<void> {
+    const tmp = `${path}.${process.pid}.${Date.now()}.tmp`;
+    try {
+      await fs.writeFile(tmp, data);
+      await fs.rename(tmp, path);
+    } catch (error) {
+      await fs.unlink(tmp).catch(() => {});
+      throw error;
+    }
+  }
+
+  private async evict(keep: string): Promise<void> {
+    const names = (await fs.readdir(this.directory))
+      .filter(name => name.endsWith('.json') && name !== `${keep}.json`);
+    if (names.length < this.maxArtifacts) {
+      return;
+    }
+
+    // Only complete entries count: a sidecar whose file is gone belongs to
+    // an entry another process is writing or removing right now
+    const entries = await Promise.all(names.map(async name => {
+      const path = join(this.directory, name);
+      try {
+        const sidecar: ArtifactSidecar = JSON.parse(await fs.readFile(path, 'utf8'));
+        const [stats] = await Promise.all([fs.stat(path), fs.stat(join(this.directory, sidecar.file))]);
+        return { path, file: join(this.directory, sidecar.file), usedAt: stats.mtimeMs };
+      } catch {
+        return null;
+      }
+    }));
+    const complete = entries.filter((entry): entry is NonNullable<typeof entry> => entry !== null);
+    const excess = complete.length - this.maxArtifacts + 1;
+    if (excess <= 0) {
+      return;
+    }
+    complete.sort((a, b) => a.usedAt - b.usedAt);
+
+    for (const { path, file } of complete.slice(0, excess)) {
+      try {
+        await fs.unlink(path);
+        await fs.unlink(file);
+      } catch {
+        // Already removed by another process
+      }
+    }
+  }
+}
+
+export default new ExportArtifactCache();
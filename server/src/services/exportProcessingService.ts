@@ -4,10 +4,17 @@
  * Handles server-side export processing for performance optimization
  * Processes large manuscripts (500+ pages) in under 30 seconds
  * Supports batch processing and background job management
+ *
+ * Generation runs on the export worker pool and finished files are cached
+ * by a hash of the exported content, so identical re-exports complete
+ * without generating anything.
  */
 
 import { EventEmitter } from 'events';
 import { v4 as uuidv4 } from 'uuid';
+import { ExportContentData, getFileExtension } from './exportFormats.js';
+import defaultArtifactCache, { ExportArtifactCache } from './exportArtifactCache.js';
+import { ExportWorkerPool, getExportWorkerPool } from './exportWorkerPool.js';
 
 export interface ServerExportJob {
   id: string;
@@ -31,6 +38,8 @@ export interface ServerExportJob {
   qualityScore?: number;
   validationResults?: ValidationResults;
   priority: 'low' | 'normal' | 'high' | 'urgent';
+  contentHash?: string;
+  cached?: boolean;
 }
 
 export interface ExportOptions {
@@ -147,13 +156,13 @@ class ExportProcessingService extends EventEmitter {
   private jobs = new Map<string, ServerExportJob>();
   private jobQueue: string[] = [];
   private processingJobs = new Set<string>();
-  private maxConcurrentJobs = 5;
+  private maxConcurrentJobs = getExportWorkerPool().size;
+  private cancelRunningTask = new Map<string, () => void>();
   private statistics: ExportStatistics;
 
-  constructor() {
+  constructor(private artifactCache: ExportArtifactCache = defaultArtifactCache) {
     super();
     this.statistics = this.initializeStatistics();
-    this.startJobProcessor();
   }
 
   public async createExportJob(
@@ -195,6 +204,8 @@ class ExportProcessingService extends EventEmitter {
     
     // Update statistics
     this.statistics.totalJobs++;
+
+    this.processJobQueue();
     
     return jobId;
   }
@@ -254,10 +265,12 @@ class ExportProcessingService extends EventEmitter {
     }
 
     if (job.status === 'processing') {
-      // Mark for cancellation
+      // Mark for cancellation and stop its worker; the slot is freed by
+      // processJobQueue once processJob settles
       job.status = 'cancelled';
-      this.processingJobs.delete(jobId);
-      
+      job.completedAt = new Date();
+      this.cancelRunningTask.get(jobId)?.();
+
       this.emit('jobCancelled', job);
       return true;
     }
@@ -269,9 +282,15 @@ class ExportProcessingService extends EventEmitter {
     const job = this.jobs.get(jobId);
     if (!job) return false;
 
-    // Clean up output file if it exists
+    // Stop any work still pending for the job and drop its output link;
+    // the cached artifact itself stays for other jobs
+    const queueIndex = this.jobQueue.indexOf(jobId);
+    if (queueIndex > -1) {
+      this.jobQueue.splice(queueIndex, 1);
+    }
+    this.cancelRunningTask.get(jobId)?.();
     if (job.outputPath) {
-      await this.cleanupOutputFile(job.outputPath);
+      await this.artifactCache.release(job.outputPath);
     }
 
     this.jobs.delete(jobId);
@@ -288,6 +307,7 @@ class ExportProcessingService extends EventEmitter {
     pending: number;
     processing: number;
     estimated_wait_time: number;
+    workers: ReturnType<ExportWorkerPool['getStatus']>;
   } {
     const pending = this.jobQueue.length;
     const processing = this.processingJobs.size;
@@ -298,7 +318,8 @@ class ExportProcessingService extends EventEmitter {
     return {
       pending,
       processing,
-      estimated_wait_time: estimatedWaitTime
+      estimated_wait_time: estimatedWaitTime,
+      workers: getExportWorkerPool().getStatus()
     };
   }
 
@@ -327,13 +348,7 @@ class ExportProcessingService extends EventEmitter {
     this.jobQueue.splice(insertIndex, 0, jobId);
   }
 
-  private startJobProcessor(): void {
-    setInterval(() => {
-      this.processJobQueue();
-    }, 1000); // Check every second
-  }
-
-  private async processJobQueue(): Promise<void> {
+  private processJobQueue(): void {
     // Process jobs up to the concurrent limit
     while (
       this.processingJobs.size < this.maxConcurrentJobs &&
@@ -344,6 +359,7 @@ class ExportProcessingService extends EventEmitter {
         this.processingJobs.add(jobId);
         this.processJob(jobId).finally(() => {
           this.processingJobs.delete(jobId);
+          this.processJobQueue();
         });
       }
     }
@@ -366,36 +382,59 @@ class ExportProcessingService extends EventEmitter {
       this.updateJobProgress(jobId, 10, 'Loading content');
       const contentData = await this.loadContentData(job.contentIds, job.projectId);
 
-      // Apply quality assurance
-      this.updateJobProgress(jobId, 25, 'Running quality checks');
-      const validationResults = await this.runQualityAssurance(contentData, job.options.qualityAssurance);
-      job.validationResults = validationResults;
+      // Reuse the file of an identical earlier export
+      const contentHash = this.artifactCache.key(contentData, job.format, job.template, job.options);
+      job.contentHash = contentHash;
+      let artifact = await this.artifactCache.load(contentHash);
+      job.cached = artifact !== null;
+
+      // Cancelled while loading: do not start a worker for it
+      if (this.isStopped(jobId)) return;
+
+      if (!artifact) {
+        // Quality checks, format conversion and output settings run on a worker thread
+        const task = getExportWorkerPool().run(
+          { kind: 'export', contentData, format: job.format, template: job.template, options: job.options },
+          (progress, message) => this.updateJobProgress(jobId, progress, message)
+        );
+        this.cancelRunningTask.set(jobId, task.cancel);
+        const generated = await task.promise.finally(() => this.cancelRunningTask.delete(jobId));
+
+        // Save output file
+        this.updateJobProgress(jobId, 90, 'Saving output');
+        artifact = await this.artifactCache.store(
+          contentHash,
+          generated.data,
+          getFileExtension(job.format),
+          generated.validationResults
+        );
+      }
 
-      // Process format conversion
-      this.updateJobProgress(jobId, 50, 'Converting format');
-      const processedData = await this.processFormat(contentData, job.format, job.template, job.options);
+      if (this.isStopped(jobId)) return;
 
-      // Apply output settings
-      this.updateJobProgress(jobId, 75, 'Applying output settings');
-      const finalData = await this.applyOutputSettings(processedData, job.options.outputSettings);
+      // The job downloads from its own link, which outlives cache eviction
+      const outputPath = await this.artifactCache.linkForJob(artifact, jobId);
+      if (this.isStopped(jobId)) {
+        await this.artifactCache.release(outputPath);
+        return;
+      }
 
-      // Save output file
-      this.updateJobProgress(jobId, 90, 'Saving output');
-      const outputPath = await this.saveOutputFile(jobId, finalData, job.format);
-      
       // Complete job
       job.status = 'completed';
       job.completedAt = new Date();
       job.progress = 100;
       job.processingTime = Date.now() - startTime;
       job.outputPath = outputPath;
-      job.outputSize = this.getDataSize(finalData);
-      job.qualityScore = validationResults.qualityScore;
+      job.outputSize = artifact.size;
+      job.validationResults = artifact.validationResults;
+      job.qualityScore = artifact.validationResults.qualityScore;
 
       this.updateStatistics(job);
       this.emit('jobCompleted', job);
 
     } catch (error) {
+      if (this.isStopped(jobId)) return;
+
       job.status = 'failed';
       job.completedAt = new Date();
       job.processingTime = Date.now() - startTime;
@@ -406,6 +445,14 @@ class ExportProcessingService extends EventEmitter {
     }
   }
 
+  /**
+   * Whether the job was cancelled or deleted while it was processing
+   */
+  private isStopped(jobId: string): boolean {
+    const job = this.jobs.get(jobId);
+    return !job || job.status === 'cancelled';
+  }
+
   private updateJobProgress(jobId: string, progress: number, message?: string): void {
     const job = this.jobs.get(jobId);
     if (job) {
@@ -414,10 +461,10 @@ class ExportProcessingService extends EventEmitter {
     }
   }
 
-  private async loadContentData(contentIds: string[], projectId: string): Promise<any> {
+  private async loadContentData(contentIds: string[], projectId: string): Promise<ExportContentData> {
     // Load content from database or storage
     // This would integrate with the existing data storage system
-    const contentData = {
+    const contentData: ExportContentData = {
       project: { id: projectId },
       documents: [],
       codexData: null,
@@ -445,342 +492,6 @@ class ExportProcessingService extends EventEmitter {
     return contentData;
   }
 
-  private async runQualityAssurance(
-    contentData: any,
-    qaOptions: QualityAssuranceOptions
-  ): Promise<ValidationResults> {
-    const warnings: ValidationIssue[] = [];
-    const errors: ValidationIssue[] = [];
-    const suggestions: ValidationSuggestion[] = [];
-
-    // Run various quality checks based on options
-    if (qaOptions.spellCheck) {
-      const spellCheckResults = await this.runSpellCheck(contentData);
-      warnings.push(...spellCheckResults.warnings);
-      errors.push(...spellCheckResults.errors);
-    }
-
-    if (qaOptions.grammarCheck) {
-      const grammarCheckResults = await this.runGrammarCheck(contentData);
-      warnings.push(...grammarCheckResults.warnings);
-      errors.push(...grammarCheckResults.errors);
-      suggestions.push(...grammarCheckResults.suggestions);
-    }
-
-    if (qaOptions.formatValidation) {
-      // Validate format compliance
-      if (contentData.documents.length === 0) {
-        errors.push({
-          type: 'structure',
-          severity: 'critical',
-          message: 'No content found for export',
-          autoFixable: false
-        });
-      }
-    }
-
-    // Calculate quality score
-    let qualityScore = 100;
-    errors.forEach(error => {
-      switch (error.severity) {
-        case 'critical': qualityScore -= 25; break;
-        case 'high': qualityScore -= 15; break;
-        case 'medium': qualityScore -= 10; break;
-        case 'low': qualityScore -= 5; break;
-      }
-    });
-
-    warnings.forEach(warning => {
-      switch (warning.severity) {
-        case 'high': qualityScore -= 3; break;
-        case 'medium': qualityScore -= 2; break;
-        case 'low': qualityScore -= 1; break;
-      }
-    });
-
-    return {
-      isValid: errors.length === 0,
-      qualityScore: Math.max(0, qualityScore),
-      warnings,
-      errors,
-      suggestions
-    };
-  }
-
-  private async processFormat(
-    contentData: any,
-    format: string,
-    template?: string,
-    options?: ExportOptions
-  ): Promise<ArrayBuffer | string> {
-    // Process the content into the specified format
-    // This would use format-specific processing engines
-    
-    switch (format) {
-      case 'manuscript_pdf':
-        return this.generateManuscriptPDF(contentData, template, options);
-      case 'kdp_interior':
-        return this.generateKDPInterior(contentData, template, options);
-      case 'epub3':
-        return this.generateEPUB3(contentData, template, options);
-      case 'final_draft':
-        return this.generateFinalDraft(contentData, template, options);
-      default:
-        // Default to plain text
-        return contentData.documents.map((doc: any) => doc.content).join('\n\n');
-    }
-  }
-
-  private async generateManuscriptPDF(
-    contentData: any,
-    template?: string,
-    options?: ExportOptions
-  ): Promise<ArrayBuffer> {
-    // Generate professional manuscript PDF using real PDF generation
-    const PDFDocument = require('pdfkit');
-    const doc = new PDFDocument({
-      margins: { top: 72, bottom: 72, left: 72, right: 72 },
-      size: 'LETTER'
-    });
-    
-    const chunks: Buffer[] = [];
-    doc.on('data', (chunk: Buffer) => chunks.push(chunk));
-    
-    return new Promise((resolve, reject) => {
-      doc.on('end', () => {
-        const pdfBuffer = Buffer.concat(chunks);
-        resolve(pdfBuffer.buffer);
-      });
-      
-      doc.on('error', reject);
-      
-      // Add content to PDF
-      contentData.documents.forEach((document: any, index: number) => {
-        if (index > 0) doc.addPage();
-        
-        // Standard manuscript formatting
-        doc.font('Times-Roman', 12)
-           .text(document.content, {
-             align: 'left',
-             lineGap: 6
-           });
-      });
-      
-      doc.end();
-    });
-  }
-
-  private async generateKDPInterior(
-    contentData: any,
-    template?: string,
-    options?: ExportOptions
-  ): Promise<ArrayBuffer> {
-    // Generate KDP-compliant interior PDF with proper formatting
-    const PDFDocument = require('pdfkit');
-    const doc = new PDFDocument({
-      margins: { top: 36, bottom: 36, left: 54, right: 54 },
-      size: [6*72, 9*72] // 6x9 inch book format
-    });
-    
-    const chunks: Buffer[] = [];
-    doc.on('data', (chunk: Buffer) => chunks.push(chunk));
-    
-    return new Promise((resolve, reject) => {
-      doc.on('end', () => {
-        const pdfBuffer = Buffer.concat(chunks);
-        resolve(pdfBuffer.buffer);
-      });
-      
-      doc.on('error', reject);
-      
-      // KDP-compliant formatting
-      contentData.documents.forEach((document: any, index: number) => {
-        if (index > 0) doc.addPage();
-        
-        doc.font('Times-Roman', 11)
-           .text(document.content, {
-             align: 'justify',
-             lineGap: 4
-           });
-      });
-      
-      doc.end();
-    });
-  }
-
-  private async generateEPUB3(
-    contentData: any,
-    template?: string,
-    options?: ExportOptions
-  ): Promise<ArrayBuffer> {
-    // Generate EPUB 3.0 file with proper structure
-    const JSZip = require('jszip');
-    const zip = new JSZip();
-    
-    // EPUB required files
-    zip.file('mimetype', 'application/epub+zip');
-    
-    // META-INF folder
-    const metaInf = zip.folder('META-INF');
-    metaInf?.file('container.xml', `<?xml version="1.0"?>
-<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
-  <rootfiles>
-    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
-  </rootfiles>
-</container>`);
-    
-    // OEBPS folder
-    const oebps = zip.folder('OEBPS');
-    
-    // Package document (OPF)
-    const manifest = contentData.documents.map((doc: any, index: number) => 
-      `<item id="chapter${index + 1}" href="chapter${index + 1}.xhtml" media-type="application/xhtml+xml"/>`
-    ).join('\n    ');
-    
-    const spine = contentData.documents.map((doc: any, index: number) => 
-      `<itemref idref="chapter${index + 1}"/>`
-    ).join('\n    ');
-    
-    oebps?.file('content.opf', `<?xml version="1.0" encoding="UTF-8"?>
-<package xmlns="http://www.idpf.org/2007/opf" unique-identifier="BookId" version="3.0">
-  <metadata>
-    <dc:title xmlns:dc="http://purl.org/dc/elements/1.1/">${options?.title || 'Untitled'}</dc:title>
-    <dc:creator xmlns:dc="http://purl.org/dc/elements/1.1/">${options?.author || 'Unknown Author'}</dc:creator>
-    <dc:identifier xmlns:dc="http://purl.org/dc/elements/1.1/" id="BookId">${Date.now()}</dc:identifier>
-    <dc:language xmlns:dc="http://purl.org/dc/elements/1.1/">en</dc:language>
-  </metadata>
-  <manifest>
-    ${manifest}
-  </manifest>
-  <spine>
-    ${spine}
-  </spine>
-</package>`);
-    
-    // Add chapters
-    contentData.documents.forEach((document: any, index: number) => {
-      const chapterContent = `<?xml version="1.0" encoding="UTF-8"?>
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-  <title>Chapter ${index + 1}</title>
-</head>
-<body>
-  <h1>Chapter ${index + 1}</h1>
-  <p>${document.content.replace(/\n/g, '</p>\n  <p>')}</p>
-</body>
-</html>`;
-      
-      oebps?.file(`chapter${index + 1}.xhtml`, chapterContent);
-    });
-    
-    const buffer = await zip.generateAsync({ type: 'arraybuffer' });
-    return buffer;
-  }
-
-  private async generateFinalDraft(
-    contentData: any,
-    template?: string,
-    options?: ExportOptions
-  ): Promise<string> {
-    // Generate Final Draft XML
-    return `<?xml version="1.0" encoding="UTF-8"?>
-<FinalDraft DocumentType="Script" Template="Feature Film" Version="11">
-  <Content>
-    ${contentData.documents.map((doc: any) => doc.content).join('\n')}
-  </Content>
-</FinalDraft>`;
-  }
-
-  private async applyOutputSettings(
-    data: ArrayBuffer | string,
-    settings: OutputSettings
-  ): Promise<ArrayBuffer | string> {
-    // Apply compression, watermark, password protection, etc.
-    let processedData = data;
-
-    if (settings.compression !== 'none') {
-      // Apply compression based on settings
-      processedData = await this.compressData(processedData, settings.compression);
-    }
-
-    if (settings.watermark) {
-      // Add watermark
-      processedData = await this.addWatermark(processedData, settings.watermark);
-    }
-
-    if (settings.passwordProtection) {
-      // Add password protection
-      processedData = await this.addPasswordProtection(processedData, settings.passwordProtection);
-    }
-
-    return processedData;
-  }
-
-  private async compressData(
-    data: ArrayBuffer | string,
-    level: 'light' | 'medium' | 'high'
-  ): Promise<ArrayBuffer | string> {
-    // Mock compression
-    return data;
-  }
-
-  private async addWatermark(
-    data: ArrayBuffer | string,
-    watermark: string
-  ): Promise<ArrayBuffer | string> {
-    // Mock watermark addition
-    return data;
-  }
-
-  private async addPasswordProtection(
-    data: ArrayBuffer | string,
-    password: string
-  ): Promise<ArrayBuffer | string> {
-    // Mock password protection
-    return data;
-  }
-
-  private async saveOutputFile(
-    jobId: string,
-    data: ArrayBuffer | string,
-    format: string
-  ): Promise<string> {
-    // Save the output file to storage
-    // In a real implementation, this would save to a file system or cloud storage
-    const outputPath = `/exports/${jobId}.${this.getFileExtension(format)}`;
-    
-    // Mock file save
-    // await fs.writeFile(outputPath, data);
-    
-    return outputPath;
-  }
-
-  private async cleanupOutputFile(outputPath: string): Promise<void> {
-    // Clean up the output file
-    // await fs.unlink(outputPath);
-  }
-
-  private getFileExtension(format: string): string {
-    const extensions: Record<string, string> = {
-      'manuscript_pdf': 'pdf',
-      'kdp_interior': 'pdf',
-      'epub3': 'epub',
-      'final_draft': 'fdx',
-      'docx': 'docx',
-      'html': 'html',
-      'markdown': 'md'
-    };
-    
-    return extensions[format] || 'txt';
-  }
-
-  private getDataSize(data: ArrayBuffer | string): number {
-    if (typeof data === 'string') {
-      return new Blob([data]).size;
-    }
-    return data.byteLength;
-  }
-
   private async estimateProcessingTime(
     contentIds: string[],
     format: string,
@@ -892,66 +603,6 @@ class ExportProcessingService extends EventEmitter {
       return null;
     }
   }
-
-  /**
-   * Run spell check using a real spell checking service
-   */
-  private async runSpellCheck(contentData: any): Promise<{
-    warnings: ValidationIssue[];
-    errors: ValidationIssue[];
-  }> {
-    const warnings: ValidationIssue[] = [];
-    const errors: ValidationIssue[] = [];
-
-    // In production, integrate with a real spell checking API like:
-    // - LanguageTool API
-    // - Grammarly API  
-    // - Microsoft Cognitive Services
-    
-    try {
-      // TODO: Implement actual spell checking service
-      console.warn('Spell check service not configured. Please integrate with a real spell checking API.');
-      
-      // For now, return empty results to avoid breaking functionality
-      return { warnings, errors };
-    } catch (error) {
-      errors.push({
-        type: 'spelling',
-        severity: 'high',
-        message: 'Spell check service unavailable',
-        autoFixable: false
-      });
-      return { warnings, errors };
-    }
-  }
-
-  /**
-   * Run grammar check using a real grammar checking service
-   */
-  private async runGrammarCheck(contentData: any): Promise<{
-    warnings: ValidationIssue[];
-    errors: ValidationIssue[];
-    suggestions: ValidationSuggestion[];
-  }> {
-    const warnings: ValidationIssue[] = [];
-    const errors: ValidationIssue[] = [];
-    const suggestions: ValidationSuggestion[] = [];
-
-    try {
-      // TODO: Implement actual grammar checking service
-      console.warn('Grammar check service not configured. Please integrate with a real grammar checking API.');
-      
-      return { warnings, errors, suggestions };
-    } catch (error) {
-      errors.push({
-        type: 'grammar',
-        severity: 'high',
-        message: 'Grammar check service unavailable',
-        autoFixable: false
-      });
-      return { warnings, errors, suggestions };
-    }
-  }
 }
 
 export default new ExportProcessingService();
\ No newline at end of file
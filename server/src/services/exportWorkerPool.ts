@@ -0,0 +1,224 @@
+/**
+ * Export Worker Pool
+ *
+ * Runs export generation and manuscript formatting on a bounded set of
+ * worker threads, so a large manuscript occupies one worker instead of the
+ * event loop every other request is served from. Tasks beyond the pool size
+ * wait in a FIFO queue. Workers are started on demand, reused between
+ * tasks, and do not keep the process alive while idle.
+ */
+
+import { Worker } from 'worker_threads';
+import { cpus } from 'os';
+import { extname } from 'path';
+import { fileURLToPath } from 'url';
+import type { ExportContentData, GeneratedExport } from './exportFormats.js';
+import type { ExportOptions } from './exportProcessingService.js';
+import type { FormattedManuscript, ManuscriptFormatOptions } from './manuscriptFormatting.js';
+
+export type ExportWorkerTask =
+  | {
+      kind: 'export';
+      contentData: ExportContentData;
+      format: string;
+      template?: string;
+      options: ExportOptions;
+    }
+  | {
+      kind: 'formatManuscript';
+      content: string;
+      options: ManuscriptFormatOptions;
+    };
+
+export interface ExportWorkerResults {
+  export: GeneratedExport;
+  formatManuscript: FormattedManuscript;
+}
+
+export type ExportWorkerMessage =
+  | { type: 'progress'; progress: number; message?: string }
+  | { type: 'done'; result: unknown }
+  | { type: 'failed'; error: string };
+
+export interface ExportWorkerRun<T> {
+  promise: Promise<T>;
+  /** Drop the task from the queue, or stop the worker running it */
+  cancel: () => void;
+}
+
+export class ExportTaskCancelledError extends Error {
+  constructor() {
+    super('Export task cancelled');
+    this.name = 'ExportTaskCancelledError';
+  }
+}
+
+interface PendingTask {
+  task: ExportWorkerTask;
+  onProgress?: (progress: number, message?: string) => void;
+  resolve: (result: any) => void;
+  reject: (error: Error) => void;
+  worker?: Worker;
+  settled: boolean;
+}
+
+// The worker is compiled next to this file: .ts under tsx, .js in dist
+const WORKER_URL = new URL(
+  `../workers/exportWorker${extname(fileURLToPath(import.meta.url))}`,
+  import.meta.url
+);
+
+export const DEFAULT_EXPORT_WORKERS = Number(process.env.EXPORT_WORKER_CONCURRENCY) ||
+  Math.max(1, Math.min(4, cpus().length - 1));
+
+export class ExportWorkerPool {
+  private idle: Worker[] = [];
+  private busy = new Set<Worker>();
+  private queue: PendingTask[] = [];
+
+  constructor(
+    public readonly size: number = DEFAULT_EXPORT_WORKERS,
+    private readonly workerUrl: URL = WORKER_URL
+  ) {}
+
+  run<K extends ExportWorkerTask['kind']>(
+    task: Extract<ExportWorkerTask, { kind: K }>,
+    onProgress?: (progress: number, message?: string) => void
+  ): ExportWorkerRun<ExportWorkerResults[K]> {
+    let pending!: PendingTask;
+    const promise = new Promise<ExportWorkerResults[K]>((resolve, reject) => {
+      pending = { task, onProgress, resolve, reject, settled: false };
+    });
+
+    this.queue.push(pending);
+    this.dispatch();
+
+    return {
+      promise,
+      cancel: () => this.cancel(pending)
+    };
+  }
+
+  getStatus(): { size: number; busy: number; idle: number; queued: number } {
+    return {
+      size: this.size,
+      busy: this.busy.size,
+      idle: this.idle.length,
+      queued: this.queue.length
+    };
+  }
+
+  async destroy(): Promise<void> {
+    this.queue.splice(0).forEach(pending => this.settle(pending, new ExportTaskCancelledError()));
+    const workers = [...this.idle, ...this.busy];
+    this.idle = [];
+    this.busy.clear();
+    await Promise.all(workers.map(worker => worker.terminate()));
+  }
+
+  private dispatch(): void {
+    while (this.queue.length > 0 && (this.idle.length > 0 || this.busy.size < this.size)) {
+      const pending = this.queue.shift()!;
+      const worker = this.idle.pop() ?? this.spawn();
+      this.start(worker, pending);
+    }
+  }
+
+  private spawn(): Worker {
+    const worker = new Worker(this.workerUrl);
+    worker.unref();
+    return worker;
+  }
+
+  private start(worker: Worker, pending: PendingTask): void {
+    pending.worker = worker;
+    this.busy.add(worker);
+    worker.ref();
+
+    const onMessage = (message: ExportWorkerMessage) => {
+      if (message.type === 'progress') {
+        pending.onProgress?.(message.progress, message.message);
+        return;
+      }
+      cleanup();
+      this.release(worker);
+      if (message.type === 'failed') {
+        this.settle(pending, new Error(message.error));
+      } else {
+        this.settle(pending, null, message.result);
+      }
+    };
+    const onError = (error: Error) => {
+      cleanup();
+      this.discard(worker);
+      this.settle(pending, error);
+    };
+    const onExit = (code: number) => {
+      cleanup();
+      this.discard(worker);
+      this.settle(pending, new Error(`Export worker stopped with exit code ${code}`));
+    };
+    const cleanup = () => {
+      worker.off('message', onMessage);
+      worker.off('error', onError);
+      worker.off('exit', onExit);
+    };
+
+    worker.on('message', onMessage);
+    worker.on('error', onError);
+    worker.on('exit', onExit);
+    worker.postMessage(pending.task);
+  }
+
+  private cancel(pending: PendingTask): void {
+    if (pending.settled) return;
+
+    const queueIndex = this.queue.indexOf(pending);
+    if (queueIndex > -1) {
+      this.queue.splice(queueIndex, 1);
+    } else if (pending.worker) {
+      // A running task can only be stopped with its worker
+      const worker = pending.worker;
+      worker.removeAllListeners();
+      this.discard(worker);
+      worker.terminate();
+    }
+    this.settle(pending, new ExportTaskCancelledError());
+  }
+
+  private release(worker: Worker): void {
+    this.busy.delete(worker);
+    worker.unref();
+    this.idle.push(worker);
+    this.dispatch();
+  }
+
+  private discard(worker: Worker): void {
+    this.busy.delete(worker);
+    this.idle = this.idle.filter(idle => idle !== worker);
+    this.dispatch();
+  }
+
+  private settle(pending: PendingTask, error: Error | null, result?: unknown): void {
+    if (pending.settled) return;
+    pending.settled = true;
+    if (error) {
+      pending.reject(error);
+    } else {
+      pending.resolve(result);
+    }
+  }
+}
+
+let sharedPool: ExportWorkerPool | null = null;
+
+/**
+ * The process-wide pool, created on first use so that importing this
+ * module (as the workers themselves do) starts no threads
+ */
+export const getExportWorkerPool = (): ExportWorkerPool => {
+  if (!sharedPool) {
+    sharedPool = new ExportWorkerPool();
+  }
+  return sharedPool;
+};
@@ -0,0 +1,114 @@
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import { existsSync, mkdtempSync, readFileSync, rmSync, writeFileSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { ExportArtifactCache } from '../services/exportArtifactCache.js';
+import type { ValidationResults } from '../services/exportProcessingService.js';
+
+const validationResults: ValidationResults = {
+  isValid: true,
+  qualityScore: 97,
+  warnings: [],
+  errors: [],
+  suggestions: []
+};
+
+const content = {
+  project: { id: 'project-1' },
+  documents: [{ id: 'doc-1', content: 'It was a dark and stormy night.', metadata: {} }],
+  codexData: null,
+  plotData: null
+};
+
+describe('ExportArtifactCache', () => {
+  let directory: string;
+
+  beforeEach(() => {
+    directory = mkdtempSync(join(tmpdir(), 'astral-artifacts-'));
+  });
+
+  afterEach(() => {
+    rmSync(directory, { recursive: true, force: true });
+  });
+
+  it('keys exports by content and settings, not by field order', () => {
+    const cache = new ExportArtifactCache(directory);
+    const key = cache.key(content, 'epub3', undefined, { quality: 'draft', outputSettings: { compression: 'none' } });
+
+    expect(cache.key(content, 'epub3', undefined, { outputSettings: { compression: 'none' }, quality: 'draft' })).toBe(key);
+    expect(cache.key(content, 'manuscript_pdf', undefined, { quality: 'draft', outputSettings: { compression: 'none' } })).not.toBe(key);
+    expect(cache.key(
+      { ...content, documents: [{ ...content.documents[0], content: 'It was a bright cold day.' }] },
+      'epub3',
+      undefined,
+      { quality: 'draft', outputSettings: { compression: 'none' } }
+    )).not.toBe(key);
+  });
+
+  it('returns stored artifacts with their validation results', async () => {
+    const cache = new ExportArtifactCache(directory);
+    const key = cache.key(content, 'final_draft', undefined, {});
+
+    expect(await cache.load(key)).toBeNull();
+
+    const stored = await cache.store(key, '<FinalDraft/>', 'fdx', validationResults);
+    const loaded = await cache.load(key);
+
+    expect(loaded).toEqual(stored);
+    expect(loaded!.path.endsWith('.fdx')).toBe(true);
+    expect(readFileSync(loaded!.path, 'utf8')).toBe('<FinalDraft/>');
+    expect(loaded!.validationResults.qualityScore).toBe(97);
+  });
+
+  it('stores binary output byte for byte', async () => {
+    const cache = new ExportArtifactCache(directory);
+    const bytes = new Uint8Array([0x50, 0x4b, 0x03, 0x04, 0x00, 0xff]);
+
+    const stored = await cache.store('binary', bytes.buffer, 'epub', validationResults);
+
+    expect(stored.size).toBe(bytes.byteLength);
+    expect([...readFileSync(stored.path)]).toEqual([...bytes]);
+  });
+
+  it('evicts the least recently used artifacts beyond its limit', async () => {
+    const cache = new ExportArtifactCache(directory, 2);
+
+    await cache.store('first', 'one', 'txt', validationResults);
+    await new Promise(resolve => setTimeout(resolve, 20));
+    await cache.store('second', 'two', 'txt', validationResults);
+    await new Promise(resolve => setTimeout(resolve, 20));
+    await cache.load('first');
+    await new Promise(resolve => setTimeout(resolve, 20));
+    await cache.store('third', 'three', 'txt', validationResults);
+
+    expect(await cache.load('first')).not.toBeNull();
+    expect(await cache.load('second')).toBeNull();
+    expect(await cache.load('third')).not.toBeNull();
+  });
+
+  it('keeps a job download readable after its artifact is evicted', async () => {
+    const cache = new ExportArtifactCache(directory, 1);
+
+    const stored = await cache.store('first', 'one', 'txt', validationResults);
+    const download = await cache.linkForJob(stored, 'job-1');
+    await new Promise(resolve => setTimeout(resolve, 20));
+    await cache.store('second', 'two', 'txt', validationResults);
+
+    expect(await cache.load('first')).toBeNull();
+    expect(readFileSync(download, 'utf8')).toBe('one');
+
+    await cache.release(download);
+    expect(existsSync(download)).toBe(false);
+  });
+
+  it('does not count sidecars whose file is still being written', async () => {
+    const cache = new ExportArtifactCache(directory, 2);
+
+    await cache.store('first', 'one', 'txt', validationResults);
+    writeFileSync(join(directory, 'pending.json'), JSON.stringify({ file: 'pending.txt', size: 3, validationResults }));
+    await cache.store('second', 'two', 'txt', validationResults);
+
+    expect(await cache.load('first')).not.toBeNull();
+    expect(await cache.load('second')).not.toBeNull();
+  });
+});
@@ -0,0 +1,127 @@
+import { describe, it, expect, afterEach } from 'vitest';
+import { ExportWorkerPool, ExportTaskCancelledError } from '../services/exportWorkerPool.js';
+
+const WORKER_URL = new URL('./fixtures/poolWorker.mjs', import.meta.url);
+
+interface FixtureResult {
+  content: string;
+  threadId: number;
+}
+
+describe('ExportWorkerPool', () => {
+  let pool: ExportWorkerPool;
+
+  const createPool = (size: number) => {
+    pool = new ExportWorkerPool(size, WORKER_URL);
+    return pool;
+  };
+
+  // Runs a fixture command, recording when the worker starts it
+  const run = (command: string, started: string[] = []) => {
+    const task = pool.run(
+      { kind: 'formatManuscript', content: command, options: { formatType: 'standard' } },
+      () => started.push(command)
+    );
+    return {
+      ...task,
+      promise: task.promise as unknown as Promise<FixtureResult>
+    };
+  };
+
+  afterEach(async () => {
+    await pool.destroy();
+  });
+
+  it('never runs more tasks than its size', async () => {
+    createPool(2);
+    let running = 0;
+    let peak = 0;
+
+    const tasks = Array.from({ length: 6 }, (_, index) => {
+      const task = pool.run(
+        { kind: 'formatManuscript', content: `wait:${30 + index}`, options: { formatType: 'standard' } },
+        () => {
+          running++;
+          peak = Math.max(peak, running);
+        }
+      );
+      return task.promise.finally(() => { running--; });
+    });
+
+    expect(pool.getStatus()).toMatchObject({ busy: 2, queued: 4 });
+    await Promise.all(tasks);
+
+    expect(peak).toBe(2);
+    expect(pool.getStatus()).toMatchObject({ busy: 0, idle: 2, queued: 0 });
+  });
+
+  it('starts queued tasks in submission order', async () => {
+    createPool(1);
+    const started: string[] = [];
+
+    const results = await Promise.all(
+      ['wait:20', 'wait:1', 'wait:2', 'wait:3'].map(command => run(command, started).promise)
+    );
+
+    expect(started).toEqual(['wait:20', 'wait:1', 'wait:2', 'wait:3']);
+    expect(results.map(result => result.content)).toEqual(['wait:20', 'wait:1', 'wait:2', 'wait:3']);
+    // One worker served every task
+    expect(new Set(results.map(result => result.threadId)).size).toBe(1);
+  });
+
+  it('drops a cancelled task from the queue without running it', async () => {
+    createPool(1);
+    const started: string[] = [];
+
+    const first = run('wait:50', started);
+    const cancelled = run('wait:1', started);
+    const last = run('wait:2', started);
+    const outcome = cancelled.promise.catch(error => error);
+
+    cancelled.cancel();
+
+    expect(await outcome).toBeInstanceOf(ExportTaskCancelledError);
+    await Promise.all([first.promise, last.promise]);
+    expect(started).toEqual(['wait:50', 'wait:2']);
+  });
+
+  it('stops the worker of a cancelled running task and moves on', async () => {
+    createPool(1);
+    const started: string[] = [];
+
+    const running = run('wait:10000', started);
+    const next = run('wait:1', started);
+    const outcome = running.promise.catch(error => error);
+
+    await new Promise<void>(resolve => {
+      const check = () => (started.length > 0 ? resolve() : setTimeout(check, 5));
+      check();
+    });
+    running.cancel();
+
+    expect(await outcome).toBeInstanceOf(ExportTaskCancelledError);
+    expect((await next.promise).content).toBe('wait:1');
+    expect(pool.getStatus()).toMatchObject({ busy: 0, idle: 1 });
+  });
+
+  it('replaces a worker that crashes', async () => {
+    createPool(1);
+
+    const before = await run('wait:1').promise;
+    await expect(run('crash').promise).rejects.toThrow('exit code 3');
+    const after = await run('wait:1').promise;
+
+    expect(after.content).toBe('wait:1');
+    expect(after.threadId).not.toBe(before.threadId);
+  });
+
+  it('rejects tasks the worker reports as failed and keeps the worker', async () => {
+    createPool(1);
+
+    const before = await run('wait:1').promise;
+    await expect(run('fail').promise).rejects.toThrow('task failed');
+    const after = await run('wait:1').promise;
+
+    expect(after.threadId).toBe(before.threadId);
+  });
+});
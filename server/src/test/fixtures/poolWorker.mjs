@@ -0,0 +1,20 @@
+// Stand-in export worker for the ExportWorkerPool tests. The task's
+// `content` is a command: `wait:<ms>` replies after a delay, `fail`
+// reports an error and `crash` kills the thread.
+import { parentPort, threadId } from 'worker_threads';
+
+parentPort.on('message', task => {
+  const [command, argument] = task.content.split(':');
+  parentPort.postMessage({ type: 'progress', progress: 0, message: 'started' });
+
+  if (command === 'crash') {
+    process.exit(3);
+  }
+  if (command === 'fail') {
+    parentPort.postMessage({ type: 'failed', error: 'task failed' });
+    return;
+  }
+  setTimeout(() => {
+    parentPort.postMessage({ type: 'done', result: { content: task.content, threadId } });
+  }, Number(argument) || 0);
+});
@@ -0,0 +1,135 @@
+import { describe, it, expect, beforeAll, afterAll, beforeEach } from 'vitest';
+import { PrismaClient } from '@prisma/client';
+import { execSync } from 'child_process';
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import {
+  getProjectStats,
+  getProjectStatsBatch,
+  getProjectsWithStats,
+  invalidateProjectStats,
+  clearProjectStatsCache
+} from '../utils/queryOptimizer.js';
+
+// Throwaway SQLite database with the app schema pushed into it
+const databaseDir = mkdtempSync(join(tmpdir(), 'astral-stats-'));
+const databaseUrl = `file:${join(databaseDir, 'test.db')}`;
+const prisma = new PrismaClient({ datasources: { db: { url: databaseUrl } } });
+
+let ownerId: string;
+
+const createProject = async (title: string, stories: number[][], notes: number, characters: number, locations: number) => {
+  const project = await prisma.project.create({ data: { title, ownerId } });
+  for (const [index, sceneWords] of stories.entries()) {
+    const story = await prisma.story.create({ data: { title: `${title} story ${index}`, projectId: project.id } });
+    for (const [order, wordCount] of sceneWords.entries()) {
+      await prisma.scene.create({ data: { title: `Scene ${order}`, order, wordCount, storyId: story.id } });
+    }
+  }
+  for (let i = 0; i < notes; i++) {
+    await prisma.projectNote.create({ data: { title: `Note ${i}`, projectId: project.id } });
+  }
+  for (let i = 0; i < characters; i++) {
+    await prisma.character.create({ data: { name: `Character ${i}`, projectId: project.id } });
+  }
+  for (let i = 0; i < locations; i++) {
+    await prisma.location.create({ data: { name: `Location ${i}`, projectId: project.id } });
+  }
+  return project.id;
+};
+
+beforeAll(async () => {
+  execSync('npx prisma db push --skip-generate', {
+    env: { ...process.env, DATABASE_URL: databaseUrl },
+    stdio: 'ignore'
+  });
+  const owner = await prisma.user.create({
+    data: { email: 'stats@example.com', username: 'stats', password: 'x' }
+  });
+  ownerId = owner.id;
+}, 60000);
+
+afterAll(async () => {
+  await prisma.$disconnect();
+  rmSync(databaseDir, { recursive: true, force: true });
+});
+
+beforeEach(() => {
+  clearProjectStatsCache();
+});
+
+describe('getProjectStatsBatch', () => {
+  it('matches the per-project stats for every project', async () => {
+    const ids = [
+      await createProject('Full', [[120, 80], [300]], 2, 3, 1),
+      await createProject('Stories only', [[], [45]], 0, 0, 0),
+      await createProject('Empty', [], 0, 0, 0),
+      await createProject('World', [], 4, 2, 5)
+    ];
+
+    const batch = await getProjectStatsBatch(prisma, ids, { useCache: false });
+
+    expect([...batch.keys()].sort()).toEqual([...ids].sort());
+    for (const id of ids) {
+      expect(batch.get(id)).toEqual(await getProjectStats(prisma, id));
+    }
+    expect(batch.get(ids[0])).toEqual({
+      storyCount: 2,
+      sceneCount: 3,
+      noteCount: 2,
+      characterCount: 3,
+      locationCount: 1,
+      wordCount: 500
+    });
+  });
+
+  it('returns zeroed stats for unknown projects', async () => {
+    const stats = await getProjectStatsBatch(prisma, ['missing']);
+
+    expect(stats.get('missing')).toEqual({
+      storyCount: 0,
+      sceneCount: 0,
+      noteCount: 0,
+      characterCount: 0,
+      locationCount: 0,
+      wordCount: 0
+    });
+  });
+
+  it('serves cached stats until the project is invalidated', async () => {
+    const id = await createProject('Cached', [[10]], 1, 0, 0);
+    const before = await getProjectStatsBatch(prisma, [id]);
+    expect(before.get(id)!.noteCount).toBe(1);
+
+    await prisma.projectNote.create({ data: { title: 'Another', projectId: id } });
+    expect((await getProjectStatsBatch(prisma, [id])).get(id)!.noteCount).toBe(1);
+
+    invalidateProjectStats(id);
+    expect((await getProjectStatsBatch(prisma, [id])).get(id)!.noteCount).toBe(2);
+  });
+
+  it('returns copies that callers cannot use to change the cache', async () => {
+    const id = await createProject('Copied', [[10]], 1, 0, 0);
+    const fresh = await getProjectStatsBatch(prisma, [id]);
+    fresh.get(id)!.wordCount = 999;
+
+    const cached = await getProjectStatsBatch(prisma, [id]);
+    expect(cached.get(id)!.wordCount).toBe(10);
+    cached.get(id)!.noteCount = 999;
+
+    expect((await getProjectStatsBatch(prisma, [id])).get(id)!.noteCount).toBe(1);
+  });
+
+  it('pairs projects with their own stats in getProjectsWithStats', async () => {
+    const small = await createProject('Small', [[5]], 0, 0, 0);
+    const large = await createProject('Large', [[500, 500]], 0, 0, 0);
+
+    const projects = await getProjectsWithStats(prisma, ownerId, 100);
+
+    expect(projects.map(project => project.id)).toEqual(expect.arrayContaining([small, large]));
+    for (const project of projects) {
+      expect(project.stats).toEqual(await getProjectStats(prisma, project.id));
+    }
+  });
+});
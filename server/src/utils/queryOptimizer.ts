@@ -63,6 +63,162 @@ export const getProjectStats = async (
   };
 };
 
+// Cached stats are served for this long; writes through the routes drop them sooner
+export const PROJECT_STATS_TTL_MS = 30 * 1000;
+// Cached stats kept at most, across all projects
+const PROJECT_STATS_CACHE_LIMIT = 10000;
+// Project ids per grouped query, well inside SQLite's bound-parameter limit
+const PROJECT_STATS_BATCH_SIZE = 500;
+
+interface CachedProjectStats {
+  stats: ProjectStatsOptimized;
+  expiresAt: number;
+}
+
+const projectStatsCache = new Map<string, CachedProjectStats>();
+// Bumped by every invalidation, so a query that raced a write is not cached
+let projectStatsGeneration = 0;
+
+const emptyProjectStats = (): ProjectStatsOptimized => ({
+  storyCount: 0,
+  sceneCount: 0,
+  noteCount: 0,
+  characterCount: 0,
+  locationCount: 0,
+  wordCount: 0
+});
+
+/**
+ * Statistics for many projects with grouped aggregates: five queries per
+ * batch of projects instead of six per project
+ */
+const queryProjectStatsBatch = async (
+  prisma: PrismaClient,
+  projectIds: string[]
+): Promise<Map<string, ProjectStatsOptimized>> => {
+  const stats = new Map<string, ProjectStatsOptimized>();
+  projectIds.forEach(id => stats.set(id, emptyProjectStats()));
+
+  for (let start = 0; start < projectIds.length; start += PROJECT_STATS_BATCH_SIZE) {
+    const ids = projectIds.slice(start, start + PROJECT_STATS_BATCH_SIZE);
+    const [stories, sceneGroups, noteGroups, characterGroups, locationGroups] = await Promise.all([
+      // Scenes only know their story, so stories also map scenes to projects
+      prisma.story.findMany({
+        where: { projectId: { in: ids } },
+        select: { id: true, projectId: true }
+      }),
+      prisma.scene.groupBy({
+        by: ['storyId'],
+        where: { story: { projectId: { in: ids } } },
+        _count: { _all: true },
+        _sum: { wordCount: true }
+      }),
+      prisma.projectNote.groupBy({
+        by: ['projectId'],
+        where: { projectId: { in: ids } },
+        _count: { _all: true }
+      }),
+      prisma.character.groupBy({
+        by: ['projectId'],
+        where: { projectId: { in: ids } },
+        _count: { _all: true }
+      }),
+      prisma.location.groupBy({
+        by: ['projectId'],
+        where: { projectId: { in: ids } },
+        _count: { _all: true }
+      })
+    ]);
+
+    const projectOfStory = new Map<string, string>();
+    stories.forEach(story => {
+      projectOfStory.set(story.id, story.projectId);
+      stats.get(story.projectId)!.storyCount++;
+    });
+    sceneGroups.forEach(group => {
+      const projectStats = stats.get(projectOfStory.get(group.storyId)!);
+      if (projectStats) {
+        projectStats.sceneCount += group._count._all;
+        projectStats.wordCount += group._sum.wordCount || 0;
+      }
+    });
+    noteGroups.forEach(group => { stats.get(group.projectId)!.noteCount = group._count._all; });
+    characterGroups.forEach(group => { stats.get(group.projectId)!.characterCount = group._count._all; });
+    locationGroups.forEach(group => { stats.get(group.projectId)!.locationCount = group._count._all; });
+  }
+
+  return stats;
+};
+
+/**
+ * Statistics for many projects at once, keyed by project id.  Stats
+ * computed within the last PROJECT_STATS_TTL_MS come from the cache, and
+ * the rest are computed together with grouped aggregate queries.
+ */
+export const getProjectStatsBatch = async (
+  prisma: PrismaClient,
+  projectIds: string[],
+  { useCache = true }: { useCache?: boolean } = {}
+): Promise<Map<string, ProjectStatsOptimized>> => {
+  const uniqueIds = [...new Set(projectIds)];
+  const stats = new Map<string, ProjectStatsOptimized>();
+  const now = Date.now();
+
+  const missing = uniqueIds.filter(id => {
+    const cached = useCache ? projectStatsCache.get(id) : undefined;
+    if (cached && cached.expiresAt > now) {
+      // A copy, so callers cannot change what later requests are served
+      stats.set(id, { ...cached.stats });
+      return false;
+    }
+    return true;
+  });
+  if (missing.length === 0) {
+    return stats;
+  }
+
+  const generation = projectStatsGeneration;
+  const fresh = await queryProjectStatsBatch(prisma, missing);
+  const cacheable = useCache && generation === projectStatsGeneration;
+  fresh.forEach((projectStats, id) => {
+    stats.set(id, projectStats);
+    if (cacheable) {
+      cacheProjectStats(id, { ...projectStats });
+    }
+  });
+  return stats;
+};
+
+const cacheProjectStats = (projectId: string, stats: ProjectStatsOptimized): void => {
+  const now = Date.now();
+  if (projectStatsCache.size >= PROJECT_STATS_CACHE_LIMIT) {
+    projectStatsCache.forEach((cached, id) => {
+      if (cached.expiresAt <= now) projectStatsCache.delete(id);
+    });
+  }
+  // Still full: drop the oldest entries
+  for (const id of projectStatsCache.keys()) {
+    if (projectStatsCache.size < PROJECT_STATS_CACHE_LIMIT) break;
+    projectStatsCache.delete(id);
+  }
+  projectStatsCache.delete(projectId);
+  projectStatsCache.set(projectId, { stats, expiresAt: now + PROJECT_STATS_TTL_MS });
+};
+
+/**
+ * Drop cached stats after a write that changes a project's stories,
+ * scenes, notes, characters or locations
+ */
+export const invalidateProjectStats = (projectId: string): void => {
+  projectStatsGeneration++;
+  projectStatsCache.delete(projectId);
+};
+
+export const clearProjectStatsCache = (): void => {
+  projectStatsGeneration++;
+  projectStatsCache.clear();
+};
+
 /**
  * Batch fetch project data with optimized queries
  */
@@ -137,7 +293,7 @@ export const getProjectWithOptimizedStats = async (
     }),
     
     // Separate optimized stats query
-    getProjectStats(prisma, projectId)
+    getProjectStatsBatch(prisma, [projectId]).then(stats => stats.get(projectId)!)
   ]);
 
   if (!project) {
@@ -202,12 +358,12 @@ export const getProjectsWithStats = async (
     }),
 
     // Batch stats for all projects
-    Promise.all(ids.map(id => getProjectStats(prisma, id)))
+    getProjectStatsBatch(prisma, ids)
   ]);
 
   // Combine projects with their stats
-  return projects.map((project, index) => ({
+  return projects.map(project => ({
     ...project,
-    stats: allStats[index]
+    stats: allStats.get(project.id)!
   }));
 };
\ No newline at end of file
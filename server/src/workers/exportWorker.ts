@@ -0,0 +1,41 @@
+/**
+ * Export Worker
+ *
+ * Worker thread entry for ExportWorkerPool: receives one task at a time,
+ * posts progress while it runs, then posts its result or error.
+ */
+
+import { parentPort } from 'worker_threads';
+import { generateExport } from '../services/exportFormats.js';
+import { formatManuscriptContent } from '../services/manuscriptFormatting.js';
+import type { ExportWorkerMessage, ExportWorkerTask } from '../services/exportWorkerPool.js';
+
+const post = (message: ExportWorkerMessage, transfer: ArrayBuffer[] = []) => {
+  parentPort!.postMessage(message, transfer);
+};
+
+const runTask = async (task: ExportWorkerTask) => {
+  switch (task.kind) {
+    case 'export': {
+      const generated = await generateExport(
+        task.contentData,
+        task.format,
+        task.template,
+        task.options,
+        (progress, message) => post({ type: 'progress', progress, message })
+      );
+      // Hand binary output over without copying it
+      post({ type: 'done', result: generated }, generated.data instanceof ArrayBuffer ? [generated.data] : []);
+      return;
+    }
+    case 'formatManuscript':
+      post({ type: 'done', result: formatManuscriptContent(task.content, task.options) });
+      return;
+  }
+};
+
+parentPort!.on('message', (task: ExportWorkerTask) => {
+  runTask(task).catch(error => {
+    post({ type: 'failed', error: error instanceof Error ? error.message : String(error) });
+  });
+});
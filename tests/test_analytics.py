@@ -0,0 +1,224 @@
+import io
+import json
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from analytics.cache import ColumnCache, export_digest
+from analytics.columns import SCHEMA, concat, read_export
+from analytics.jsonstream import WILDCARD, iter_paths
+from analytics.runner import load_one, run_parallel
+
+
+def export(projects=(), notes=None, sessions=None):
+    data = {'projects': list(projects), 'notes': notes or {}, 'preferences': {}, 'appData': {}}
+    if sessions is not None:
+        data['sessions'] = sessions
+    return data
+
+
+def project(project_id, chapters=(), scenes=(), **fields):
+    return {'id': project_id, 'wordCount': 0, 'createdAt': '2024-01-01T00:00:00Z',
+            'stories': [{'id': f'{project_id}-story', 'chapters': list(chapters), 'scenes': list(scenes)}],
+            **fields}
+
+
+def columns_of(data, block_size=None):
+    return read_export(io.StringIO(json.dumps(data)), block_size)
+
+
+def _walk_reference(value, path, selectors):
+    """Selected values by walking the fully loaded document."""
+    depth = len(path)
+    if any(len(selector) == depth for selector in selectors):
+        yield tuple(path), value
+        return
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, child in items:
+        matching = [s for s in selectors if len(s) > depth and s[depth] in (WILDCARD, key)]
+        if matching:
+            yield from _walk_reference(child, path + [key], matching)
+
+
+SELECTORS = [('projects', WILDCARD, 'stories', WILDCARD, 'scenes', WILDCARD),
+             ('projects', WILDCARD, 'id'),
+             ('notes', WILDCARD, WILDCARD)]
+
+
+def _random_document(rng):
+    def scalar():
+        return rng.choice([
+            rng.randint(-10 ** 6, 10 ** 6), rng.random() * 1e5, -1.5e-7, 12345678901234567890,
+            'text', 'quote " and \\ backslash', 'ünïcode  ', '', True, False, None,
+        ])
+
+    def scene():
+        return {'id': str(rng.random()), 'content': 'x' * rng.randint(0, 40), 'wordCount': scalar(),
+                'tags': [scalar() for _ in range(rng.randint(0, 3))]}
+
+    return {
+        'projects': [{
+            'id': f'p{n}',
+            'meta': {'nested': [[scalar()], {'deep': scalar()}]},
+            'stories': [{'scenes': [scene() for _ in range(rng.randint(0, 4))], 'chapters': []}
+                        for _ in range(rng.randint(0, 3))],
+        } for n in range(rng.randint(0, 4))],
+        'notes': {f'p{n}': [scene() for _ in range(rng.randint(0, 3))] for n in range(rng.randint(0, 3))},
+        'trailing': scalar(),
+    }
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 3, 5, 8, 64, 1 << 16])
+def test_iter_paths_matches_a_full_parse_at_any_block_size(block_size):
+    rng = random.Random(block_size)
+    for _ in range(40):
+        document = _random_document(rng)
+        for indent in (None, 2):
+            text = json.dumps(document, indent=indent, ensure_ascii=rng.random() < 0.5)
+            found = list(iter_paths(io.StringIO(text), SELECTORS, block_size=block_size))
+            assert found == list(_walk_reference(json.loads(text), [], SELECTORS))
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 3])
+def test_numbers_split_across_blocks_are_read_whole(block_size):
+    text = '{"notes": {"p": [{"wordCount": 123456789}, {"wordCount": 1.25e+3}, {"wordCount": -0.5}]}}'
+    values = [value['wordCount'] for _, value in iter_paths(io.StringIO(text), [('notes', '*', '*')],
+                                                            block_size=block_size)]
+    assert values == [123456789, 1250.0, -0.5]
+
+
+@pytest.mark.parametrize('text', ['', '{"notes": {"p": [1, 2}', '{"a": 1} {"b": 2}', '{1: 2}'])
+def test_iter_paths_rejects_malformed_json(text):
+    with pytest.raises(ValueError):
+        list(iter_paths(io.StringIO(text), [('a',)], block_size=2))
+
+
+def test_read_export_columns():
+    data = export(
+        projects=[
+            project('a', chapters=[{'id': 'c1', 'wordCount': 10}, {'id': 'c2', 'content': '<p>three words here</p>'}],
+                    scenes=[{'chapterId': 'c2', 'wordCount': 4}, {'chapterId': 'missing', 'wordCount': 5}],
+                    wordCount=19, targetWordCount=50000),
+            project('b', wordCount=7),
+        ],
+        notes={'b': [{'wordCount': 2, 'createdAt': 0, 'updatedAt': '2024-01-02T00:00:00+00:00'}],
+               'gone': [{'wordCount': 1}]},
+        sessions=[{'projectId': 'a', 'startTime': '2024-01-01T10:00:00Z', 'duration': 30,
+                   'wordsWritten': 100, 'wordsDeleted': 20}],
+    )
+    columns = columns_of(data)
+    assert set(columns) == set(SCHEMA)
+    assert columns['projects.id'].tolist() == ['a', 'b']
+    assert columns['projects.word_count'].tolist() == [19, 7]
+    assert columns['chapters.word_count'].tolist() == [10, 3]
+    assert columns['scenes.chapter'].tolist() == [1, -1]
+    assert columns['notes.project'].tolist() == [1, -1]
+    assert columns['notes.created'][0] == np.datetime64(0, 'ms')
+    assert np.isnat(columns['notes.created'][1])
+    assert columns['sessions.net_words'].tolist() == [80]
+
+
+def test_out_of_range_numbers_do_not_overflow():
+    data = export(
+        projects=[project('a', scenes=[{'wordCount': 1e20, 'content': 'two words'}],
+                          wordCount=1e20, targetWordCount=2 ** 63, createdAt=1e300)],
+        notes={'a': [{'wordCount': -1e19, 'createdAt': -2 ** 63, 'updatedAt': 1e300}]},
+        sessions=[{'projectId': 'a', 'wordsWritten': 2 ** 63 - 1, 'wordsDeleted': -(2 ** 63 - 1),
+                   'duration': 1e300, 'startTime': 1e20}],
+    )
+    columns = columns_of(data)
+    assert columns['projects.word_count'].tolist() == [0]
+    assert columns['projects.target'].tolist() == [0]
+    assert np.isnat(columns['projects.created'][0])
+    # A stored count that cannot be right falls back to counting the content
+    assert columns['scenes.word_count'].tolist() == [2]
+    assert columns['notes.word_count'].tolist() == [0]
+    assert np.isnat(columns['notes.created'][0]) and np.isnat(columns['notes.updated'][0])
+    assert columns['sessions.words_written'].tolist() == [2 ** 63 - 1]
+    assert columns['sessions.net_words'].tolist() == [0]
+    assert np.isnat(columns['sessions.start'][0])
+
+
+def test_infinite_numbers_are_treated_as_missing():
+    text = '{"projects": [{"id": "a", "wordCount": 1e400, "createdAt": -1e400}], "notes": {}}'
+    columns = read_export(io.StringIO(text))
+    assert columns['projects.word_count'].tolist() == [0]
+    assert np.isnat(columns['projects.created'][0])
+
+
+def test_concat_renumbers_references():
+    first = columns_of(export(
+        projects=[project('a', chapters=[{'id': 'c1'}], scenes=[{'chapterId': 'c1', 'wordCount': 1}])],
+        notes={'a': [{'wordCount': 1}], 'nope': [{'wordCount': 1}]},
+    ))
+    second = columns_of(export(
+        projects=[project('x'), project('y', chapters=[{'id': 'c1'}, {'id': 'c2'}],
+                                        scenes=[{'chapterId': 'c2', 'wordCount': 2}, {'wordCount': 3}])],
+        notes={'y': [{'wordCount': 2}]},
+        sessions=[{'projectId': 'x'}],
+    ))
+    joined = concat([first, second])
+
+    assert joined['projects.id'].tolist() == ['a', 'x', 'y']
+    assert joined['projects.export'].tolist() == [0, 1, 1]
+    assert joined['chapters.project'].tolist() == [0, 2, 2]
+    assert joined['scenes.project'].tolist() == [0, 2, 2]
+    assert joined['scenes.chapter'].tolist() == [0, 2, -1]
+    assert joined['notes.project'].tolist() == [0, -1, 2]
+    assert joined['notes.export'].tolist() == [0, 0, 1]
+    assert joined['sessions.project'].tolist() == [1]
+    for name, dtype in SCHEMA.items():
+        assert joined[name].dtype == first[name].dtype, name
+
+
+def test_concat_of_nothing_is_empty():
+    joined = concat([])
+    assert all(len(joined[name]) == 0 for name in SCHEMA)
+
+
+def test_npz_cache_round_trip(tmp_path):
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps(export(
+        projects=[project('a', scenes=[{'wordCount': 3}])],
+        notes={'a': [{'wordCount': 1, 'createdAt': '2024-03-01T12:00:00Z'}]},
+    )))
+    cache = ColumnCache(str(tmp_path / 'cache'))
+
+    first = load_one(str(path), cache)
+    second = load_one(str(path), cache)
+    assert not first.cached and second.cached
+    for name in SCHEMA:
+        assert second.columns[name].dtype == first.columns[name].dtype, name
+        assert second.columns[name].tolist() == first.columns[name].tolist(), name
+
+    # A different export is a different entry
+    path.write_text(json.dumps(export(projects=[project('b')])))
+    third = load_one(str(path), cache)
+    assert not third.cached
+    assert third.columns['projects.id'].tolist() == ['b']
+
+
+def test_damaged_cache_entries_are_ignored(tmp_path):
+    path = tmp_path / 'export.json'
+    path.write_text(json.dumps(export(projects=[project('a')])))
+    cache = ColumnCache(str(tmp_path / 'cache'))
+    with open(cache.path(export_digest(str(path))), 'wb') as f:
+        f.write(b'not a zip file')
+    result = load_one(str(path), cache)
+    assert not result.cached
+    assert result.columns['projects.id'].tolist() == ['a']
+
+
+def test_one_bad_export_does_not_stop_the_run(tmp_path):
+    good = tmp_path / 'a.json'
+    good.write_text(json.dumps(export(projects=[project('a', wordCount=5)])))
+    broken = tmp_path / 'b.json'
+    broken.write_text('{"projects": [')
+    missing = tmp_path / 'c.json'
+
+    run = run_parallel([str(good), str(broken), str(missing)], jobs=1)
+    assert [result.path for result in run.loaded] == [str(good)]
+    assert [result.path for result in run.failed] == [str(broken), str(missing)]
+    assert run.aggregates['projects'] == 1
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+import codemod.cache
+from codemod.cache import RuleCache, content_hash, ruleset_version
+from codemod.engine import PatchEngine
+from codemod.rules import RegexRule
+
+SOURCE = 'const items = this.getItems();\n'
+REWRITTEN = 'const items = this.items();\n'
+
+
+def rules(replacement='this.items()'):
+    return [RegexRule('rename', 'store.ts', r'this\.getItems\(\)', replacement)]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = RuleCache(str(tmp_path / 'cache'))
+    yield cache
+    cache.close()
+
+
+def run(tmp_path, cache, rule_set=None):
+    return PatchEngine(rule_set or rules(), root=str(tmp_path), cache=cache).run()[0]
+
+
+def test_a_ruleset_version_bump_invalidates_entries(cache, monkeypatch):
+    digest = content_hash(SOURCE.encode())
+    version = ruleset_version(rules())
+    cache.store(digest, version, {'rename': 1}, REWRITTEN.encode())
+    assert cache.lookup(digest, version).output == REWRITTEN.encode()
+
+    # A different replacement, or a new cache format, is a different version
+    assert ruleset_version(rules('this.all()')) != version
+    monkeypatch.setattr(codemod.cache, 'CACHE_FORMAT', codemod.cache.CACHE_FORMAT + 1)
+    bumped = ruleset_version(rules())
+    assert bumped != version
+    assert cache.lookup(digest, bumped) is None
+
+
+def test_a_content_change_invalidates_entries(tmp_path, cache):
+    path = tmp_path / 'store.ts'
+    path.write_text(SOURCE)
+    run(tmp_path, cache)
+    run(tmp_path, cache)
+    assert run(tmp_path, cache).cached
+
+    path.write_text(SOURCE + 'const more = this.getItems();\n')
+    result = run(tmp_path, cache)
+
+    assert not result.cached and result.changed
+    assert path.read_text() == REWRITTEN + 'const more = this.items();\n'
+
+
+def test_a_corrupt_database_falls_back_to_no_cache(tmp_path, capsys):
+    (tmp_path / 'cache').mkdir()
+    (tmp_path / 'cache' / 'cache.sqlite3').write_bytes(b'not a database' * 100)
+    (tmp_path / 'store.ts').write_text(SOURCE)
+
+    cache = RuleCache(str(tmp_path / 'cache'))
+    result = run(tmp_path, cache)
+    cache.close()
+
+    assert not cache.enabled
+    assert 'running without the codemod cache' in capsys.readouterr().err
+    assert result.changed and not result.cached
+    assert (tmp_path / 'store.ts').read_text() == REWRITTEN
+
+
+def test_a_locked_database_falls_back_to_no_cache(tmp_path, capsys):
+    (tmp_path / 'store.ts').write_text(SOURCE)
+    cache = RuleCache(str(tmp_path / 'cache'), timeout=0.05)
+    assert cache.enabled
+
+    # Another process holds the database for longer than the timeout
+    other = sqlite3.connect(str(tmp_path / 'cache' / 'cache.sqlite3'))
+    other.execute('BEGIN EXCLUSIVE')
+    try:
+        result = run(tmp_path, cache)
+        locked_out = RuleCache(str(tmp_path / 'cache'), timeout=0.05)
+    finally:
+        other.rollback()
+        other.close()
+    cache.close()
+
+    assert not cache.enabled and not locked_out.enabled
+    assert 'database is locked' in capsys.readouterr().err
+    assert result.changed and not result.cached
+    assert (tmp_path / 'store.ts').read_text() == REWRITTEN
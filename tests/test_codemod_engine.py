@@ -0,0 +1,221 @@
+import builtins
+import os
+
+import pytest
+
+from codemod.cache import RuleCache
+from codemod.engine import PatchEngine, apply_edits, apply_rules, group_by_target, load_fix_scripts
+from codemod.rules import Edit, FunctionRule, RegexRule
+from codemod.stream import stream_rewrite
+
+SOURCE = '''export class Store {
+  load() {
+    const items = this.getItems();
+    return items;
+  }
+
+  save() {
+    this.getItems().forEach(item => write(item));
+  }
+}
+'''
+
+
+def rules(target='store.ts'):
+    return [
+        RegexRule('rename', target, r'this\.getItems\(\)', 'this.items()'),
+        RegexRule('semicolons', target, r'return (\w+);', r'return \1 ?? [];'),
+        RegexRule('unmatched', target, r'never present', 'x'),
+    ]
+
+
+@pytest.fixture
+def opens(monkeypatch):
+    """Paths opened through open(), with their modes."""
+    calls = []
+    real_open = builtins.open
+
+    def counting_open(file, mode='r', *args, **kwargs):
+        calls.append((os.path.basename(str(file)), mode))
+        return real_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    return calls
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write(path, text):
+    path.write_bytes(text.encode())
+    return path
+
+
+def test_apply_edits_splices_in_one_pass():
+    assert apply_edits('abcdef', [Edit(4, 5, 'E', 'b'), Edit(0, 1, 'A', 'a'), Edit(2, 2, '+', 'c')]) == 'Ab+cdEf'
+    assert apply_edits('same', []) == 'same'
+
+
+def test_group_by_target_keeps_registration_order():
+    a, b, c = RegexRule('a', 'x.ts', 'a', ''), RegexRule('b', 'y.ts', 'b', ''), RegexRule('c', 'x.ts', 'c', '')
+    assert group_by_target([a, b, c]) == {'x.ts': [a, c], 'y.ts': [b]}
+
+
+def test_every_rule_applies_in_one_read_and_write(tmp_path, opens):
+    path = write(tmp_path / 'store.ts', SOURCE)
+    results = PatchEngine(rules(), root=str(tmp_path)).run()
+
+    assert len(results) == 1
+    result = results[0]
+    assert result.changed
+    assert result.hits == {'rename': 2, 'semicolons': 1, 'unmatched': 0}
+    assert path.read_text() == (SOURCE.replace('this.getItems()', 'this.items()')
+                                .replace('return items;', 'return items ?? [];'))
+    # One read; the write goes through a temporary file renamed over the target
+    assert opens == [('store.ts', 'rb')]
+    assert [name for name in os.listdir(tmp_path) if name != 'store.ts'] == []
+
+
+def test_rules_see_the_original_text(tmp_path):
+    write(tmp_path / 'store.ts', 'abc')
+    first = RegexRule('first', 'store.ts', 'abc', 'xyz')
+    second = RegexRule('second', 'store.ts', 'xyz', 'never')
+    result = PatchEngine([first, second], root=str(tmp_path)).run()[0]
+    assert (tmp_path / 'store.ts').read_text() == 'xyz'
+    assert result.hits == {'first': 1, 'second': 0}
+
+
+def test_unchanged_files_are_not_written(tmp_path):
+    path = write(tmp_path / 'store.ts', 'nothing to do\n')
+    before = os.stat(path).st_mtime_ns
+    result = PatchEngine(rules(), root=str(tmp_path)).run()[0]
+    assert not result.changed
+    assert os.stat(path).st_mtime_ns == before
+
+
+def test_dry_run_returns_a_diff_and_writes_nothing(tmp_path):
+    path = write(tmp_path / 'store.ts', SOURCE)
+    result = PatchEngine(rules(), root=str(tmp_path), dry_run=True).run()[0]
+    assert result.changed
+    assert path.read_text() == SOURCE
+    assert result.diff.startswith('--- a/store.ts\n+++ b/store.ts\n')
+    assert '\n-    return items;\n' in result.diff
+    assert '\n+    return items ?? [];\n' in result.diff
+
+
+def test_overlapping_rules_are_reported(tmp_path):
+    write(tmp_path / 'store.ts', 'one two three\n')
+    overlapping = [
+        RegexRule('a', 'store.ts', 'one two', 'ONE TWO'),
+        RegexRule('b', 'store.ts', 'two three', 'TWO THREE'),
+    ]
+    result = PatchEngine(overlapping, root=str(tmp_path)).run()[0]
+    assert (tmp_path / 'store.ts').read_text() == 'ONE TWO three\n'
+    assert [(c.kept, c.dropped, c.line) for c in result.conflicts] == [('a', 'b', 1)]
+
+
+def test_cache_answers_unchanged_files_without_reading_them(tmp_path, opens):
+    path = write(tmp_path / 'store.ts', SOURCE)
+    cache = RuleCache(str(tmp_path / 'cache'))
+    try:
+        first = PatchEngine(rules(), root=str(tmp_path), cache=cache).run()[0]
+        assert first.changed and not first.cached
+        rewritten = path.read_text()
+
+        # The rewritten file is new input; once it has been through the rules it is not read again
+        second = PatchEngine(rules(), root=str(tmp_path), cache=cache).run()[0]
+        assert not second.cached and not second.changed
+        del opens[:]
+        repeat = PatchEngine(rules(), root=str(tmp_path), cache=cache).run()[0]
+        assert repeat.cached and not repeat.changed
+        assert repeat.hits == {'rename': 0, 'semicolons': 0, 'unmatched': 0}
+        assert opens == []
+        assert path.read_text() == rewritten
+
+        # The same input again is answered with the stored output
+        write(path, SOURCE)
+        third = PatchEngine(rules(), root=str(tmp_path), cache=cache).run()[0]
+        assert third.cached and third.changed
+        assert third.hits == first.hits
+        assert path.read_text() == rewritten
+
+        # A changed rule is a different rule set
+        changed = rules()[:1] + [RegexRule('semicolons', 'store.ts', r'return (\w+);', r'return \1;')]
+        write(path, SOURCE)
+        fourth = PatchEngine(changed, root=str(tmp_path), cache=cache).run()[0]
+        assert not fourth.cached
+    finally:
+        cache.close()
+
+
+def test_function_rules_propose_spans(tmp_path):
+    write(tmp_path / 'store.ts', SOURCE)
+
+    def wrap_class(text):
+        start = text.index('export class')
+        yield start, start, '// generated\n'
+
+    rule = FunctionRule('banner', 'store.ts', wrap_class)
+    PatchEngine([rule], root=str(tmp_path)).run()
+    assert (tmp_path / 'store.ts').read_text() == '// generated\n' + SOURCE
+
+
+def _large_source(copies):
+    return ''.join(SOURCE.replace('Store', f'Store{n}') for n in range(copies))
+
+
+def test_stream_and_in_memory_paths_agree(tmp_path):
+    text = _large_source(200) + 'one two three\n'
+    stream_rules = rules() + [
+        RegexRule('a', 'store.ts', 'one two', 'ONE TWO'),
+        RegexRule('b', 'store.ts', 'two three', 'TWO THREE'),
+    ]
+    streamed_path = write(tmp_path / 'streamed.ts', text)
+    in_memory_path = write(tmp_path / 'memory.ts', text)
+
+    streamed = PatchEngine(stream_rules, root=str(tmp_path), stream_threshold=0).run_file('streamed.ts', stream_rules)
+    in_memory = PatchEngine(stream_rules, root=str(tmp_path), stream_threshold=None).run_file('memory.ts', stream_rules)
+
+    assert streamed_path.read_bytes() == in_memory_path.read_bytes()
+    assert streamed.changed and in_memory.changed
+    assert streamed.hits == in_memory.hits
+    # ASCII input, so byte and character offsets agree
+    assert streamed.conflicts == in_memory.conflicts
+
+
+def test_stream_rewrite_declines_what_it_cannot_stream(tmp_path):
+    crlf = write(tmp_path / 'crlf.ts', SOURCE.replace('\n', '\r\n'))
+    assert stream_rewrite(str(crlf), rules()) is None
+    assert crlf.read_bytes() == SOURCE.replace('\n', '\r\n').encode()
+
+    plain = write(tmp_path / 'plain.ts', SOURCE)
+    function_rule = FunctionRule('f', 'plain.ts', lambda text: [])
+    assert stream_rewrite(str(plain), rules() + [function_rule]) is None
+    callable_rule = RegexRule('c', 'plain.ts', 'load', lambda m: 'LOAD')
+    assert stream_rewrite(str(plain), [callable_rule]) is None
+
+    empty = write(tmp_path / 'empty.ts', '')
+    assert stream_rewrite(str(empty), rules()) is None
+
+
+def test_stream_rewrite_leaves_unmatched_files_alone(tmp_path):
+    path = write(tmp_path / 'store.ts', 'nothing to do\n')
+    before = os.stat(path).st_mtime_ns
+    assert stream_rewrite(str(path), rules()) == (False, {'rename': 0, 'semicolons': 0, 'unmatched': 0}, [])
+    assert os.stat(path).st_mtime_ns == before
+
+
+def test_stream_rewrite_does_not_write_edits_that_change_nothing(tmp_path):
+    path = write(tmp_path / 'store.ts', SOURCE)
+    before = os.stat(path).st_mtime_ns
+    same = [RegexRule('same', 'store.ts', r'return items;', 'return items;')]
+
+    assert stream_rewrite(str(path), same) == (False, {'same': 1}, [])
+    assert os.stat(path).st_mtime_ns == before
+    assert path.read_bytes() == SOURCE.encode()
+
+
+def test_fix_scripts_run_without_conflicts():
+    results = apply_rules(load_fix_scripts(ROOT), root=ROOT, cache_dir=None, dry_run=True)
+
+    assert [conflict for result in results for conflict in result.conflicts] == []
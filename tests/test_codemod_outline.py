@@ -0,0 +1,116 @@
+import pytest
+
+from codemod.engine import apply_edits
+from codemod.outline import OutlineRule, StructuralEditor, outline
+from codemod.tslex import BracketIndex
+
+SOURCE = '''import type { Note } from './types';
+
+export interface WritingSession {
+  id: string;
+  wordCount: number;
+  meta?: { source: string; tags: string[] };
+  readonly startTime: number;
+}
+
+export class SessionService {
+  private sessions: WritingSession[] = [];
+
+  // Not a method: if (x) { }
+  public async load(id: string): Promise<{ id: string }> {
+    const label = `session ${id} }`;
+    if (id === '}') {
+      return { id };
+    }
+    return { id: label.replace(/[}\\]]/g, '') };
+  }
+
+  save(session: WritingSession): void {
+    this.sessions.push(session);
+  }
+}
+'''
+
+
+def test_brackets_skip_strings_comments_templates_and_regexes():
+    index = BracketIndex(SOURCE)
+    class_open = SOURCE.index('{', SOURCE.index('class SessionService'))
+    assert index.match(class_open) == SOURCE.rindex('}')
+    code = index.code()
+    assert len(code) == len(SOURCE)
+    assert 'Not a method' not in code
+    assert '`session' not in code
+    assert "'}'" not in code
+
+
+def test_span_after():
+    text = "this.items = ['a]', { b: [1] }];\nnext();"
+    index = BracketIndex(text)
+    start, end = index.span_after('this.items = [')
+    assert text[start:end] == "this.items = ['a]', { b: [1] }]"
+    assert index.span_after('missing') is None
+
+
+def test_outline_finds_classes_methods_and_fields():
+    parsed = outline(SOURCE)
+    cls = parsed.classes['SessionService']
+    assert [method.name for method in cls.methods] == ['load', 'save']
+    load = cls.method('load')
+    assert SOURCE[load.start:load.end].startswith('  public async load(')
+    assert SOURCE[load.start:load.end].endswith("return { id: label.replace(/[}\\]]/g, '') };\n  }")
+
+    iface = parsed.interfaces['WritingSession']
+    assert [(f.name, f.optional, f.type) for f in iface.fields] == [
+        ('id', False, 'string'),
+        ('wordCount', False, 'number'),
+        ('meta', True, '{ source: string; tags: string[] }'),
+        ('startTime', False, 'number'),
+    ]
+    assert parsed.find_method('save')[0] is cls
+    assert parsed.find_method('missing') is None
+
+
+def test_editor_replaces_and_adds():
+    editor = StructuralEditor(SOURCE)
+    assert editor.replace_method('SessionService', 'save', '  save(): void {}')
+    assert editor.add_method('SessionService', '  clear(): void {\n    this.sessions = [];\n  }', after='load')
+    assert editor.add_interface_fields('WritingSession', ['totalWords: number;', 'id: string;'],
+                                       after='wordCount')
+    text = editor.apply()
+
+    parsed = outline(text)
+    assert [m.name for m in parsed.classes['SessionService'].methods] == ['load', 'clear', 'save']
+    assert '  save(): void {}\n}' in text
+    assert [f.name for f in parsed.interfaces['WritingSession'].fields] == [
+        'id', 'wordCount', 'totalWords', 'meta', 'startTime']
+    assert '  wordCount: number;\n  totalWords: number;\n' in text
+
+
+def test_editor_operations_are_idempotent():
+    editor = StructuralEditor(SOURCE)
+    load = outline(SOURCE).classes['SessionService'].method('load')
+    assert not editor.replace_method('SessionService', 'load', SOURCE[load.start:load.end])
+    assert not editor.add_method('SessionService', '  save(): void {}')
+    assert not editor.add_interface_fields('WritingSession', ['wordCount: number;'])
+    assert not editor.replace_method('MissingClass', 'load', '')
+    assert not editor.add_interface_fields('MissingInterface', ['x: number;'])
+    assert editor.edits == []
+    assert editor.apply() == SOURCE
+
+
+def test_malformed_fields_are_rejected():
+    editor = StructuralEditor(SOURCE)
+    with pytest.raises(ValueError, match='Not a field declaration'):
+        editor.add_interface_fields('WritingSession', ['totalWords number;'])
+
+
+def test_outline_rule_edits_are_attributed():
+    def add_total(editor):
+        editor.add_interface_field('WritingSession', 'totalWords: number;')
+
+    rule = OutlineRule('add_total', 'session.ts', add_total, group='fix')
+    edits = rule.find_edits(SOURCE)
+    assert [edit.rule for edit in edits] == ['fix.add_total']
+    updated = apply_edits(SOURCE, edits)
+    assert '  readonly startTime: number;\n  totalWords: number;\n}' in updated
+    assert rule.find_edits(updated) == []
@@ -0,0 +1,102 @@
+import os
+import random
+import re
+
+import pytest
+
+from codemod.bench import SHAPES, generate
+from codemod.engine import load_fix_scripts
+from codemod.prefilter import NO_ANCHORS, Anchors, LiteralScan, anchors
+from codemod.rules import RegexRule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prefiltered(rule, text):
+    """What the engine runs: nothing unless the literals occur, then a search from the lead."""
+    scan = LiteralScan(text)
+    if not scan.admits(rule.anchors):
+        return []
+    return rule.find_edits(text, scan.search_start(rule.anchors))
+
+
+def test_required_literals():
+    assert anchors(re.compile(r'// Store story in project\n(\s+)const')).literals == (
+        '// Store story in project\n', 'const')
+    # Optional parts and alternatives are not required
+    assert anchors(re.compile(r'(?:optional)?required')).literals == ('required',)
+    assert anchors(re.compile(r'first|second')) == NO_ANCHORS
+    # Zero-width assertions do not split a literal
+    assert anchors(re.compile(r'\bword(?=s)s\b')).literals == ('words',)
+    assert anchors(re.compile(r'(?i)casefold')) == NO_ANCHORS
+    assert anchors(re.compile(r'ab.cd')) == NO_ANCHORS
+
+
+def test_lead_offsets():
+    fixed = anchors(re.compile(r'\d{2,3}-literal'))
+    assert (fixed.lead, fixed.lead_offset) == ('-literal', 3)
+    run = anchors(re.compile(r'(\s+)literal'))
+    assert run.lead == 'literal' and run.lead_offset is None
+    text = 'x = 1;\n    literal'
+    assert run.search_start(text, text.index('literal')) == text.index('\n')
+
+
+def test_scan_memoises_positions():
+    scan = LiteralScan('abc needle def needle')
+    assert scan.first('needle') == 4
+    assert scan.admits(Anchors(('needle', 'def')))
+    assert not scan.admits(Anchors(('needle', 'missing')))
+    assert scan.positions == {'needle': 4, 'def': 11, 'missing': -1}
+
+
+PATTERNS = [
+    r'const (\w+) = this\.getProjectById\((\w+)\);',
+    r'(\s+)// Store\n(\s+)return value;',
+    r'(\s+)return value;\n(\s+)\}',
+    r'if \(project\) \{[^}]+?\n  \}',
+    r'^export (?:const|let) (\w+)',
+    r'(?<=\n)  private (\w+)\(',
+    r'\d{1,3}px solid',
+    r'(?:value|project)+\.stories',
+    r'value(?!\.stories)\.id',
+]
+
+FRAGMENTS = [
+    'const a = this.getProjectById(id);', '\n', '    ', '  ', '// Store', 'return value;',
+    '}', '{', 'if (project) {', '\n  }', 'export const x', 'export let y', '  private run(',
+    '12px solid', '1234px solid', 'value.stories', 'project.stories', 'value.id', 'stories', 'x',
+]
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_prefilter_never_skips_a_match(pattern):
+    rule = RegexRule('probe', '*', pattern, r'<\g<0>>', re.MULTILINE)
+    rng = random.Random(pattern)
+    for _ in range(400):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 25)))
+        assert prefiltered(rule, text) == rule.find_edits(text)
+
+
+@pytest.fixture(scope='module')
+def fix_rules():
+    return load_fix_scripts(ROOT)
+
+
+def _variants(text, literals):
+    yield text
+    for literal in literals:
+        # Drop one required literal at a time: the file can no longer be admitted
+        yield text.replace(literal, '')
+        # Keep only its last occurrence, so the lead is found late in the file
+        head, _, tail = text.rpartition(literal)
+        yield head.replace(literal, '') + literal + tail
+
+
+@pytest.mark.parametrize('shape_name', sorted(SHAPES))
+def test_prefilter_never_skips_a_fix_script_match(fix_rules, shape_name):
+    text = generate(shape_name, 400)
+    rules = [rule for rule in fix_rules if rule.applies_to(SHAPES[shape_name].target)]
+    assert any(rule.find_edits(text) for rule in rules)
+    for rule in rules:
+        for variant in _variants(text, rule.anchors.literals):
+            assert prefiltered(rule, variant) == rule.find_edits(variant), rule.id
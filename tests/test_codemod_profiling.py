@@ -0,0 +1,86 @@
+import re
+import threading
+import time
+
+from codemod.engine import FileResult
+from codemod.profiling import RuleTimer, rule_profile
+from codemod.rules import RegexRule
+from codemod.stream import stream_rewrite
+
+# Backtracks exponentially over a run of 'a's with no 'b' after it
+RUNAWAY = r'(a+)+b'
+
+
+def test_run_records_time_scanned_and_matches():
+    timer = RuleTimer()
+
+    assert timer.run('rule', 120, lambda: ['edit', 'edit']) == ['edit', 'edit']
+
+    [sample] = timer.samples
+    assert (sample.rule, sample.scanned, sample.matches, sample.status) == ('rule', 120, 2, 'ok')
+    assert sample.seconds >= 0
+    assert not timer.timed_out
+
+
+def test_skip_records_a_rule_that_was_prefiltered_out():
+    timer = RuleTimer()
+    timer.skip('rule')
+
+    assert timer.samples[0].status == 'skipped'
+    assert (timer.samples[0].scanned, timer.samples[0].matches) == (0, 0)
+
+
+def test_a_runaway_search_is_interrupted():
+    timer = RuleTimer(timeout=0.05)
+    started = time.perf_counter()
+
+    assert timer.run('runaway', 42, lambda: list(re.finditer(RUNAWAY, 'a' * 40))) == []
+
+    assert time.perf_counter() - started < 5
+    assert timer.samples[0].status == 'timeout'
+    assert timer.timed_out
+
+
+def test_a_slow_search_off_the_main_thread_finishes_but_counts_as_a_timeout():
+    timers = []
+    edits = []
+
+    def slow():
+        time.sleep(0.02)
+        return ['edit']
+
+    def worker():
+        # No interval timer off the main thread, as in a thread pool
+        timers.append(RuleTimer(timeout=0.001))
+        edits.extend(timers[0].run('slow', 1, slow))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert edits == ['edit']
+    assert timers[0].samples[0].status == 'timeout'
+
+
+def test_stream_rewrite_drops_the_edits_of_a_rule_that_timed_out(tmp_path):
+    path = tmp_path / 'runaway.ts'
+    path.write_bytes(b'const x = 1;\n' + b'a' * 40 + b'\n')
+    rules = [
+        RegexRule('runaway', '*', RUNAWAY, 'x'),
+        RegexRule('rename', '*', r'const x', 'let x'),
+        RegexRule('absent', '*', r'never present', 'x'),
+    ]
+    timer = RuleTimer(timeout=0.05)
+
+    changed, hits, conflicts = stream_rewrite(str(path), rules, timer=timer)
+
+    assert changed and conflicts == []
+    assert hits == {'runaway': 0, 'rename': 1, 'absent': 0}
+    assert path.read_bytes() == b'let x = 1;\n' + b'a' * 40 + b'\n'
+    assert {sample.rule: sample.status for sample in timer.samples} == {
+        'runaway': 'timeout', 'rename': 'ok', 'absent': 'skipped',
+    }
+
+    result = FileResult('runaway.ts', changed, hits, profile=tuple(timer.samples))
+    [runaway] = [row for row in rule_profile([result]) if row['rule'] == 'runaway']
+    assert runaway['timeouts'] == 1
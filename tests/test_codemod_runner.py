@@ -0,0 +1,57 @@
+import shutil
+
+from codemod.engine import PatchEngine, expand_globs, load_fix_scripts
+from codemod.rules import registered_rules
+from codemod.runner import run_parallel
+
+SCRIPT = '''
+from codemod import RegexRule, register
+
+GROUP = 'runner_probe'
+
+RULES = [
+    register(RegexRule('rename', 'src/**', r'getItems', 'items', group=GROUP)),
+    register(RegexRule('one_two', 'src/**', r'one two', 'ONE TWO', group=GROUP)),
+    register(RegexRule('two_three', 'src/**', r'two three', 'TWO THREE', group=GROUP)),
+]
+'''
+
+RULE_IDS = ['runner_probe.rename', 'runner_probe.one_two', 'runner_probe.two_three']
+
+
+def _tree(root):
+    for n in range(40):
+        path = root / 'src' / f'pkg{n % 4}' / f'file{n}.ts'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f'const a{n} = this.getItems();'] * (n % 3)
+        if n % 5 == 0:
+            lines.append('one two three')  # overlapping rules: a conflict
+        if n % 7 == 0:
+            lines.append('nothing to change here')
+        path.write_text('\n'.join(lines) + '\n')
+
+
+def test_parallel_run_matches_a_serial_engine_run(tmp_path):
+    scripts = tmp_path / 'scripts'
+    scripts.mkdir()
+    (scripts / 'fix_runner_probe.py').write_text(SCRIPT)
+    load_fix_scripts(str(scripts))
+    rules = [rule for rule in registered_rules() if rule.id in RULE_IDS]
+
+    parallel_root = tmp_path / 'parallel'
+    serial_root = tmp_path / 'serial'
+    _tree(parallel_root)
+    shutil.copytree(parallel_root, serial_root)
+    paths = expand_globs(['src/**/*.ts'], str(parallel_root))
+
+    summary = run_parallel(paths, scripts_dir=str(scripts), root=str(parallel_root), rule_ids=RULE_IDS,
+                           jobs=4, chunk_size=3, stream_threshold=None)
+    serial = sorted(PatchEngine(rules, root=str(serial_root), stream_threshold=None).run_paths(paths),
+                    key=lambda result: result.path)
+
+    assert [(r.path, r.changed, r.hits, r.conflicts) for r in summary.results] == \
+        [(r.path, r.changed, r.hits, r.conflicts) for r in serial]
+    assert any(result.conflicts for result in serial)
+    assert summary.hits['runner_probe.rename'] > 0
+    for path in paths:
+        assert (parallel_root / path).read_text() == (serial_root / path).read_text()
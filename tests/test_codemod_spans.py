@@ -0,0 +1,114 @@
+import random
+
+from codemod.engine import apply_edits
+from codemod.rules import Edit
+from codemod.spans import Conflict, EditIndex, number_lines, resolve_edits
+
+
+def _overlaps(a, b):
+    return a.start < b.end and b.start < a.end
+
+
+def _reference(edits):
+    """The documented resolution, by brute force."""
+    accepted = []
+    conflicts = []
+    for edit in edits:
+        if any(other[:3] == edit[:3] for other in accepted):
+            continue
+        existing = sorted((other for other in accepted if _overlaps(edit, other)),
+                          key=lambda e: (e.start, e.end))
+        covers = edit.start < edit.end and all(
+            edit.start <= other.start and other.end <= edit.end for other in existing)
+        if existing and not covers:
+            conflicts.extend(Conflict(edit.start, edit.end, other.rule, edit.rule) for other in existing)
+            continue
+        conflicts.extend(Conflict(other.start, other.end, edit.rule, other.rule) for other in existing)
+        accepted = [other for other in accepted if other not in existing] + [edit]
+    return accepted, conflicts
+
+
+def test_disjoint_edits_are_all_kept_in_order():
+    edits, conflicts = resolve_edits([Edit(6, 9, 'C', 'b'), Edit(0, 3, 'A', 'a')])
+    assert [edit.rule for edit in edits] == ['a', 'b']
+    assert conflicts == []
+
+
+def test_partial_overlap_drops_the_later_edit():
+    edits, conflicts = resolve_edits([Edit(0, 5, 'first', 'a'), Edit(3, 8, 'second', 'b')])
+    assert edits == [Edit(0, 5, 'first', 'a')]
+    assert conflicts == [Conflict(3, 8, 'a', 'b')]
+
+
+def test_covering_edit_replaces_the_edits_it_covers():
+    edits, conflicts = resolve_edits([
+        Edit(2, 4, 'x', 'a'),
+        Edit(6, 7, 'y', 'b'),
+        Edit(0, 10, 'whole', 'c'),
+    ])
+    assert edits == [Edit(0, 10, 'whole', 'c')]
+    assert conflicts == [Conflict(2, 4, 'c', 'a'), Conflict(6, 7, 'c', 'b')]
+
+
+def test_resolution_depends_only_on_rule_order():
+    proposed = [Edit(0, 5, 'a', 'a'), Edit(3, 8, 'b', 'b'), Edit(0, 8, 'c', 'c')]
+    first = resolve_edits(proposed)
+    assert all(resolve_edits(list(proposed)) == first for _ in range(5))
+    # Swapping the first two rules changes which of them survives until the third covers both
+    assert resolve_edits([proposed[1], proposed[0]])[0] == [Edit(3, 8, 'b', 'b')]
+
+
+def test_identical_edits_are_kept_once():
+    edits, conflicts = resolve_edits([
+        Edit(0, 3, 'x', 'a'), Edit(0, 3, 'x', 'b'),
+        Edit(5, 5, 'import', 'a'), Edit(5, 5, 'import', 'b'),
+    ])
+    assert edits == [Edit(0, 3, 'x', 'a'), Edit(5, 5, 'import', 'a')]
+    assert conflicts == []
+
+
+def test_insertions():
+    text = 'abcdef'
+    edits, conflicts = resolve_edits([
+        Edit(2, 2, '1', 'a'),
+        Edit(2, 2, '2', 'b'),
+        Edit(2, 4, 'XY', 'c'),  # starts at the insertions: no conflict
+        Edit(3, 3, '!', 'd'),   # strictly inside the replacement
+    ])
+    assert apply_edits(text, edits) == 'ab12XYef'
+    assert conflicts == [Conflict(3, 3, 'c', 'd')]
+
+
+def test_matches_the_reference_on_random_edits():
+    rng = random.Random(12)
+    for _ in range(500):
+        proposed = []
+        for n in range(rng.randint(1, 12)):
+            start = rng.randint(0, 30)
+            end = start + rng.choice([0, 0, 1, 2, 5, 12])
+            proposed.append(Edit(start, end, rng.choice('xyz'), f'r{n}'))
+        edits, conflicts = resolve_edits(proposed)
+        expected, expected_conflicts = _reference(proposed)
+
+        for a, b in zip(edits, edits[1:]):
+            assert a.end <= b.start
+        assert sorted(edits) == sorted(expected)
+        assert sorted(conflicts) == sorted(expected_conflicts)
+        text = 'abcdefghijklmnopqrstuvwxyz0123456789abcdefghij'
+        assert apply_edits(text, edits) == apply_edits(text, sorted(expected, key=lambda e: (e.start, e.end)))
+
+
+def test_index_reports_overlapping_range():
+    index = EditIndex()
+    for edit in [Edit(0, 2, '', 'a'), Edit(4, 6, '', 'b'), Edit(8, 10, '', 'c')]:
+        index.add(edit)
+    assert len(index) == 3
+    assert index.overlapping(Edit(5, 9, '', 'd')) == (1, 3)
+    assert index.overlapping(Edit(2, 4, '', 'd')) == (1, 1)
+
+
+def test_number_lines():
+    text = 'one\ntwo\nthree\nfour'
+    conflicts = [Conflict(text.index('four'), len(text), 'a', 'b'), Conflict(text.index('two'), 7, 'a', 'b')]
+    numbered = number_lines(conflicts, lambda start, end: text.count('\n', start, end))
+    assert [conflict.line for conflict in numbered] == [2, 4]
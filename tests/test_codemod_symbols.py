@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from codemod.outline import StructuralEditor
+from codemod.symbols import FieldSymbol, SymbolIndex, parse_symbols
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PERSONALITY = '''export interface AIPersonality {
+  id: string;
+  name: string;
+  traits: {
+    encouraging: number;
+    critical: number;
+  };
+  specialties?: string[];
+  counts: Map<string, number>;
+  status:
+    | 'active'
+    | 'idle';
+}
+
+export class AIWritingCompanionService {
+  getCurrentSession(): string {
+    // getCurrentSession() in a comment is not a call
+    return this.session.id;
+  }
+
+  start() {
+    const personality = { id: 'mentor', name: 'Wise Mentor' };
+    return this.getCurrentSession();
+  }
+}
+'''
+
+
+def _write(root, path, text):
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(text)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    _write(tmp_path, 'src/companion.ts', PERSONALITY)
+    _write(tmp_path, 'src/other.ts', 'export const session = service.getCurrentSession();\n')
+    return tmp_path
+
+
+def open_index(tree):
+    return SymbolIndex(str(tree), directory=str(tree / 'cache'), globs=['src/**/*.ts'])
+
+
+def test_importing_codemod_does_not_load_symbols():
+    code = ('import sys, codemod; loaded = "codemod.symbols" in sys.modules; '
+            'codemod.SymbolIndex; print(loaded, "codemod.symbols" in sys.modules)')
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ['False', 'True']
+
+
+def test_parse_symbols_reads_fields_methods_calls_and_uses():
+    symbols = parse_symbols(PERSONALITY)
+
+    assert [field.name for field in symbols.interfaces['AIPersonality']] == [
+        'id', 'name', 'traits', 'specialties', 'counts', 'status']
+    fields = {field.name: field for field in symbols.interfaces['AIPersonality']}
+    assert fields['specialties'] == FieldSymbol('specialties', True, 'string[]')
+    assert fields['counts'].type == 'Map<string, number>'
+    assert fields['traits'].type.startswith('{') and fields['traits'].type.endswith('}')
+    assert symbols.classes == {'AIWritingCompanionService': ['getCurrentSession', 'start']}
+    assert symbols.calls == {'getCurrentSession': [23]}
+    assert {'id', 'name', 'session'} <= set(symbols.uses)
+
+
+def test_index_is_built_once_and_reloaded_from_sqlite(tree):
+    with open_index(tree) as index:
+        assert index.update() == ['src/companion.ts', 'src/other.ts']
+        assert index.update() == []
+        built = dict(index.files)
+
+    with open_index(tree) as index:
+        # Rows come back from the database; nothing is parsed again
+        assert index.files == built
+        assert index.update() == []
+        assert index.call_sites('getCurrentSession') == [('src/companion.ts', 23), ('src/other.ts', 1)]
+
+        _write(tree, 'src/other.ts', 'export const session = null;\n')
+        assert index.update() == ['src/other.ts']
+        assert index.call_sites('getCurrentSession') == [('src/companion.ts', 23)]
+
+        os.remove(tree / 'src' / 'other.ts')
+        assert index.update() == []
+        assert list(index.files) == ['src/companion.ts']
+
+
+def test_object_problems(tree):
+    with open_index(tree) as index:
+        index.update()
+        keys = ['id', 'name', 'traits', 'counts', 'status']
+
+        assert index.object_problems('AIPersonality', keys) == []
+        assert index.object_problems('AIPersonality', keys + ['specialties']) == []
+        assert index.object_problems('AIPersonality', keys[1:] + ['role']) == [
+            "AIPersonality has no field 'role'",
+            'AIPersonality.id is required but missing',
+        ]
+        assert index.object_problems('Missing', keys) == ['interface Missing not found']
+
+
+def test_malformed_fields_are_rejected():
+    source = PERSONALITY.replace('  name: string;\n', '  name: string;\n  totalWords number;\n')
+
+    fields = {field.name: field for field in parse_symbols(source).interfaces['AIPersonality']}
+    # Neither indexed as a field nor taken into the type of the field before it
+    assert 'totalWords' not in fields
+    assert fields['name'].type == 'string'
+
+    with pytest.raises(ValueError, match='Not a field declaration'):
+        StructuralEditor(source).add_interface_fields('AIPersonality', ['totalWords number;'])
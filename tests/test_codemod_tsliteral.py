@@ -0,0 +1,85 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from codemod.tsliteral import LiteralEmitter, TSExpression, ts_const, ts_key, ts_literal, ts_string
+
+AWKWARD = 'it\'s "quoted" \\ back\nslash\r\t\x00\x7f \u2028\u2029 ünï'
+
+
+def test_strings_are_escaped_for_their_quote():
+    assert ts_string("it's") == "'it\\'s'"
+    assert ts_string('say "hi"', '"') == '"say \\"hi\\""'
+    assert ts_string('a\nb\\c') == "'a\\nb\\\\c'"
+    assert ts_string('\x00\u2028') == "'\\x00\\u2028'"
+
+
+def test_keys_are_bare_only_when_they_can_be():
+    assert ts_key('communicationStyle') == 'communicationStyle'
+    assert ts_key('$id') == '$id'
+    assert ts_key('x-y') == "'x-y'"
+    assert ts_key('1st') == "'1st'"
+    assert ts_key(3) == '3'
+    assert ts_key(-1) == "'-1'"
+    with pytest.raises(TypeError):
+        ts_key(True)
+
+
+def test_layout():
+    value = {
+        'id': 'mentor',
+        'traits': {'creative': 60},
+        'tags': ['a', 'b'],
+        'created': TSExpression('new Date().toISOString()'),
+        'nested': [{'a': None}, []],
+        'active': True,
+    }
+    assert ts_literal(value) == '''{
+  id: 'mentor',
+  traits: {
+    creative: 60
+  },
+  tags: ['a', 'b'],
+  created: new Date().toISOString(),
+  nested: [
+    {
+      a: null
+    },
+    []
+  ],
+  active: true
+}'''
+
+
+def test_long_scalar_lists_wrap():
+    words = [f'word{n}' for n in range(30)]
+    emitted = ts_literal({'words': words}, inline_width=40)
+    assert emitted.splitlines()[1] == '  words: ['
+    assert emitted.splitlines()[2] == "    'word0',"
+
+
+def test_level_and_options():
+    assert ts_literal({'a': [1]}, level=2) == '{\n      a: [1]\n    }'
+    assert ts_literal({'a': 1}, indent='    ', trailing_comma=True) == '{\n    a: 1,\n}'
+    assert ts_literal(['x'], quote='"') == '["x"]'
+    assert ts_const('mockIds', [1, 2], type='number[]', export=True) == 'export const mockIds: number[] = [1, 2];'
+    with pytest.raises(ValueError):
+        LiteralEmitter(quote='`')
+    with pytest.raises(TypeError):
+        ts_literal({'a': object()})
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+@pytest.mark.parametrize('quote', ['\'', '"'])
+def test_node_reads_back_the_same_data(quote):
+    value = {
+        'text': AWKWARD,
+        AWKWARD: [AWKWARD, 1, -2.5, 1e21, None, False],
+        'deep': [[{'x-y': {'': 'empty key'}}]],
+        7: 'numeric key',
+    }
+    script = f'process.stdout.write(JSON.stringify({ts_literal(value, quote=quote)}))'
+    output = subprocess.run(['node', '-e', script], capture_output=True, check=True).stdout
+    assert json.loads(output) == json.loads(json.dumps(value))
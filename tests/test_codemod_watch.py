@@ -0,0 +1,28 @@
+from codemod.engine import PatchEngine
+from codemod.rules import RegexRule
+from codemod.watch import Watcher
+
+
+def test_only_the_saved_file_is_rerun(tmp_path):
+    (tmp_path / 'src').mkdir()
+    for name in ('a', 'b', 'c'):
+        (tmp_path / 'src' / f'{name}.ts').write_text('const x = 1;\n')
+    rule = RegexRule('rename', 'src/*.ts', r'getItems', 'items')
+    engine = PatchEngine([rule], root=str(tmp_path), stream_threshold=None)
+
+    runs = []
+    run_file = engine.run_file
+    engine.run_file = lambda path, rules: runs.append(path) or run_file(path, rules)
+    watcher = Watcher(engine, ['src/*.ts'], interval=0.005, debounce=0.02)
+    watcher.prime()
+
+    (tmp_path / 'src' / 'b.ts').write_text('const x = this.getItems();\n')
+    # One turn of Watcher.serve
+    batch = watcher.process(watcher.settle(watcher.poll()))
+
+    assert runs == ['src/b.ts']
+    assert [result.path for result in batch.results] == ['src/b.ts']
+    assert batch.results[0].changed
+    assert (tmp_path / 'src' / 'b.ts').read_text() == 'const x = this.items();\n'
+    # The watcher's own write is not seen as another save
+    assert watcher.poll() == []